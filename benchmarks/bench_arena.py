@@ -0,0 +1,93 @@
+"""
+Benchmark de los asignadores de memoria del runtime
+Compila con -O2 un programa que en cada llamada a una función arma textos,
+listas y mapas de vida corta, y lo ejecuta con el asignador del sistema y
+con la arena (JADE_ALLOC=arena). Muestra el tiempo, la memoria máxima (RSS)
+y las estadísticas del runtime (JADE_ALLOC_STATS).
+
+Uso:
+    python benchmarks/bench_arena.py [--llamadas N] [--repeticiones N]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ASIGNADORES = ('sistema', 'arena')
+
+PROGRAMA = """
+funcion resumen(entero semilla)
+    variable filas = [0]
+    variable por_clave = {{"total": 0}}
+    variable i = 0
+    mientras i < 50 hacer
+        variable clave = "k" + convertir_a_texto((semilla + i) % 17)
+        variable fila = clave + "=" + convertir_a_texto(semilla * i) + ";"
+        filas.agregar(fila.longitud())
+        por_clave[clave] = i
+        i = i + 1
+    fin
+    retornar filas.longitud() + por_clave.longitud()
+fin
+
+funcion main()
+    variable total = 0
+    variable k = 0
+    mientras k < {llamadas} hacer
+        total = total + resumen(k)
+        k = k + 1
+    fin
+    mostrar(convertir_a_texto(total))
+fin
+"""
+
+
+def medir(ejecutable: str, asignador: str, repeticiones: int):
+    """Mejor tiempo (s), memoria máxima (KB), salida y estadísticas del runtime"""
+    entorno = {**os.environ, 'JADE_ALLOC': asignador, 'JADE_ALLOC_STATS': '1'}
+    mejor, memoria, salida, estadisticas = float('inf'), 0, None, ''
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        proceso = subprocess.Popen([ejecutable], stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                   stderr=subprocess.PIPE, env=entorno)
+        salida = proceso.stdout.read()
+        # Las estadísticas se escriben al terminar: son pocas líneas
+        estadisticas = proceso.stderr.read()
+        _, _, uso = os.wait4(proceso.pid, 0)
+        mejor = min(mejor, time.perf_counter() - inicio)
+        memoria = max(memoria, uso.ru_maxrss)
+    return mejor, memoria, salida, estadisticas.decode('utf-8')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de los asignadores del runtime de Jade')
+    parser.add_argument('--llamadas', type=int, default=100000)
+    parser.add_argument('--repeticiones', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        fuente = os.path.join(directorio, 'resumen.jde')
+        with open(fuente, 'w', encoding='utf-8') as f:
+            f.write(PROGRAMA.format(llamadas=args.llamadas))
+        ejecutable = os.path.join(directorio, 'resumen')
+        subprocess.run([sys.executable, os.path.join(RAIZ, 'src', 'compiler.py'), '-O2', '--sin-cache',
+                        fuente, '-o', ejecutable], check=True, stdout=subprocess.DEVNULL)
+
+        print(f"{args.llamadas} llamadas")
+        salidas = set()
+        for asignador in ASIGNADORES:
+            tiempo, memoria, salida, estadisticas = medir(ejecutable, asignador, args.repeticiones)
+            salidas.add(salida)
+            print(f"\n{asignador}: {tiempo * 1000:.1f} ms, memoria máxima {memoria / 1024:.1f} MB")
+            print(estadisticas.rstrip())
+        if len(salidas) != 1:
+            print("[!] las salidas no coinciden")
+
+
+if __name__ == "__main__":
+    main()
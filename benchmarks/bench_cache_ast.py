@@ -0,0 +1,68 @@
+"""
+Benchmark de la caché de AST de Jade
+Genera un programa de varios módulos en un directorio temporal y mide el
+tiempo de obtener el AST de todos ellos sin caché (lexer + parser), con la
+caché fría (lexer + parser + escritura) y con la caché caliente (lectura).
+
+Uso:
+    python benchmarks/bench_cache_ast.py [--modulos N] [--lineas N]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RAIZ, 'src'))
+
+from parse_cache import CacheAST
+from bench_memoria_ast import PLANTILLA_FUNCION
+
+
+def escribir_modulos(directorio: str, modulos: int, lineas: int) -> list:
+    """Escribe 'modulos' archivos de ~'lineas' líneas y retorna sus rutas"""
+    funciones = max(1, lineas // PLANTILLA_FUNCION.count('\n'))
+    rutas = []
+    for m in range(modulos):
+        ruta = os.path.join(directorio, f"modulo_{m}.jde")
+        with open(ruta, 'w', encoding='utf-8') as f:
+            for n in range(funciones):
+                f.write(PLANTILLA_FUNCION.format(n=m * funciones + n))
+        rutas.append(ruta)
+    return rutas
+
+
+def medir(cache: CacheAST, rutas: list) -> float:
+    inicio = time.perf_counter()
+    for ruta in rutas:
+        cache.parsear_archivo(ruta)
+    return time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de la caché de AST de Jade')
+    parser.add_argument('--modulos', type=int, default=50)
+    parser.add_argument('--lineas', type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        rutas = escribir_modulos(directorio, args.modulos, args.lineas)
+        print(f"{args.modulos} módulos de ~{args.lineas} líneas")
+
+        sin_cache = medir(CacheAST(habilitada=False), rutas)
+        fria = CacheAST()
+        tiempo_fria = medir(fria, rutas)
+        caliente = CacheAST()
+        tiempo_caliente = medir(caliente, rutas)
+
+        print(f"{'modo':<16} {'tiempo (s)':>10}")
+        print(f"{'sin caché':<16} {sin_cache:>10.3f}")
+        print(f"{'caché fría':<16} {tiempo_fria:>10.3f}   ({fria.resumen()})")
+        print(f"{'caché caliente':<16} {tiempo_caliente:>10.3f}   ({caliente.resumen()})")
+        print(f"aceleración en caliente: {sin_cache / tiempo_caliente:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
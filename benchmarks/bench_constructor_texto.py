@@ -0,0 +1,98 @@
+"""
+Benchmark del constructor de textos
+Arma un texto grande en un bucle de dos formas: con constructor_texto()
+(agregar + construir) y con concatenaciones repetidas (s = s + trozo), y
+mide ambas en los motores del intérprete y en el ejecutable compilado con
+-O2 (tiempo y memoria máxima). La concatenación repetida copia todo el
+texto en cada vuelta, por eso se mide con un tamaño menor.
+
+Uso:
+    python benchmarks/bench_constructor_texto.py [--tamano BYTES] [--tamano-concatenacion BYTES]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MOTORES = ('arbol', 'cierres', 'bytecode')
+
+PROGRAMA_CONSTRUCTOR = """
+funcion main()
+    variable ct = constructor_texto()
+    variable i = 0
+    mientras ct.longitud() < {tamano} hacer
+        ct.agregar(f("linea {{}};", i))
+        i = i + 1
+    fin
+    variable resultado = ct.construir()
+    mostrar(convertir_a_texto(resultado.longitud()))
+fin
+"""
+
+PROGRAMA_CONCATENACION = """
+funcion main()
+    variable resultado = ""
+    variable i = 0
+    mientras resultado.longitud() < {tamano} hacer
+        resultado = resultado + f("linea {{}};", i)
+        i = i + 1
+    fin
+    mostrar(convertir_a_texto(resultado.longitud()))
+fin
+"""
+
+
+def medir(comando, repeticiones: int):
+    """Mejor tiempo (s), memoria máxima (KB) y salida del comando"""
+    mejor, memoria, salida = float('inf'), 0, None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        proceso = subprocess.Popen(comando, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE)
+        salida = proceso.stdout.read()
+        _, _, uso = os.wait4(proceso.pid, 0)
+        mejor = min(mejor, time.perf_counter() - inicio)
+        memoria = max(memoria, uso.ru_maxrss)
+    return mejor, memoria, salida
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark del constructor de textos de Jade')
+    parser.add_argument('--tamano', type=int, default=1 << 20, help='bytes del texto con el constructor')
+    parser.add_argument('--tamano-concatenacion', type=int, default=1 << 15,
+                        help='bytes del texto con concatenaciones repetidas')
+    parser.add_argument('--repeticiones', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        casos = [
+            ('constructor', PROGRAMA_CONSTRUCTOR, args.tamano),
+            ('constructor', PROGRAMA_CONSTRUCTOR, args.tamano_concatenacion),
+            ('concatenacion', PROGRAMA_CONCATENACION, args.tamano_concatenacion),
+        ]
+        print(f"{'programa':<14} {'bytes':>9} {'motor':<10} {'tiempo (ms)':>12} {'memoria máx. (MB)':>18}")
+        for i, (nombre, plantilla, tamano) in enumerate(casos):
+            fuente = os.path.join(directorio, f"{nombre}_{i}.jde")
+            with open(fuente, 'w', encoding='utf-8') as f:
+                f.write(plantilla.format(tamano=tamano))
+            ejecutable = os.path.join(directorio, f"{nombre}_{i}")
+            subprocess.run([sys.executable, os.path.join(RAIZ, 'src', 'compiler.py'), '-O2', '--sin-cache',
+                            fuente, '-o', ejecutable], check=True, stdout=subprocess.DEVNULL)
+
+            comandos = [(motor, [sys.executable, os.path.join(RAIZ, 'src', 'interpreter.py'),
+                                 '--motor', motor, fuente]) for motor in MOTORES]
+            comandos.append(('nativo', [ejecutable]))
+            salidas = set()
+            for motor, comando in comandos:
+                tiempo, memoria, salida = medir(comando, args.repeticiones)
+                salidas.add(salida)
+                print(f"{nombre:<14} {tamano:>9} {motor:<10} {tiempo * 1000:>12.1f} {memoria / 1024:>18.1f}")
+            if len(salidas) != 1:
+                print("[!] las salidas no coinciden")
+
+
+if __name__ == "__main__":
+    main()
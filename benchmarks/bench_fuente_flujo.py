@@ -0,0 +1,66 @@
+"""
+Benchmark de memoria del lexer en flujo de Jade
+Tokeniza un programa generado de N líneas de dos formas: cargando todo el
+código en una cadena y llamando a tokenizar(), o leyendo el código por
+fragmentos desde un generador y consumiendo Lexer.iterar_tokens(). Con la
+fuente por fragmentos el pico de memoria no depende del tamaño del programa.
+
+Uso:
+    python benchmarks/bench_fuente_flujo.py [--lineas N]
+"""
+
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RAIZ, 'src'))
+
+from lexer import Lexer
+from bench_memoria_ast import PLANTILLA_FUNCION
+
+
+def fragmentos(lineas: int):
+    """Genera el programa función a función, sin construirlo completo"""
+    for n in range(max(1, lineas // PLANTILLA_FUNCION.count('\n'))):
+        yield PLANTILLA_FUNCION.format(n=n)
+
+
+def completo(lineas: int) -> int:
+    codigo = ''.join(fragmentos(lineas))
+    return len(Lexer(codigo).tokenizar())
+
+
+def en_flujo(lineas: int) -> int:
+    return sum(1 for _ in Lexer(fragmentos(lineas)).iterar_tokens())
+
+
+def medir(funcion, lineas):
+    """Retorna (tokens, bytes pico, segundos)"""
+    gc.collect()
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    tokens = funcion(lineas)
+    tiempo = time.perf_counter() - inicio
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return tokens, pico, tiempo
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de memoria del lexer en flujo de Jade')
+    parser.add_argument('--lineas', type=int, default=20_000)
+    args = parser.parse_args()
+
+    print(f"{'lineas':>8} {'modo':<10} {'tokens':>9} {'pico (MB)':>10} {'tiempo (s)':>10}")
+    for lineas in (args.lineas // 4, args.lineas):
+        for modo, funcion in (('completo', completo), ('en flujo', en_flujo)):
+            tokens, pico, tiempo = medir(funcion, lineas)
+            print(f"{lineas:>8} {modo:<10} {tokens:>9} {pico / 1e6:>10.2f} {tiempo:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
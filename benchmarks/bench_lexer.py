@@ -0,0 +1,86 @@
+"""
+Benchmark de rendimiento del lexer de Jade
+Mide el throughput (MB/s de código fuente) del lexer clásico (carácter a
+carácter) y del lexer rápido (expresión regular maestra) sobre corpus
+generados, tanto produciendo lista de Token como FlujoTokens. Verifica
+además que ambos motores producen exactamente los mismos tokens.
+
+Uso:
+    python benchmarks/bench_lexer.py [--lineas N] [--repeticiones N]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RAIZ, 'src'))
+
+from lexer import crear_lexer, MOTORES_LEXER
+from bench_memoria_ast import generar_programa
+
+
+# Corpus con más literales, comentarios y escapes que el programa generado
+PLANTILLA_TEXTOS = '''
+/* Bloque {n}:
+   comentario de varias líneas */
+funcion describir_{n}(nombre, edad)
+    // saludo con escapes
+    variable saludo = "Hola, \\"" + nombre + "\\"\\n"
+    variable inicial = 'J'
+    variable separador = '\\t'
+    variable nota = """texto
+multilínea {n}"""
+    retornar saludo + convertir_a_texto(edad * 1.5) + nota
+fin
+'''
+
+
+def generar_corpus_textos(lineas: int) -> str:
+    lineas_por_bloque = PLANTILLA_TEXTOS.count('\n')
+    bloques = [PLANTILLA_TEXTOS.format(n=n) for n in range(max(1, lineas // lineas_por_bloque))]
+    return ''.join(bloques)
+
+
+def medir(motor, salida, codigo, repeticiones):
+    """Retorna el mejor tiempo (segundos) de tokenizar el código"""
+    mejor = float('inf')
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        getattr(crear_lexer(codigo, motor), salida)()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de throughput del lexer de Jade')
+    parser.add_argument('--lineas', type=int, default=20_000)
+    parser.add_argument('--repeticiones', type=int, default=3)
+    args = parser.parse_args()
+
+    corpus = {
+        'programa': generar_programa(args.lineas),
+        'textos': generar_corpus_textos(args.lineas),
+    }
+
+    for nombre, codigo in corpus.items():
+        tokens = [[(t.tipo, t.valor, t.linea, t.columna) for t in crear_lexer(codigo, motor).tokenizar()]
+                  for motor in MOTORES_LEXER]
+        assert all(t == tokens[0] for t in tokens), f"los motores difieren en el corpus '{nombre}'"
+
+        megabytes = len(codigo.encode('utf-8')) / 1e6
+        print(f"corpus '{nombre}': {codigo.count(chr(10))} líneas, {megabytes:.2f} MB, "
+              f"{len(tokens[0])} tokens")
+        print(f"  {'motor':<8} {'salida':<16} {'tiempo (s)':>10} {'MB/s':>8}")
+        for salida in ('tokenizar', 'tokenizar_flujo'):
+            base = None
+            for motor in MOTORES_LEXER:
+                tiempo = medir(motor, salida, codigo, args.repeticiones)
+                base = base or tiempo
+                print(f"  {motor:<8} {salida:<16} {tiempo:>10.3f} {megabytes / tiempo:>8.2f}"
+                      f"   ({base / tiempo:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Microbenchmark del indexado de listas en el código generado
+Compila un bucle numérico sobre una lista[entero] con acceso en línea
+(comprobación de límites y load/store generados por GeneradorLLVM) y con
+llamadas a jade_lista_obtener/asignar del runtime, a -O0 y -O2, y mide el
+tiempo de ejecución de cada ejecutable.
+
+Uso:
+    python benchmarks/bench_listas.py [--repeticiones N] [--elementos N] [--vueltas N]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RAIZ, 'src'))
+
+from lexer import tokenizar_codigo
+from parser import parsear_codigo
+from semantic_analyzer import AnalizadorSemantico
+from resolver import Resolutor
+from codegen_llvm import GeneradorLLVM, inicializar_llvm
+from optimizer import optimizar_ir
+from linker import compilar_runtime, crear_maquina_destino, emitir_objeto, enlazar
+
+PROGRAMA = """
+funcion main()
+    variable n = {elementos}
+    variable xs = [0]
+    variable i = 1
+    mientras i < n hacer
+        xs.agregar(i)
+        i = i + 1
+    fin
+    variable total = 0
+    variable vuelta = 0
+    mientras vuelta < {vueltas} hacer
+        i = 0
+        mientras i < n hacer
+            xs[i] = xs[i] + vuelta
+            total = total + xs[i]
+            i = i + 1
+        fin
+        vuelta = vuelta + 1
+    fin
+    mostrar(convertir_a_texto(total))
+fin
+"""
+
+
+def compilar(codigo: str, acceso_en_linea: bool, nivel: int, directorio: str, runtime: str) -> str:
+    programa = parsear_codigo(tokenizar_codigo(codigo))
+    AnalizadorSemantico("bench_listas.jde").analizar(programa, requiere_main=True)
+    Resolutor().resolver_programa(programa)
+    llvm_ir = GeneradorLLVM(acceso_en_linea=acceso_en_linea).generar(programa)
+    optimizado, _, _ = optimizar_ir(llvm_ir, nivel)
+    nombre = f"listas_{'linea' if acceso_en_linea else 'runtime'}_O{nivel}"
+    objeto = os.path.join(directorio, nombre + ".o")
+    ejecutable = os.path.join(directorio, nombre)
+    emitir_objeto(optimizado, objeto, crear_maquina_destino(nivel))
+    enlazar([objeto, runtime], ejecutable)
+    return ejecutable
+
+
+def medir(ejecutable: str, repeticiones: int):
+    """Mejor tiempo de ejecución en segundos y salida del programa"""
+    mejor = float('inf')
+    salida = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = subprocess.run([ejecutable], stdin=subprocess.DEVNULL, capture_output=True,
+                                   text=True, timeout=300)
+        mejor = min(mejor, time.perf_counter() - inicio)
+        salida = resultado.stdout
+    return mejor, salida
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Microbenchmark de indexado de listas de Jade')
+    parser.add_argument('--repeticiones', type=int, default=3)
+    parser.add_argument('--elementos', type=int, default=1000000)
+    parser.add_argument('--vueltas', type=int, default=20)
+    args = parser.parse_args()
+    codigo = PROGRAMA.format(elementos=args.elementos, vueltas=args.vueltas)
+
+    inicializar_llvm()
+    with tempfile.TemporaryDirectory() as directorio:
+        runtime = compilar_runtime(directorio)
+        print(f"{args.elementos} elementos, {args.vueltas} vueltas (lectura + escritura por elemento)")
+        print(f"{'acceso':<10} {'nivel':>5} {'tiempo (ms)':>12} {'aceleración':>12}")
+        for nivel in (0, 2):
+            base = None
+            salidas = set()
+            for acceso_en_linea in (False, True):
+                ejecutable = compilar(codigo, acceso_en_linea, nivel, directorio, runtime)
+                tiempo, salida = medir(ejecutable, args.repeticiones)
+                salidas.add(salida)
+                base = base or tiempo
+                nombre = 'en línea' if acceso_en_linea else 'runtime'
+                print(f"{nombre:<10} {'-O' + str(nivel):>5} {tiempo * 1000:>12.1f} {base / tiempo:>11.2f}x")
+            if len(salidas) != 1:
+                print("  [!] las salidas no coinciden")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+/*
+ * Benchmark del mapa del runtime de Jade
+ * Mide inserción, búsqueda (claves presentes y ausentes), borrado y
+ * reinserción con N claves de texto (y, si el runtime los tiene, inserción y
+ * búsqueda en un mapa de claves enteras), y verifica cada fase.
+ * Las búsquedas y borrados recorren las claves en orden aleatorio: con
+ * claves consecutivas, un hash débil que las deja en posiciones contiguas
+ * saldría favorecido por la caché.
+ *
+ * Compilación (o con benchmarks/bench_mapa.py, que además compara variantes):
+ *   gcc -O2 -Istd benchmarks/bench_mapa.c std/runtime.c -lm -o bench_mapa
+ *   gcc -O2 -DJADE_MAPA_ROBIN_HOOD -Istd ... (sondeo Robin Hood)
+ *
+ * Uso: ./bench_mapa [N]   (por defecto 1000000)
+ */
+
+#include "runtime.h"
+#include <stdint.h>
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <time.h>
+
+static double ahora(void) {
+  struct timespec t;
+  clock_gettime(CLOCK_MONOTONIC, &t);
+  return t.tv_sec + t.tv_nsec * 1e-9;
+}
+
+static char **crear_claves(const char *prefijo, int64_t n) {
+  char **claves = (char **)malloc(sizeof(char *) * n);
+  for (int64_t i = 0; i < n; i++) {
+    char buffer[64];
+    int longitud = snprintf(buffer, sizeof(buffer), "%s:%lld", prefijo, (long long)i);
+#ifdef JADE_TEXTO_INMORTAL
+    /* Las claves de texto del mapa son JadeString */
+    claves[i] = jade_texto_nuevo(buffer, longitud);
+#else
+    claves[i] = (char *)malloc(longitud + 1);
+    memcpy(claves[i], buffer, longitud + 1);
+#endif
+  }
+  return claves;
+}
+
+/* Permutación aleatoria (Fisher-Yates con semilla fija) */
+static int64_t *permutacion(int64_t n) {
+  int64_t *orden = (int64_t *)malloc(sizeof(int64_t) * n);
+  uint64_t estado = 0x9e3779b97f4a7c15ULL;
+  for (int64_t i = 0; i < n; i++) {
+    orden[i] = i;
+  }
+  for (int64_t i = n - 1; i > 0; i--) {
+    estado ^= estado << 13;
+    estado ^= estado >> 7;
+    estado ^= estado << 17;
+    int64_t j = (int64_t)(estado % (uint64_t)(i + 1));
+    int64_t t = orden[i];
+    orden[i] = orden[j];
+    orden[j] = t;
+  }
+  return orden;
+}
+
+static void informar(const char *fase, double segundos, int64_t operaciones) {
+  printf("%-24s %10.1f ms %8.1f ns/op\n", fase, segundos * 1000,
+         segundos * 1e9 / operaciones);
+}
+
+static void verificar(int condicion, const char *fase) {
+  if (!condicion) {
+    fprintf(stderr, "Error: resultado incorrecto en la fase '%s'\n", fase);
+    exit(1);
+  }
+}
+
+int main(int argc, char **argv) {
+  int64_t n = argc > 1 ? atoll(argv[1]) : 1000000;
+  char **claves = crear_claves("clave", n);
+  char **ausentes = crear_claves("ausente", n);
+  int64_t *orden = permutacion(n);
+  JadeMap *mapa = jade_mapa_nuevo();
+  double inicio;
+  int64_t encontrados;
+
+  inicio = ahora();
+  for (int64_t i = 0; i < n; i++) {
+    jade_mapa_asignar(mapa, claves[i], (void *)(intptr_t)(i + 1));
+  }
+  informar("insertar", ahora() - inicio, n);
+  verificar(jade_mapa_longitud(mapa) == n, "insertar");
+
+  inicio = ahora();
+  encontrados = 0;
+  for (int64_t k = 0; k < n; k++) {
+    int64_t i = orden[k];
+    encontrados += (intptr_t)jade_mapa_obtener(mapa, claves[i]) == i + 1;
+  }
+  informar("buscar (presentes)", ahora() - inicio, n);
+  verificar(encontrados == n, "buscar (presentes)");
+
+  inicio = ahora();
+  encontrados = 0;
+  for (int64_t k = 0; k < n; k++) {
+    encontrados += jade_mapa_contiene(mapa, ausentes[orden[k]]);
+  }
+  informar("buscar (ausentes)", ahora() - inicio, n);
+  verificar(encontrados == 0, "buscar (ausentes)");
+
+  inicio = ahora();
+  /* Claves con índice par, en orden aleatorio */
+  for (int64_t k = 0; k < n; k++) {
+    if (orden[k] % 2 == 0) {
+      jade_mapa_eliminar(mapa, claves[orden[k]]);
+    }
+  }
+  informar("eliminar (la mitad)", ahora() - inicio, (n + 1) / 2);
+  verificar(jade_mapa_longitud(mapa) == n - (n + 1) / 2, "eliminar");
+
+  inicio = ahora();
+  encontrados = 0;
+  for (int64_t k = 0; k < n; k++) {
+    encontrados += jade_mapa_contiene(mapa, claves[orden[k]]);
+  }
+  informar("buscar tras eliminar", ahora() - inicio, n);
+  verificar(encontrados == n - (n + 1) / 2, "buscar tras eliminar");
+
+  inicio = ahora();
+  for (int64_t i = 0; i < n; i += 2) {
+    jade_mapa_asignar(mapa, claves[i], (void *)(intptr_t)(i + 1));
+  }
+  informar("reinsertar", ahora() - inicio, (n + 1) / 2);
+  verificar(jade_mapa_longitud(mapa) == n, "reinsertar");
+  for (int64_t i = 0; i < n; i++) {
+    verificar((intptr_t)jade_mapa_obtener(mapa, claves[i]) == i + 1, "reinsertar");
+  }
+
+  jade_mapa_liberar(mapa);
+
+#ifdef JADE_CLAVE_ENTERO
+  /* Claves enteras: sin strlen ni strcmp */
+  mapa = jade_mapa_entero_nuevo();
+  inicio = ahora();
+  for (int64_t i = 0; i < n; i++) {
+    jade_mapa_entero_asignar(mapa, i, (void *)(intptr_t)(i + 1));
+  }
+  informar("insertar (entero)", ahora() - inicio, n);
+
+  inicio = ahora();
+  encontrados = 0;
+  for (int64_t k = 0; k < n; k++) {
+    int64_t i = orden[k];
+    encontrados += (intptr_t)jade_mapa_entero_obtener(mapa, i) == i + 1;
+  }
+  informar("buscar (entero)", ahora() - inicio, n);
+  verificar(encontrados == n, "buscar (entero)");
+  jade_mapa_liberar(mapa);
+#endif
+  return 0;
+}
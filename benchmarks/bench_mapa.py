@@ -0,0 +1,67 @@
+"""
+Benchmark del mapa del runtime de C
+Compila benchmarks/bench_mapa.c con std/runtime.c en sus dos variantes
+(sondeo lineal con tombstones y Robin Hood) y, opcionalmente, con el
+runtime de una revisión de git anterior, y ejecuta inserción, búsqueda y
+borrado con N claves de texto.
+
+Uso:
+    python benchmarks/bench_mapa.py [--claves N] [--revision REV]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RAIZ, 'src'))
+
+from linker import DIRECTORIO_STD, compilador_c
+
+HARNESS = os.path.join(RAIZ, 'benchmarks', 'bench_mapa.c')
+
+VARIANTES = [
+    ('lineal + tombstones', []),
+    ('robin hood', ['-DJADE_MAPA_ROBIN_HOOD']),
+]
+
+
+def extraer_runtime(revision: str, directorio: str) -> str:
+    """Copia std/runtime.{c,h} de una revisión de git a 'directorio'"""
+    for nombre in ('runtime.c', 'runtime.h'):
+        contenido = subprocess.run(['git', 'show', f'{revision}:std/{nombre}'], cwd=RAIZ,
+                                   capture_output=True, check=True).stdout
+        with open(os.path.join(directorio, nombre), 'wb') as f:
+            f.write(contenido)
+    return directorio
+
+
+def compilar(directorio_std: str, opciones, ejecutable: str):
+    subprocess.run([compilador_c(), '-O2', *opciones, f'-I{directorio_std}', HARNESS,
+                    os.path.join(directorio_std, 'runtime.c'), '-lm', '-o', ejecutable], check=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark del mapa del runtime de Jade')
+    parser.add_argument('--claves', type=int, default=1000000)
+    parser.add_argument('--revision', help='comparar también con el runtime de esta revisión de git')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        variantes = [(nombre, DIRECTORIO_STD, opciones) for nombre, opciones in VARIANTES]
+        if args.revision:
+            std_anterior = os.path.join(directorio, 'std')
+            os.makedirs(std_anterior)
+            variantes.insert(0, (args.revision, extraer_runtime(args.revision, std_anterior), []))
+        for i, (nombre, directorio_std, opciones) in enumerate(variantes):
+            ejecutable = os.path.join(directorio, f'bench_mapa_{i}')
+            compilar(directorio_std, opciones, ejecutable)
+            print(f"== {nombre} ({args.claves} claves)")
+            sys.stdout.flush()
+            subprocess.run([ejecutable, str(args.claves)], check=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Benchmark de memoria del AST de Jade
+Mide la memoria retenida por el AST de un programa generado de ~100k líneas
+con los nodos compactos (__slots__, posición empaquetada, operadores
+compartidos) y con la representación anterior (__dict__ por instancia y un
+Token vivo por nodo), reconstruida a partir del mismo árbol.
+
+Uso:
+    python benchmarks/bench_memoria_ast.py [--lineas N]
+"""
+
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RAIZ, 'src'))
+
+from lexer import tokenizar_codigo
+from parser import parsear_codigo
+from ast_nodes import NodoAST, Operador
+from token_types import Token, TokenType
+
+
+# Función de ~20 líneas que se repite hasta alcanzar el tamaño pedido
+PLANTILLA_FUNCION = """
+funcion calcular_{n}(a, b)
+    variable total = 0
+    variable valores = [a, b, {n}]
+    para i desde 0 hasta a hacer
+        si i % 2 == 0 entonces
+            total = total + i * b
+        sino
+            total = total - valores[1]
+        fin
+    fin
+    mientras total > 1000 hacer
+        total = total / 2
+    fin
+    variable mensaje = "resultado " + convertir_a_texto(total)
+    si total > b y a < {n} entonces
+        retornar total + {n}
+    fin
+    retornar -total
+fin
+"""
+
+
+def generar_programa(lineas: int) -> str:
+    """Genera un programa Jade de aproximadamente 'lineas' líneas"""
+    lineas_por_funcion = PLANTILLA_FUNCION.count('\n')
+    funciones = [PLANTILLA_FUNCION.format(n=n) for n in range(max(1, lineas // lineas_por_funcion))]
+    funciones.append("\nfuncion main()\n    mostrar(calcular_0(3, 4))\nfin\n")
+    return ''.join(funciones)
+
+
+# ============================================================================
+# REPRESENTACIÓN ANTERIOR
+# ============================================================================
+
+_CLASES_CON_DICT = {}
+
+
+def _clase_con_dict(clase):
+    """Clase equivalente sin __slots__ (una instancia = objeto + __dict__)"""
+    if clase not in _CLASES_CON_DICT:
+        _CLASES_CON_DICT[clase] = type(clase.__name__, (), {})
+    return _CLASES_CON_DICT[clase]
+
+
+def _atributos(nodo):
+    for clase in type(nodo).__mro__:
+        for nombre in getattr(clase, '__slots__', ()):
+            if nombre != 'posicion' and hasattr(nodo, nombre):
+                yield nombre, getattr(nodo, nombre)
+
+
+def _convertir(valor, linea, columna):
+    if isinstance(valor, NodoAST):
+        return a_representacion_anterior(valor)
+    if isinstance(valor, Operador):
+        # Antes cada nodo retenía su propio token de operador
+        return Token(valor.tipo, valor.valor, linea, columna)
+    if isinstance(valor, list):
+        return [_convertir(v, linea, columna) for v in valor]
+    if isinstance(valor, tuple):
+        return tuple(_convertir(v, linea, columna) for v in valor)
+    return valor
+
+
+def a_representacion_anterior(nodo: NodoAST):
+    """Copia el AST con un __dict__ por nodo y un Token vivo por nodo"""
+    copia = _clase_con_dict(type(nodo))()
+    linea, columna = nodo.linea, nodo.columna
+    for nombre, valor in _atributos(nodo):
+        setattr(copia, nombre, _convertir(valor, linea, columna))
+    copia.token = Token(TokenType.IDENTIFICADOR, getattr(nodo, 'nombre', ''), linea, columna)
+    return copia
+
+
+# ============================================================================
+# MEDICIÓN
+# ============================================================================
+
+def contar_nodos(nodo) -> int:
+    if isinstance(nodo, NodoAST):
+        return 1 + sum(contar_nodos(v) for _, v in _atributos(nodo))
+    if isinstance(nodo, (list, tuple)):
+        return sum(contar_nodos(v) for v in nodo)
+    return 0
+
+
+def memoria_retenida(construir):
+    """Retorna (objeto, bytes retenidos) tras construir el objeto"""
+    gc.collect()
+    tracemalloc.start()
+    inicio = tracemalloc.get_traced_memory()[0]
+    objeto = construir()
+    gc.collect()
+    retenido = tracemalloc.get_traced_memory()[0] - inicio
+    tracemalloc.stop()
+    return objeto, retenido
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de memoria del AST de Jade')
+    parser.add_argument('--lineas', type=int, default=100_000)
+    args = parser.parse_args()
+
+    codigo = generar_programa(args.lineas)
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 10_000))
+
+    # Los tokens se generan fuera de la medición: los lexemas que comparten
+    # con los nodos (nombres, literales) cuentan igual en ambas representaciones
+    tokens = tokenizar_codigo(codigo)
+    programa, compacto = memoria_retenida(lambda: parsear_codigo(tokens))
+    del tokens
+    _, anterior = memoria_retenida(lambda: a_representacion_anterior(programa))
+
+    nodos = contar_nodos(programa)
+    print(f"programa: {codigo.count(chr(10))} líneas, {nodos} nodos")
+    print(f"{'representacion':<28} {'MB':>10} {'bytes/nodo':>12}")
+    print(f"{'anterior (__dict__ + Token)':<28} {anterior / 1e6:>10.1f} {anterior / nodos:>12.1f}")
+    print(f"{'compacta (__slots__)':<28} {compacto / 1e6:>10.1f} {compacto / nodos:>12.1f}")
+    print(f"reduccion: {anterior / compacto:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
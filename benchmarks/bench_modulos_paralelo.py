@@ -0,0 +1,80 @@
+"""
+Benchmark de carga paralela de módulos de Jade
+Genera un proyecto sintético de N módulos organizados en capas (cada módulo
+importa dos de la capa inferior) y mide el tiempo total del intérprete
+(arranque en frío, sin caché de AST) con distinta cantidad de procesos.
+Con --procesos 1 se usa el camino secuencial.
+
+Uso:
+    python benchmarks/bench_modulos_paralelo.py [--modulos N] [--funciones N] [--procesos 1,2,4]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RAIZ, 'src'))
+
+from bench_memoria_ast import PLANTILLA_FUNCION
+
+MODULOS_POR_CAPA = 20
+
+
+def escribir_proyecto(directorio: str, modulos: int, funciones: int) -> str:
+    """Escribe el proyecto y retorna la ruta del programa principal"""
+    capas = max(1, modulos // MODULOS_POR_CAPA)
+    for capa in range(capas):
+        for j in range(MODULOS_POR_CAPA):
+            m = capa * MODULOS_POR_CAPA + j
+            partes = []
+            if capa > 0:
+                for k in (j, (j + 1) % MODULOS_POR_CAPA):
+                    partes.append(f'importar "modulo_{(capa - 1) * MODULOS_POR_CAPA + k}.jde"\n')
+            partes += [PLANTILLA_FUNCION.format(n=m * funciones + n) for n in range(funciones)]
+            # Cada módulo usa una función de su capa inferior
+            anterior = ((capa - 1) * MODULOS_POR_CAPA + j) * funciones if capa > 0 else m * funciones
+            partes.append(f"\nfuncion usa_{m}()\n    retornar calcular_{anterior}(1, 2)\nfin\n")
+            with open(os.path.join(directorio, f"modulo_{m}.jde"), 'w', encoding='utf-8') as f:
+                f.write(''.join(partes))
+
+    superior = (capas - 1) * MODULOS_POR_CAPA
+    principal = os.path.join(directorio, "principal.jde")
+    with open(principal, 'w', encoding='utf-8') as f:
+        for j in range(MODULOS_POR_CAPA):
+            f.write(f'importar "modulo_{superior + j}.jde"\n')
+        f.write(f'\nfuncion main()\n    mostrar(usa_{superior}())\nfin\n')
+    return principal
+
+
+def medir(principal: str, procesos: int) -> float:
+    comando = [sys.executable, os.path.join(RAIZ, 'src', 'interpreter.py'),
+               '--sin-cache', '--procesos', str(procesos), principal]
+    inicio = time.perf_counter()
+    subprocess.run(comando, check=True, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de carga paralela de módulos de Jade')
+    parser.add_argument('--modulos', type=int, default=200)
+    parser.add_argument('--funciones', type=int, default=5, help='Funciones de ~20 líneas por módulo')
+    parser.add_argument('--procesos', default='1,2,4,8')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        principal = escribir_proyecto(directorio, args.modulos, args.funciones)
+        print(f"{args.modulos} módulos x {args.funciones} funciones, {os.cpu_count()} CPU disponibles")
+        print(f"{'procesos':>8} {'tiempo (s)':>10} {'aceleración':>12}")
+        base = None
+        for procesos in (int(p) for p in args.procesos.split(',')):
+            tiempo = medir(principal, procesos)
+            base = base or tiempo
+            print(f"{procesos:>8} {tiempo:>10.2f} {base / tiempo:>11.2f}x")
+
+
+if __name__ == "__main__":
+    main()
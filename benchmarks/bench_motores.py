@@ -0,0 +1,89 @@
+"""
+Benchmark de los motores del intérprete de Jade
+Compara el intérprete de árbol con los motores alternativos
+
+Uso:
+    python benchmarks/bench_motores.py [--repeticiones N]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RAIZ, 'src'))
+
+from lexer import tokenizar_codigo
+from parser import parsear_codigo
+from interpreter import InterpreteJade
+from closure_compiler import InterpreteCierres
+from vm import InterpreteBytecode
+
+
+MOTORES = {
+    'arbol': InterpreteJade,
+    'cierres': InterpreteCierres,
+    'bytecode': InterpreteBytecode,
+}
+
+# Programa sintético dominado por bucles y llamadas (sin salida)
+PROGRAMA_BUCLES = """
+funcion fib(n)
+    si n <= 1 entonces
+        retornar n
+    fin
+    retornar fib(n - 1) + fib(n - 2)
+fin
+
+funcion main()
+    variable total = 0
+    para i desde 0 hasta 20000 hacer
+        total = total + i * 2 % 7
+    fin
+    variable r = fib(16)
+fin
+"""
+
+
+def cargar_programas():
+    """Carga los programas a medir: (nombre, ruta, AST)"""
+    programas = []
+    for nombre in ('fibonacci.jde', 'factorial.jde'):
+        ruta = os.path.join(RAIZ, 'examples', nombre)
+        with open(ruta, 'r', encoding='utf-8') as f:
+            programas.append((nombre, ruta, parsear_codigo(tokenizar_codigo(f.read()))))
+    programas.append(('sintetico (bucles+recursion)', '',
+                      parsear_codigo(tokenizar_codigo(PROGRAMA_BUCLES))))
+    return programas
+
+
+def medir(clase_motor, ruta, programa, repeticiones):
+    """Retorna el mejor tiempo (segundos) de ejecutar el programa"""
+    mejor = float('inf')
+    for _ in range(repeticiones):
+        with contextlib.redirect_stdout(io.StringIO()):
+            inicio = time.perf_counter()
+            clase_motor(ruta).ejecutar_programa(programa)
+            mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de motores de Jade')
+    parser.add_argument('--repeticiones', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'programa':<30} {'motor':<10} {'tiempo (ms)':>12} {'aceleracion':>12}")
+    for nombre, ruta, programa in cargar_programas():
+        base = None
+        for motor, clase in MOTORES.items():
+            t = medir(clase, ruta, programa, args.repeticiones)
+            base = base or t
+            print(f"{nombre:<30} {motor:<10} {t * 1000:>12.3f} {base / t:>11.2f}x")
+
+
+if __name__ == "__main__":
+    main()
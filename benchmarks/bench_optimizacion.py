@@ -0,0 +1,120 @@
+"""
+Benchmark de los niveles de optimización del compilador de Jade
+Compila los ejemplos (y un programa sintético de cálculo) con -O0 a -O3,
+enlaza cada uno con el runtime y mide el tamaño del IR y el tiempo de
+ejecución del ejecutable. Los ejemplos que el generador LLVM todavía no
+soporta se omiten.
+
+Uso:
+    python benchmarks/bench_optimizacion.py [--repeticiones N] [--niveles 0,1,2,3]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RAIZ, 'src'))
+
+from lexer import tokenizar_codigo
+from parser import parsear_codigo
+from semantic_analyzer import AnalizadorSemantico
+from resolver import Resolutor
+from codegen_llvm import GeneradorLLVM, inicializar_llvm
+from optimizer import optimizar_ir
+from linker import compilar_runtime, crear_maquina_destino, emitir_objeto, enlazar
+
+# Programa sintético dominado por bucles y llamadas
+PROGRAMA_CALCULO = """
+funcion fib(entero n)
+    si n <= 1 entonces
+        retornar n
+    fin
+    retornar fib(n - 1) + fib(n - 2)
+fin
+
+funcion suma_modular(entero n)
+    variable total = 0
+    variable i = 0
+    mientras i < n hacer
+        total = total + i * 2 % 7
+        i = i + 1
+    fin
+    retornar total
+fin
+
+funcion main()
+    mostrar(convertir_a_texto(fib(27)))
+    mostrar(convertir_a_texto(suma_modular(20000000)))
+fin
+"""
+
+
+def cargar_programas():
+    """(nombre, código) de los ejemplos y del programa sintético"""
+    programas = []
+    directorio = os.path.join(RAIZ, 'examples')
+    for nombre in sorted(os.listdir(directorio)):
+        if nombre.endswith('.jde'):
+            with open(os.path.join(directorio, nombre), 'r', encoding='utf-8') as f:
+                programas.append((nombre, f.read()))
+    programas.append(('sintetico (calculo)', PROGRAMA_CALCULO))
+    return programas
+
+
+def generar_ir(codigo: str, ruta: str) -> str:
+    programa = parsear_codigo(tokenizar_codigo(codigo))
+    AnalizadorSemantico(ruta).analizar(programa, requiere_main=True)
+    Resolutor().resolver_programa(programa)
+    return GeneradorLLVM().generar(programa)
+
+
+def medir(ejecutable: str, repeticiones: int) -> float:
+    """Mejor tiempo de ejecución en segundos"""
+    mejor = float('inf')
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        subprocess.run([ejecutable], stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL, timeout=120)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de niveles de optimización de Jade')
+    parser.add_argument('--repeticiones', type=int, default=3)
+    parser.add_argument('--niveles', default='0,1,2,3')
+    args = parser.parse_args()
+    niveles = [int(n) for n in args.niveles.split(',')]
+
+    inicializar_llvm()
+    with tempfile.TemporaryDirectory() as directorio:
+        runtime = compilar_runtime(directorio)
+        print(f"{'programa':<24} {'nivel':>5} {'instr.':>7} {'allocas':>8} {'bytes IR':>9} {'tiempo (ms)':>12}")
+        for nombre, codigo in cargar_programas():
+            try:
+                llvm_ir = generar_ir(codigo, os.path.join(RAIZ, 'examples', nombre))
+            except Exception as e:
+                print(f"{nombre:<24} omitido ({type(e).__name__})")
+                continue
+            for nivel in niveles:
+                try:
+                    optimizado, _, tamano = optimizar_ir(llvm_ir, nivel)
+                    objeto = os.path.join(directorio, f"programa_O{nivel}.o")
+                    ejecutable = os.path.join(directorio, f"programa_O{nivel}")
+                    # El IR ya está optimizado: la máquina usa el mismo nivel para el código nativo
+                    emitir_objeto(optimizado, objeto, crear_maquina_destino(nivel))
+                    enlazar([objeto, runtime], ejecutable)
+                except Exception as e:
+                    print(f"{nombre:<24} omitido ({type(e).__name__})")
+                    break
+                tiempo = medir(ejecutable, args.repeticiones)
+                print(f"{nombre:<24} {'-O' + str(nivel):>5} {tamano.instrucciones:>7} {tamano.allocas:>8} "
+                      f"{tamano.bytes:>9} {tiempo * 1000:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark de recursión profunda del intérprete de árbol
+Compara la pila de marcos (MarcoLlamada) con el esquema anterior, que
+copiaba todo el scope en cada llamada (costo proporcional al número de
+variables vivas)
+
+Uso:
+    python benchmarks/bench_recursion.py [--profundidad N] [--repeticiones N]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RAIZ, 'src'))
+
+from lexer import tokenizar_codigo
+from parser import parsear_codigo
+from interpreter import InterpreteJade
+
+
+class InterpreteCopiaScope(InterpreteJade):
+    """Referencia: llamadas con copia completa del scope (implementación previa)"""
+
+    def ejecutar_funcion(self, nombre: str, argumentos: list):
+        if nombre not in self.funciones:
+            raise NameError(f"Función '{nombre}' no definida")
+
+        func = self.funciones[nombre]
+        scope_anterior = self.variables.copy()
+        for i, (param_nombre, _) in enumerate(func.parametros):
+            if i < len(argumentos):
+                self.variables[param_nombre] = argumentos[i]
+
+        self.debe_retornar = False
+        for stmt in func.cuerpo:
+            self.ejecutar_statement(stmt)
+            if self.debe_retornar:
+                break
+
+        resultado = self.valor_retorno
+        self.valor_retorno = None
+        self.debe_retornar = False
+        self.variables = scope_anterior
+        return resultado
+
+
+MOTORES = {
+    'copia de scope': InterpreteCopiaScope,
+    'marcos': InterpreteJade,
+}
+
+
+def generar_programa(profundidad: int, num_variables: int) -> str:
+    """Recursión lineal de la profundidad dada con N variables vivas en main"""
+    declaraciones = '\n'.join(f'    variable v{i} = {i}' for i in range(num_variables))
+    return f"""
+funcion suma(n)
+    si n <= 0 entonces
+        retornar 0
+    fin
+    retornar n + suma(n - 1)
+fin
+
+funcion main()
+{declaraciones}
+    para k desde 0 hasta 5 hacer
+        mostrar(suma({profundidad}))
+    fin
+fin
+"""
+
+
+def medir(clase_motor, programa, repeticiones):
+    """Retorna el mejor tiempo (segundos) de ejecutar el programa (tras un calentamiento)"""
+    mejor = float('inf')
+    with contextlib.redirect_stdout(io.StringIO()):
+        clase_motor().ejecutar_programa(programa)
+    for _ in range(repeticiones):
+        with contextlib.redirect_stdout(io.StringIO()):
+            inicio = time.perf_counter()
+            clase_motor().ejecutar_programa(programa)
+            mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de recursión profunda de Jade')
+    parser.add_argument('--profundidad', type=int, default=1000)
+    parser.add_argument('--repeticiones', type=int, default=5)
+    args = parser.parse_args()
+
+    # Cada llamada de Jade usa varios marcos de Python en el intérprete de árbol
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), args.profundidad * 20))
+
+    print(f"{'variables vivas':<16} {'motor':<16} {'tiempo (ms)':>12} {'aceleracion':>12}")
+    for num_variables in (0, 50, 200):
+        codigo = generar_programa(args.profundidad, num_variables)
+        programa = parsear_codigo(tokenizar_codigo(codigo))
+        base = None
+        for motor, clase in MOTORES.items():
+            t = medir(clase, programa, args.repeticiones)
+            base = base or t
+            print(f"{num_variables:<16} {motor:<16} {t * 1000:>12.3f} {base / t:>11.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark de la salida con buffer
+Muestra N líneas (por defecto un millón) con mostrar() en los motores del
+intérprete y en el ejecutable compilado con -O2, con la salida acumulada en
+el buffer y con --salida-sin-buffer (cada línea se escribe y se vacía en el
+momento). La salida va a un pipe, como al redirigirla a otro programa.
+
+Uso:
+    python benchmarks/bench_salida.py [--lineas N] [--repeticiones N]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MOTORES = ('arbol', 'cierres', 'bytecode')
+
+PROGRAMA = """
+funcion main()
+    variable i = 0
+    mientras i < {lineas} hacer
+        mostrar(f("linea {{}}", i))
+        i = i + 1
+    fin
+fin
+"""
+
+
+def medir(comando, repeticiones: int):
+    """Mejor tiempo (s) y salida del comando"""
+    mejor, salida = float('inf'), None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        proceso = subprocess.Popen(comando, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE)
+        salida = proceso.stdout.read()
+        proceso.wait()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor, salida
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de la salida con buffer de Jade')
+    parser.add_argument('--lineas', type=int, default=1_000_000)
+    parser.add_argument('--repeticiones', type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        fuente = os.path.join(directorio, 'lineas.jde')
+        with open(fuente, 'w', encoding='utf-8') as f:
+            f.write(PROGRAMA.format(lineas=args.lineas))
+        compilador = [sys.executable, os.path.join(RAIZ, 'src', 'compiler.py'), '-O2', '--sin-cache']
+        ejecutables = {}
+        for modo, opciones in (('buffer', []), ('sin buffer', ['--salida-sin-buffer'])):
+            ejecutables[modo] = os.path.join(directorio, f"lineas_{len(ejecutables)}")
+            subprocess.run(compilador + opciones + [fuente, '-o', ejecutables[modo]],
+                           check=True, stdout=subprocess.DEVNULL)
+
+        print(f"{args.lineas} líneas")
+        print(f"{'motor':<10} {'salida':<11} {'tiempo (ms)':>12}")
+        salidas = set()
+        for motor in MOTORES + ('nativo',):
+            for modo in ('buffer', 'sin buffer'):
+                if motor == 'nativo':
+                    comando = [ejecutables[modo]]
+                else:
+                    comando = [sys.executable, os.path.join(RAIZ, 'src', 'interpreter.py'),
+                               '--motor', motor, fuente]
+                    if modo == 'sin buffer':
+                        comando.append('--salida-sin-buffer')
+                tiempo, salida = medir(comando, args.repeticiones)
+                salidas.add(salida)
+                print(f"{motor:<10} {modo:<11} {tiempo * 1000:>12.1f}")
+        if len(salidas) != 1:
+            print("[!] las salidas no coinciden")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark de textos del código compilado
+Compila con -O2 un programa que arma un informe en un bucle (concatenaciones,
+conversiones a texto y un mapa con claves de texto) y mide el tiempo y la
+memoria máxima (RSS) del ejecutable. Con --revision compara con el
+compilador y el runtime de otra revisión de git.
+
+Uso:
+    python benchmarks/bench_textos.py [--filas N] [--revision REV] [--repeticiones N]
+"""
+
+import argparse
+import io
+import os
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROGRAMA = """
+funcion main()
+    variable por_cliente = {{"total": 0}}
+    variable total = 0
+    variable i = 0
+    mientras i < {filas} hacer
+        total = total + por_cliente["cliente-" + convertir_a_texto(i % 1000)]
+        por_cliente["cliente-" + convertir_a_texto(i % 1000)] = i * 37 % 10007
+        si i % {cada} == 0 entonces
+            mostrar("fila " + convertir_a_texto(i) + " | cliente-" + convertir_a_texto(i % 1000) + " | importe " + convertir_a_texto(i * 37 % 10007) + " | acumulado " + convertir_a_texto(total))
+        fin
+        i = i + 1
+    fin
+    mostrar("clientes: " + convertir_a_texto(por_cliente.longitud()))
+fin
+"""
+
+
+def extraer_revision(revision: str, directorio: str) -> str:
+    """Extrae src/ y std/ de una revisión de git en 'directorio'"""
+    archivo = subprocess.run(['git', 'archive', revision, 'src', 'std'], cwd=RAIZ,
+                             capture_output=True, check=True).stdout
+    with tarfile.open(fileobj=io.BytesIO(archivo)) as tar:
+        tar.extractall(directorio)
+    return directorio
+
+
+def compilar(raiz: str, fuente: str, ejecutable: str):
+    subprocess.run([sys.executable, os.path.join(raiz, 'src', 'compiler.py'), '-O2', '--sin-cache',
+                    fuente, '-o', ejecutable], check=True, stdout=subprocess.DEVNULL)
+
+
+def medir(ejecutable: str, repeticiones: int):
+    """Mejor tiempo (s), memoria máxima (KB) y salida del ejecutable"""
+    mejor, memoria, salida = float('inf'), 0, None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        proceso = subprocess.Popen([ejecutable], stdin=subprocess.DEVNULL, stdout=subprocess.PIPE)
+        salida = proceso.stdout.read()
+        _, _, uso = os.wait4(proceso.pid, 0)
+        mejor = min(mejor, time.perf_counter() - inicio)
+        memoria = max(memoria, uso.ru_maxrss)
+    return mejor, memoria, salida
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de textos de Jade')
+    parser.add_argument('--filas', type=int, default=1000000)
+    parser.add_argument('--cada', type=int, default=1000, help='mostrar una fila de cada N')
+    parser.add_argument('--revision', help='comparar con el compilador de esta revisión de git')
+    parser.add_argument('--repeticiones', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        fuente = os.path.join(directorio, 'informe.jde')
+        with open(fuente, 'w', encoding='utf-8') as f:
+            f.write(PROGRAMA.format(filas=args.filas, cada=args.cada))
+
+        compiladores = [('actual', RAIZ)]
+        if args.revision:
+            compiladores.insert(0, (args.revision, extraer_revision(args.revision, os.path.join(directorio, 'rev'))))
+
+        print(f"informe de {args.filas} filas")
+        print(f"{'compilador':<12} {'tiempo (ms)':>12} {'memoria máx. (MB)':>18}")
+        salidas = set()
+        for i, (nombre, raiz) in enumerate(compiladores):
+            ejecutable = os.path.join(directorio, f"informe_{i}")
+            compilar(raiz, fuente, ejecutable)
+            tiempo, memoria, salida = medir(ejecutable, args.repeticiones)
+            salidas.add(salida)
+            print(f"{nombre:<12} {tiempo * 1000:>12.1f} {memoria / 1024:>18.1f}")
+        if len(salidas) != 1:
+            print("[!] las salidas no coinciden")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Benchmark de memoria de la salida del lexer de Jade
+Compara la lista de Token (Lexer.tokenizar) con el FlujoTokens compacto
+(Lexer.tokenizar_flujo) sobre un programa generado: memoria retenida por
+los tokens, pico durante el lexing y tiempo de lexer + parser.
+
+Uso:
+    python benchmarks/bench_tokens.py [--lineas N]
+"""
+
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RAIZ, 'src'))
+
+from lexer import Lexer
+from parser import parsear_codigo
+from bench_memoria_ast import generar_programa
+
+
+MODOS = {
+    'lista de Token': Lexer.tokenizar,
+    'FlujoTokens': Lexer.tokenizar_flujo,
+}
+
+
+def medir_memoria(tokenizar, codigo):
+    """Retorna (bytes retenidos, bytes pico) de tokenizar el código"""
+    gc.collect()
+    tracemalloc.start()
+    tokens = tokenizar(Lexer(codigo))
+    gc.collect()
+    retenido, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del tokens
+    return retenido, pico
+
+
+def medir_tiempo(tokenizar, codigo):
+    """Retorna el tiempo (segundos) de lexer + parser"""
+    inicio = time.perf_counter()
+    parsear_codigo(tokenizar(Lexer(codigo)))
+    return time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de memoria de tokens de Jade')
+    parser.add_argument('--lineas', type=int, default=20_000)
+    args = parser.parse_args()
+
+    codigo = generar_programa(args.lineas)
+    print(f"programa: {codigo.count(chr(10))} líneas, {len(codigo) / 1e6:.2f} MB de código")
+    print(f"{'modo':<16} {'retenido (MB)':>14} {'pico (MB)':>10} {'lexer+parser (s)':>17}")
+
+    base = None
+    for modo, tokenizar in MODOS.items():
+        retenido, pico = medir_memoria(tokenizar, codigo)
+        tiempo = medir_tiempo(tokenizar, codigo)
+        base = base or retenido
+        print(f"{modo:<16} {retenido / 1e6:>14.2f} {pico / 1e6:>10.2f} {tiempo:>17.2f}"
+              f"   ({base / retenido:.1f}x menos memoria)")
+
+
+if __name__ == "__main__":
+    main()
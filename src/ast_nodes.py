@@ -3,12 +3,83 @@ Nodos del Árbol de Sintaxis Abstracta (AST) para Jade
 """
 
 from typing import List, Optional, Any
-from token_types import Token
+from token_types import Token, TokenType
+
+
+# ============================================================================
+# POSICIONES Y OPERADORES
+# ============================================================================
+# Los nodos no retienen el Token del que salieron: guardan la posición
+# empaquetada en un solo entero (línea en los bits altos, columna en los
+# bajos) y los operadores se comparten entre todos los nodos que los usan.
+
+BITS_COLUMNA = 20
+MASCARA_COLUMNA = (1 << BITS_COLUMNA) - 1
+
+
+def empaquetar_posicion(linea: int, columna: int) -> int:
+    """Empaqueta (línea, columna) en un entero"""
+    return (linea << BITS_COLUMNA) | min(columna, MASCARA_COLUMNA)
+
+
+def posicion_de(origen) -> int:
+    """
+    Posición empaquetada de un Token o de otro nodo. Acepta también una
+    posición ya empaquetada (parser sobre FlujoTokens); 0 si se desconoce.
+    """
+    if isinstance(origen, int):
+        return origen
+    if origen is None or isinstance(origen, Operador):
+        return 0
+    return empaquetar_posicion(origen.linea, origen.columna)
+
+
+class Operador:
+    """Operador de una expresión o asignación (tipo y lexema, sin posición)"""
+    __slots__ = ('tipo', 'valor')
+
+    def __init__(self, tipo: TokenType, valor: str):
+        self.tipo = tipo
+        self.valor = valor
+
+    def __repr__(self):
+        return f"Operador({self.tipo.name}, '{self.valor}')"
+
+    def __reduce__(self):
+        # Al deserializar (caché de AST) se recupera la instancia compartida
+        return (obtener_operador, (self.tipo, self.valor))
+
+
+_OPERADORES = {}
+
+
+def obtener_operador(tipo: TokenType, valor: str) -> Operador:
+    """Retorna el Operador compartido para (tipo, lexema)"""
+    clave = (tipo, valor)
+    operador = _OPERADORES.get(clave)
+    if operador is None:
+        operador = _OPERADORES[clave] = Operador(tipo, valor)
+    return operador
+
+
+def operador_de(origen) -> Operador:
+    """Retorna el Operador compartido equivalente a un token (o el mismo Operador)"""
+    if isinstance(origen, Operador):
+        return origen
+    return obtener_operador(origen.tipo, origen.valor)
 
 
 class NodoAST:
     """Clase base para todos los nodos del AST"""
-    pass
+    __slots__ = ('posicion',)  # Línea y columna empaquetadas
+
+    @property
+    def linea(self) -> int:
+        return self.posicion >> BITS_COLUMNA
+
+    @property
+    def columna(self) -> int:
+        return self.posicion & MASCARA_COLUMNA
 
 
 # ============================================================================
@@ -17,14 +88,16 @@ class NodoAST:
 
 class Expresion(NodoAST):
     """Clase base para expresiones"""
-    pass
+    __slots__ = ('tipo',)  # Anotado por el analizador semántico
 
 
 class LiteralEntero(Expresion):
     """Literal numérico entero"""
+    __slots__ = ('valor',)
+
     def __init__(self, valor: int, token: Token):
         self.valor = valor
-        self.token = token
+        self.posicion = posicion_de(token)
     
     def __repr__(self):
         return f"LiteralEntero({self.valor})"
@@ -32,9 +105,11 @@ class LiteralEntero(Expresion):
 
 class LiteralFlotante(Expresion):
     """Literal numérico flotante"""
+    __slots__ = ('valor',)
+
     def __init__(self, valor: float, token: Token):
         self.valor = valor
-        self.token = token
+        self.posicion = posicion_de(token)
     
     def __repr__(self):
         return f"LiteralFlotante({self.valor})"
@@ -42,9 +117,11 @@ class LiteralFlotante(Expresion):
 
 class LiteralTexto(Expresion):
     """Literal de cadena de texto"""
+    __slots__ = ('valor',)
+
     def __init__(self, valor: str, token: Token):
         self.valor = valor
-        self.token = token
+        self.posicion = posicion_de(token)
     
     def __repr__(self):
         return f"LiteralTexto('{self.valor}')"
@@ -52,9 +129,11 @@ class LiteralTexto(Expresion):
 
 class LiteralBooleano(Expresion):
     """Literal booleano (verdadero/falso)"""
+    __slots__ = ('valor',)
+
     def __init__(self, valor: bool, token: Token):
         self.valor = valor
-        self.token = token
+        self.posicion = posicion_de(token)
     
     def __repr__(self):
         return f"LiteralBooleano({self.valor})"
@@ -62,8 +141,10 @@ class LiteralBooleano(Expresion):
 
 class LiteralNulo(Expresion):
     """Literal nulo"""
+    __slots__ = ()
+
     def __init__(self, token: Token):
-        self.token = token
+        self.posicion = posicion_de(token)
     
     def __repr__(self):
         return "LiteralNulo()"
@@ -71,9 +152,13 @@ class LiteralNulo(Expresion):
 
 class Identificador(Expresion):
     """Referencia a una variable"""
+    __slots__ = ('nombre', 'profundidad', 'slot')
+
     def __init__(self, nombre: str, token: Token):
         self.nombre = nombre
-        self.token = token
+        self.posicion = posicion_de(token)
+        self.profundidad = None  # Coordenada asignada por el Resolutor
+        self.slot = None
     
     def __repr__(self):
         return f"Identificador({self.nombre})"
@@ -81,10 +166,14 @@ class Identificador(Expresion):
 
 class ExpresionBinaria(Expresion):
     """Expresión binaria (a + b, a * b, etc.)"""
-    def __init__(self, izquierda: Expresion, operador: Token, derecha: Expresion):
+    __slots__ = ('izquierda', 'operador', 'derecha')
+
+    def __init__(self, izquierda: Expresion, operador: Token, derecha: Expresion,
+                 posicion: Optional[int] = None):
         self.izquierda = izquierda
-        self.operador = operador
+        self.operador = operador_de(operador)
         self.derecha = derecha
+        self.posicion = posicion if posicion is not None else posicion_de(operador)
     
     def __repr__(self):
         return f"ExpresionBinaria({self.izquierda} {self.operador.valor} {self.derecha})"
@@ -92,9 +181,12 @@ class ExpresionBinaria(Expresion):
 
 class ExpresionUnaria(Expresion):
     """Expresión unaria (-a, no b)"""
-    def __init__(self, operador: Token, expresion: Expresion):
-        self.operador = operador
+    __slots__ = ('operador', 'expresion')
+
+    def __init__(self, operador: Token, expresion: Expresion, posicion: Optional[int] = None):
+        self.operador = operador_de(operador)
         self.expresion = expresion
+        self.posicion = posicion if posicion is not None else posicion_de(operador)
     
     def __repr__(self):
         return f"ExpresionUnaria({self.operador.valor} {self.expresion})"
@@ -102,10 +194,12 @@ class ExpresionUnaria(Expresion):
 
 class LlamadaFuncion(Expresion):
     """Llamada a función"""
+    __slots__ = ('nombre', 'argumentos')
+
     def __init__(self, nombre: str, argumentos: List[Expresion], token: Token):
         self.nombre = nombre
         self.argumentos = argumentos
-        self.token = token
+        self.posicion = posicion_de(token)
     
     def __repr__(self):
         args = ', '.join(str(arg) for arg in self.argumentos)
@@ -114,11 +208,13 @@ class LlamadaFuncion(Expresion):
 
 class LlamadaMetodo(Expresion):
     """Llamada a método de objeto (obj.metodo(args))"""
+    __slots__ = ('objeto', 'nombre_metodo', 'argumentos')
+
     def __init__(self, objeto: Expresion, nombre_metodo: str, argumentos: List[Expresion], token: Token):
         self.objeto = objeto
         self.nombre_metodo = nombre_metodo
         self.argumentos = argumentos
-        self.token = token
+        self.posicion = posicion_de(token)
     
     def __repr__(self):
         args = ', '.join(str(arg) for arg in self.argumentos)
@@ -127,10 +223,12 @@ class LlamadaMetodo(Expresion):
 
 class AccesoIndice(Expresion):
     """Acceso a elemento de lista/mapa por índice (arr[0])"""
+    __slots__ = ('objeto', 'indice')
+
     def __init__(self, objeto: Expresion, indice: Expresion, token: Token):
         self.objeto = objeto
         self.indice = indice
-        self.token = token
+        self.posicion = posicion_de(token)
     
     def __repr__(self):
         return f"AccesoIndice({self.objeto}[{self.indice}])"
@@ -138,10 +236,12 @@ class AccesoIndice(Expresion):
 
 class AccesoPropiedad(Expresion):
     """Acceso a propiedad de objeto (obj.propiedad)"""
+    __slots__ = ('objeto', 'propiedad')
+
     def __init__(self, objeto: Expresion, propiedad: str, token: Token):
         self.objeto = objeto
         self.propiedad = propiedad
-        self.token = token
+        self.posicion = posicion_de(token)
     
     def __repr__(self):
         return f"AccesoPropiedad({self.objeto}.{self.propiedad})"
@@ -149,9 +249,11 @@ class AccesoPropiedad(Expresion):
 
 class LiteralLista(Expresion):
     """Literal de lista [1, 2, 3]"""
+    __slots__ = ('elementos',)
+
     def __init__(self, elementos: List[Expresion], token: Token):
         self.elementos = elementos
-        self.token = token
+        self.posicion = posicion_de(token)
     
     def __repr__(self):
         elems = ', '.join(str(e) for e in self.elementos)
@@ -160,9 +262,11 @@ class LiteralLista(Expresion):
 
 class LiteralMapa(Expresion):
     """Literal de mapa {clave: valor}"""
+    __slots__ = ('pares',)
+
     def __init__(self, pares: List[tuple], token: Token):
         self.pares = pares  # Lista de (clave_expr, valor_expr)
-        self.token = token
+        self.posicion = posicion_de(token)
     
     def __repr__(self):
         items = ', '.join(f"{k}: {v}" for k, v in self.pares)
@@ -175,18 +279,22 @@ class LiteralMapa(Expresion):
 
 class Statement(NodoAST):
     """Clase base para statements"""
-    pass
+    __slots__ = ()
 
 
 class DeclaracionVariable(Statement):
     """Declaración de variable"""
+    __slots__ = ('nombre', 'tipo_dato', 'valor_inicial', 'es_constante', 'profundidad', 'slot')
+
     def __init__(self, nombre: str, tipo_dato: Optional[str], valor_inicial: Optional[Expresion], 
                  es_constante: bool, token: Token):
         self.nombre = nombre
         self.tipo_dato = tipo_dato
         self.valor_inicial = valor_inicial
         self.es_constante = es_constante
-        self.token = token
+        self.posicion = posicion_de(token)
+        self.profundidad = None  # Coordenada asignada por el Resolutor
+        self.slot = None
     
     def __repr__(self):
         tipo = self.tipo_dato if self.tipo_dato else "inferido"
@@ -196,10 +304,16 @@ class DeclaracionVariable(Statement):
 
 class Asignacion(Statement):
     """Asignación a variable"""
-    def __init__(self, nombre: str, valor: Expresion, operador: Token):
+    __slots__ = ('nombre', 'valor', 'operador', 'profundidad', 'slot')
+
+    def __init__(self, nombre: str, valor: Expresion, operador: Token,
+                 posicion: Optional[int] = None):
         self.nombre = nombre
         self.valor = valor
-        self.operador = operador  # =, +=, -=, etc.
+        self.operador = operador_de(operador)  # =, +=, -=, etc.
+        self.posicion = posicion if posicion is not None else posicion_de(operador)
+        self.profundidad = None  # Coordenada asignada por el Resolutor
+        self.slot = None
     
     def __repr__(self):
         return f"Asignacion({self.nombre} {self.operador.valor} {self.valor})"
@@ -207,11 +321,13 @@ class Asignacion(Statement):
 
 class AsignacionIndice(Statement):
     """Asignación a elemento de lista/mapa (arr[0] = valor)"""
+    __slots__ = ('objeto', 'indice', 'valor')
+
     def __init__(self, objeto: Expresion, indice: Expresion, valor: Expresion, token: Token):
         self.objeto = objeto
         self.indice = indice
         self.valor = valor
-        self.token = token
+        self.posicion = posicion_de(token)
     
     def __repr__(self):
         return f"AsignacionIndice({self.objeto}[{self.indice}] = {self.valor})"
@@ -219,12 +335,14 @@ class AsignacionIndice(Statement):
 
 class Si(Statement):
     """Statement condicional si/entonces/sino"""
+    __slots__ = ('condicion', 'bloque_entonces', 'bloque_sino')
+
     def __init__(self, condicion: Expresion, bloque_entonces: List[Statement], 
                  bloque_sino: Optional[List[Statement]], token: Token):
         self.condicion = condicion
         self.bloque_entonces = bloque_entonces
         self.bloque_sino = bloque_sino
-        self.token = token
+        self.posicion = posicion_de(token)
     
     def __repr__(self):
         return f"Si({self.condicion})"
@@ -232,10 +350,12 @@ class Si(Statement):
 
 class Mientras(Statement):
     """Bucle mientras"""
+    __slots__ = ('condicion', 'cuerpo')
+
     def __init__(self, condicion: Expresion, cuerpo: List[Statement], token: Token):
         self.condicion = condicion
         self.cuerpo = cuerpo
-        self.token = token
+        self.posicion = posicion_de(token)
     
     def __repr__(self):
         return f"Mientras({self.condicion})"
@@ -243,22 +363,28 @@ class Mientras(Statement):
 
 class Para(Statement):
     """Bucle para"""
+    __slots__ = ('variable', 'inicio', 'fin', 'cuerpo', 'profundidad', 'slot')
+
     def __init__(self, variable: str, inicio: Expresion, fin: Expresion, 
                  cuerpo: List[Statement], token: Token):
         self.variable = variable
         self.inicio = inicio
         self.fin = fin
         self.cuerpo = cuerpo
-        self.token = token
+        self.posicion = posicion_de(token)
+        self.profundidad = None  # Coordenada de 'variable' asignada por el Resolutor
+        self.slot = None
     def __repr__(self):
         return f"Para({self.variable} desde {self.inicio} hasta {self.fin})"
 
 
 class Retornar(Statement):
     """Statement de retorno"""
+    __slots__ = ('valor',)
+
     def __init__(self, valor: Optional[Expresion], token: Token):
         self.valor = valor
-        self.token = token
+        self.posicion = posicion_de(token)
     
     def __repr__(self):
         return f"Retornar({self.valor})"
@@ -266,8 +392,10 @@ class Retornar(Statement):
 
 class Romper(Statement):
     """Statement break"""
+    __slots__ = ()
+
     def __init__(self, token: Token):
-        self.token = token
+        self.posicion = posicion_de(token)
     
     def __repr__(self):
         return "Romper()"
@@ -275,8 +403,10 @@ class Romper(Statement):
 
 class Continuar(Statement):
     """Statement continue"""
+    __slots__ = ()
+
     def __init__(self, token: Token):
-        self.token = token
+        self.posicion = posicion_de(token)
     
     def __repr__(self):
         return "Continuar()"
@@ -284,9 +414,11 @@ class Continuar(Statement):
 
 class Importar(Statement):
     """Statement importar"""
+    __slots__ = ('ruta',)
+
     def __init__(self, ruta: str, token: Token):
         self.ruta = ruta
-        self.token = token
+        self.posicion = posicion_de(token)
     
     def __repr__(self):
         return f"Importar('{self.ruta}')"
@@ -294,8 +426,11 @@ class Importar(Statement):
 
 class ExpresionStatement(Statement):
     """Una expresión usada como statement (ej: llamada a función)"""
+    __slots__ = ('expresion',)
+
     def __init__(self, expresion: Expresion):
         self.expresion = expresion
+        self.posicion = expresion.posicion
     
     def __repr__(self):
         return f"ExpresionStatement({self.expresion})"
@@ -307,13 +442,16 @@ class ExpresionStatement(Statement):
 
 class DeclaracionFuncion(NodoAST):
     """Declaración de función"""
+    __slots__ = ('nombre', 'parametros', 'tipo_retorno', 'cuerpo', 'locales')
+
     def __init__(self, nombre: str, parametros: List[tuple], tipo_retorno: Optional[str],
                  cuerpo: List[Statement], token: Token):
         self.nombre = nombre
         self.parametros = parametros  # Lista de (nombre, tipo_opcional)
         self.tipo_retorno = tipo_retorno
         self.cuerpo = cuerpo
-        self.token = token
+        self.posicion = posicion_de(token)
+        self.locales = None  # Nombre de cada slot local (Resolutor)
     
     def __repr__(self):
         params = ', '.join(f"{n}:{t if t else '?'}" for n, t in self.parametros)
@@ -322,10 +460,12 @@ class DeclaracionFuncion(NodoAST):
 
 class DeclaracionEnum(NodoAST):
     """Declaración de Enum"""
+    __slots__ = ('nombre', 'valores')
+
     def __init__(self, nombre: str, valores: List[str], token: Token):
         self.nombre = nombre
         self.valores = valores
-        self.token = token
+        self.posicion = posicion_de(token)
     
     def __repr__(self):
         return f"DeclaracionEnum({self.nombre} {{{', '.join(self.valores)}}})"
@@ -333,8 +473,11 @@ class DeclaracionEnum(NodoAST):
 
 class Programa(NodoAST):
     """Nodo raíz del programa"""
+    __slots__ = ('declaraciones',)
+
     def __init__(self, declaraciones: List[NodoAST]):
         self.declaraciones = declaraciones
+        self.posicion = 0
     
     def __repr__(self):
         return f"Programa({len(self.declaraciones)} declaraciones)"
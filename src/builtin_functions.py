@@ -28,6 +28,11 @@ FUNCIONES_BUILTIN = {
         [],
         TIPO_TEXTO
     ),
+    'vaciar_salida': FuncionBuiltIn(
+        'vaciar_salida',
+        [],
+        TIPO_NULO
+    ),
     
     # Conversiones
     'convertir_a_texto': FuncionBuiltIn(
@@ -105,6 +110,12 @@ FUNCIONES_BUILTIN = {
         [('template', TIPO_TEXTO)],
         TIPO_TEXTO
     ),
+    # Construcción de textos por partes (agregar, construir, longitud)
+    'constructor_texto': FuncionBuiltIn(
+        'constructor_texto',
+        [],
+        TIPO_CONSTRUCTOR_TEXTO
+    ),
 }
 
 
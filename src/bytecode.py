@@ -0,0 +1,372 @@
+"""
+Formato de bytecode y compilador AST -> bytecode para Jade
+Cada función se traduce a una secuencia plana de pares (opcode, operando)
+sobre una máquina de pila. Las variables locales se resuelven en tiempo de
+compilación a índices de slot (asignados por el Resolutor) en lugar de
+buscarse por nombre.
+"""
+
+from typing import List
+from ast_nodes import *
+from token_types import TokenType
+from interpreter import FUNCIONES_NATIVAS
+from resolver import Resolutor, PROFUNDIDAD_LOCAL
+
+
+# ============================================================================
+# OPCODES
+# ============================================================================
+# Todas las instrucciones ocupan dos enteros: opcode y operando (0 si no usa).
+
+CONST = 0           # push constantes[arg]
+LOAD_LOCAL = 1      # push locales[arg]
+STORE_LOCAL = 2     # locales[arg] = pop
+LOAD_GLOBAL = 3     # push globales[nombres[arg]]
+ADD = 4
+SUB = 5
+MUL = 6
+LT = 7
+LE = 8
+GT = 9
+GE = 10
+EQ = 11
+NE = 12
+BINARY = 13         # operacion binaria genérica: OPERACIONES[arg]
+NEG = 14
+NOT = 15
+JUMP = 16           # pc = arg
+JUMP_IF_FALSE = 17  # if not pop: pc = arg
+CALL = 18           # llamada a función de usuario: llamadas[arg] = (nombre, argc)
+CALL_NATIVE = 19    # llamada a built-in: llamadas[arg] = (nombre, argc)
+CALL_METHOD = 20    # llamada a método: llamadas[arg] = (nombre_metodo, argc)
+BUILD_LIST = 21     # arg elementos
+BUILD_MAP = 22      # arg pares
+INDEX = 23          # obj, idx -> obj[idx]
+STORE_INDEX = 24    # obj, idx, valor -> obj[idx] = valor
+GET_PROP = 25       # obj -> obj.nombres[arg] (enums)
+POP = 26
+RETURN = 27         # retorna pop
+RETURN_NONE = 28
+FOR_ITER = 29       # paso de 'para': iteraciones[arg] = (contador, limite, variable, fin)
+DIV = 30
+MOD = 31
+
+# Nombres para desensamblar; la lista es explícita porque el módulo también
+# tiene otras constantes enteras (las de ast_nodes, por ejemplo)
+NOMBRES_OPCODES = {
+    globals()[nombre]: nombre for nombre in (
+        'CONST', 'LOAD_LOCAL', 'STORE_LOCAL', 'LOAD_GLOBAL',
+        'ADD', 'SUB', 'MUL', 'LT', 'LE', 'GT', 'GE', 'EQ', 'NE', 'BINARY', 'NEG', 'NOT',
+        'JUMP', 'JUMP_IF_FALSE', 'CALL', 'CALL_NATIVE', 'CALL_METHOD',
+        'BUILD_LIST', 'BUILD_MAP', 'INDEX', 'STORE_INDEX', 'GET_PROP',
+        'POP', 'RETURN', 'RETURN_NONE', 'FOR_ITER', 'DIV', 'MOD',
+    )
+}
+
+# Operadores con opcode propio
+OPCODES_BINARIOS = {
+    '+': ADD, '-': SUB, '*': MUL,
+    '<': LT, '<=': LE, '>': GT, '>=': GE,
+    '==': EQ, '!=': NE, '/': DIV, '%': MOD,
+}
+
+# Operadores que pasan por BINARY (índice en esta tupla)
+OPERACIONES = ('^', 'y', 'o')
+
+
+class CodigoFuncion:
+    """Bytecode de una función compilada"""
+
+    __slots__ = ('nombre', 'parametros', 'codigo', 'constantes', 'nombres',
+                 'llamadas', 'locales', 'iteraciones')
+
+    def __init__(self, nombre: str, parametros: List[str]):
+        self.nombre = nombre
+        self.parametros = parametros
+        self.codigo: List[int] = []       # pares (opcode, operando)
+        self.constantes: list = []
+        self.nombres: List[str] = []      # globales y propiedades
+        self.llamadas: List[tuple] = []   # (nombre, argc)
+        self.locales: List[str] = []      # nombre de cada slot
+        self.iteraciones: List[list] = [] # bucles 'para': [contador, limite, variable, fin]
+
+    @property
+    def num_locales(self) -> int:
+        return len(self.locales)
+
+    def __repr__(self):
+        return f"CodigoFuncion({self.nombre}, {len(self.codigo) // 2} instrucciones)"
+
+
+class CompiladorBytecode:
+    """Compila declaraciones de funciones Jade a CodigoFuncion"""
+
+    def compilar_funcion(self, func: DeclaracionFuncion) -> CodigoFuncion:
+        """Compila una función completa"""
+        self.actual = CodigoFuncion(func.nombre, [n for n, _ in func.parametros])
+        self.bucles: List[tuple] = []  # (parches de romper, destino de continuar)
+
+        # Los slots de usuario vienen del Resolutor; los ocultos van después
+        if func.locales is None:
+            Resolutor().resolver_funcion(func)
+        self.actual.locales = list(func.locales)
+
+        self._bloque(func.cuerpo)
+        self._emitir(RETURN_NONE)
+        return self.actual
+
+    # ========================================================================
+    # UTILIDADES
+    # ========================================================================
+
+    def _emitir(self, opcode: int, arg: int = 0) -> int:
+        """Emite una instrucción y retorna su posición"""
+        self.actual.codigo.extend((opcode, arg))
+        return len(self.actual.codigo) - 2
+
+    def _posicion(self) -> int:
+        return len(self.actual.codigo)
+
+    def _parchear(self, posicion: int, destino: int):
+        """Fija el destino de un salto emitido previamente"""
+        self.actual.codigo[posicion + 1] = destino
+
+    def _slot_oculto(self, descripcion: str) -> int:
+        """Reserva un slot sin nombre de usuario (contadores de bucle)"""
+        self.actual.locales.append(descripcion)
+        return len(self.actual.locales) - 1
+
+    def _constante(self, valor) -> int:
+        for i, c in enumerate(self.actual.constantes):
+            if type(c) is type(valor) and c == valor:
+                return i
+        self.actual.constantes.append(valor)
+        return len(self.actual.constantes) - 1
+
+    def _nombre(self, nombre: str) -> int:
+        if nombre not in self.actual.nombres:
+            self.actual.nombres.append(nombre)
+        return self.actual.nombres.index(nombre)
+
+    def _llamada(self, nombre: str, argc: int) -> int:
+        self.actual.llamadas.append((nombre, argc))
+        return len(self.actual.llamadas) - 1
+
+    # ========================================================================
+    # STATEMENTS
+    # ========================================================================
+
+    def _bloque(self, statements: list):
+        for stmt in statements:
+            self._statement(stmt)
+
+    def _statement(self, stmt: Statement):
+        if isinstance(stmt, DeclaracionVariable):
+            self._expresion(stmt.valor_inicial)
+            self._emitir(STORE_LOCAL, stmt.slot)
+
+        elif isinstance(stmt, Asignacion):
+            self._expresion(stmt.valor)
+            self._emitir(STORE_LOCAL, stmt.slot)
+
+        elif isinstance(stmt, AsignacionIndice):
+            self._expresion(stmt.objeto)
+            self._expresion(stmt.indice)
+            self._expresion(stmt.valor)
+            self._emitir(STORE_INDEX)
+
+        elif isinstance(stmt, Si):
+            self._expresion(stmt.condicion)
+            salto_sino = self._emitir(JUMP_IF_FALSE)
+            self._bloque(stmt.bloque_entonces)
+            if stmt.bloque_sino:
+                salto_fin = self._emitir(JUMP)
+                self._parchear(salto_sino, self._posicion())
+                self._bloque(stmt.bloque_sino)
+                self._parchear(salto_fin, self._posicion())
+            else:
+                self._parchear(salto_sino, self._posicion())
+
+        elif isinstance(stmt, Mientras):
+            inicio = self._posicion()
+            self._expresion(stmt.condicion)
+            salto_fin = self._emitir(JUMP_IF_FALSE)
+            self.bucles.append(([], inicio))
+            self._bloque(stmt.cuerpo)
+            self._emitir(JUMP, inicio)
+            self._parchear(salto_fin, self._cerrar_bucle())
+
+        elif isinstance(stmt, Para):
+            self._para(stmt)
+
+        elif isinstance(stmt, Retornar):
+            if stmt.valor is None:
+                self._emitir(RETURN_NONE)
+            else:
+                self._expresion(stmt.valor)
+                self._emitir(RETURN)
+
+        elif isinstance(stmt, Romper):
+            if self.bucles:
+                self.bucles[-1][0].append(self._emitir(JUMP))
+
+        elif isinstance(stmt, Continuar):
+            if self.bucles:
+                self._emitir(JUMP, self.bucles[-1][1])
+
+        elif isinstance(stmt, ExpresionStatement):
+            self._expresion(stmt.expresion)
+            self._emitir(POP)
+
+    def _para(self, para: Para):
+        """
+        Compila 'para i desde a hasta b' con un contador oculto, igual que
+        range(a, b) en el intérprete de árbol (asignar a 'i' en el cuerpo no
+        altera la iteración):
+
+            contador = a ; limite = b
+        test:
+            FOR_ITER k     (si contador < limite: i = contador, contador += 1;
+                            si no: salta a fin)
+            cuerpo
+            JUMP test      ('continuar' también salta a test)
+        fin:
+        """
+        contador = self._slot_oculto(f'<contador {para.variable}>')
+        limite = self._slot_oculto(f'<limite {para.variable}>')
+
+        self._expresion(para.inicio)
+        self._emitir(STORE_LOCAL, contador)
+        self._expresion(para.fin)
+        self._emitir(STORE_LOCAL, limite)
+
+        iteracion = [contador, limite, para.slot, 0]
+        self.actual.iteraciones.append(iteracion)
+        test = self._emitir(FOR_ITER, len(self.actual.iteraciones) - 1)
+
+        self.bucles.append(([], test))
+        self._bloque(para.cuerpo)
+        self._emitir(JUMP, test)
+
+        iteracion[3] = self._cerrar_bucle()
+
+    def _cerrar_bucle(self) -> int:
+        """Parchea los 'romper' del bucle actual y retorna la posición de salida"""
+        fin = self._posicion()
+        parches_romper, _ = self.bucles.pop()
+        for posicion in parches_romper:
+            self._parchear(posicion, fin)
+        return fin
+
+    # ========================================================================
+    # EXPRESIONES
+    # ========================================================================
+
+    def _expresion(self, expr: Expresion):
+        if isinstance(expr, (LiteralEntero, LiteralFlotante, LiteralTexto, LiteralBooleano)):
+            self._emitir(CONST, self._constante(expr.valor))
+
+        elif isinstance(expr, LiteralNulo):
+            self._emitir(CONST, self._constante(None))
+
+        elif isinstance(expr, Identificador):
+            if expr.profundidad == PROFUNDIDAD_LOCAL:
+                self._emitir(LOAD_LOCAL, expr.slot)
+            else:
+                self._emitir(LOAD_GLOBAL, self._nombre(expr.nombre))
+
+        elif isinstance(expr, ExpresionBinaria):
+            self._expresion(expr.izquierda)
+            self._expresion(expr.derecha)
+            op = expr.operador.valor
+            if op in OPCODES_BINARIOS:
+                self._emitir(OPCODES_BINARIOS[op])
+            elif op in OPERACIONES:
+                self._emitir(BINARY, OPERACIONES.index(op))
+            else:
+                self._emitir(POP)
+                self._emitir(POP)
+                self._emitir(CONST, self._constante(None))
+
+        elif isinstance(expr, ExpresionUnaria):
+            self._expresion(expr.expresion)
+            if expr.operador.tipo == TokenType.MENOS:
+                self._emitir(NEG)
+            elif expr.operador.tipo == TokenType.NO:
+                self._emitir(NOT)
+
+        elif isinstance(expr, LlamadaFuncion):
+            for arg in expr.argumentos:
+                self._expresion(arg)
+            opcode = CALL_NATIVE if expr.nombre in FUNCIONES_NATIVAS else CALL
+            self._emitir(opcode, self._llamada(expr.nombre, len(expr.argumentos)))
+
+        elif isinstance(expr, LlamadaMetodo):
+            self._expresion(expr.objeto)
+            for arg in expr.argumentos:
+                self._expresion(arg)
+            self._emitir(CALL_METHOD, self._llamada(expr.nombre_metodo, len(expr.argumentos)))
+
+        elif isinstance(expr, LiteralLista):
+            for elem in expr.elementos:
+                self._expresion(elem)
+            self._emitir(BUILD_LIST, len(expr.elementos))
+
+        elif isinstance(expr, LiteralMapa):
+            for clave, valor in expr.pares:
+                self._expresion(clave)
+                self._expresion(valor)
+            self._emitir(BUILD_MAP, len(expr.pares))
+
+        elif isinstance(expr, AccesoIndice):
+            self._expresion(expr.objeto)
+            self._expresion(expr.indice)
+            self._emitir(INDEX)
+
+        elif isinstance(expr, AccesoPropiedad):
+            self._expresion(expr.objeto)
+            self._emitir(GET_PROP, self._nombre(expr.propiedad))
+
+        else:
+            self._emitir(CONST, self._constante(None))
+
+
+# ============================================================================
+# DESENSAMBLADOR
+# ============================================================================
+
+def desensamblar(funcion: CodigoFuncion) -> str:
+    """Retorna una representación legible del bytecode de una función"""
+    lineas = [
+        f"funcion {funcion.nombre}({', '.join(funcion.parametros)})  "
+        f"[{len(funcion.codigo) // 2} instrucciones, {funcion.num_locales} locales]"
+    ]
+    codigo = funcion.codigo
+    for pc in range(0, len(codigo), 2):
+        op, arg = codigo[pc], codigo[pc + 1]
+        nombre = NOMBRES_OPCODES.get(op, f'<{op}>')
+        detalle = ''
+        if op == CONST:
+            detalle = repr(funcion.constantes[arg])
+        elif op in (LOAD_LOCAL, STORE_LOCAL):
+            detalle = funcion.locales[arg]
+        elif op == FOR_ITER:
+            contador, _, variable, fin = funcion.iteraciones[arg]
+            detalle = f'{funcion.locales[variable]} <- {funcion.locales[contador]}, fin -> {fin}'
+        elif op in (LOAD_GLOBAL, GET_PROP):
+            detalle = funcion.nombres[arg]
+        elif op == BINARY:
+            detalle = OPERACIONES[arg]
+        elif op in (CALL, CALL_NATIVE, CALL_METHOD):
+            detalle = '%s/%d' % funcion.llamadas[arg]
+        elif op in (JUMP, JUMP_IF_FALSE):
+            detalle = f'-> {arg}'
+        elif op in (BUILD_LIST, BUILD_MAP):
+            detalle = str(arg)
+
+        if op in (ADD, SUB, MUL, DIV, MOD, LT, LE, GT, GE, EQ, NE, NEG, NOT, INDEX,
+                  STORE_INDEX, POP, RETURN, RETURN_NONE):
+            lineas.append(f"{pc:6d}  {nombre}")
+        else:
+            lineas.append(f"{pc:6d}  {nombre:<14} {arg:5d}  ({detalle})")
+    return '\n'.join(lineas)
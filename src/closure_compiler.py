@@ -0,0 +1,370 @@
+"""
+Compilador de cierres (closures) para Jade
+Traduce el AST una sola vez a un árbol de funciones Python pre-enlazadas,
+evitando el despacho por isinstance y la comparación de operadores en cada
+evaluación del intérprete de árbol
+"""
+
+import operator
+from ast_nodes import *
+from token_types import TokenType
+from interpreter import InterpreteJade, FUNCIONES_NATIVAS, aplicar_metodo, _dividir, INDEFINIDA, salida
+from resolver import Resolutor, PROFUNDIDAD_GLOBAL
+
+
+# Señales de control de flujo devueltas por los statements compilados
+# (None significa "continuar con el siguiente statement")
+ROMPER = object()
+CONTINUAR = object()
+RETORNAR = object()
+
+# El entorno de una llamada es una lista indexada por los slots del
+# Resolutor; el valor de retorno se guarda en el último elemento
+VALOR_RETORNO = -1
+
+
+def _y(izq, der):
+    return izq and der
+
+
+def _o(izq, der):
+    return izq or der
+
+
+OPERADORES_BINARIOS = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': _dividir,
+    '%': operator.mod,
+    '^': operator.pow,
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '>': operator.gt,
+    '<=': operator.le,
+    '>=': operator.ge,
+    'y': _y,
+    'o': _o,
+}
+
+
+class CompiladorCierres:
+    """Compila declaraciones, statements y expresiones a closures"""
+
+    def __init__(self, globales: list, funciones: dict):
+        self.globales = globales      # Globales indexados por slot (enums)
+        self.funciones = funciones    # nombre -> callable(args) compilado
+
+    # ========================================================================
+    # FUNCIONES
+    # ========================================================================
+
+    def compilar_funcion(self, func: DeclaracionFuncion):
+        """Compila una función a un callable que recibe la lista de argumentos"""
+        if func.locales is None:
+            Resolutor().resolver_funcion(func)
+        num_params = len(func.parametros)
+        # Slots locales más uno para el valor de retorno
+        plantilla = [INDEFINIDA] * (len(func.locales) + 1)
+        cuerpo = self.compilar_bloque(func.cuerpo)
+
+        def llamar(argumentos):
+            env = plantilla.copy()
+            env[:num_params] = argumentos[:num_params]
+            if cuerpo(env) is RETORNAR:
+                return env[VALOR_RETORNO]
+            return None
+
+        return llamar
+
+    # ========================================================================
+    # STATEMENTS
+    # ========================================================================
+
+    def compilar_bloque(self, statements: list):
+        """Compila una lista de statements a un único callable"""
+        compilados = [self.compilar_statement(s) for s in statements]
+
+        if not compilados:
+            return lambda env: None
+        if len(compilados) == 1:
+            return compilados[0]
+
+        compilados = tuple(compilados)
+
+        def bloque(env):
+            for stmt in compilados:
+                senal = stmt(env)
+                if senal is not None:
+                    return senal
+            return None
+
+        return bloque
+
+    def compilar_statement(self, stmt: Statement):
+        """Compila un statement; el callable resultante devuelve una señal o None"""
+        if isinstance(stmt, (DeclaracionVariable, Asignacion)):
+            slot = stmt.slot
+            valor = self.compilar_expresion(
+                stmt.valor_inicial if isinstance(stmt, DeclaracionVariable) else stmt.valor
+            )
+
+            def asignar(env):
+                env[slot] = valor(env)
+            return asignar
+
+        elif isinstance(stmt, AsignacionIndice):
+            objeto = self.compilar_expresion(stmt.objeto)
+            indice = self.compilar_expresion(stmt.indice)
+            valor = self.compilar_expresion(stmt.valor)
+
+            def asignar_indice(env):
+                obj = objeto(env)
+                idx = indice(env)
+                obj[idx] = valor(env)
+            return asignar_indice
+
+        elif isinstance(stmt, Si):
+            return self._compilar_si(stmt)
+
+        elif isinstance(stmt, Mientras):
+            return self._compilar_mientras(stmt)
+
+        elif isinstance(stmt, Para):
+            return self._compilar_para(stmt)
+
+        elif isinstance(stmt, Retornar):
+            if stmt.valor is None:
+                def retornar_vacio(env):
+                    env[VALOR_RETORNO] = None
+                    return RETORNAR
+                return retornar_vacio
+
+            valor = self.compilar_expresion(stmt.valor)
+
+            def retornar(env):
+                env[VALOR_RETORNO] = valor(env)
+                return RETORNAR
+            return retornar
+
+        elif isinstance(stmt, Romper):
+            return lambda env: ROMPER
+
+        elif isinstance(stmt, Continuar):
+            return lambda env: CONTINUAR
+
+        elif isinstance(stmt, ExpresionStatement):
+            expresion = self.compilar_expresion(stmt.expresion)
+
+            def evaluar(env):
+                expresion(env)
+            return evaluar
+
+        return lambda env: None
+
+    def _compilar_si(self, si: Si):
+        """Compila condicional si/entonces/sino"""
+        condicion = self.compilar_expresion(si.condicion)
+        entonces = self.compilar_bloque(si.bloque_entonces)
+
+        if not si.bloque_sino:
+            def si_simple(env):
+                if condicion(env):
+                    return entonces(env)
+                return None
+            return si_simple
+
+        sino = self.compilar_bloque(si.bloque_sino)
+
+        def si_sino(env):
+            if condicion(env):
+                return entonces(env)
+            return sino(env)
+        return si_sino
+
+    def _compilar_mientras(self, mientras: Mientras):
+        """Compila bucle mientras"""
+        condicion = self.compilar_expresion(mientras.condicion)
+        cuerpo = self.compilar_bloque(mientras.cuerpo)
+
+        def bucle_mientras(env):
+            while condicion(env):
+                senal = cuerpo(env)
+                if senal is not None:
+                    if senal is ROMPER:
+                        break
+                    if senal is RETORNAR:
+                        return senal
+            return None
+        return bucle_mientras
+
+    def _compilar_para(self, para: Para):
+        """Compila bucle para"""
+        slot = para.slot
+        inicio = self.compilar_expresion(para.inicio)
+        fin = self.compilar_expresion(para.fin)
+        cuerpo = self.compilar_bloque(para.cuerpo)
+
+        def bucle_para(env):
+            for i in range(inicio(env), fin(env)):
+                env[slot] = i
+                senal = cuerpo(env)
+                if senal is not None:
+                    if senal is ROMPER:
+                        break
+                    if senal is RETORNAR:
+                        return senal
+            return None
+        return bucle_para
+
+    # ========================================================================
+    # EXPRESIONES
+    # ========================================================================
+
+    def compilar_expresion(self, expr: Expresion):
+        """Compila una expresión a un callable env -> valor"""
+        if isinstance(expr, (LiteralEntero, LiteralFlotante, LiteralTexto, LiteralBooleano)):
+            constante = expr.valor
+            return lambda env: constante
+
+        elif isinstance(expr, LiteralNulo):
+            return lambda env: None
+
+        elif isinstance(expr, Identificador):
+            return self._compilar_identificador(expr)
+
+        elif isinstance(expr, ExpresionBinaria):
+            return self._compilar_binaria(expr)
+
+        elif isinstance(expr, ExpresionUnaria):
+            valor = self.compilar_expresion(expr.expresion)
+            if expr.operador.tipo == TokenType.MENOS:
+                return lambda env: -valor(env)
+            elif expr.operador.tipo == TokenType.NO:
+                return lambda env: not valor(env)
+            return lambda env: None
+
+        elif isinstance(expr, LlamadaFuncion):
+            return self._compilar_llamada(expr)
+
+        elif isinstance(expr, LiteralLista):
+            elementos = [self.compilar_expresion(e) for e in expr.elementos]
+            return lambda env: [e(env) for e in elementos]
+
+        elif isinstance(expr, LiteralMapa):
+            pares = [(self.compilar_expresion(k), self.compilar_expresion(v))
+                     for k, v in expr.pares]
+            return lambda env: {k(env): v(env) for k, v in pares}
+
+        elif isinstance(expr, AccesoIndice):
+            objeto = self.compilar_expresion(expr.objeto)
+            indice = self.compilar_expresion(expr.indice)
+            return lambda env: objeto(env)[indice(env)]
+
+        elif isinstance(expr, LlamadaMetodo):
+            objeto = self.compilar_expresion(expr.objeto)
+            nombre_metodo = expr.nombre_metodo
+            args = [self.compilar_expresion(a) for a in expr.argumentos]
+            return lambda env: aplicar_metodo(objeto(env), nombre_metodo, [a(env) for a in args])
+
+        elif isinstance(expr, AccesoPropiedad):
+            return self._compilar_acceso_propiedad(expr)
+
+        return lambda env: None
+
+    def _compilar_identificador(self, expr: Identificador):
+        """Lectura de variable por slot: local del entorno o global"""
+        nombre = expr.nombre
+        slot = expr.slot
+
+        if expr.profundidad == PROFUNDIDAD_GLOBAL:
+            globales = self.globales
+            return lambda env: globales[slot]
+
+        def leer(env):
+            valor = env[slot] if slot is not None else INDEFINIDA
+            if valor is INDEFINIDA:
+                raise NameError(f"Variable '{nombre}' no definida")
+            return valor
+        return leer
+
+    def _compilar_binaria(self, expr: ExpresionBinaria):
+        """Compila expresión binaria pre-seleccionando la operación"""
+        op = OPERADORES_BINARIOS.get(expr.operador.valor)
+        if op is None:
+            return lambda env: None
+
+        izq = self.compilar_expresion(expr.izquierda)
+
+        # Especialización: operando derecho constante (i + 1, n <= 1, ...)
+        if isinstance(expr.derecha, (LiteralEntero, LiteralFlotante, LiteralTexto)):
+            constante = expr.derecha.valor
+            return lambda env: op(izq(env), constante)
+
+        der = self.compilar_expresion(expr.derecha)
+        return lambda env: op(izq(env), der(env))
+
+    def _compilar_llamada(self, llamada: LlamadaFuncion):
+        """Compila llamada a built-in o a función de usuario"""
+        args = tuple(self.compilar_expresion(a) for a in llamada.argumentos)
+        nativa = FUNCIONES_NATIVAS.get(llamada.nombre)
+
+        if nativa is not None:
+            return lambda env: nativa(*[a(env) for a in args])
+
+        # Enlace tardío: la función puede definirse después (recursión, imports)
+        nombre = llamada.nombre
+        funciones = self.funciones
+
+        def llamar_usuario(env):
+            func = funciones.get(nombre)
+            if func is None:
+                raise NameError(f"Función '{nombre}' no definida")
+            return func([a(env) for a in args])
+        return llamar_usuario
+
+    def _compilar_acceso_propiedad(self, expr: AccesoPropiedad):
+        """Compila acceso a propiedad (Enum.VALOR)"""
+        objeto = self.compilar_expresion(expr.objeto)
+        propiedad = expr.propiedad
+
+        def acceder(env):
+            obj = objeto(env)
+            if isinstance(obj, dict):
+                if propiedad in obj:
+                    return obj[propiedad]
+                raise AttributeError(f"Propiedad '{propiedad}' no encontrada en objeto")
+            raise TypeError(f"No se puede acceder a propiedad en objeto de tipo {type(obj)}")
+        return acceder
+
+
+class InterpreteCierres(InterpreteJade):
+    """Intérprete que compila el programa a closures antes de ejecutarlo"""
+
+    def ejecutar_programa(self, programa: Programa):
+        """Compila y ejecuta un programa Jade"""
+        # Registrar funciones, imports y enums igual que el intérprete de árbol
+        for decl in programa.declaraciones:
+            if isinstance(decl, DeclaracionFuncion):
+                self.funciones[decl.nombre] = decl
+            elif isinstance(decl, Importar):
+                self.ejecutar_importar(decl)
+            elif isinstance(decl, DeclaracionEnum):
+                self.globales[decl.nombre] = {val: val for val in decl.valores}
+        self.resolver_funciones()
+
+        # Compilar todas las funciones (incluidas las importadas) una sola vez
+        compiladas = {}
+        compilador = CompiladorCierres(self.valores_globales, compiladas)
+        for nombre, func in self.funciones.items():
+            compiladas[nombre] = compilador.compilar_funcion(func)
+
+        # Ejecutar función main
+        if 'main' in compiladas:
+            try:
+                compiladas['main']([])
+            finally:
+                salida.vaciar()
+        else:
+            print("Error: No se encontró función 'main'")
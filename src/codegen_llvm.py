@@ -8,22 +8,74 @@ from llvmlite import binding as llvm
 from ast_nodes import *
 from type_system import *
 from builtin_functions import FUNCIONES_BUILTIN
+from resolver import Resolutor, PROFUNDIDAD_LOCAL
 import sys
 
 
+# Listas con representación nativa en el runtime: sufijo -> tipo del elemento
+LISTAS_ESPECIALIZADAS = {
+    'entero': ir.IntType(64),
+    'flotante': ir.DoubleType(),
+    'booleano': ir.IntType(8),
+}
+
+# Tipo de elemento de Jade -> (sufijo, código JADE_ELEMENTO_* del runtime)
+_ELEMENTOS_ESPECIALIZADOS = {
+    TipoDato.ENTERO: ('entero', 1),
+    TipoDato.FLOTANTE: ('flotante', 2),
+    TipoDato.BOOLEANO: ('booleano', 3),
+}
+
+
+# Nombre en el IR de la función main de Jade
+NOMBRE_MAIN_JADE = "jade.main"
+
+# Contador de referencias de los literales de texto (JADE_TEXTO_INMORTAL)
+JADE_TEXTO_INMORTAL = -1
+
+# Mapas especializados por tipo de clave en el runtime: sufijo -> tipo de la clave
+MAPAS_ESPECIALIZADOS = {
+    'entero': ir.IntType(64),
+    'texto': ir.IntType(8).as_pointer(),
+}
+
+# Tipo de clave de Jade -> sufijo (los booleanos se guardan como enteros 0/1)
+_CLAVES_ESPECIALIZADAS = {
+    TipoDato.ENTERO: 'entero',
+    TipoDato.BOOLEANO: 'entero',
+    TipoDato.TEXTO: 'texto',
+}
+
+# Objetos del runtime con contador de referencias:
+# TipoDato -> (nombre en jade_<nombre>_retener/liberar, código JADE_ELEMENTO_*)
+_OBJETOS_CONTADOS = {
+    TipoDato.TEXTO: ('texto', 4),
+    TipoDato.LISTA: ('lista', 5),
+    TipoDato.MAPA: ('mapa', 6),
+    TipoDato.CONSTRUCTOR_TEXTO: ('constructor_texto', 7),
+}
+
+# Tipos cuyos valores se reservan en el heap del runtime
+_TIPOS_CON_MEMORIA = tuple(_OBJETOS_CONTADOS)
+
+# Métodos que no reservan memoria
+_METODOS_SIN_MEMORIA = ('longitud', 'contiene')
+
+
 class GeneradorLLVM:
     """Generador de código LLVM IR"""
     
-    def __init__(self):
+    def __init__(self, nombre: str = "jade_module", acceso_en_linea: bool = True,
+                 regiones: bool = True, salida_sin_buffer: bool = False):
         # Módulo LLVM
-        self.module = ir.Module(name="jade_module")
+        self.module = ir.Module(name=nombre)
         self.module.triple = llvm.get_default_triple()
         
         # Builder para instrucciones
         self.builder = None
         
         # Tablas de símbolos
-        self.variables = {}  # nombre -> alloca
+        self.variables = []  # slot (Resolutor) -> alloca
         self.funciones = {}  # nombre -> ir.Function
         
         # Tipos LLVM
@@ -35,8 +87,39 @@ class GeneradorLLVM:
             TipoDato.NULO: ir.VoidType(),
         }
         
-        # Función actual
+        # Disposición de JadeList en std/runtime.h: {data, size, capacity, tipo, referencias}
+        self.tipo_lista_runtime = ir.LiteralStructType([
+            ir.IntType(8).as_pointer().as_pointer(), ir.IntType(64), ir.IntType(64), ir.IntType(64),
+            ir.IntType(64),
+        ])
+        # Cabecera de JadeString ({longitud, capacidad, referencias, hash}),
+        # justo antes de los datos a los que apunta un texto
+        self.tipo_cabecera_texto = ir.LiteralStructType([ir.IntType(64)] * 4)
+        
+        # Indexar listas con comprobación de límites y load/store en línea
+        # (False: llamar siempre a jade_lista_obtener/asignar)
+        self.acceso_en_linea = acceso_en_linea
+        
+        # Abrir una región de la arena en las funciones de las que no puede
+        # escapar nada reservado (ver _usa_region)
+        self.regiones = regiones
+        
+        # Escribir cada línea de mostrar() en el momento (uso interactivo)
+        # en lugar de acumular la salida en el buffer del runtime
+        self.salida_sin_buffer = salida_sin_buffer
+        
+        # Función actual y marca de su región (None si no tiene)
         self.funcion_actual = None
+        self.marca_region = None
+        
+        # Variables locales con objetos contados de la función actual:
+        # alloca -> Tipo (se liberan al retornar) y declaración -> alloca
+        self.locales_contados = {}
+        self.declaraciones_contadas = {}
+        
+        # Nombre de las constantes de texto: distinto por módulo para que
+        # no choquen al enlazar módulos compilados por separado
+        self.prefijo_textos = "str" if nombre == "jade_module" else f"str.{nombre}"
         
         # Declarar funciones del runtime
         self._declarar_runtime()
@@ -51,6 +134,12 @@ class GeneradorLLVM:
         fnty = ir.FunctionType(ir.IntType(8).as_pointer(), [])
         self.runtime_leer = ir.Function(self.module, fnty, name="jade_leer")
         
+        # void jade_vaciar_salida() / void jade_configurar_salida(int64_t con_buffer)
+        fnty = ir.FunctionType(ir.VoidType(), [])
+        self.runtime_vaciar_salida = ir.Function(self.module, fnty, name="jade_vaciar_salida")
+        fnty = ir.FunctionType(ir.VoidType(), [ir.IntType(64)])
+        self.runtime_configurar_salida = ir.Function(self.module, fnty, name="jade_configurar_salida")
+        
         # char* jade_convertir_a_texto_entero(int64_t n)
         fnty = ir.FunctionType(ir.IntType(8).as_pointer(), [ir.IntType(64)])
         self.runtime_conv_entero = ir.Function(self.module, fnty, name="jade_convertir_a_texto_entero")
@@ -63,10 +152,51 @@ class GeneradorLLVM:
         fnty = ir.FunctionType(ir.VoidType(), [])
         self.runtime_init = ir.Function(self.module, fnty, name="jade_init_runtime")
         
+        # void jade_finalizar_runtime()
+        self.runtime_finalizar = ir.Function(self.module, fnty, name="jade_finalizar_runtime")
+        
+        # void* jade_arena_marca() / void jade_arena_restaurar(void* marca)
+        fnty = ir.FunctionType(ir.IntType(8).as_pointer(), [])
+        self.runtime_arena_marca = ir.Function(self.module, fnty, name="jade_arena_marca")
+        fnty = ir.FunctionType(ir.VoidType(), [ir.IntType(8).as_pointer()])
+        self.runtime_arena_restaurar = ir.Function(self.module, fnty, name="jade_arena_restaurar")
+        
         # char* jade_concatenar(const char* a, const char* b)
         fnty = ir.FunctionType(ir.IntType(8).as_pointer(), [ir.IntType(8).as_pointer(), ir.IntType(8).as_pointer()])
         self.runtime_concatenar = ir.Function(self.module, fnty, name="jade_concatenar")
         
+        # char* jade_concatenar_n(int64_t n, const char** partes)
+        fnty = ir.FunctionType(ir.IntType(8).as_pointer(), [ir.IntType(64), ir.IntType(8).as_pointer().as_pointer()])
+        self.runtime_concatenar_n = ir.Function(self.module, fnty, name="jade_concatenar_n")
+        
+        # Constructor de textos: jade_constructor_texto_{nuevo,agregar,construir,longitud}
+        ct_ptr = ir.IntType(8).as_pointer()
+        firmas = {
+            'nuevo': (ct_ptr, []),
+            'agregar': (ir.VoidType(), [ct_ptr, ir.IntType(8).as_pointer()]),
+            'construir': (ir.IntType(8).as_pointer(), [ct_ptr]),
+            'longitud': (ir.IntType(64), [ct_ptr]),
+        }
+        self.runtime_constructor_texto = {
+            operacion: ir.Function(self.module, ir.FunctionType(retorno, params),
+                                   name=f"jade_constructor_texto_{operacion}")
+            for operacion, (retorno, params) in firmas.items()
+        }
+        
+        # Contadores de referencias: void jade_<objeto>_retener/liberar(objeto)
+        fnty = ir.FunctionType(ir.VoidType(), [ir.IntType(8).as_pointer()])
+        self.runtime_retener = {}
+        self.runtime_liberar = {}
+        for nombre, _ in _OBJETOS_CONTADOS.values():
+            self.runtime_retener[nombre] = ir.Function(self.module, fnty, name=f"jade_{nombre}_retener")
+            self.runtime_liberar[nombre] = ir.Function(self.module, fnty, name=f"jade_{nombre}_liberar")
+        self.runtime_texto_liberar = self.runtime_liberar['texto']
+        
+        # void jade_mapa_especializar_valores(JadeMap* mapa, int64_t tipo)
+        fnty = ir.FunctionType(ir.VoidType(), [ir.IntType(8).as_pointer(), ir.IntType(64)])
+        self.runtime_mapa_especializar_valores = ir.Function(self.module, fnty,
+                                                             name="jade_mapa_especializar_valores")
+        
         # Listas
         # JadeList* jade_lista_nueva()
         fnty = ir.FunctionType(ir.IntType(8).as_pointer(), [])
@@ -96,6 +226,34 @@ class GeneradorLLVM:
         fnty = ir.FunctionType(ir.IntType(32), [ir.IntType(8).as_pointer(), ir.IntType(8).as_pointer()])
         self.runtime_lista_contiene = ir.Function(self.module, fnty, name="jade_lista_contiene")
         
+        # void jade_lista_error_indice(JadeList* lista, int64_t indice): no retorna
+        fnty = ir.FunctionType(ir.VoidType(), [ir.IntType(8).as_pointer(), ir.IntType(64)])
+        self.runtime_lista_error_indice = ir.Function(self.module, fnty, name="jade_lista_error_indice")
+        self.runtime_lista_error_indice.attributes.add('noreturn')
+        self.runtime_lista_error_indice.attributes.add('cold')
+        
+        # void jade_lista_especializar(JadeList* lista, int64_t tipo)
+        fnty = ir.FunctionType(ir.VoidType(), [ir.IntType(8).as_pointer(), ir.IntType(64)])
+        self.runtime_lista_especializar = ir.Function(self.module, fnty, name="jade_lista_especializar")
+        
+        # Listas especializadas (jade_lista_<sufijo>_*): elementos nativos sin caja
+        self.runtime_listas = {}
+        for sufijo, tipo_elem in LISTAS_ESPECIALIZADAS.items():
+            lista_ptr = ir.IntType(8).as_pointer()
+            firmas = {
+                'nueva': (lista_ptr, []),
+                'agregar': (ir.VoidType(), [lista_ptr, tipo_elem]),
+                'obtener': (tipo_elem, [lista_ptr, ir.IntType(64)]),
+                'asignar': (ir.VoidType(), [lista_ptr, ir.IntType(64), tipo_elem]),
+                'eliminar': (tipo_elem, [lista_ptr, ir.IntType(64)]),
+                'contiene': (ir.IntType(32), [lista_ptr, tipo_elem]),
+            }
+            self.runtime_listas[sufijo] = {
+                operacion: ir.Function(self.module, ir.FunctionType(retorno, params),
+                                       name=f"jade_lista_{sufijo}_{operacion}")
+                for operacion, (retorno, params) in firmas.items()
+            }
+        
         # Mapas
         # JadeMap* jade_mapa_nuevo()
         fnty = ir.FunctionType(ir.IntType(8).as_pointer(), [])
@@ -128,28 +286,90 @@ class GeneradorLLVM:
         # JadeList* jade_mapa_valores(JadeMap* mapa)
         fnty = ir.FunctionType(ir.IntType(8).as_pointer(), [ir.IntType(8).as_pointer()])
         self.runtime_mapa_valores = ir.Function(self.module, fnty, name="jade_mapa_valores")
+        
+        # Mapas especializados (jade_mapa_<sufijo>_*): claves nativas, sin
+        # conversión a texto ni strcmp para las enteras
+        self.runtime_mapas = {}
+        for sufijo, tipo_clave in MAPAS_ESPECIALIZADOS.items():
+            mapa_ptr = ir.IntType(8).as_pointer()
+            valor_ptr = ir.IntType(8).as_pointer()
+            firmas = {
+                'nuevo': (mapa_ptr, []),
+                'asignar': (ir.VoidType(), [mapa_ptr, tipo_clave, valor_ptr]),
+                'obtener': (valor_ptr, [mapa_ptr, tipo_clave]),
+                'eliminar': (valor_ptr, [mapa_ptr, tipo_clave]),
+                'contiene': (ir.IntType(32), [mapa_ptr, tipo_clave]),
+            }
+            self.runtime_mapas[sufijo] = {
+                operacion: ir.Function(self.module, ir.FunctionType(retorno, params),
+                                       name=f"jade_mapa_{sufijo}_{operacion}")
+                for operacion, (retorno, params) in firmas.items()
+            }
     
     def obtener_tipo_llvm(self, tipo: Tipo) -> ir.Type:
         """Convierte un tipo Jade a tipo LLVM"""
         return self.tipos_llvm.get(tipo.tipo_base, ir.IntType(64))
     
-    def generar(self, programa: Programa) -> str:
-        """Genera código LLVM IR para todo el programa"""
+    def generar(self, programa: Programa, importados: List[Programa] = ()) -> str:
+        """
+        Genera código LLVM IR para todo el programa
+        'importados' son los AST (ya analizados) de los módulos importados,
+        dependencias primero; sus funciones se incluyen en el mismo módulo LLVM.
+        """
+        funciones = self._funciones_a_generar(programa, importados)
+        
         # Generar declaraciones de funciones primero
-        for decl in programa.declaraciones:
-            if isinstance(decl, DeclaracionFuncion):
-                self._declarar_funcion(decl)
+        for func in funciones:
+            self._declarar_funcion(func)
         
         # Generar cuerpos de funciones
-        for decl in programa.declaraciones:
-            if isinstance(decl, DeclaracionFuncion):
-                self._generar_funcion(decl)
+        for func in funciones:
+            self._generar_funcion(func)
         
         # Crear función de entrada que llama a main
         self._generar_entry_point()
         
         return str(self.module)
     
+    def generar_modulo(self, programa: Programa, importados: List[Programa] = (),
+                       principal: bool = True) -> str:
+        """
+        Genera un módulo LLVM solo con las funciones propias del programa: las
+        de los módulos importados se declaran como externas y se resuelven al
+        enlazar los módulos. Solo el programa principal conserva su main y
+        define el punto de entrada.
+        """
+        funciones = self._funciones_a_generar(programa, importados)
+        propias = {id(decl) for decl in programa.declaraciones
+                   if isinstance(decl, DeclaracionFuncion) and (principal or decl.nombre != 'main')}
+        
+        # Las funciones importadas solo se declaran (sin cuerpo)
+        for func in funciones:
+            if id(func) in propias or func.nombre != 'main':
+                self._declarar_funcion(func)
+        
+        for func in funciones:
+            if id(func) in propias:
+                self._generar_funcion(func)
+        
+        if principal:
+            self._generar_entry_point()
+        
+        return str(self.module)
+    
+    def _funciones_a_generar(self, programa: Programa, importados: List[Programa]) -> List[DeclaracionFuncion]:
+        """Funciones del programa más las importadas que no redefine (sin sus main)"""
+        propias = [decl for decl in programa.declaraciones if isinstance(decl, DeclaracionFuncion)]
+        nombres = {func.nombre for func in propias}
+        funciones = []
+        for modulo in importados:
+            for decl in modulo.declaraciones:
+                if (isinstance(decl, DeclaracionFuncion) and decl.nombre != 'main'
+                        and decl.nombre not in nombres):
+                    nombres.add(decl.nombre)
+                    funciones.append(decl)
+        return funciones + propias
+    
     def _declarar_funcion(self, func: DeclaracionFuncion):
         """Declara una función (firma solamente)"""
         # Determinar tipos de parámetros
@@ -171,7 +391,9 @@ class GeneradorLLVM:
         
         # Crear función
         fnty = ir.FunctionType(tipo_ret, tipos_params)
-        fn = ir.Function(self.module, fnty, name=func.nombre)
+        # main de Jade no puede llamarse main: ese nombre es el punto de entrada de C
+        nombre_llvm = NOMBRE_MAIN_JADE if func.nombre == 'main' else func.nombre
+        fn = ir.Function(self.module, fnty, name=nombre_llvm)
         
         # Nombrar parámetros
         for i, (nombre_param, _) in enumerate(func.parametros):
@@ -213,8 +435,10 @@ class GeneradorLLVM:
         bloque_entrada = fn.append_basic_block("entry")
         self.builder = ir.IRBuilder(bloque_entrada)
         
-        # Crear nuevo scope de variables
-        self.variables = {}
+        # Crear nuevo scope de variables, indexado por los slots del Resolutor
+        if func.locales is None:
+            Resolutor().resolver_funcion(func)
+        self.variables = [None] * len(func.locales)
         
         # Asignar parámetros a variables locales
         for i, (nombre_param, tipo_nombre) in enumerate(func.parametros):
@@ -227,7 +451,24 @@ class GeneradorLLVM:
             # Crear alloca para el parámetro
             alloca = self.builder.alloca(tipo_llvm, name=nombre_param)
             self.builder.store(fn.args[i], alloca)
-            self.variables[nombre_param] = alloca
+            self.variables[i] = alloca
+            
+            # La función toma su propia referencia a los parámetros objeto
+            if tipo_nombre and self._objeto(tipo) and isinstance(tipo_llvm, ir.PointerType):
+                self._retener(fn.args[i], tipo)
+                self.locales_contados[alloca] = tipo
+        
+        # Las variables con objetos empiezan en NULL: liberarlas al retornar
+        # no hace nada si su declaración no se ejecutó
+        for decl in self._declaraciones_con_objetos(func.cuerpo):
+            alloca = self.builder.alloca(ir.IntType(8).as_pointer(), name=decl.nombre)
+            self.builder.store(ir.Constant(ir.IntType(8).as_pointer(), None), alloca)
+            self.declaraciones_contadas[id(decl)] = alloca
+            self.locales_contados[alloca] = self._tipo_declarado(decl)
+        
+        self.marca_region = None
+        if self.regiones and self._usa_region(func, fn):
+            self.marca_region = self.builder.call(self.runtime_arena_marca, [], name="region")
         
         # Generar cuerpo
         tiene_retorno = False
@@ -238,28 +479,112 @@ class GeneradorLLVM:
         
         # Si no hay retorno explícito, agregar ret void
         if not tiene_retorno and isinstance(fn.return_value.type, ir.VoidType):
+            self._liberar_locales()
+            self._cerrar_region()
             self.builder.ret_void()
         
         self.funcion_actual = None
+        self.marca_region = None
+        self.locales_contados = {}
+        self.declaraciones_contadas = {}
+    
+    def _tipo_declarado(self, decl: DeclaracionVariable):
+        """Tipo de una variable: el anotado o el de su valor inicial"""
+        if decl.tipo_dato:
+            return Tipo.desde_nombre(decl.tipo_dato)
+        return getattr(decl.valor_inicial, 'tipo', None)
+    
+    def _declaraciones_con_objetos(self, statements: List[Statement]) -> List[DeclaracionVariable]:
+        """Declaraciones (también las de bloques anidados) de variables con objetos contados"""
+        declaraciones = []
+        for stmt in statements:
+            if isinstance(stmt, DeclaracionVariable):
+                if self._objeto(self._tipo_declarado(stmt)):
+                    declaraciones.append(stmt)
+            elif isinstance(stmt, Si):
+                declaraciones += self._declaraciones_con_objetos(stmt.bloque_entonces)
+                declaraciones += self._declaraciones_con_objetos(stmt.bloque_sino or [])
+            elif isinstance(stmt, (Mientras, Para)):
+                declaraciones += self._declaraciones_con_objetos(stmt.cuerpo)
+        return declaraciones
+    
+    def _liberar_locales(self):
+        """Suelta las referencias de las variables locales antes de retornar"""
+        for alloca, tipo in self.locales_contados.items():
+            self._liberar(self.builder.load(alloca), tipo)
+    
+    def _usa_region(self, func: DeclaracionFuncion, fn: ir.Function) -> bool:
+        """
+        True si la función puede liberar al retornar todo lo que se reservó
+        durante su ejecución: retorna un valor escalar y solo recibe escalares
+        o textos (inmutables), así que nada reservado en ella ni en las
+        funciones que llama queda alcanzable después (el código compilado no
+        tiene variables globales). Además tiene que
+        reservar algo; si no, la región solo costaría dos llamadas.
+        """
+        if (isinstance(fn.function_type.return_type, ir.PointerType)
+                or Tipo.desde_nombre(func.tipo_retorno).tipo_base in _TIPOS_CON_MEMORIA):
+            return False
+        for (_, tipo_nombre), arg in zip(func.parametros, fn.args):
+            tipo = Tipo.desde_nombre(tipo_nombre).tipo_base
+            if tipo != TipoDato.TEXTO and (tipo in _TIPOS_CON_MEMORIA or isinstance(arg.type, ir.PointerType)):
+                return False
+        return self._reserva_memoria(func.cuerpo)
+    
+    def _reserva_memoria(self, nodo) -> bool:
+        """True si el código (nodo o lista de nodos) puede reservar memoria del runtime"""
+        if isinstance(nodo, (list, tuple)):
+            return any(self._reserva_memoria(hijo) for hijo in nodo)
+        if not isinstance(nodo, NodoAST):
+            return False
+        if isinstance(nodo, (LiteralLista, LiteralMapa, AsignacionIndice)):
+            return True
+        if isinstance(nodo, LlamadaMetodo) and nodo.nombre_metodo not in _METODOS_SIN_MEMORIA:
+            return True
+        if isinstance(nodo, (ExpresionBinaria, LlamadaFuncion)):
+            tipo = getattr(nodo, 'tipo', None)
+            if tipo is not None and tipo.tipo_base in _TIPOS_CON_MEMORIA:
+                return True
+        return any(self._reserva_memoria(getattr(nodo, campo, None))
+                   for clase in type(nodo).__mro__
+                   for campo in getattr(clase, '__slots__', ())
+                   if campo not in ('posicion', 'tipo'))
+    
+    def _cerrar_region(self):
+        """Libera la región de la función actual antes de retornar"""
+        if self.marca_region is not None:
+            self.builder.call(self.runtime_arena_restaurar, [self.marca_region])
 
     def _generar_entry_point(self):
         """Genera función principal que inicializa runtime y llama a main"""
         # int _jade_main() que llama a jade main()
         fnty = ir.FunctionType(ir.IntType(32), [])
         c_main_fn = ir.Function(self.module, fnty, name="_jade_main")
+        # Sin integrar en main: el programa quedaría copiado en los dos
+        c_main_fn.attributes.add('noinline')
         
         bloque = c_main_fn.append_basic_block("entry")
         builder = ir.IRBuilder(bloque)
         
         # Llamar a jade_init_runtime()
         builder.call(self.runtime_init, [])
+        if self.salida_sin_buffer:
+            builder.call(self.runtime_configurar_salida, [ir.Constant(ir.IntType(64), 0)])
         
         # Llamar a la función main de Jade si existe
         if "main" in self.funciones:
             builder.call(self.funciones["main"], [])
         
+        # Estadísticas de memoria (JADE_ALLOC_STATS) y liberación de la arena
+        builder.call(self.runtime_finalizar, [])
+        
         # Retornar 0
         builder.ret(ir.Constant(ir.IntType(32), 0))
+        
+        # int main() de C para los ejecutables (el JIT llama a _jade_main)
+        c_main = ir.Function(self.module, fnty, name="main")
+        builder = ir.IRBuilder(c_main.append_basic_block("entry"))
+        builder.ret(builder.call(c_main_fn, []))
 
     def _generar_statement(self, stmt: Statement):
         """Genera código para un statement"""
@@ -278,7 +603,9 @@ class GeneradorLLVM:
         elif isinstance(stmt, Retornar):
             self._generar_retornar(stmt)
         elif isinstance(stmt, ExpresionStatement):
-            self._generar_expresion(stmt.expresion)
+            valor = self._generar_expresion(stmt.expresion)
+            # Un objeto nuevo que nadie usa
+            self._liberar_temporales((stmt.expresion, valor))
     
     def _generar_declaracion_variable(self, decl: DeclaracionVariable):
         """Genera código para declaración de variable"""
@@ -290,19 +617,47 @@ class GeneradorLLVM:
             # Si es void, no podemos crear una variable con ese valor
             return
         
+        alloca = self.declaraciones_contadas.get(id(decl))
+        if alloca is not None and valor.type == alloca.type.pointee:
+            # Variable con un objeto contado (también si se vuelve a declarar en un bucle)
+            self._guardar_contado(alloca, decl.valor_inicial, valor)
+            self.variables[decl.slot] = alloca
+            return
+        
+        if alloca is not None and not self._es_temporal(decl.valor_inicial):
+            # Sin seguimiento: la referencia que se toma no se suelta nunca
+            self._retener(valor, self.locales_contados[alloca])
+        
         # Crear alloca para la variable
         alloca = self.builder.alloca(valor.type, name=decl.nombre)
         self.builder.store(valor, alloca)
         
         # Guardar en tabla de símbolos
-        self.variables[decl.nombre] = alloca
+        self.variables[decl.slot] = alloca
     
     def _generar_asignacion(self, asig: Asignacion):
         """Genera código para asignación"""
         valor = self._generar_expresion(asig.valor)
-        alloca = self.variables.get(asig.nombre)
-        if alloca:
+        alloca = self.variables[asig.slot]
+        if alloca in self.locales_contados and valor.type == alloca.type.pointee:
+            self._guardar_contado(alloca, asig.valor, valor)
+        elif alloca:
+            if not self._es_temporal(asig.valor):
+                self._retener(valor, getattr(asig.valor, 'tipo', None))
             self.builder.store(valor, alloca)
+    
+    def _guardar_contado(self, alloca, expr, valor):
+        """
+        Guarda un objeto en una variable, que es dueña de una referencia: un
+        temporal le cede la suya y un valor prestado se retiene. El valor
+        anterior se suelta después de guardar (puede ser el mismo objeto).
+        """
+        tipo = self.locales_contados[alloca]
+        if not self._es_temporal(expr):
+            self._retener(valor, tipo)
+        anterior = self.builder.load(alloca)
+        self.builder.store(valor, alloca)
+        self._liberar(anterior, tipo)
             
     def _generar_asignacion_indice(self, stmt: AsignacionIndice):
         """Genera código para asignación a índice: arr[i] = val"""
@@ -310,10 +665,33 @@ class GeneradorLLVM:
         indice = self._generar_expresion(stmt.indice)
         valor = self._generar_expresion(stmt.valor)
         
-        val_ptr = self._cast_to_void_ptr(valor)
-        
         # Usar info de tipos
         tipo_obj = getattr(stmt.objeto, 'tipo', None)
+        sufijo = self._sufijo_lista(tipo_obj)
+        tipo_elemento = self._tipo_almacen_lista(tipo_obj)
+        if tipo_elemento is not None and self.acceso_en_linea:
+            destino = self._elemento_lista_en_linea(objeto, indice, tipo_elemento)
+            if sufijo:
+                self.builder.store(self._a_elemento(valor, sufijo), destino)
+                return
+            tipo_contado = tipo_obj.tipo_elemento if self._cuenta_elementos(tipo_obj) else None
+            anterior = self.builder.load(destino) if tipo_contado else None
+            self.builder.store(self._cast_to_void_ptr(valor), destino)
+            if tipo_contado:
+                # La lista toma la referencia del valor y suelta la del anterior
+                if not self._es_temporal(stmt.valor):
+                    self._retener(valor, tipo_contado)
+                self._liberar(anterior, tipo_contado)
+            else:
+                self._guardado_en_contenedor(stmt.valor, valor, False)
+            return
+        if sufijo:
+            funciones = self.runtime_listas[sufijo]
+            indice = self._indice_i64(indice)
+            self.builder.call(funciones['asignar'], [objeto, indice, self._a_elemento(valor, sufijo)])
+            return
+        
+        val_ptr = self._cast_to_void_ptr(valor)
         es_mapa = False
         
         if tipo_obj and isinstance(tipo_obj, TipoMapa):
@@ -325,13 +703,21 @@ class GeneradorLLVM:
             if str(indice.type) == 'i8*':
                 es_mapa = True
             
-        if es_mapa:
+        sufijo_mapa = self._sufijo_mapa(tipo_obj)
+        if sufijo_mapa:
+            clave = self._a_clave(indice, sufijo_mapa)
+            self.builder.call(self.runtime_mapas[sufijo_mapa]['asignar'], [objeto, clave, val_ptr])
+            # El mapa retiene sus claves de texto
+            self._liberar_temporales((stmt.indice, indice))
+        elif es_mapa:
             indice_ptr = self._cast_to_void_ptr(indice)
             self.builder.call(self.runtime_mapa_asignar, [objeto, indice_ptr, val_ptr])
+            self._liberar_temporales((stmt.indice, indice))
         else:
             if str(indice.type) != 'i64':
                  indice = self.builder.zext(indice, ir.IntType(64))
             self.builder.call(self.runtime_lista_asignar, [objeto, indice, val_ptr])
+        self._guardado_en_contenedor(stmt.valor, valor, self._cuenta_elementos(tipo_obj))
     
     def _generar_si(self, si: Si):
         """Genera código para condicional si/entonces/sino"""
@@ -398,7 +784,7 @@ class GeneradorLLVM:
         inicio = self._generar_expresion(para.inicio)
         fin = self._generar_expresion(para.fin)
         self.builder.store(inicio, iter_alloca)
-        self.variables[para.variable] = iter_alloca
+        self.variables[para.slot] = iter_alloca
         
         # Bloques
         bloque_cond = self.funcion_actual.append_basic_block("for.cond")
@@ -434,8 +820,15 @@ class GeneradorLLVM:
         """Genera código para retorno"""
         if ret.valor:
             valor = self._generar_expresion(ret.valor)
+            # Quien llama recibe una referencia propia
+            if not self._es_temporal(ret.valor):
+                self._retener(valor, getattr(ret.valor, 'tipo', None))
+            self._liberar_locales()
+            self._cerrar_region()
             self.builder.ret(valor)
         else:
+            self._liberar_locales()
+            self._cerrar_region()
             self.builder.ret_void()
     
     def _generar_expresion(self, expr: Expresion):
@@ -450,17 +843,12 @@ class GeneradorLLVM:
             return ir.Constant(ir.IntType(1), 1 if expr.valor else 0)
         
         elif isinstance(expr, LiteralTexto):
-            # Crear string constante global
-            texto_bytes = bytearray((expr.valor + '\0').encode('utf-8'))
-            texto_const = ir.Constant(ir.ArrayType(ir.IntType(8), len(texto_bytes)), texto_bytes)
-            global_str = ir.GlobalVariable(self.module, texto_const.type, self.module.get_unique_name("str"))
-            global_str.initializer = texto_const
-            global_str.global_constant = True
-            # Obtener puntero al primer elemento
-            return self.builder.bitcast(global_str, ir.IntType(8).as_pointer())
+            return self._texto_literal(expr.valor)
         
         elif isinstance(expr, Identificador):
-            alloca = self.variables.get(expr.nombre)
+            alloca = None
+            if expr.profundidad == PROFUNDIDAD_LOCAL:
+                alloca = self.variables[expr.slot]
             if alloca:
                 return self.builder.load(alloca, expr.nombre)
             return ir.Constant(ir.IntType(64), 0)
@@ -480,6 +868,18 @@ class GeneradorLLVM:
             
             # Usar info de tipos
             tipo_obj = getattr(expr.objeto, 'tipo', None)
+            sufijo = self._sufijo_lista(tipo_obj)
+            tipo_elemento = self._tipo_almacen_lista(tipo_obj)
+            if tipo_elemento is not None and self.acceso_en_linea:
+                valor = self.builder.load(self._elemento_lista_en_linea(objeto, indice, tipo_elemento))
+                if sufijo:
+                    return self._desde_elemento(valor, sufijo)
+                return self._cast_from_void_ptr(valor, self._tipo_llvm_expresion(expr))
+            if sufijo:
+                funciones = self.runtime_listas[sufijo]
+                valor = self.builder.call(funciones['obtener'], [objeto, self._indice_i64(indice)])
+                return self._desde_elemento(valor, sufijo)
+            
             es_mapa = False
             
             if tipo_obj and isinstance(tipo_obj, TipoMapa):
@@ -491,33 +891,43 @@ class GeneradorLLVM:
                 if str(indice.type) == 'i8*': 
                     es_mapa = True
             
-            if es_mapa:
+            sufijo_mapa = self._sufijo_mapa(tipo_obj)
+            if sufijo_mapa:
+                clave = self._a_clave(indice, sufijo_mapa)
+                val_ptr = self.builder.call(self.runtime_mapas[sufijo_mapa]['obtener'], [objeto, clave])
+                self._liberar_temporales((expr.indice, indice))
+            elif es_mapa:
                 indice_ptr = self._cast_to_void_ptr(indice)
                 val_ptr = self.builder.call(self.runtime_mapa_obtener, [objeto, indice_ptr])
+                self._liberar_temporales((expr.indice, indice))
             else:
                 # Asumir lista
                 if str(indice.type) != 'i64':
                      indice = self.builder.zext(indice, ir.IntType(64))
                 val_ptr = self.builder.call(self.runtime_lista_obtener, [objeto, indice])
             
-            # Determinar tipo de retorno basado en análisis semántico
-            tipo_retorno = ir.IntType(64) # Default
-            tipo_expr = getattr(expr, 'tipo', None)
-            
-            if tipo_expr:
-                if tipo_expr.tipo_base == TipoDato.TEXTO:
-                    tipo_retorno = ir.IntType(8).as_pointer()
-                elif tipo_expr.tipo_base == TipoDato.FLOTANTE:
-                    tipo_retorno = ir.DoubleType()
-            
-            return self._cast_from_void_ptr(val_ptr, tipo_retorno)
+            return self._cast_from_void_ptr(val_ptr, self._tipo_llvm_expresion(expr))
         
         elif isinstance(expr, LlamadaMetodo):
             return self._generar_metodo(expr)
         
         elif isinstance(expr, LiteralLista):
+            sufijo = self._sufijo_lista(getattr(expr, 'tipo', None))
+            if sufijo:
+                # Lista especializada: los elementos se guardan sin caja
+                funciones = self.runtime_listas[sufijo]
+                lista = self.builder.call(funciones['nueva'], [])
+                for elem in expr.elementos:
+                    val = self._a_elemento(self._generar_expresion(elem), sufijo)
+                    self.builder.call(funciones['agregar'], [lista, val])
+                return lista
+            
             # Crear nueva lista
             lista = self.builder.call(self.runtime_lista_nueva, [])
+            cuenta = self._cuenta_elementos(getattr(expr, 'tipo', None))
+            if cuenta:
+                _, codigo = self._objeto(expr.tipo.tipo_elemento)
+                self.builder.call(self.runtime_lista_especializar, [lista, ir.Constant(ir.IntType(64), codigo)])
             
             # Agregar elementos
             for elem in expr.elementos:
@@ -525,22 +935,39 @@ class GeneradorLLVM:
                 # Convertir valor a void* (i8*)
                 val_ptr = self._cast_to_void_ptr(val)
                 self.builder.call(self.runtime_lista_agregar, [lista, val_ptr])
+                self._guardado_en_contenedor(elem, val, cuenta)
             
             return lista
             
         elif isinstance(expr, LiteralMapa):
+            sufijo = self._sufijo_mapa(getattr(expr, 'tipo', None))
+            
             # Crear nuevo mapa
-            mapa = self.builder.call(self.runtime_mapa_nuevo, [])
+            if sufijo:
+                mapa = self.builder.call(self.runtime_mapas[sufijo]['nuevo'], [])
+            else:
+                mapa = self.builder.call(self.runtime_mapa_nuevo, [])
+            cuenta = self._cuenta_elementos(getattr(expr, 'tipo', None))
+            if cuenta:
+                _, codigo = self._objeto(expr.tipo.tipo_valor)
+                self.builder.call(self.runtime_mapa_especializar_valores,
+                                  [mapa, ir.Constant(ir.IntType(64), codigo)])
             
             # Agregar pares
             for k, v in expr.pares:
                 clave = self._generar_expresion(k)
                 valor = self._generar_expresion(v)
                 
-                clave_ptr = self._cast_to_void_ptr(clave)
                 valor_ptr = self._cast_to_void_ptr(valor)
                 
-                self.builder.call(self.runtime_mapa_asignar, [mapa, clave_ptr, valor_ptr])
+                if sufijo:
+                    clave_nativa = self._a_clave(clave, sufijo)
+                    self.builder.call(self.runtime_mapas[sufijo]['asignar'], [mapa, clave_nativa, valor_ptr])
+                else:
+                    clave_ptr = self._cast_to_void_ptr(clave)
+                    self.builder.call(self.runtime_mapa_asignar, [mapa, clave_ptr, valor_ptr])
+                self._liberar_temporales((k, clave))
+                self._guardado_en_contenedor(v, valor, cuenta)
             
             return mapa
             
@@ -551,7 +978,13 @@ class GeneradorLLVM:
         """Genera código para llamada a método"""
         objeto = self._generar_expresion(expr.objeto)
         args = [self._generar_expresion(arg) for arg in expr.argumentos]
-        
+        resultado = self._aplicar_metodo(expr, objeto, args)
+        # El objeto ya no hace falta si era temporal (p. ej. (a + b).longitud())
+        self._liberar_temporales((expr.objeto, objeto))
+        return resultado
+    
+    def _aplicar_metodo(self, expr: LlamadaMetodo, objeto, args):
+        """Llamada a un método sobre los valores ya generados del objeto y los argumentos"""
         # Usar información de tipos adjunta por el analizador semántico
         tipo_obj = getattr(expr.objeto, 'tipo', None)
         
@@ -568,27 +1001,60 @@ class GeneradorLLVM:
             elif len(args) > 0 and str(args[0].type) == 'i8*':
                 es_mapa = True
         
+        if tipo_obj is not None and tipo_obj.tipo_base == TipoDato.TEXTO and expr.nombre_metodo == 'longitud':
+            return self._longitud_texto(objeto)
+        
+        if tipo_obj is not None and tipo_obj.tipo_base == TipoDato.CONSTRUCTOR_TEXTO:
+            res = self.builder.call(self.runtime_constructor_texto[expr.nombre_metodo], [objeto] + args)
+            if expr.nombre_metodo == 'agregar':
+                # El constructor copia el texto: un temporal ya no hace falta
+                self._liberar_temporales((expr.argumentos[0], args[0]))
+                return ir.Constant(ir.IntType(64), 0)
+            return res
+        
+        sufijo_mapa = self._sufijo_mapa(tipo_obj)
+        if sufijo_mapa and expr.nombre_metodo in ('eliminar', 'contiene'):
+            clave = self._a_clave(args[0], sufijo_mapa)
+            res = self.builder.call(self.runtime_mapas[sufijo_mapa][expr.nombre_metodo], [objeto, clave])
+            self._liberar_temporales((expr.argumentos[0], args[0]))
+            if expr.nombre_metodo == 'contiene':
+                return self.builder.zext(res, ir.IntType(64))
+            return res
+        
+        sufijo = None if es_mapa else self._sufijo_lista(tipo_obj)
+        if sufijo and expr.nombre_metodo in ('agregar', 'eliminar', 'contiene'):
+            return self._generar_metodo_lista_especializada(expr.nombre_metodo, sufijo, objeto, args)
+        
         if expr.nombre_metodo == 'agregar':
             val_ptr = self._cast_to_void_ptr(args[0])
             self.builder.call(self.runtime_lista_agregar, [objeto, val_ptr])
+            self._guardado_en_contenedor(expr.argumentos[0], args[0], self._cuenta_elementos(tipo_obj))
             return ir.Constant(ir.IntType(64), 0)
             
-        elif expr.nombre_metodo == 'claves':
-            return self.builder.call(self.runtime_mapa_claves, [objeto])
-            
-        elif expr.nombre_metodo == 'valores':
-            return self.builder.call(self.runtime_mapa_valores, [objeto])
+        elif expr.nombre_metodo in ('claves', 'valores'):
+            funcion = self.runtime_mapa_claves if expr.nombre_metodo == 'claves' else self.runtime_mapa_valores
+            lista = self.builder.call(funcion, [objeto])
+            # El runtime construye una lista genérica: adoptar la representación de su tipo
+            tipo_lista = getattr(expr, 'tipo', None)
+            if self._sufijo_lista(tipo_lista):
+                _, codigo = _ELEMENTOS_ESPECIALIZADOS[tipo_lista.tipo_elemento.tipo_base]
+                self.builder.call(self.runtime_lista_especializar, [lista, ir.Constant(ir.IntType(64), codigo)])
+            return lista
             
         elif expr.nombre_metodo == 'longitud':
             if es_mapa:
                 return self.builder.call(self.runtime_mapa_longitud, [objeto])
+            elif self.acceso_en_linea and isinstance(tipo_obj, TipoLista):
+                return self.builder.load(self._campo_lista(objeto, 1), name="lista.tam")
             else:
                 return self.builder.call(self.runtime_lista_longitud, [objeto])
             
         elif expr.nombre_metodo == 'eliminar':
             if es_mapa:
                 arg_ptr = self._cast_to_void_ptr(args[0])
-                return self.builder.call(self.runtime_mapa_eliminar, [objeto, arg_ptr])
+                res = self.builder.call(self.runtime_mapa_eliminar, [objeto, arg_ptr])
+                self._liberar_temporales((expr.argumentos[0], args[0]))
+                return res
             else:
                 return self.builder.call(self.runtime_lista_eliminar, [objeto, args[0]])
             
@@ -598,13 +1064,36 @@ class GeneradorLLVM:
                 res = self.builder.call(self.runtime_mapa_contiene, [objeto, val_ptr])
             else:
                 res = self.builder.call(self.runtime_lista_contiene, [objeto, val_ptr])
+            self._liberar_temporales((expr.argumentos[0], args[0]))
             
             return self.builder.zext(res, ir.IntType(64))
         
         return ir.Constant(ir.IntType(64), 0)
     
+    def _generar_metodo_lista_especializada(self, metodo: str, sufijo: str, objeto, args):
+        """agregar, eliminar y contiene sobre una lista especializada"""
+        funciones = self.runtime_listas[sufijo]
+        if metodo == 'agregar':
+            self.builder.call(funciones['agregar'], [objeto, self._a_elemento(args[0], sufijo)])
+            return ir.Constant(ir.IntType(64), 0)
+        if metodo == 'eliminar':
+            valor = self.builder.call(funciones['eliminar'], [objeto, self._indice_i64(args[0])])
+            return self._desde_elemento(valor, sufijo)
+        res = self.builder.call(funciones['contiene'], [objeto, self._a_elemento(args[0], sufijo)])
+        return self.builder.zext(res, ir.IntType(64))
+    
     def _generar_binaria(self, expr: ExpresionBinaria):
         """Genera código para expresión binaria"""
+        if self._es_concatenacion(expr):
+            # a + b + c + ...: una sola reserva para toda la cadena
+            valores, temporales = [], []
+            for operando in self._operandos_concatenacion(expr):
+                valor = self._generar_expresion(operando)
+                valores.append(valor)
+                if self._es_temporal(operando):
+                    temporales.append(valor)
+            return self._concatenar(valores, temporales)
+        
         izq = self._generar_expresion(expr.izquierda)
         der = self._generar_expresion(expr.derecha)
         
@@ -615,7 +1104,9 @@ class GeneradorLLVM:
             # Verificar si son strings (i8*)
             if str(izq.type) == 'i8*' and str(der.type) == 'i8*':
                 # Concatenación de strings
-                return self.builder.call(self.runtime_concatenar, [izq, der])
+                resultado = self.builder.call(self.runtime_concatenar, [izq, der])
+                self._liberar_temporales((expr.izquierda, izq), (expr.derecha, der))
+                return resultado
             else:
                 # Suma aritmética
                 return self.builder.add(izq, der)
@@ -629,10 +1120,10 @@ class GeneradorLLVM:
             return self.builder.srem(izq, der)
         
         # Operadores de comparación
-        elif op == '==':
-            return self.builder.icmp_signed('==', izq, der)
-        elif op == '!=':
-            return self.builder.icmp_signed('!=', izq, der)
+        elif op in ('==', '!='):
+            resultado = self.builder.icmp_signed(op, izq, der)
+            self._liberar_temporales((expr.izquierda, izq), (expr.derecha, der))
+            return resultado
         elif op == '<':
             return self.builder.icmp_signed('<', izq, der)
         elif op == '>':
@@ -666,51 +1157,355 @@ class GeneradorLLVM:
         # Verificar si es built-in
         if llamada.nombre == "mostrar":
             arg = self._generar_expresion(llamada.argumentos[0])
-            return self.builder.call(self.runtime_mostrar, [arg])
+            resultado = self.builder.call(self.runtime_mostrar, [arg])
+            self._liberar_temporales((llamada.argumentos[0], arg))
+            return resultado
+        
+        elif llamada.nombre == "leer":
+            return self.builder.call(self.runtime_leer, [])
+        
+        elif llamada.nombre == "vaciar_salida":
+            return self.builder.call(self.runtime_vaciar_salida, [])
         
         elif llamada.nombre == "convertir_a_texto":
             arg_expr = llamada.argumentos[0]
-            arg = self._generar_expresion(arg_expr)
-            
-            # Usar información semántica si está disponible
-            tipo_sem = getattr(arg_expr, 'tipo', None)
-            
-            if tipo_sem:
-                if tipo_sem.tipo_base == TipoDato.ENTERO:
-                    # Si viene como void* (de una lista/mapa), convertir a entero
-                    if str(arg.type) == 'i8*':
-                        arg = self.builder.ptrtoint(arg, ir.IntType(64))
-                    return self.builder.call(self.runtime_conv_entero, [arg])
-                    
-                elif tipo_sem.tipo_base == TipoDato.FLOTANTE:
-                    # Si viene como void*, convertir a double
-                    if str(arg.type) == 'i8*':
-                        # Asumimos que se guardó bitcasteado
-                        arg_int = self.builder.ptrtoint(arg, ir.IntType(64))
-                        arg = self.builder.bitcast(arg_int, ir.DoubleType())
-                    return self.builder.call(self.runtime_conv_flotante, [arg])
-                    
-                elif tipo_sem.tipo_base == TipoDato.TEXTO:
-                    # Ya es i8*, devolver tal cual
-                    return arg
-            
-            # Fallback: inferencia por tipo LLVM
-            if isinstance(arg.type, ir.PointerType) and arg.type.pointee == ir.IntType(8):
-                return arg
-            elif isinstance(arg.type, ir.DoubleType):
-                return self.builder.call(self.runtime_conv_flotante, [arg])
-            else:
-                return self.builder.call(self.runtime_conv_entero, [arg])
+            return self._convertir_a_texto(arg_expr, self._generar_expresion(arg_expr))
+        
+        elif llamada.nombre == "f" and llamada.argumentos and isinstance(llamada.argumentos[0], LiteralTexto):
+            return self._generar_interpolacion(llamada)
+        
+        elif llamada.nombre == "constructor_texto":
+            return self.builder.call(self.runtime_constructor_texto['nuevo'], [])
         
         # Función definida por usuario
         elif llamada.nombre in self.funciones:
             fn = self.funciones[llamada.nombre]
             args = [self._generar_expresion(arg) for arg in llamada.argumentos]
-            return self.builder.call(fn, args)
+            resultado = self.builder.call(fn, args)
+            # La función retiene los parámetros que guarda
+            self._liberar_temporales(*zip(llamada.argumentos, args))
+            return resultado
         
         return ir.Constant(ir.IntType(64), 0)
 
 
+    def _sufijo_lista(self, tipo):
+        """Sufijo de la lista especializada para un TipoLista, o None si es genérica"""
+        if isinstance(tipo, TipoLista) and tipo.tipo_elemento is not None:
+            especializada = _ELEMENTOS_ESPECIALIZADOS.get(tipo.tipo_elemento.tipo_base)
+            if especializada:
+                return especializada[0]
+        return None
+
+    def _convertir_a_texto(self, arg_expr, arg):
+        """convertir_a_texto(): el valor ya generado de arg_expr como texto"""
+        # Usar información semántica si está disponible
+        tipo_sem = getattr(arg_expr, 'tipo', None)
+        
+        if tipo_sem:
+            if tipo_sem.tipo_base == TipoDato.ENTERO:
+                # Si viene como void* (de una lista/mapa), convertir a entero
+                if str(arg.type) == 'i8*':
+                    arg = self.builder.ptrtoint(arg, ir.IntType(64))
+                return self.builder.call(self.runtime_conv_entero, [arg])
+                
+            elif tipo_sem.tipo_base == TipoDato.FLOTANTE:
+                # Si viene como void*, convertir a double
+                if str(arg.type) == 'i8*':
+                    # Asumimos que se guardó bitcasteado
+                    arg_int = self.builder.ptrtoint(arg, ir.IntType(64))
+                    arg = self.builder.bitcast(arg_int, ir.DoubleType())
+                return self.builder.call(self.runtime_conv_flotante, [arg])
+                
+            elif tipo_sem.tipo_base == TipoDato.TEXTO:
+                # Ya es i8*, devolver tal cual
+                return arg
+        
+        # Fallback: inferencia por tipo LLVM
+        if isinstance(arg.type, ir.PointerType) and arg.type.pointee == ir.IntType(8):
+            if self._texto_convertido_es_propio(arg_expr):
+                # Como en las conversiones de números, el resultado es una referencia propia
+                self._retener(arg, TIPO_TEXTO)
+            return arg
+        elif isinstance(arg.type, ir.DoubleType):
+            return self.builder.call(self.runtime_conv_flotante, [arg])
+        else:
+            return self.builder.call(self.runtime_conv_entero, [arg])
+
+    def _texto_convertido_es_propio(self, arg_expr) -> bool:
+        """
+        True si convertir_a_texto(arg_expr) retorna una referencia propia:
+        los números y booleanos (y los valores sin tipo conocido) se
+        convierten en un texto nuevo; un texto se retorna tal cual.
+        """
+        tipo_sem = getattr(arg_expr, 'tipo', None)
+        return tipo_sem is None or tipo_sem.tipo_base in (TipoDato.ENTERO, TipoDato.FLOTANTE,
+                                                          TipoDato.BOOLEANO, TipoDato.DESCONOCIDO)
+
+    def _texto_literal(self, valor: str):
+        """Puntero a los datos de un JadeString global con el texto dado"""
+        # Crear JadeString global: cabecera + datos
+        texto_bytes = bytearray((valor + '\0').encode('utf-8'))
+        longitud = ir.Constant(ir.IntType(64), len(texto_bytes) - 1)
+        datos = ir.Constant(ir.ArrayType(ir.IntType(8), len(texto_bytes)), texto_bytes)
+        texto_const = ir.Constant.literal_struct([
+            longitud, longitud,
+            ir.Constant(ir.IntType(64), JADE_TEXTO_INMORTAL),
+            ir.Constant(ir.IntType(64), 0),
+            datos,
+        ])
+        global_str = ir.GlobalVariable(self.module, texto_const.type, self.module.get_unique_name(self.prefijo_textos))
+        global_str.initializer = texto_const
+        # No es constante: el runtime guarda en la cabecera el hash calculado
+        global_str.global_constant = False
+        # Obtener puntero al primer byte de los datos
+        cero = ir.Constant(ir.IntType(32), 0)
+        return self.builder.gep(global_str, [cero, ir.Constant(ir.IntType(32), 4), cero], inbounds=True)
+
+    def _es_concatenacion(self, expr) -> bool:
+        """True si expr es un '+' entre textos"""
+        tipo = getattr(expr, 'tipo', None)
+        return (isinstance(expr, ExpresionBinaria) and expr.operador.valor == '+'
+                and tipo is not None and tipo.tipo_base == TipoDato.TEXTO)
+
+    def _operandos_concatenacion(self, expr) -> List[Expresion]:
+        """Aplana una cadena a + b + c + ... en la lista de sus operandos"""
+        if not self._es_concatenacion(expr):
+            return [expr]
+        return self._operandos_concatenacion(expr.izquierda) + self._operandos_concatenacion(expr.derecha)
+
+    def _alloca_entrada(self, tipo, nombre: str = ""):
+        """alloca en el bloque de entrada de la función (no crece la pila en los bucles)"""
+        with self.builder.goto_entry_block():
+            self.builder.position_at_start(self.builder.function.entry_basic_block)
+            return self.builder.alloca(tipo, name=nombre)
+
+    def _concatenar(self, valores, temporales):
+        """
+        Concatena los textos de valores con una sola reserva (jade_concatenar_n)
+        y libera después los temporales ya copiados
+        """
+        if len(valores) == 2:
+            resultado = self.builder.call(self.runtime_concatenar, valores)
+        else:
+            texto_ptr = ir.IntType(8).as_pointer()
+            partes = self._alloca_entrada(ir.ArrayType(texto_ptr, len(valores)), "partes")
+            cero = ir.Constant(ir.IntType(32), 0)
+            for i, valor in enumerate(valores):
+                destino = self.builder.gep(partes, [cero, ir.Constant(ir.IntType(32), i)], inbounds=True)
+                self.builder.store(valor, destino)
+            inicio = self.builder.gep(partes, [cero, cero], inbounds=True)
+            resultado = self.builder.call(self.runtime_concatenar_n,
+                                          [ir.Constant(ir.IntType(64), len(valores)), inicio])
+        for valor in temporales:
+            self.builder.call(self.runtime_texto_liberar, [valor])
+        return resultado
+
+    def _generar_interpolacion(self, llamada: LlamadaFuncion):
+        """f("... {} ...", a, ...) con plantilla literal: una concatenación de sus partes"""
+        partes = llamada.argumentos[0].valor.split('{}')
+        argumentos = llamada.argumentos[1:]
+        valores, temporales = [], []
+        for i, parte in enumerate(partes):
+            if i > 0:
+                if i <= len(argumentos):
+                    arg_expr = argumentos[i - 1]
+                    valor = self._convertir_a_texto(arg_expr, self._generar_expresion(arg_expr))
+                    valores.append(valor)
+                    if self._texto_convertido_es_propio(arg_expr) or self._es_temporal(arg_expr):
+                        temporales.append(valor)
+                else:
+                    # '{}' sin valor: queda como está
+                    parte = '{}' + parte
+            if parte:
+                valores.append(self._texto_literal(parte))
+        # Siempre un texto nuevo, como el resto de las concatenaciones
+        while len(valores) < 2:
+            valores.append(self._texto_literal(''))
+        return self._concatenar(valores, temporales)
+
+    def _objeto(self, tipo):
+        """(nombre, código JADE_ELEMENTO_*) si los valores del tipo son objetos contados"""
+        if tipo is None:
+            return None
+        return _OBJETOS_CONTADOS.get(tipo.tipo_base)
+
+    def _cuenta_elementos(self, tipo) -> bool:
+        """True si la lista o el mapa tiene elementos (valores) que son objetos contados"""
+        if isinstance(tipo, TipoLista):
+            return self._objeto(tipo.tipo_elemento) is not None
+        if isinstance(tipo, TipoMapa):
+            return self._objeto(tipo.tipo_valor) is not None
+        return False
+
+    def _es_puntero_objeto(self, valor) -> bool:
+        """Los objetos llegan como punteros o, desde listas anidadas, como i64"""
+        return isinstance(valor.type, ir.PointerType) or valor.type == ir.IntType(64)
+
+    def _retener(self, valor, tipo):
+        """Toma una referencia a valor si es un objeto contado"""
+        objeto = self._objeto(tipo)
+        if objeto and self._es_puntero_objeto(valor):
+            self.builder.call(self.runtime_retener[objeto[0]], [self._cast_to_void_ptr(valor)])
+
+    def _liberar(self, valor, tipo):
+        """Suelta una referencia a valor si es un objeto contado (NULL no hace nada)"""
+        objeto = self._objeto(tipo)
+        if objeto and self._es_puntero_objeto(valor):
+            self.builder.call(self.runtime_liberar[objeto[0]], [self._cast_to_void_ptr(valor)])
+
+    def _es_temporal(self, expr) -> bool:
+        """
+        True si la expresión produce un objeto nuevo (con una referencia
+        propia) que no queda guardado en ninguna variable, lista o mapa:
+        quien lo consume lo guarda cediendo esa referencia o lo libera
+        después de usarlo. Los demás valores (variables, elementos,
+        literales de texto) son prestados.
+        """
+        tipo = getattr(expr, 'tipo', None)
+        if self._objeto(tipo) is None:
+            return False
+        if isinstance(expr, (LiteralLista, LiteralMapa)):
+            return True
+        if isinstance(expr, ExpresionBinaria):
+            return expr.operador.valor == '+'
+        if isinstance(expr, LlamadaFuncion):
+            if expr.nombre in ('f', 'constructor_texto', 'leer'):
+                return True
+            if expr.nombre == 'convertir_a_texto' and expr.argumentos:
+                # convertir_a_texto de un texto retorna el mismo texto
+                arg = expr.argumentos[0]
+                return self._texto_convertido_es_propio(arg) or self._es_temporal(arg)
+            # Las funciones retornan una referencia propia
+            return expr.nombre in self.funciones
+        if isinstance(expr, LlamadaMetodo):
+            tipo_obj = getattr(expr.objeto, 'tipo', None)
+            if expr.nombre_metodo in ('claves', 'valores'):
+                return True
+            if expr.nombre_metodo == 'construir':
+                return tipo_obj is not None and tipo_obj.tipo_base == TipoDato.CONSTRUCTOR_TEXTO
+            if expr.nombre_metodo == 'eliminar':
+                # La referencia de la lista o el mapa pasa a quien elimina
+                return self._cuenta_elementos(tipo_obj)
+        return False
+
+    def _liberar_temporales(self, *pares):
+        """Libera los objetos temporales de los pares (expresión, valor) ya consumidos"""
+        for expr, valor in pares:
+            if self._es_temporal(expr):
+                self._liberar(valor, expr.tipo)
+
+    def _guardado_en_contenedor(self, expr, valor, cuenta: bool):
+        """
+        Después de guardar valor en una lista o un mapa: si el contenedor
+        cuenta sus elementos ya tomó su referencia y un temporal se libera;
+        si no (tipo de elemento desconocido) se queda con una referencia
+        que nunca suelta, así el objeto no se libera mientras esté guardado.
+        """
+        if cuenta:
+            self._liberar_temporales((expr, valor))
+        elif not self._es_temporal(expr):
+            self._retener(valor, getattr(expr, 'tipo', None))
+
+    def _longitud_texto(self, texto):
+        """Longitud de un texto, leída de la cabecera JadeString que lo precede"""
+        cabecera = self.builder.bitcast(texto, self.tipo_cabecera_texto.as_pointer())
+        campo = self.builder.gep(cabecera, [ir.Constant(ir.IntType(32), -1), ir.Constant(ir.IntType(32), 0)])
+        return self.builder.load(campo, name="texto.longitud")
+
+    def _sufijo_mapa(self, tipo):
+        """Sufijo del mapa especializado para un TipoMapa, o None si es genérico"""
+        if isinstance(tipo, TipoMapa) and tipo.tipo_clave is not None:
+            return _CLAVES_ESPECIALIZADAS.get(tipo.tipo_clave.tipo_base)
+        return None
+
+    def _a_clave(self, clave, sufijo: str):
+        """Convierte una clave al tipo nativo del mapa especializado"""
+        destino = MAPAS_ESPECIALIZADOS[sufijo]
+        if clave.type == destino:
+            return clave
+        if isinstance(clave.type, ir.IntType) and isinstance(destino, ir.IntType):
+            return self.builder.zext(clave, destino)
+        return self.builder.bitcast(clave, destino)
+
+    def _tipo_almacen_lista(self, tipo):
+        """
+        Tipo LLVM con el que el runtime guarda los elementos de una lista de
+        tipo conocido (nativo en las especializadas, i8* en las demás), o
+        None si el tipo del elemento se desconoce.
+        """
+        if not isinstance(tipo, TipoLista) or tipo.tipo_elemento is None:
+            return None
+        if tipo.tipo_elemento.tipo_base == TipoDato.DESCONOCIDO:
+            return None
+        sufijo = self._sufijo_lista(tipo)
+        return LISTAS_ESPECIALIZADAS[sufijo] if sufijo else ir.IntType(8).as_pointer()
+
+    def _tipo_llvm_expresion(self, expr):
+        """Tipo LLVM de un valor extraído de una lista o mapa genéricos"""
+        tipo_expr = getattr(expr, 'tipo', None)
+        if tipo_expr:
+            if tipo_expr.tipo_base == TipoDato.TEXTO:
+                return ir.IntType(8).as_pointer()
+            elif tipo_expr.tipo_base == TipoDato.FLOTANTE:
+                return ir.DoubleType()
+        return ir.IntType(64)
+
+    def _campo_lista(self, objeto, campo: int):
+        """Puntero a un campo de la JadeList apuntada por objeto"""
+        lista = self.builder.bitcast(objeto, self.tipo_lista_runtime.as_pointer())
+        return self.builder.gep(lista, [ir.Constant(ir.IntType(32), 0), ir.Constant(ir.IntType(32), campo)],
+                                inbounds=True)
+
+    def _elemento_lista_en_linea(self, objeto, indice, tipo_elemento):
+        """
+        Comprueba en línea que 0 <= indice < size y retorna el puntero al
+        elemento dentro del arreglo de datos. Fuera de rango llama a
+        jade_lista_error_indice, que informa del error y termina.
+        """
+        indice = self._indice_i64(indice)
+        tamano = self.builder.load(self._campo_lista(objeto, 1), name="lista.tam")
+        # Comparación sin signo: los índices negativos también quedan fuera
+        en_rango = self.builder.icmp_unsigned('<', indice, tamano)
+        bloque_ok = self.funcion_actual.append_basic_block("lista.en_rango")
+        bloque_error = self.funcion_actual.append_basic_block("lista.fuera_de_rango")
+        rama = self.builder.cbranch(en_rango, bloque_ok, bloque_error)
+        rama.set_weights([2000, 1])
+        
+        self.builder.position_at_end(bloque_error)
+        self.builder.call(self.runtime_lista_error_indice, [objeto, indice])
+        self.builder.unreachable()
+        
+        self.builder.position_at_end(bloque_ok)
+        datos = self.builder.load(self._campo_lista(objeto, 0), name="lista.datos")
+        datos = self.builder.bitcast(datos, tipo_elemento.as_pointer())
+        return self.builder.gep(datos, [indice], inbounds=True)
+
+    def _indice_i64(self, indice):
+        """Extiende un índice a i64"""
+        if indice.type != ir.IntType(64):
+            return self.builder.zext(indice, ir.IntType(64))
+        return indice
+
+    def _a_elemento(self, val, sufijo: str):
+        """Convierte un valor al tipo nativo del elemento de la lista"""
+        destino = LISTAS_ESPECIALIZADAS[sufijo]
+        if val.type == destino:
+            return val
+        if isinstance(destino, ir.DoubleType):
+            return self.builder.sitofp(val, destino)
+        if sufijo == 'booleano' and val.type != ir.IntType(1):
+            val = self.builder.icmp_signed('!=', val, ir.Constant(val.type, 0))
+        if val.type.width < destino.width:
+            return self.builder.zext(val, destino)
+        return self.builder.trunc(val, destino)
+
+    def _desde_elemento(self, val, sufijo: str):
+        """Convierte un elemento nativo de la lista al tipo LLVM del valor en Jade"""
+        if sufijo == 'booleano':
+            return self.builder.trunc(val, ir.IntType(1))
+        return val
+
     def _cast_to_void_ptr(self, val):
         """Convierte un valor a void* (i8*)"""
         if isinstance(val.type, ir.PointerType) and val.type.pointee == ir.IntType(8):
@@ -5,13 +5,19 @@ Coordina todas las fases de compilación
 
 import sys
 import os
+import contextlib
 from pathlib import Path
 
-from lexer import Lexer
+from lexer import crear_lexer, MOTORES_LEXER
+from parse_cache import cache_ast
+from module_loader import registro_modulos
+from version import VERSION_JADE
 from parser import Parser
 from semantic_analyzer import AnalizadorSemantico
+from resolver import Resolutor
 try:
     from codegen_llvm import GeneradorLLVM, inicializar_llvm
+    from optimizer import optimizar_ir
     LLVM_DISPONIBLE = True
 except ImportError:
     LLVM_DISPONIBLE = False
@@ -21,11 +27,23 @@ except ImportError:
 class Compilador:
     """Compilador principal de Jade"""
     
-    def __init__(self, archivo_entrada: str):
+    def __init__(self, archivo_entrada: str, procesos: int = 1, incremental: bool = False,
+                 jit: bool = False, nivel_optimizacion: int = 0, emitir: str = 'exe',
+                 salida: str = None, salida_sin_buffer: bool = False):
         self.archivo_entrada = archivo_entrada
+        self.procesos = procesos  # > 1: módulos importados en paralelo
+        self.incremental = incremental  # Recompilar solo los módulos afectados
+        self.jit = jit  # El IR queda en memoria para ejecutar_jit, sin escribir el .ll
+        self.nivel_optimizacion = nivel_optimizacion  # -O0 a -O3
+        self.emitir = emitir  # Último producto: 'll', 'obj' o 'exe'
+        self.salida = salida  # Ruta del último producto (por defecto junto al fuente)
+        self.salida_sin_buffer = salida_sin_buffer  # mostrar() escribe cada línea en el momento
+        self.runtime_pendiente = None  # Future del runtime compilándose en segundo plano
         self.codigo_fuente = ""
         self.tokens = []
         self.ast = None
+        self.modulo = None  # Entrada del programa en el registro de módulos
+        self.llvm_ir = None  # IR del programa completo (fase_codegen)
         self.errores = []
     
     def leer_archivo(self):
@@ -50,7 +68,7 @@ class Compilador:
         """Fase de análisis léxico"""
         print("=== Fase 1: Analisis Lexico ===")
         try:
-            lexer = Lexer(self.codigo_fuente)
+            lexer = crear_lexer(self.codigo_fuente)
             self.tokens = lexer.tokenizar()
             print(f"[OK] Generados {len(self.tokens)} tokens")
             return True
@@ -64,20 +82,48 @@ class Compilador:
         try:
             parser = Parser(self.tokens)
             self.ast = parser.parsear()
+            self.modulo = registro_modulos.registrar(self.archivo_entrada, self.ast)
             print(f"[OK] AST generado con {len(self.ast.declaraciones)} declaraciones")
             return True
         except SyntaxError as e:
             self.error(f"Error de sintaxis: {e}")
             return False
     
+    def fase_flujo(self):
+        """
+        Fases léxica y sintáctica en flujo: el parser consume los tokens a
+        medida que el lexer lee el archivo, sin cargar antes todo el código.
+        Si el archivo no cambió, el AST se recupera de la caché en disco.
+        """
+        print("=== Fase 1-2: Analisis Lexico y Sintactico (en flujo) ===")
+        try:
+            aciertos = cache_ast.aciertos
+            if self.procesos > 1:
+                registro_modulos.precargar(self.archivo_entrada, self.procesos)
+            self.modulo = registro_modulos.cargar(self.archivo_entrada)
+            self.ast = self.modulo.programa
+            if cache_ast.aciertos > aciertos:
+                print("[OK] AST recuperado de la cache")
+            print(f"[OK] AST generado con {len(self.ast.declaraciones)} declaraciones")
+            return True
+        except FileNotFoundError:
+            self.error(f"Archivo no encontrado: {self.archivo_entrada}")
+            return False
+        except SyntaxError as e:
+            fase = "léxico" if str(e).startswith("Error léxico") else "de sintaxis"
+            self.error(f"Error {fase}: {e}")
+            return False
+        except Exception as e:
+            self.error(f"Error al leer archivo: {e}")
+            return False
+    
     def fase_semantica(self):
         """Fase de análisis semántico"""
         print("=== Fase 3: Analisis Semantico ===")
         try:
-            analizador = AnalizadorSemantico(self.archivo)
-            analizador.analizar(self.ast)
+            registro_modulos.analizar(self.modulo, requiere_main=True)
             print("[OK] Analisis semantico completado")
-            print(f"  - {len(analizador.funciones)} funciones verificadas")
+            print(f"  - {len(self.modulo.funciones)} funciones verificadas")
             return True
         except Exception as e:
             self.error(f"Error semántico: {e}")
@@ -97,26 +143,37 @@ class Compilador:
             inicializar_llvm()
             
             # Asegurar que el análisis semántico se ejecutó (para anotar tipos)
-            # Si ya se ejecutó en fase_semantica, self.ast ya tiene tipos?
-            # No necesariamente, porque fase_semantica podría no haberse llamado si solo pedimos codegen.
-            # Pero compilar() llama a todas en orden.
-            # Sin embargo, para estar seguros y si se usa fase_codegen aisladamente:
-            # Re-ejecutar análisis semántico sobre el AST actual para garantizar anotaciones
-            analizador = AnalizadorSemantico()
-            analizador.analizar(self.ast)
+            # si fase_codegen se usa aisladamente; el registro no lo repite
+            if self.modulo is None:
+                self.modulo = registro_modulos.registrar(self.archivo_entrada, self.ast)
+            registro_modulos.analizar(self.modulo, requiere_main=True)
             
-            # Generar LLVM IR
-            generador = GeneradorLLVM()
-            llvm_ir = generador.generar(self.ast)
+            # Resolver variables a slots (el generador indexa sus allocas por slot)
+            Resolutor().resolver_programa(self.ast)
             
-            # Guardar IR a archivo
-            nombre_base = os.path.splitext(self.archivo_entrada)[0]
-            archivo_ll = nombre_base + ".ll"
+            # Generar LLVM IR, incluidas las funciones de los módulos importados
+            importados = [modulo.programa for modulo in registro_modulos.importados(self.modulo)]
+            generador = GeneradorLLVM(salida_sin_buffer=self.salida_sin_buffer)
+            llvm_ir = generador.generar(self.ast, importados)
             
-            with open(archivo_ll, 'w') as f:
-                f.write(llvm_ir)
+            if self.nivel_optimizacion > 0:
+                llvm_ir, antes, despues = optimizar_ir(llvm_ir, self.nivel_optimizacion)
+                print(f"[OK] Optimizado con -O{self.nivel_optimizacion}")
+                print(f"  - Antes:   {antes}")
+                print(f"  - Despues: {despues}")
+            self.llvm_ir = llvm_ir
             
-            print(f"[OK] LLVM IR generado: {archivo_ll}")
+            if self.jit:
+                print("[OK] LLVM IR generado en memoria")
+            else:
+                # Guardar IR a archivo
+                nombre_base = os.path.splitext(self.archivo_entrada)[0]
+                archivo_ll = self.ruta_salida(".ll") if self.emitir == 'll' else nombre_base + ".ll"
+                
+                with open(archivo_ll, 'w') as f:
+                    f.write(llvm_ir)
+                
+                print(f"[OK] LLVM IR generado: {archivo_ll}")
             
             if mostrar_ir:
                 print("\n=== LLVM IR Generado ===")
@@ -132,6 +189,99 @@ class Compilador:
             traceback.print_exc()
             return False
     
+    def fase_incremental(self):
+        """
+        Compilación separada e incremental: cada módulo tiene su propio
+        módulo LLVM y archivo objeto, y solo se analizan y generan los que
+        cambiaron o cuyas dependencias cambiaron de firma. Los objetos se
+        enlazan con el runtime en un ejecutable.
+        """
+        print("=== Fase 3-4: Analisis y Generacion de Codigo (por modulo) ===")
+        
+        if not LLVM_DISPONIBLE:
+            print("[!] llvmlite no instalado - Generacion de codigo deshabilitada")
+            print("    Instalar con: pip install llvmlite")
+            return self.fase_semantica()
+        
+        from incremental import ConstruccionIncremental
+        
+        try:
+            inicializar_llvm()
+            construccion = ConstruccionIncremental(self.archivo_entrada, procesos=self.procesos,
+                                                   nivel_optimizacion=self.nivel_optimizacion,
+                                                   salida_sin_buffer=self.salida_sin_buffer)
+            objetos = construccion.construir()
+        except Exception as e:
+            self.error(f"Error en compilacion incremental: {e}")
+            return False
+        
+        print(f"[OK] {construccion.resumen()}")
+        for ruta in construccion.regenerados:
+            print(f"  - {os.path.relpath(ruta)}")
+        
+        if self.emitir != 'exe':
+            print(f"[OK] Objetos en {os.path.relpath(construccion.directorio)}")
+            return True
+        return self.enlazar_ejecutable(objetos)
+    
+    def directorio_construccion(self) -> str:
+        """Directorio __jadebuild__ junto al programa (objetos y runtime compilado)"""
+        from incremental import DIRECTORIO_CONSTRUCCION
+        return os.path.join(os.path.dirname(os.path.abspath(self.archivo_entrada)),
+                            DIRECTORIO_CONSTRUCCION)
+    
+    def ruta_salida(self, extension: str) -> str:
+        """Ruta del producto final: -o o el nombre del fuente con la extensión dada"""
+        return self.salida or os.path.splitext(self.archivo_entrada)[0] + extension
+    
+    def iniciar_runtime(self):
+        """Compila (o recupera de la caché) el runtime en paralelo con las demás fases"""
+        from linker import compilar_runtime_en_segundo_plano
+        if self.runtime_pendiente is None:
+            self.runtime_pendiente = compilar_runtime_en_segundo_plano(self.directorio_construccion())
+    
+    def fase_objeto(self):
+        """Emite el archivo objeto del programa con la máquina destino de llvmlite"""
+        from linker import crear_maquina_destino, emitir_objeto
+        
+        archivo_o = self.ruta_salida(".o") if self.emitir == 'obj' else \
+            os.path.splitext(self.archivo_entrada)[0] + ".o"
+        try:
+            # El IR ya pasó por optimizar_ir; la máquina usa el mismo nivel
+            emitir_objeto(self.llvm_ir, archivo_o, crear_maquina_destino(self.nivel_optimizacion))
+        except Exception as e:
+            self.error(f"Error al emitir el objeto: {e}")
+            return None
+        print(f"[OK] Objeto generado: {archivo_o}")
+        return archivo_o
+    
+    def enlazar_ejecutable(self, objetos) -> bool:
+        """Enlaza los objetos con el runtime compilado en segundo plano"""
+        from linker import enlazar, ErrorEnlace
+        
+        print("\n=== Fase 5: Enlace ===")
+        ejecutable = self.ruta_salida(".exe" if os.name == 'nt' else "")
+        try:
+            self.iniciar_runtime()
+            enlazar(objetos + [self.runtime_pendiente.result()], ejecutable)
+        except ErrorEnlace as e:
+            self.error(f"Error de enlace: {e}")
+            return False
+        print(f"[OK] Ejecutable generado: {ejecutable}")
+        return True
+    
+    def ejecutar_jit(self) -> int:
+        """
+        Ejecuta el programa ya compilado (fase_codegen) en el proceso con
+        MCJIT; el runtime se carga como biblioteca compartida. Retorna el
+        código de salida del programa.
+        """
+        from jit import ejecutar_jit
+        
+        # fase_codegen ya optimizó el IR con el nivel elegido
+        return ejecutar_jit(self.llvm_ir, self.directorio_construccion(),
+                            self.nivel_optimizacion, optimizar=False)
+    
     def mostrar_ast(self):
         """Muestra el AST"""
         print("\n=== Árbol de Sintaxis Abstracta ===")
@@ -232,34 +382,52 @@ class Compilador:
         """Ejecuta todas las fases de compilación"""
         print(f"\n>>> Compilando {self.archivo_entrada}...\n")
         
-        # Leer archivo
-        if not self.leer_archivo():
-            return False
-        
-        # Fase léxica
-        if not self.fase_lexica():
-            return False
+        # El runtime de C se compila mientras corren las fases del front-end
+        if LLVM_DISPONIBLE and self.emitir == 'exe' and not self.jit:
+            self.iniciar_runtime()
         
         if mostrar_tokens:
+            # Mostrar los tokens requiere la lista completa
+            if not self.leer_archivo():
+                return False
+            
+            # Fase léxica
+            if not self.fase_lexica():
+                return False
+            
             print("\n=== Tokens Generados ===")
             for token in self.tokens[:20]:  # Mostrar solo los primeros 20
                 print(f"  {token}")
             if len(self.tokens) > 20:
                 print(f"  ... y {len(self.tokens) - 20} más")
-        
-        # Fase sintáctica
-        if not self.fase_sintactica():
+            
+            # Fase sintáctica
+            if not self.fase_sintactica():
+                return False
+        elif not self.fase_flujo():
             return False
         
         if mostrar_ast:
             self.mostrar_ast()
         
+        if self.incremental:
+            return self.fase_incremental()
+        
         # Fase semántica
         if not self.fase_semantica():
             return False
         
         # Fase de generación de código LLVM
-        return self.fase_codegen(mostrar_ir)
+        if not self.fase_codegen(mostrar_ir):
+            return False
+        if not LLVM_DISPONIBLE or self.jit or self.emitir == 'll':
+            return True
+        
+        # Objeto y ejecutable
+        archivo_o = self.fase_objeto()
+        if archivo_o is None:
+            return False
+        return self.emitir == 'obj' or self.enlazar_ejecutable([archivo_o])
 
 
 def main():
@@ -280,11 +448,37 @@ def main():
                        help='Mostrar LLVM IR generado')
     parser.add_argument('--repl', action='store_true',
                        help='Iniciar REPL interactivo')
+    parser.add_argument('--lexer', choices=MOTORES_LEXER,
+                       help='Motor del lexer: clasico o rapido (por defecto JADE_LEXER o clasico)')
+    parser.add_argument('--procesos', type=int, default=1,
+                       help='Procesos para parsear y analizar los módulos importados en paralelo')
+    parser.add_argument('-O', dest='optimizacion', type=int, choices=(0, 1, 2, 3),
+                       help='Nivel de optimización de LLVM: -O0 a -O3 (por defecto -O0, o -O2 con --jit)')
+    parser.add_argument('--emitir', choices=('ll', 'obj', 'exe'), default='exe',
+                       help='Producto final: LLVM IR, archivo objeto o ejecutable (por defecto)')
+    parser.add_argument('-o', '--salida',
+                       help='Ruta del producto final (por defecto junto al archivo fuente)')
+    parser.add_argument('--jit', action='store_true',
+                       help='Compilar en memoria con MCJIT y ejecutar el programa')
+    parser.add_argument('--salida-sin-buffer', action='store_true',
+                       help='Escribir cada línea de mostrar() en el momento (programas interactivos)')
+    parser.add_argument('--incremental', action='store_true',
+                       help='Compilar cada módulo a su propio objeto y recompilar solo los que cambiaron (__jadebuild__)')
+    parser.add_argument('--sin-cache', action='store_true',
+                       help='No usar la caché de AST en disco (__jadecache__)')
+    parser.add_argument('--estadisticas-cache', action='store_true',
+                       help='Mostrar aciertos y fallos de la caché de AST al terminar')
     parser.add_argument('--version', action='version',
-                       version='Jade 0.1.0')
+                       version=f'Jade {VERSION_JADE}')
     
     args = parser.parse_args()
     
+    # El motor se propaga por entorno para alcanzar también a los módulos importados
+    if args.lexer:
+        os.environ['JADE_LEXER'] = args.lexer
+    if args.sin_cache:
+        cache_ast.habilitada = False
+    
     # Modo REPL
     if args.repl:
         from repl import JadeREPL
@@ -301,15 +495,34 @@ def main():
         print("Advertencia: El archivo no tiene extensión .jde", file=sys.stderr)
     
     # Compilar
-    compilador = Compilador(args.archivo)
-    exito = compilador.compilar(
-        mostrar_tokens=args.tokens,
-        mostrar_ast=args.ast,
-        mostrar_ir=args.ir
-    )
+    nivel = args.optimizacion if args.optimizacion is not None else (2 if args.jit else 0)
+    compilador = Compilador(args.archivo, args.procesos, args.incremental and not args.jit, args.jit, nivel,
+                            args.emitir, args.salida, args.salida_sin_buffer)
+    codigo_salida = None
+    if args.jit:
+        # Los mensajes del compilador van a stderr: stdout es del programa
+        with contextlib.redirect_stdout(sys.stderr):
+            exito = compilador.compilar(mostrar_ast=args.ast, mostrar_ir=args.ir)
+        if exito and compilador.llvm_ir is not None:
+            try:
+                codigo_salida = compilador.ejecutar_jit()
+            except Exception as e:
+                compilador.error(f"Error en ejecucion JIT: {e}")
+                exito = False
+    else:
+        exito = compilador.compilar(
+            mostrar_tokens=args.tokens,
+            mostrar_ast=args.ast,
+            mostrar_ir=args.ir
+        )
     
+    if args.estadisticas_cache:
+        print(cache_ast.resumen(), file=sys.stderr if args.jit else sys.stdout)
+        print(registro_modulos.resumen(), file=sys.stderr if args.jit else sys.stdout)
+    
+    if codigo_salida is not None:
+        sys.exit(codigo_salida)
     sys.exit(0 if exito else 1)
 
-
 if __name__ == "__main__":
     main()
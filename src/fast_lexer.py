@@ -0,0 +1,199 @@
+"""
+Lexer rápido para Jade
+Tokeniza con una única expresión regular maestra compilada en lugar de
+avanzar carácter a carácter. Produce exactamente los mismos tokens (tipo,
+valor, línea y columna) que el Lexer clásico; ante cualquier entrada que no
+reconoce (errores léxicos, dígitos Unicode no decimales) delega en el Lexer
+clásico para que los mensajes de error sean idénticos.
+"""
+
+import re
+from bisect import bisect_right
+from typing import Iterator, List
+from token_types import Token, TokenType, PALABRAS_RESERVADAS
+from token_stream import FlujoTokens, CODIGO_TIPO, TIPOS
+from lexer import Lexer, SIMBOLOS_SIMPLES, fragmentos_de
+
+
+# Operadores de dos caracteres (se prueban antes que los de uno)
+SIMBOLOS_DOBLES = {
+    '==': TokenType.IGUAL,
+    '!=': TokenType.DIFERENTE,
+    '<=': TokenType.MENOR_IGUAL,
+    '>=': TokenType.MAYOR_IGUAL,
+    '+=': TokenType.MAS_IGUAL,
+    '-=': TokenType.MENOS_IGUAL,
+    '*=': TokenType.MULTIPLICAR_IGUAL,
+    '/=': TokenType.DIVIDIR_IGUAL,
+}
+
+SIMBOLOS = {**SIMBOLOS_SIMPLES, **SIMBOLOS_DOBLES}
+
+# El orden de las alternativas reproduce el orden de decisión del Lexer
+# clásico: comentarios antes que '/' y '/=', triple comilla antes que comilla.
+# Los espacios y saltos de línea previos se absorben en el mismo match
+_PATRON = re.compile(r'''
+    [ \t\r\n]*
+    (?:
+        (?P<identificador>[^\W\d]\w*)
+      | (?P<comentario>//[^\n]*)
+      | (?P<bloque>/\*(?:.*?\*/)?)
+      | (?P<simbolo>[=!<>+\-*/]=|[-+*/%^=<>(){}\[\],.:;])
+      | (?P<numero>\d[\d.]*)
+      | (?P<multilinea>"""(?:.*?""")?)
+      | (?P<texto>"(?:[^"\\]|\\.)*(?P<cierre>")?)
+      | (?P<caracter>'(?:\\.|[^'\\])'?)
+      | (?P<fin>\Z)
+      | (?P<otro>.)
+    )
+''', re.VERBOSE | re.DOTALL)
+
+_SALTO = re.compile(r'\n')
+
+_ESCAPE = re.compile(r'\\(.)', re.DOTALL)
+_ESCAPES_TEXTO = {'n': '\n', 't': '\t', 'r': '\r'}
+_ESCAPES_CARACTER = {'n': '\n', 't': '\t'}
+
+
+class _Irregular(Exception):
+    """Entrada que el lexer rápido no reproduce: se delega en el clásico"""
+
+
+def _reemplazar_escape(coincidencia) -> str:
+    caracter = coincidencia.group(1)
+    return _ESCAPES_TEXTO.get(caracter, caracter)
+
+
+class LexerRapido:
+    """
+    Lexer basado en una expresión regular maestra, equivalente al Lexer clásico
+    Acepta las mismas fuentes que el clásico, pero un archivo o iterable de
+    fragmentos se lee completo antes de tokenizar (no es incremental).
+    """
+
+    def __init__(self, codigo):
+        self.codigo = codigo if isinstance(codigo, str) else ''.join(fragmentos_de(codigo))
+
+    def _escanear(self, flujo: FlujoTokens):
+        """
+        Agrega al flujo todos los tokens del código (sin NUEVA_LINEA), incluido
+        el EOF. Lanza _Irregular ante cualquier entrada no reconocida.
+        """
+        codigo = self.codigo
+        # Offsets de los saltos de línea: la línea de un token es la cantidad
+        # de saltos anteriores más uno (búsqueda binaria)
+        saltos = [m.start() for m in _SALTO.finditer(codigo)]
+        saltos_previos = bisect_right
+        extra = 0  # Líneas que el clásico cuenta de más en textos multilínea
+        posicion = 0
+        tipos = flujo.tipos.append
+        inicios = flujo.inicios.append
+        longitudes = flujo.longitudes.append
+        lineas = flujo.lineas.append
+        columnas = flujo.columnas.append
+        codigos = CODIGO_TIPO
+        reservadas = PALABRAS_RESERVADAS
+        simbolos = SIMBOLOS
+        identificador = TokenType.IDENTIFICADOR
+
+        # Con la alternativa 'otro' los matches cubren el código sin huecos
+        for m in _PATRON.finditer(codigo):
+            clase = m.lastgroup
+            inicio, posicion = m.span(clase)
+
+            if clase == 'identificador':
+                if not (codigo[inicio].isalpha() or codigo[inicio] == '_'):
+                    raise _Irregular()
+                tipo = reservadas.get(codigo[inicio:posicion], identificador)
+            elif clase == 'simbolo':
+                tipo = simbolos[codigo[inicio:posicion]]
+            elif clase == 'comentario':
+                continue
+            elif clase == 'numero':
+                lexema = codigo[inicio:posicion]
+                if lexema.endswith('.') or lexema.count('.') > 1:
+                    raise _Irregular()
+                # Un dígito no decimal (p. ej. '²') continúa el número en el clásico
+                if posicion < len(codigo) and codigo[posicion].isdigit():
+                    raise _Irregular()
+                tipo = TokenType.LITERAL_FLOTANTE if '.' in lexema else TokenType.LITERAL_ENTERO
+            elif clase == 'texto':
+                if m.start('cierre') < 0:
+                    raise _Irregular()
+                tipo = TokenType.LITERAL_TEXTO
+            elif clase == 'caracter':
+                # '\\' sin cerrar también termina en comilla: se valida la longitud
+                largo = 4 if codigo[inicio + 1] == '\\' else 3
+                if posicion - inicio != largo or codigo[posicion - 1] != "'":
+                    raise _Irregular()
+                tipo = TokenType.LITERAL_CARACTER
+            elif clase == 'multilinea':
+                if posicion - inicio < 6 or not codigo.endswith('"""', inicio, posicion):
+                    raise _Irregular()
+                tipo = TokenType.LITERAL_TEXTO
+            elif clase == 'bloque':
+                if posicion - inicio < 4 or not codigo.endswith('*/', inicio, posicion):
+                    raise _Irregular()
+                continue
+            elif clase == 'fin':
+                break
+            else:
+                raise _Irregular()
+
+            anteriores = saltos_previos(saltos, inicio)
+            tipos(codigos[tipo])
+            inicios(inicio)
+            longitudes(posicion - inicio)
+            lineas(anteriores + 1 + extra)
+            columnas(inicio - saltos[anteriores - 1] if anteriores else inicio + 1)
+
+            if clase == 'multilinea':
+                # El clásico cuenta dos veces cada salto de línea del contenido
+                extra += codigo.count('\n', inicio, posicion)
+
+        if posicion != len(codigo):
+            raise _Irregular()
+        anteriores = len(saltos)
+        flujo.agregar(TokenType.EOF, posicion, 0, anteriores + 1 + extra,
+                      posicion - saltos[-1] if anteriores else posicion + 1)
+
+    def tokenizar(self) -> List[Token]:
+        """Tokeniza todo el código y retorna una lista de tokens"""
+        flujo = FlujoTokens(self.codigo)
+        try:
+            self._escanear(flujo)
+        except _Irregular:
+            return Lexer(self.codigo).tokenizar()
+        codigo = self.codigo
+        return [Token(TIPOS[tipo], _valor(TIPOS[tipo], codigo[inicio:inicio + longitud]), linea, columna)
+                for tipo, inicio, longitud, linea, columna
+                in zip(flujo.tipos, flujo.inicios, flujo.longitudes, flujo.lineas, flujo.columnas)]
+
+    def iterar_tokens(self) -> Iterator[Token]:
+        """Genera los tokens del código, terminando en EOF"""
+        return iter(self.tokenizar())
+
+    def tokenizar_flujo(self) -> FlujoTokens:
+        """Tokeniza todo el código a un FlujoTokens, sin crear objetos Token"""
+        flujo = FlujoTokens(self.codigo)
+        try:
+            self._escanear(flujo)
+        except _Irregular:
+            return Lexer(self.codigo).tokenizar_flujo()
+        return flujo
+
+
+def _valor(tipo: TokenType, lexema: str) -> str:
+    """Valor del token a partir de su lexema, igual al del Lexer clásico"""
+    if tipo == TokenType.LITERAL_TEXTO:
+        if lexema.startswith('"""'):
+            return lexema[3:-3]
+        contenido = lexema[1:-1]
+        if '\\' in contenido:
+            contenido = _ESCAPE.sub(_reemplazar_escape, contenido)
+        return contenido
+    if tipo == TokenType.LITERAL_CARACTER:
+        if lexema[1] == '\\':
+            return _ESCAPES_CARACTER.get(lexema[2], lexema[2])
+        return lexema[1]
+    return lexema
@@ -0,0 +1,197 @@
+"""
+Recompilación incremental de programas Jade
+Cada módulo se compila a su propio módulo LLVM (.ll) y archivo objeto (.o)
+en un directorio __jadebuild__ junto al programa principal. Un archivo de estado guarda, por
+módulo, el hash de su código, las firmas de funciones que exporta y sus
+importaciones; en la siguiente construcción solo se vuelven a analizar y
+generar los módulos cuyo código cambió o que importan un módulo cuyas firmas
+cambiaron, y solo se emiten de nuevo sus objetos. Los objetos de todos los
+módulos se enlazan con el runtime.
+"""
+
+import hashlib
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+from codegen_llvm import GeneradorLLVM
+from linker import crear_maquina_destino, emitir_objeto
+from module_loader import registro_modulos, Modulo
+from parse_cache import huella_archivo, _calcular_version_compilador, _MODULOS_FRONTEND
+from resolver import Resolutor
+
+
+DIRECTORIO_CONSTRUCCION = '__jadebuild__'
+ARCHIVO_ESTADO = 'estado.pickle'
+
+# Módulos del compilador que determinan el IR generado
+_MODULOS_BACKEND = _MODULOS_FRONTEND + ('semantic_analyzer.py', 'type_system.py', 'resolver.py',
+                                        'codegen_llvm.py', 'linker.py', 'optimizer.py')
+
+
+class EstadoModulo:
+    """Resultado guardado de la última compilación de un módulo"""
+
+    def __init__(self, huella: str, funciones: Dict[str, tuple], firma: str,
+                 importaciones: List[str], archivo_ll: str):
+        self.huella = huella                # Hash del código fuente
+        self.funciones = funciones          # Firmas del analizador (incluye las importadas)
+        self.firma = firma                  # Hash de lo que ven los módulos que lo importan
+        self.importaciones = importaciones  # Rutas absolutas importadas directamente
+        self.archivo_ll = archivo_ll
+
+    @property
+    def archivo_o(self) -> str:
+        return os.path.splitext(self.archivo_ll)[0] + ".o"
+
+
+class ConstruccionIncremental:
+    """Construcción incremental de un programa y sus módulos importados"""
+
+    def __init__(self, archivo_entrada: str, directorio: Optional[str] = None, procesos: int = 1,
+                 nivel_optimizacion: int = 0, salida_sin_buffer: bool = False):
+        self.principal = os.path.abspath(archivo_entrada)
+        self.procesos = procesos  # > 1: objetos emitidos en paralelo
+        self.nivel_optimizacion = nivel_optimizacion
+        self.salida_sin_buffer = salida_sin_buffer  # Solo afecta al punto de entrada
+        self.directorio = directorio or os.path.join(os.path.dirname(self.principal),
+                                                     DIRECTORIO_CONSTRUCCION)
+        # Cambiar el nivel de optimización o la salida invalida la construcción guardada
+        self.version = f"{_calcular_version_compilador(_MODULOS_BACKEND)}-O{nivel_optimizacion}"
+        if salida_sin_buffer:
+            self.version += "-sin-buffer"
+        self.estado: Dict[str, EstadoModulo] = self._leer_estado()
+        self.regenerados: List[str] = []
+        self.reutilizados: List[str] = []
+
+    # ========================================================================
+    # ESTADO EN DISCO
+    # ========================================================================
+
+    def _ruta_estado(self) -> str:
+        return os.path.join(self.directorio, ARCHIVO_ESTADO)
+
+    def _leer_estado(self) -> Dict[str, EstadoModulo]:
+        """Estado de la construcción anterior; vacío si no existe o es de otra versión"""
+        try:
+            with open(self._ruta_estado(), 'rb') as f:
+                version, estado = pickle.load(f)
+        except Exception:
+            return {}
+        return estado if version == self.version else {}
+
+    def _guardar_estado(self):
+        destino = self._ruta_estado()
+        temporal = f"{destino}.{os.getpid()}.tmp"
+        with open(temporal, 'wb') as f:
+            pickle.dump((self.version, self.estado), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporal, destino)
+
+    @staticmethod
+    def nombre_modulo(ruta: str) -> str:
+        """Nombre del módulo LLVM de un archivo (el hash de la ruta distingue homónimos)"""
+        nombre = os.path.splitext(os.path.basename(ruta))[0]
+        return f"{nombre}-{hashlib.sha256(ruta.encode('utf-8')).hexdigest()[:8]}"
+
+    def ruta_ll(self, ruta: str) -> str:
+        """Archivo .ll de un módulo"""
+        return os.path.join(self.directorio, self.nombre_modulo(ruta) + ".ll")
+
+    # ========================================================================
+    # CONSTRUCCIÓN
+    # ========================================================================
+
+    def construir(self) -> List[str]:
+        """
+        Compila los módulos que lo requieren y retorna los objetos de todos
+        los módulos del programa, dependencias primero. Lanza la excepción del
+        primer módulo con errores; el estado de los módulos ya compilados se
+        guarda igualmente.
+        """
+        os.makedirs(self.directorio, exist_ok=True)
+        modulo = registro_modulos.cargar(self.principal)
+        orden = registro_modulos.importados(modulo) + [modulo]  # Dependencias primero
+
+        firma_cambiada: Dict[str, bool] = {}
+        try:
+            for actual in orden:
+                anterior = self.estado.get(actual.ruta)
+                importaciones = actual.rutas_importadas()
+                if self._vigente(actual, anterior, importaciones, firma_cambiada):
+                    # Sus firmas quedan disponibles sin analizarlo de nuevo
+                    if not actual.analizado:
+                        actual.funciones = anterior.funciones
+                    firma_cambiada[actual.ruta] = False
+                    self.reutilizados.append(actual.ruta)
+                else:
+                    nuevo = self._compilar_modulo(actual, importaciones)
+                    firma_cambiada[actual.ruta] = anterior is None or anterior.firma != nuevo.firma
+                    self.estado[actual.ruta] = nuevo
+                    self.regenerados.append(actual.ruta)
+            # El análisis sigue el orden de dependencias; los objetos no
+            self._emitir_objetos([self.estado[ruta] for ruta in self.regenerados])
+        finally:
+            self._guardar_estado()
+
+        return [self.estado[actual.ruta].archivo_o for actual in orden]
+
+    def _vigente(self, modulo: Modulo, anterior: Optional[EstadoModulo],
+                 importaciones: List[str], firma_cambiada: Dict[str, bool]) -> bool:
+        """El .ll guardado sirve si ni el módulo ni las firmas que importa cambiaron"""
+        return (anterior is not None
+                and anterior.huella == huella_archivo(modulo.ruta)
+                and anterior.importaciones == importaciones
+                and not any(firma_cambiada.get(ruta, True) for ruta in importaciones)
+                and os.path.exists(anterior.archivo_ll)
+                and os.path.exists(anterior.archivo_o))
+
+    def _compilar_modulo(self, modulo: Modulo, importaciones: List[str]) -> EstadoModulo:
+        """Analiza el módulo y escribe su .ll; sus dependencias ya están analizadas"""
+        es_principal = modulo.ruta == self.principal
+        registro_modulos.analizar(modulo, requiere_main=es_principal)
+        Resolutor().resolver_programa(modulo.programa)
+
+        importados = [m.programa for m in registro_modulos.importados(modulo)]
+        generador = GeneradorLLVM(self.nombre_modulo(modulo.ruta), salida_sin_buffer=self.salida_sin_buffer)
+        llvm_ir = generador.generar_modulo(modulo.programa, importados, principal=es_principal)
+
+        archivo_ll = self.ruta_ll(modulo.ruta)
+        nuevo = EstadoModulo(huella_archivo(modulo.ruta), modulo.funciones,
+                             self._firma(modulo, generador), importaciones, archivo_ll)
+        # El objeto anterior ya no corresponde a este .ll
+        if os.path.exists(nuevo.archivo_o):
+            os.remove(nuevo.archivo_o)
+        with open(archivo_ll, 'w') as f:
+            f.write(llvm_ir)
+        return nuevo
+
+    def _emitir_objetos(self, modulos: List[EstadoModulo]):
+        """Emite el objeto de cada .ll regenerado, en paralelo con procesos > 1"""
+        tareas = [(m.archivo_ll, m.archivo_o, self.nivel_optimizacion) for m in modulos]
+        if self.procesos > 1 and len(tareas) > 1:
+            with ProcessPoolExecutor(max_workers=self.procesos) as ejecutor:
+                list(ejecutor.map(_emitir_en_proceso, tareas))
+        elif tareas:
+            maquina = crear_maquina_destino(self.nivel_optimizacion)
+            for tarea in tareas:
+                _emitir_en_proceso(tarea, maquina)
+
+    @staticmethod
+    def _firma(modulo: Modulo, generador: GeneradorLLVM) -> str:
+        """Hash de las firmas del analizador y de los tipos LLVM de las funciones"""
+        resumen = hashlib.sha256(repr(sorted(modulo.funciones.items())).encode('utf-8'))
+        for nombre, fn in sorted(generador.funciones.items()):
+            resumen.update(f"{nombre}:{fn.function_type}".encode('utf-8'))
+        return resumen.hexdigest()
+
+    def resumen(self) -> str:
+        return (f"Construcción incremental: {len(self.regenerados)} módulos regenerados, "
+                f"{len(self.reutilizados)} reutilizados")
+
+
+def _emitir_en_proceso(tarea: tuple, maquina=None):
+    """Emite el objeto de un .ll (tarea de los procesos de construcción)"""
+    archivo_ll, archivo_o, nivel_optimizacion = tarea
+    with open(archivo_ll) as f:
+        emitir_objeto(f.read(), archivo_o, maquina, nivel_optimizacion)
@@ -3,21 +3,47 @@ Intérprete simple de Jade
 Ejecuta programas Jade directamente sin compilar
 """
 
+import functools
 import sys
 import os
-from lexer import tokenizar_codigo
-from parser import parsear_codigo
+from lexer import MOTORES_LEXER
+from parse_cache import cache_ast
+from module_loader import registro_modulos
 from semantic_analyzer import AnalizadorSemantico
 from ast_nodes import *
 from type_system import *
 from token_types import TokenType
+from resolver import Resolutor, PROFUNDIDAD_LOCAL, PROFUNDIDAD_GLOBAL
+
+
+class _Indefinida:
+    """Valor de un slot local aún no asignado"""
+    __slots__ = ()
+
+    def __repr__(self):
+        return '<indefinida>'
+
+
+INDEFINIDA = _Indefinida()
+
+
+class MarcoLlamada:
+    """Marco de activación de una llamada: función en ejecución y sus locales"""
+    __slots__ = ('funcion', 'locales')
+
+    def __init__(self, funcion: DeclaracionFuncion, locales: list):
+        self.funcion = funcion
+        self.locales = locales
 
 
 class InterpreteJade:
     """Intérprete que ejecuta código Jade directamente"""
     
     def __init__(self, archivo_actual: str = ""):
-        self.variables = {}  # Scope global
+        self.globales = {}   # Scope global (enums)
+        self.valores_globales = []  # Globales indexados por slot (Resolutor)
+        self.marcos = []     # Pila de llamadas (MarcoLlamada)
+        self.variables = self.valores_globales  # Locales del marco actual (por slot)
         self.funciones = {}  # Funciones definidas
         self.valor_retorno = None
         self.debe_retornar = False
@@ -39,19 +65,32 @@ class InterpreteJade:
                 # Usamos un dict simple para representar el Enum en runtime
                 # { 'VAL1': 'VAL1', 'VAL2': 'VAL2' }
                 enum_dict = {val: val for val in decl.valores}
-                self.variables[decl.nombre] = enum_dict
+                self.globales[decl.nombre] = enum_dict
+        
+        self.resolver_funciones()
         
         # Ejecutar función main
         if 'main' in self.funciones:
-            self.ejecutar_funcion('main', [])
+            try:
+                self.ejecutar_funcion('main', [])
+            finally:
+                salida.vaciar()
         else:
             print("Error: No se encontró función 'main'")
     
+    def resolver_funciones(self):
+        """Resuelve las variables de todas las funciones (incluidas las importadas) a slots"""
+        resolutor = Resolutor()
+        for nombre, valor in self.globales.items():
+            resolutor.declarar_global(nombre)
+            self.valores_globales.append(valor)
+        for func in self.funciones.values():
+            resolutor.resolver_funcion(func)
+    
     def ejecutar_importar(self, imp: Importar):
         """Ejecuta una importación"""
         # Resolver ruta absoluta
-        dir_actual = os.path.dirname(self.archivo_actual)
-        ruta_abs = os.path.abspath(os.path.join(dir_actual, imp.ruta))
+        ruta_abs = registro_modulos.resolver_ruta(self.archivo_actual, imp.ruta)
         
         # Verificar existencia
         if not os.path.exists(ruta_abs):
@@ -64,16 +103,8 @@ class InterpreteJade:
         self.archivos_importados.add(ruta_abs)
         
         try:
-            # Cargar y parsear módulo
-            with open(ruta_abs, 'r', encoding='utf-8') as f:
-                codigo = f.read()
-            
-            # Importaciones locales
-            from lexer import tokenizar_codigo
-            from parser import parsear_codigo
-            
-            tokens = tokenizar_codigo(codigo)
-            modulo_ast = parsear_codigo(tokens)
+            # Mismo Programa que obtuvo el analizador (parseado una sola vez)
+            modulo_ast = registro_modulos.cargar(ruta_abs).programa
             
             # Ejecutar módulo recursivamente
             interprete_modulo = InterpreteJade(ruta_abs)
@@ -103,26 +134,30 @@ class InterpreteJade:
         
         func = self.funciones[nombre]
         
-        # Crear scope local
-        scope_anterior = self.variables.copy()
-        
-        # Asignar parámetros
-        for i, (param_nombre, _) in enumerate(func.parametros):
-            if i < len(argumentos):
-                self.variables[param_nombre] = argumentos[i]
+        # Crear marco con un slot por variable local; los parámetros ocupan
+        # los primeros slots. El costo de la llamada no depende de cuántas
+        # variables existan en otros marcos
+        locales = [INDEFINIDA] * len(func.locales)
+        num_params = min(len(func.parametros), len(argumentos))
+        locales[:num_params] = argumentos[:num_params]
+        marcos = self.marcos
+        marcos.append(MarcoLlamada(func, locales))
+        self.variables = locales
         
         # Ejecutar cuerpo
         self.debe_retornar = False
+        ejecutar_statement = self.ejecutar_statement
         for stmt in func.cuerpo:
-            self.ejecutar_statement(stmt)
+            ejecutar_statement(stmt)
             if self.debe_retornar:
                 break
         
-        # Restaurar scope
+        # Desapilar marco y restaurar las locales del llamador
         resultado = self.valor_retorno
         self.valor_retorno = None
         self.debe_retornar = False
-        self.variables = scope_anterior
+        marcos.pop()
+        self.variables = marcos[-1].locales if marcos else self.valores_globales
         
         return resultado
     
@@ -130,11 +165,11 @@ class InterpreteJade:
         """Ejecuta un statement"""
         if isinstance(stmt, DeclaracionVariable):
             valor = self.evaluar_expresion(stmt.valor_inicial)
-            self.variables[stmt.nombre] = valor
+            self.variables[stmt.slot] = valor
         
         elif isinstance(stmt, Asignacion):
             valor = self.evaluar_expresion(stmt.valor)
-            self.variables[stmt.nombre] = valor
+            self.variables[stmt.slot] = valor
         
         elif isinstance(stmt, AsignacionIndice):
             objeto = self.evaluar_expresion(stmt.objeto)
@@ -167,7 +202,7 @@ class InterpreteJade:
             fin = self.evaluar_expresion(stmt.fin)
             
             for i in range(inicio, fin):
-                self.variables[stmt.variable] = i
+                self.variables[stmt.slot] = i
                 for s in stmt.cuerpo:
                     self.ejecutar_statement(s)
                     if self.debe_retornar:
@@ -199,8 +234,12 @@ class InterpreteJade:
             return None
         
         elif isinstance(expr, Identificador):
-            if expr.nombre in self.variables:
-                return self.variables[expr.nombre]
+            if expr.profundidad == PROFUNDIDAD_LOCAL:
+                valor = self.variables[expr.slot]
+                if valor is not INDEFINIDA:
+                    return valor
+            elif expr.profundidad == PROFUNDIDAD_GLOBAL:
+                return self.valores_globales[expr.slot]
             raise NameError(f"Variable '{expr.nombre}' no definida")
         
         elif isinstance(expr, ExpresionBinaria):
@@ -215,7 +254,7 @@ class InterpreteJade:
             elif op == '*':
                 return izq * der
             elif op == '/':
-                return izq // der if isinstance(izq, int) else izq / der
+                return _dividir(izq, der)
             elif op == '%':
                 return izq % der
             elif op == '^':
@@ -279,141 +318,243 @@ class InterpreteJade:
         """Ejecuta llamada a método de objeto"""
         objeto = self.evaluar_expresion(llamada.objeto)
         args = [self.evaluar_expresion(arg) for arg in llamada.argumentos]
+        return aplicar_metodo(objeto, llamada.nombre_metodo, args)
+
+    def ejecutar_llamada(self, llamada: LlamadaFuncion):
+        """Ejecuta llamada a función"""
+        args = [self.evaluar_expresion(arg) for arg in llamada.argumentos]
         
-        # Métodos de listas
-        if isinstance(objeto, list):
-            if llamada.nombre_metodo == 'agregar':
-                if len(args) != 1:
-                    raise TypeError("agregar() requiere 1 argumento")
-                objeto.append(args[0])
-                return None
-            
-            elif llamada.nombre_metodo == 'longitud':
-                return len(objeto)
-            
-            elif llamada.nombre_metodo == 'eliminar':
-                if len(args) != 1:
-                    raise TypeError("eliminar() requiere 1 argumento")
-                return objeto.pop(args[0])
-            
-            elif llamada.nombre_metodo == 'contiene':
-                if len(args) != 1:
-                    raise TypeError("contiene() requiere 1 argumento")
-                return args[0] in objeto
-            
-            else:
-                raise AttributeError(f"Lista no tiene método '{llamada.nombre_metodo}'")
+        # Funciones built-in
+        nativa = FUNCIONES_NATIVAS.get(llamada.nombre)
+        if nativa is not None:
+            return nativa(*args)
         
-        # Métodos de mapas
-        elif isinstance(objeto, dict):
-            if llamada.nombre_metodo == 'claves':
-                return list(objeto.keys())
-            
-            elif llamada.nombre_metodo == 'valores':
-                return list(objeto.values())
-            
-            elif llamada.nombre_metodo == 'longitud':
-                return len(objeto)
-            
-            elif llamada.nombre_metodo == 'eliminar':
-                if len(args) != 1:
-                    raise TypeError("eliminar() requiere 1 argumento")
-                return objeto.pop(args[0], None)
-            
-            elif llamada.nombre_metodo == 'contiene':
-                if len(args) != 1:
-                    raise TypeError("contiene() requiere 1 argumento")
-                return args[0] in objeto
-            
-            else:
-                raise AttributeError(f"Mapa no tiene método '{llamada.nombre_metodo}'")
+        # Funciones definidas por usuario
+        return self.ejecutar_funcion(llamada.nombre, args)
 
-        # Métodos de texto
-        elif isinstance(objeto, str):
-            if llamada.nombre_metodo == 'longitud':
-                return len(objeto)
-            
-            elif llamada.nombre_metodo == 'mayusculas':
-                return objeto.upper()
-            
-            elif llamada.nombre_metodo == 'minusculas':
-                return objeto.lower()
-            
-            elif llamada.nombre_metodo == 'recortar':
-                return objeto.strip()
-            
-            elif llamada.nombre_metodo == 'contiene':
-                if len(args) != 1:
-                    raise TypeError("contiene() requiere 1 argumento")
-                return args[0] in objeto
-            
-            elif llamada.nombre_metodo == 'reemplazar':
-                if len(args) != 2:
-                    raise TypeError("reemplazar() requiere 2 argumentos")
-                return objeto.replace(args[0], args[1])
-            
-            elif llamada.nombre_metodo == 'dividir':
-                if len(args) != 1:
-                    raise TypeError("dividir() requiere 1 argumento")
-                return objeto.split(args[0])
-            
-            else:
-                raise AttributeError(f"Texto no tiene método '{llamada.nombre_metodo}'")
+
+class ConstructorTexto:
+    """
+    Texto construido por partes: agregar() guarda la parte sin copiar lo
+    acumulado y construir() las une una sola vez.
+    """
+    __slots__ = ('partes', 'longitud')
+
+    def __init__(self):
+        self.partes = []
+        self.longitud = 0
+
+    def agregar(self, texto: str):
+        self.partes.append(texto)
+        self.longitud += len(texto)
+
+    def construir(self) -> str:
+        if len(self.partes) != 1:
+            # Se conserva unido para las siguientes llamadas
+            self.partes = [''.join(self.partes)]
+        return self.partes[0] if self.partes else ''
+
+
+def _dividir(izq, der):
+    """División de Jade: entera entre enteros, real en otro caso"""
+    return izq // der if isinstance(izq, int) else izq / der
+
+
+def aplicar_metodo(objeto, nombre_metodo: str, args: list):
+    """Aplica un método de lista, mapa o texto sobre un valor ya evaluado"""
+    # Métodos de listas
+    if isinstance(objeto, list):
+        if nombre_metodo == 'agregar':
+            if len(args) != 1:
+                raise TypeError("agregar() requiere 1 argumento")
+            objeto.append(args[0])
+            return None
+        
+        elif nombre_metodo == 'longitud':
+            return len(objeto)
+        
+        elif nombre_metodo == 'eliminar':
+            if len(args) != 1:
+                raise TypeError("eliminar() requiere 1 argumento")
+            return objeto.pop(args[0])
+        
+        elif nombre_metodo == 'contiene':
+            if len(args) != 1:
+                raise TypeError("contiene() requiere 1 argumento")
+            return args[0] in objeto
+        
+        else:
+            raise AttributeError(f"Lista no tiene método '{nombre_metodo}'")
+    
+    # Métodos de mapas
+    elif isinstance(objeto, dict):
+        if nombre_metodo == 'claves':
+            return list(objeto.keys())
         
-        raise TypeError(f"Objeto de tipo {type(objeto)} no tiene métodos")
+        elif nombre_metodo == 'valores':
+            return list(objeto.values())
+        
+        elif nombre_metodo == 'longitud':
+            return len(objeto)
+        
+        elif nombre_metodo == 'eliminar':
+            if len(args) != 1:
+                raise TypeError("eliminar() requiere 1 argumento")
+            return objeto.pop(args[0], None)
+        
+        elif nombre_metodo == 'contiene':
+            if len(args) != 1:
+                raise TypeError("contiene() requiere 1 argumento")
+            return args[0] in objeto
+        
+        else:
+            raise AttributeError(f"Mapa no tiene método '{nombre_metodo}'")
 
-    def ejecutar_llamada(self, llamada: LlamadaFuncion):
-        """Ejecuta llamada a función"""
-        # Funciones built-in
-        if llamada.nombre == 'mostrar':
-            arg = self.evaluar_expresion(llamada.argumentos[0])
-            print(arg)
+    # Métodos de texto
+    elif isinstance(objeto, str):
+        if nombre_metodo == 'longitud':
+            return len(objeto)
+        
+        elif nombre_metodo == 'mayusculas':
+            return objeto.upper()
+        
+        elif nombre_metodo == 'minusculas':
+            return objeto.lower()
+        
+        elif nombre_metodo == 'recortar':
+            return objeto.strip()
+        
+        elif nombre_metodo == 'contiene':
+            if len(args) != 1:
+                raise TypeError("contiene() requiere 1 argumento")
+            return args[0] in objeto
+        
+        elif nombre_metodo == 'reemplazar':
+            if len(args) != 2:
+                raise TypeError("reemplazar() requiere 2 argumentos")
+            return objeto.replace(args[0], args[1])
+        
+        elif nombre_metodo == 'dividir':
+            if len(args) != 1:
+                raise TypeError("dividir() requiere 1 argumento")
+            return objeto.split(args[0])
+        
+        else:
+            raise AttributeError(f"Texto no tiene método '{nombre_metodo}'")
+    
+    # Métodos del constructor de textos
+    elif isinstance(objeto, ConstructorTexto):
+        if nombre_metodo == 'agregar':
+            if len(args) != 1:
+                raise TypeError("agregar() requiere 1 argumento")
+            objeto.agregar(args[0])
             return None
         
-        elif llamada.nombre == 'leer':
-            return input()
-        
-        elif llamada.nombre == 'convertir_a_texto':
-            arg = self.evaluar_expresion(llamada.argumentos[0])
-            return str(arg)
-        
-        elif llamada.nombre == 'convertir_a_entero':
-            arg = self.evaluar_expresion(llamada.argumentos[0])
-            return int(arg)
-        
-        elif llamada.nombre == 'convertir_a_flotante':
-            arg = self.evaluar_expresion(llamada.argumentos[0])
-            return float(arg)
-        
-        # Funciones matemáticas
-        elif llamada.nombre == 'abs':
-            arg = self.evaluar_expresion(llamada.argumentos[0])
-            return abs(arg)
-        
-        elif llamada.nombre == 'max':
-            a = self.evaluar_expresion(llamada.argumentos[0])
-            b = self.evaluar_expresion(llamada.argumentos[1])
-            return max(a, b)
-        
-        elif llamada.nombre == 'min':
-            a = self.evaluar_expresion(llamada.argumentos[0])
-            b = self.evaluar_expresion(llamada.argumentos[1])
-            return min(a, b)
-        
-        # String formatting/interpolation  
-        elif llamada.nombre == 'f':
-            if len(llamada.argumentos) < 1:
-                raise TypeError("f() requiere al menos 1 argumento")
-            template = self.evaluar_expresion(llamada.argumentos[0])
-            valores = [self.evaluar_expresion(arg) for arg in llamada.argumentos[1:]]
-            resultado = template
-            for valor in valores:
-                resultado = resultado.replace('{}', str(valor), 1)
-            return resultado
-        # Funciones definidas por usuario
+        elif nombre_metodo == 'construir':
+            return objeto.construir()
+        
+        elif nombre_metodo == 'longitud':
+            return objeto.longitud
+        
         else:
-            args = [self.evaluar_expresion(arg) for arg in llamada.argumentos]
-            return self.ejecutar_funcion(llamada.nombre, args)
+            raise AttributeError(f"Constructor de texto no tiene método '{nombre_metodo}'")
+    
+    raise TypeError(f"Objeto de tipo {type(objeto)} no tiene métodos")
+
+
+@functools.lru_cache(maxsize=256)
+def _partes_plantilla(plantilla: str) -> tuple:
+    """Fragmentos de una plantilla de f() entre cada '{}' (en caché por plantilla)"""
+    return tuple(plantilla.split('{}'))
+
+
+def _nativa_f(*args):
+    """Interpolación de texto: f("Hola {}", nombre)"""
+    if len(args) < 1:
+        raise TypeError("f() requiere al menos 1 argumento")
+    partes = _partes_plantilla(args[0])
+    valores = args[1:]
+    if len(partes) == 1:
+        return args[0]
+    # Un solo join; los '{}' sin valor quedan como están y los valores
+    # sobrantes se ignoran
+    piezas = [partes[0]]
+    for i, parte in enumerate(partes[1:]):
+        piezas.append(str(valores[i]) if i < len(valores) else '{}')
+        piezas.append(parte)
+    return ''.join(piezas)
+
+
+# Caracteres acumulados a partir de los cuales se escribe la salida
+LIMITE_SALIDA = 1 << 16
+
+
+class SalidaJade:
+    """
+    Salida de mostrar(), compartida por todos los motores: las líneas se
+    acumulan y se escriben juntas al pasar LIMITE_SALIDA, antes de leer(),
+    con vaciar_salida() y al terminar el programa. Sin buffer cada línea se
+    escribe y se vacía en el momento (uso interactivo).
+    """
+    __slots__ = ('lineas', 'tamano', 'sin_buffer')
+
+    def __init__(self):
+        self.lineas = []
+        self.tamano = 0
+        self.sin_buffer = False
+
+    def escribir(self, valor):
+        linea = str(valor)
+        if self.sin_buffer:
+            sys.stdout.write(linea + '\n')
+            sys.stdout.flush()
+            return
+        self.lineas.append(linea)
+        self.tamano += len(linea) + 1
+        if self.tamano >= LIMITE_SALIDA:
+            self.vaciar()
+
+    def vaciar(self):
+        """Escribe lo acumulado en el sys.stdout actual y lo vacía"""
+        if self.lineas:
+            self.lineas.append('')
+            sys.stdout.write('\n'.join(self.lineas))
+            self.lineas = []
+            self.tamano = 0
+        sys.stdout.flush()
+
+
+salida = SalidaJade()
+
+
+def _nativa_mostrar(*args):
+    salida.escribir(args[0])
+
+
+def _nativa_leer(*args):
+    # Lo mostrado antes (p. ej. una pregunta) tiene que verse al leer
+    salida.vaciar()
+    return input()
+
+
+def _nativa_vaciar_salida(*args):
+    salida.vaciar()
+
+
+# Funciones built-in del intérprete, compartidas por todos los motores
+FUNCIONES_NATIVAS = {
+    'mostrar': _nativa_mostrar,
+    'leer': _nativa_leer,
+    'vaciar_salida': _nativa_vaciar_salida,
+    'convertir_a_texto': lambda *args: str(args[0]),
+    'convertir_a_entero': lambda *args: int(args[0]),
+    'convertir_a_flotante': lambda *args: float(args[0]),
+    'abs': lambda *args: abs(args[0]),
+    'max': lambda *args: max(args[0], args[1]),
+    'min': lambda *args: min(args[0], args[1]),
+    'f': _nativa_f,
+    'constructor_texto': lambda *args: ConstructorTexto(),
+}
 
 
 def main():
@@ -428,32 +569,60 @@ def main():
     parser.add_argument('archivo', help='Archivo .jde a ejecutar')
     parser.add_argument('--debug', action='store_true',
                        help='Mostrar información de debug')
+    parser.add_argument('--motor', choices=['arbol', 'cierres', 'bytecode'], default='arbol',
+                       help='Motor de ejecución: arbol (recorrido del AST), '
+                            'cierres (AST compilado a closures) o bytecode (VM de pila)')
+    parser.add_argument('--lexer', choices=MOTORES_LEXER,
+                       help='Motor del lexer: clasico o rapido (por defecto JADE_LEXER o clasico)')
+    parser.add_argument('--desensamblar', action='store_true',
+                       help='Mostrar el bytecode generado en lugar de ejecutar')
+    parser.add_argument('--procesos', type=int, default=1,
+                       help='Procesos para parsear y analizar los módulos importados en paralelo')
+    parser.add_argument('--sin-cache', action='store_true',
+                       help='No usar la caché de AST en disco (__jadecache__)')
+    parser.add_argument('--estadisticas-cache', action='store_true',
+                       help='Mostrar aciertos y fallos de la caché de AST al terminar')
+    parser.add_argument('--salida-sin-buffer', action='store_true',
+                       help='Escribir cada línea de mostrar() en el momento (programas interactivos)')
     
     args = parser.parse_args()
+    salida.sin_buffer = args.salida_sin_buffer
+    
+    # El motor se propaga por entorno para alcanzar también a los módulos importados
+    if args.lexer:
+        os.environ['JADE_LEXER'] = args.lexer
+    if args.sin_cache:
+        cache_ast.habilitada = False
     
     try:
-        # Leer archivo
-        with open(args.archivo, 'r', encoding='utf-8') as f:
-            codigo = f.read()
-        
         if args.debug:
             print(f">>> Ejecutando {args.archivo}...\n")
         
-        # Tokenizar
-        tokens = tokenizar_codigo(codigo)
-        
-        # Parsear
-        programa = parsear_codigo(tokens)
-        
-        # Análisis semántico
-        analizador = AnalizadorSemantico()
-        analizador.analizar(programa)
+        # Tokenizar, parsear (o recuperar el AST de la caché) y analizar; los
+        # módulos importados quedan en el registro para el intérprete
+        if args.procesos > 1:
+            registro_modulos.precargar(args.archivo, args.procesos)
+        modulo = registro_modulos.cargar(args.archivo)
+        registro_modulos.analizar(modulo, requiere_main=True)
+        programa = modulo.programa
         
         if args.debug:
             print(">>> Análisis completado, ejecutando...\n")
         
+        if args.desensamblar:
+            from vm import InterpreteBytecode
+            print(InterpreteBytecode(args.archivo).desensamblar_programa(programa))
+            return
+        
         # Ejecutar
-        interprete = InterpreteJade()
+        if args.motor == 'cierres':
+            from closure_compiler import InterpreteCierres
+            interprete = InterpreteCierres(args.archivo)
+        elif args.motor == 'bytecode':
+            from vm import InterpreteBytecode
+            interprete = InterpreteBytecode(args.archivo)
+        else:
+            interprete = InterpreteJade(args.archivo)
         interprete.ejecutar_programa(programa)
         
     except FileNotFoundError:
@@ -465,6 +634,10 @@ def main():
         if args.debug:
             traceback.print_exc()
         sys.exit(1)
+    finally:
+        if args.estadisticas_cache:
+            print(cache_ast.resumen(), file=sys.stderr)
+            print(registro_modulos.resumen(), file=sys.stderr)
 
 
 if __name__ == "__main__":
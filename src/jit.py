@@ -0,0 +1,56 @@
+"""
+Ejecución JIT de programas Jade
+Compila en memoria el módulo LLVM del programa con MCJIT y llama a su punto
+de entrada sin escribir archivos .ll ni invocar llc o el enlazador. Las
+funciones del runtime se toman de std/runtime.c compilado una vez como
+biblioteca compartida y cargado en el proceso.
+"""
+
+import ctypes
+import sys
+
+from llvmlite import binding as llvm
+
+from linker import compilar_runtime_compartido, crear_maquina_destino
+from optimizer import optimizar_modulo
+
+
+# Bibliotecas ya cargadas en el proceso
+_bibliotecas_cargadas = set()
+
+
+def cargar_runtime(directorio: str):
+    """Compila (si hace falta) y carga la biblioteca compartida del runtime"""
+    ruta = compilar_runtime_compartido(directorio)
+    if ruta not in _bibliotecas_cargadas:
+        llvm.load_library_permanently(ruta)
+        _bibliotecas_cargadas.add(ruta)
+
+
+def ejecutar_jit(llvm_ir: str, directorio_runtime: str, nivel_optimizacion: int = 2,
+                 optimizar: bool = True) -> int:
+    """
+    Compila el IR con MCJIT y ejecuta _jade_main (inicializa el runtime y
+    llama a main). Retorna el código de salida del programa. Con
+    optimizar=False el IR ya pasó por optimizar_ir y solo se usa el nivel
+    para la generación de código máquina.
+    """
+    cargar_runtime(directorio_runtime)
+
+    modulo = llvm.parse_assembly(llvm_ir)
+    modulo.verify()
+    maquina = crear_maquina_destino(nivel_optimizacion)
+    if optimizar:
+        optimizar_modulo(modulo, maquina, nivel_optimizacion)
+
+    motor = llvm.create_mcjit_compiler(modulo, maquina)
+    motor.finalize_object()
+    motor.run_static_constructors()
+
+    entrada = ctypes.CFUNCTYPE(ctypes.c_int32)(motor.get_function_address("_jade_main"))
+    # La salida de Python y la de printf del runtime usan búferes distintos
+    sys.stdout.flush()
+    try:
+        return entrada()
+    finally:
+        ctypes.CDLL(None).fflush(None)
@@ -3,18 +3,96 @@ Analizador léxico (Lexer) para Jade
 Convierte código fuente en una secuencia de tokens
 """
 
+import os
+from typing import Iterable, Iterator, TextIO, Union
 from token_types import Token, TokenType, PALABRAS_RESERVADAS
+from token_stream import FlujoTokens
+
+
+# Operadores y símbolos de un carácter
+SIMBOLOS_SIMPLES = {
+    '+': TokenType.MAS,
+    '-': TokenType.MENOS,
+    '*': TokenType.MULTIPLICAR,
+    '/': TokenType.DIVIDIR,
+    '%': TokenType.MODULO,
+    '^': TokenType.POTENCIA,
+    '=': TokenType.ASIGNAR,
+    '<': TokenType.MENOR,
+    '>': TokenType.MAYOR,
+    '(': TokenType.PARENTESIS_IZQ,
+    ')': TokenType.PARENTESIS_DER,
+    '{': TokenType.LLAVE_IZQ,
+    '}': TokenType.LLAVE_DER,
+    '[': TokenType.CORCHETE_IZQ,
+    ']': TokenType.CORCHETE_DER,
+    ',': TokenType.COMA,
+    '.': TokenType.PUNTO,
+    ':': TokenType.DOS_PUNTOS,
+    ';': TokenType.PUNTO_Y_COMA,
+}
+
+# Motores de lexer seleccionables: 'clasico' (carácter a carácter) o
+# 'rapido' (expresión regular maestra, ver fast_lexer.py)
+MOTORES_LEXER = ('clasico', 'rapido')
+
+# Caracteres leídos por bloque de un archivo, y umbral a partir del cual el
+# lexer descarta del búfer el código ya tokenizado
+TAMANO_BLOQUE = 64 * 1024
+
+
+def fragmentos_de(fuente: Union[TextIO, Iterable[str]]) -> Iterator[str]:
+    """Iterador de fragmentos de texto de un archivo abierto o de un iterable de cadenas"""
+    if hasattr(fuente, 'read'):
+        return iter(lambda: fuente.read(TAMANO_BLOQUE), '')
+    return iter(fuente)
 
 
 class Lexer:
-    """Analizador léxico que tokeniza código fuente Jade"""
+    """
+    Analizador léxico que tokeniza código fuente Jade
+    El código puede ser una cadena, un archivo abierto o un iterable de
+    fragmentos; en los dos últimos casos se lee a medida que se tokeniza y
+    solo se retiene en memoria el código aún no consumido.
+    """
     
-    def __init__(self, codigo: str):
-        self.codigo = codigo
-        self.posicion = 0
+    def __init__(self, codigo: Union[str, TextIO, Iterable[str]]):
+        if isinstance(codigo, str):
+            self.codigo = codigo
+            self.fragmentos = None
+        else:
+            self.codigo = ''
+            self.fragmentos = fragmentos_de(codigo)
+            self.cargar_fragmento()
+        self.desplazamiento = 0  # Offset absoluto de self.codigo[0] (código ya descartado)
+        self.posicion = 0        # Índice en self.codigo
         self.linea = 1
         self.columna = 1
         self.caracter_actual = self.codigo[0] if len(self.codigo) > 0 else None
+        self.inicio_token = 0  # Offset absoluto donde empieza el último token leído
+    
+    def cargar_fragmento(self) -> bool:
+        """Agrega al búfer el siguiente fragmento no vacío; False si la fuente se agotó"""
+        if self.fragmentos is None:
+            return False
+        for fragmento in self.fragmentos:
+            if fragmento:
+                self.codigo += fragmento
+                return True
+        self.fragmentos = None
+        return False
+    
+    def descartar_consumido(self):
+        """Elimina del búfer el código ya tokenizado (solo con fuentes por fragmentos)"""
+        self.codigo = self.codigo[self.posicion:]
+        self.desplazamiento += self.posicion
+        self.posicion = 0
+    
+    def leer_todo(self):
+        """Carga en el búfer el resto de la fuente"""
+        if self.fragmentos is not None:
+            self.codigo += ''.join(self.fragmentos)
+            self.fragmentos = None
     
     def error(self, mensaje: str):
         """Lanza un error de lexer con información de posición"""
@@ -31,7 +109,7 @@ class Lexer:
             self.columna += 1
         
         self.posicion += 1
-        if self.posicion >= len(self.codigo):
+        if self.posicion >= len(self.codigo) and not self.cargar_fragmento():
             self.caracter_actual = None
         else:
             self.caracter_actual = self.codigo[self.posicion]
@@ -39,8 +117,9 @@ class Lexer:
     def ver_siguiente(self, offset=1):
         """Mira el siguiente carácter sin avanzar"""
         pos = self.posicion + offset
-        if pos >= len(self.codigo):
-            return None
+        while pos >= len(self.codigo):
+            if not self.cargar_fragmento():
+                return None
         return self.codigo[pos]
     
     def saltar_espacios(self):
@@ -227,6 +306,10 @@ class Lexer:
     def siguiente_token(self):
         """Obtiene el siguiente token del código"""
         while self.caracter_actual:
+            if self.fragmentos is not None and self.posicion >= TAMANO_BLOQUE:
+                self.descartar_consumido()
+            self.inicio_token = self.desplazamiento + self.posicion
+            
             # Saltar espacios en blanco
             if self.caracter_actual in ' \t\r':
                 self.saltar_espacios()
@@ -311,31 +394,9 @@ class Lexer:
                 return Token(TokenType.DIVIDIR_IGUAL, '/=', linea_actual, columna_actual)
             
             # Operadores y símbolos de un carácter
-            simbolos_simples = {
-                '+': TokenType.MAS,
-                '-': TokenType.MENOS,
-                '*': TokenType.MULTIPLICAR,
-                '/': TokenType.DIVIDIR,
-                '%': TokenType.MODULO,
-                '^': TokenType.POTENCIA,
-                '=': TokenType.ASIGNAR,
-                '<': TokenType.MENOR,
-                '>': TokenType.MAYOR,
-                '(': TokenType.PARENTESIS_IZQ,
-                ')': TokenType.PARENTESIS_DER,
-                '{': TokenType.LLAVE_IZQ,
-                '}': TokenType.LLAVE_DER,
-                '[': TokenType.CORCHETE_IZQ,
-                ']': TokenType.CORCHETE_DER,
-                ',': TokenType.COMA,
-                '.': TokenType.PUNTO,
-                ':': TokenType.DOS_PUNTOS,
-                ';': TokenType.PUNTO_Y_COMA,
-            }
-            
-            if self.caracter_actual in simbolos_simples:
+            if self.caracter_actual in SIMBOLOS_SIMPLES:
                 simbolo = self.caracter_actual
-                tipo = simbolos_simples[simbolo]
+                tipo = SIMBOLOS_SIMPLES[simbolo]
                 self.avanzar()
                 return Token(tipo, simbolo, linea_actual, columna_actual)
             
@@ -343,28 +404,70 @@ class Lexer:
             self.error(f"Carácter inesperado: '{self.caracter_actual}'")
         
         # Fin del archivo
+        self.inicio_token = self.desplazamiento + self.posicion
         return Token(TokenType.EOF, '', self.linea, self.columna)
     
+    def iterar_tokens(self) -> Iterator[Token]:
+        """Genera los tokens a medida que se leen, terminando en EOF"""
+        while True:
+            token = self.siguiente_token()
+            # Ignorar nueva línea en la secuencia de tokens (opcional)
+            if token.tipo != TokenType.NUEVA_LINEA:
+                yield token
+            if token.tipo == TokenType.EOF:
+                return
+    
     def tokenizar(self):
         """Tokeniza todo el código y retorna una lista de tokens"""
-        tokens = []
+        return list(self.iterar_tokens())
+    
+    def tokenizar_flujo(self) -> FlujoTokens:
+        """Tokeniza todo el código a un FlujoTokens (sin retener objetos Token)"""
+        # El flujo apunta al código fuente: necesita el código completo
+        self.leer_todo()
+        flujo = FlujoTokens(self.codigo)
         while True:
             token = self.siguiente_token()
-            # Ignorar nueva línea en la lista de tokens (opcional)
             if token.tipo != TokenType.NUEVA_LINEA:
-                tokens.append(token)
+                flujo.agregar(token.tipo, self.inicio_token,
+                              self.desplazamiento + self.posicion - self.inicio_token,
+                              token.linea, token.columna)
             if token.tipo == TokenType.EOF:
                 break
-        return tokens
+        return flujo
+
+
+def crear_lexer(codigo: Union[str, TextIO, Iterable[str]], motor: str = None):
+    """
+    Crea el lexer del motor indicado. Sin motor explícito se usa la variable
+    de entorno JADE_LEXER y, si no está definida, el lexer clásico.
+    """
+    motor = motor or os.environ.get('JADE_LEXER') or 'clasico'
+    if motor == 'rapido':
+        from fast_lexer import LexerRapido
+        return LexerRapido(codigo)
+    if motor != 'clasico':
+        raise ValueError(f"Motor de lexer desconocido: '{motor}' (opciones: {', '.join(MOTORES_LEXER)})")
+    return Lexer(codigo)
 
 
 # Función de utilidad para pruebas
-def tokenizar_codigo(codigo: str):
+def tokenizar_codigo(codigo: Union[str, TextIO, Iterable[str]], motor: str = None):
     """Tokeniza código Jade y retorna lista de tokens"""
-    lexer = Lexer(codigo)
+    lexer = crear_lexer(codigo, motor)
     return lexer.tokenizar()
 
 
+def tokenizar_flujo(codigo: Union[str, TextIO, Iterable[str]], motor: str = None) -> FlujoTokens:
+    """Tokeniza código Jade y retorna un FlujoTokens compacto"""
+    return crear_lexer(codigo, motor).tokenizar_flujo()
+
+
+def iterar_tokens(codigo: Union[str, TextIO, Iterable[str]], motor: str = None) -> Iterator[Token]:
+    """Genera los tokens de código Jade (cadena, archivo o fragmentos) a medida que se leen"""
+    return crear_lexer(codigo, motor).iterar_tokens()
+
+
 if __name__ == "__main__":
     # Prueba simple
     codigo_ejemplo = """
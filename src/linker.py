@@ -0,0 +1,106 @@
+"""
+Emisión de objetos y enlace de programas Jade
+Convierte el IR de cada módulo en un archivo objeto con la máquina destino de
+llvmlite (sin pasar por llc), compila el runtime de C y enlaza los objetos de
+todos los módulos con él en un ejecutable. El runtime compilado se guarda
+indexado por el hash de sus fuentes y del comando, así que solo se vuelve a
+compilar cuando cambia.
+"""
+
+import hashlib
+import os
+import subprocess
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List
+
+from llvmlite import binding as llvm
+
+from optimizer import optimizar_modulo
+
+
+DIRECTORIO_STD = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'std')
+RUNTIME_C = os.path.join(DIRECTORIO_STD, 'runtime.c')
+RUNTIME_H = os.path.join(DIRECTORIO_STD, 'runtime.h')
+
+
+class ErrorEnlace(Exception):
+    """Error de la herramienta externa (compilador de C o enlazador)"""
+    pass
+
+
+def compilador_c() -> str:
+    """Compilador de C usado para el runtime y el enlace (variable CC o gcc)"""
+    return os.environ.get('CC', 'gcc')
+
+
+def crear_maquina_destino(nivel_optimizacion: int = 2):
+    """Máquina destino nativa; código independiente de posición para enlazar como PIE"""
+    llvm.initialize_native_target()
+    llvm.initialize_native_asmprinter()
+    return llvm.Target.from_default_triple().create_target_machine(reloc='pic', opt=nivel_optimizacion)
+
+
+def emitir_objeto(llvm_ir: str, ruta_objeto: str, maquina=None, nivel_optimizacion: int = 0):
+    """Verifica el IR de un módulo, lo optimiza y escribe su archivo objeto"""
+    modulo = llvm.parse_assembly(llvm_ir)
+    modulo.verify()
+    maquina = maquina or crear_maquina_destino(nivel_optimizacion)
+    optimizar_modulo(modulo, maquina, nivel_optimizacion)
+    with open(ruta_objeto, 'wb') as f:
+        f.write(maquina.emit_object(modulo))
+
+
+def _ejecutar(comando: List[str]):
+    try:
+        resultado = subprocess.run(comando, capture_output=True, text=True)
+    except FileNotFoundError:
+        raise ErrorEnlace(f"No se encuentra '{comando[0]}' (definir CC con el compilador de C)")
+    if resultado.returncode != 0:
+        raise ErrorEnlace(f"{' '.join(comando)}\n{resultado.stderr.strip()}")
+
+
+def _compilar_runtime(directorio: str, extension: str, opciones: List[str]) -> str:
+    """
+    Compila std/runtime.c en 'directorio' salvo que ya exista la salida para
+    el mismo hash de runtime.c, runtime.h, compilador y opciones.
+    """
+    comando = [compilador_c(), *opciones, '-O2', '-fPIC']
+    resumen = hashlib.sha256(' '.join(comando).encode('utf-8'))
+    for fuente in (RUNTIME_C, RUNTIME_H):
+        with open(fuente, 'rb') as f:
+            resumen.update(f.read())
+    ruta_salida = os.path.join(directorio, f"runtime-{resumen.hexdigest()[:16]}{extension}")
+
+    if not os.path.exists(ruta_salida):
+        os.makedirs(directorio, exist_ok=True)
+        # Escritura atómica: otra compilación puede estar usando el mismo directorio
+        temporal = f"{ruta_salida}.{os.getpid()}.tmp"
+        _ejecutar([*comando, RUNTIME_C, '-o', temporal, '-lm'])
+        os.replace(temporal, ruta_salida)
+    return ruta_salida
+
+
+def compilar_runtime(directorio: str) -> str:
+    """Objeto del runtime para enlazar ejecutables"""
+    return _compilar_runtime(directorio, '.o', ['-c'])
+
+
+def compilar_runtime_compartido(directorio: str) -> str:
+    """Biblioteca compartida del runtime para cargarla en el proceso (modo JIT)"""
+    return _compilar_runtime(directorio, '.so', ['-shared'])
+
+
+def compilar_runtime_en_segundo_plano(directorio: str) -> Future:
+    """
+    Inicia compilar_runtime en un hilo y retorna su Future. El compilador de C
+    corre en su propio proceso, en paralelo con la generación de código.
+    """
+    ejecutor = ThreadPoolExecutor(max_workers=1)
+    futuro = ejecutor.submit(compilar_runtime, directorio)
+    ejecutor.shutdown(wait=False)
+    return futuro
+
+
+def enlazar(objetos: List[str], ruta_ejecutable: str):
+    """Enlaza los objetos de los módulos (y el del runtime) en un ejecutable"""
+    _ejecutar([compilador_c(), *objetos, '-o', ruta_ejecutable, '-lm'])
@@ -0,0 +1,195 @@
+"""
+Cargador y registro de módulos de Jade
+Resuelve rutas de importación, obtiene el AST de cada archivo (vía la caché
+de AST) y lo analiza semánticamente una sola vez por proceso. El analizador,
+los intérpretes y el generador LLVM reciben el mismo Programa y las mismas
+firmas de funciones para cada módulo.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+from ast_nodes import Programa, Importar
+from parse_cache import parsear_archivo
+
+
+class Modulo:
+    """Un archivo .jde cargado: su AST y, tras analizarlo, sus firmas de funciones"""
+
+    def __init__(self, ruta: str, programa: Programa):
+        self.ruta = ruta
+        self.programa = programa
+        self.funciones: Optional[Dict[str, tuple]] = None  # Firmas del analizador
+        self.en_analisis = False
+        self.error: Optional[Exception] = None  # Error semántico del análisis, si lo hubo
+
+    @property
+    def analizado(self) -> bool:
+        return self.funciones is not None or self.error is not None
+
+    def rutas_importadas(self) -> List[str]:
+        """Rutas absolutas de los módulos que importa, en orden de declaración"""
+        directorio = os.path.dirname(self.ruta)
+        return [os.path.abspath(os.path.join(directorio, decl.ruta))
+                for decl in self.programa.declaraciones if isinstance(decl, Importar)]
+
+
+class RegistroModulos:
+    """Registro de módulos por ruta absoluta: cada uno se parsea y analiza una vez"""
+
+    def __init__(self):
+        self.modulos: Dict[str, Modulo] = {}
+        self.cargas = 0     # Módulos cuyo AST se obtuvo (de disco o de la caché)
+        self.analisis = 0   # Módulos analizados semánticamente
+
+    @staticmethod
+    def resolver_ruta(archivo_actual: str, ruta: str) -> str:
+        """Ruta absoluta de una importación relativa al archivo que la declara"""
+        return os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(archivo_actual)), ruta))
+
+    def registrar(self, ruta: str, programa: Programa) -> Modulo:
+        """Registra un AST ya parseado (p. ej. el programa principal)"""
+        ruta = os.path.abspath(ruta)
+        modulo = self.modulos[ruta] = Modulo(ruta, programa)
+        return modulo
+
+    def cargar(self, ruta: str) -> Modulo:
+        """Retorna el módulo de la ruta, parseándolo solo la primera vez"""
+        ruta = os.path.abspath(ruta)
+        modulo = self.modulos.get(ruta)
+        if modulo is None:
+            self.cargas += 1
+            modulo = self.registrar(ruta, parsear_archivo(ruta))
+        return modulo
+
+    def analizar(self, modulo: Modulo, requiere_main: bool = False) -> Modulo:
+        """
+        Analiza el módulo si no se analizó antes y retorna el mismo módulo.
+        Un módulo en pleno análisis (importación cíclica) se retorna sin
+        firmas; un módulo con errores vuelve a lanzar su SemanticError.
+        """
+        if modulo.en_analisis:
+            return modulo
+        if not modulo.analizado:
+            from semantic_analyzer import AnalizadorSemantico
+
+            self.analisis += 1
+            modulo.en_analisis = True
+            analizador = AnalizadorSemantico(modulo.ruta)
+            try:
+                analizador.analizar(modulo.programa, requiere_main=requiere_main)
+                modulo.funciones = analizador.funciones
+            except Exception as e:
+                modulo.error = e
+            finally:
+                modulo.en_analisis = False
+        if modulo.error is not None:
+            raise modulo.error
+        return modulo
+
+    def importados(self, modulo: Modulo) -> List[Modulo]:
+        """Módulos importados directa o transitivamente, dependencias primero"""
+        orden = []
+        visitados = {modulo.ruta}
+
+        def visitar(actual: Modulo):
+            for ruta in actual.rutas_importadas():
+                if ruta not in visitados:
+                    visitados.add(ruta)
+                    importado = self.cargar(ruta)
+                    visitar(importado)
+                    orden.append(importado)
+
+        visitar(modulo)
+        return orden
+
+    def precargar(self, ruta: str, procesos: Optional[int] = None):
+        """
+        Parsea y analiza en paralelo todos los módulos alcanzables desde 'ruta'
+        con un ProcessPoolExecutor. El grafo de importaciones se descubre por
+        oleadas de parseo; después se analizan por niveles del orden
+        topológico, cada módulo con las firmas de sus dependencias ya
+        analizadas. Los resultados se registran por ruta, así que no dependen
+        del orden en que terminan los procesos.
+
+        El programa principal solo se parsea; su análisis (con requiere_main)
+        queda a cargo de quien llama. Los módulos que no se pudieron parsear o
+        que forman ciclos quedan para el camino secuencial, que reporta sus
+        errores igual que sin precarga.
+        """
+        principal = os.path.abspath(ruta)
+        with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+            # Oleadas de parseo: cada oleada son los módulos recién descubiertos
+            importaciones: Dict[str, List[str]] = {}  # Módulos parseados -> sus importaciones
+            vistos = {principal}
+            oleada = [principal]
+            while oleada:
+                pendientes = [r for r in oleada if r not in self.modulos]
+                for r, programa in zip(pendientes, ejecutor.map(_parsear_en_proceso, pendientes)):
+                    if programa is not None:
+                        self.cargas += 1
+                        self.registrar(r, programa)
+                descubiertos = []
+                for r in oleada:
+                    if r in self.modulos:
+                        importaciones[r] = [i for i in self.modulos[r].rutas_importadas() if os.path.exists(i)]
+                        for i in importaciones[r]:
+                            if i not in vistos:
+                                vistos.add(i)
+                                descubiertos.append(i)
+                oleada = descubiertos
+
+            # Análisis por niveles: un módulo está listo cuando sus dependencias lo están
+            listos = {r for r in importaciones if self.modulos[r].analizado}
+            restantes = sorted(r for r in importaciones if r != principal and r not in listos)
+            while restantes:
+                nivel = [r for r in restantes if all(i in listos for i in importaciones[r])]
+                if not nivel:
+                    break  # Ciclos o dependencias con errores de sintaxis
+                tareas = [(r, self.modulos[r].programa, self._firmas_de(importaciones[r])) for r in nivel]
+                for r, (programa, funciones, error) in zip(nivel, ejecutor.map(_analizar_en_proceso, tareas)):
+                    modulo = self.modulos[r]
+                    modulo.programa, modulo.funciones, modulo.error = programa, funciones, error
+                    self.analisis += 1
+                    listos.add(r)
+                restantes = [r for r in restantes if r not in listos]
+
+    def _firmas_de(self, rutas: List[str]) -> Dict[str, tuple]:
+        """Resultado del análisis (firmas, error) de cada dependencia"""
+        return {r: (self.modulos[r].funciones, self.modulos[r].error) for r in rutas}
+
+    def resumen(self) -> str:
+        return f"Módulos: {len(self.modulos)} registrados, {self.cargas} parseados, {self.analisis} analizados"
+
+
+# ============================================================================
+# TAREAS DE LOS PROCESOS DE PRECARGA
+# ============================================================================
+
+def _parsear_en_proceso(ruta: str) -> Optional[Programa]:
+    """Parsea un módulo; None si tiene errores (se reportan en el camino secuencial)"""
+    try:
+        return parsear_archivo(ruta)
+    except Exception:
+        return None
+
+
+def _analizar_en_proceso(tarea: tuple) -> tuple:
+    """Analiza un módulo con las firmas de sus dependencias; retorna (AST anotado, firmas, error)"""
+    ruta, programa, dependencias = tarea
+    # El registro del proceso solo contiene las dependencias ya analizadas
+    registro_modulos.modulos.clear()
+    for ruta_dependencia, (funciones, error) in dependencias.items():
+        dependencia = registro_modulos.registrar(ruta_dependencia, None)
+        dependencia.funciones, dependencia.error = funciones, error
+    modulo = registro_modulos.registrar(ruta, programa)
+    try:
+        registro_modulos.analizar(modulo)
+    except Exception:
+        pass
+    return modulo.programa, modulo.funciones, modulo.error
+
+
+# Registro compartido por el proceso (analizador, intérpretes y compilador)
+registro_modulos = RegistroModulos()
@@ -0,0 +1,64 @@
+"""
+Optimización del IR de Jade con el pass manager de LLVM
+Aplica el pipeline estándar de LLVM para -O1, -O2 o -O3 (mem2reg,
+instcombine, GVN, desenrollado y vectorización de bucles, inlining) sobre el
+módulo generado por GeneradorLLVM, y mide el tamaño del IR antes y después.
+"""
+
+from typing import Tuple
+
+from llvmlite import binding as llvm
+
+
+NIVELES_OPTIMIZACION = (0, 1, 2, 3)
+
+# Umbral de inlining por nivel (los valores por defecto de clang; -O1 usa el de LLVM)
+_UMBRAL_INLINING = {2: 225, 3: 250}
+
+
+class TamanoIR:
+    """Tamaño de un módulo LLVM: funciones definidas, instrucciones y allocas"""
+
+    def __init__(self, modulo):
+        self.funciones = 0
+        self.instrucciones = 0
+        self.allocas = 0
+        for funcion in modulo.functions:
+            if funcion.is_declaration:
+                continue
+            self.funciones += 1
+            for bloque in funcion.blocks:
+                for instruccion in bloque.instructions:
+                    self.instrucciones += 1
+                    if instruccion.opcode == 'alloca':
+                        self.allocas += 1
+        self.bytes = len(str(modulo))
+
+    def __str__(self):
+        return f"{self.instrucciones} instrucciones ({self.allocas} allocas), {self.bytes} bytes"
+
+
+def optimizar_modulo(modulo, maquina, nivel: int):
+    """Ejecuta el pipeline -O<nivel> sobre un módulo de llvmlite.binding"""
+    if nivel <= 0:
+        return
+    opciones = llvm.create_pipeline_tuning_options(speed_level=nivel)
+    opciones.loop_unrolling = nivel >= 2
+    opciones.loop_vectorization = nivel >= 2
+    opciones.slp_vectorization = nivel >= 2
+    if nivel in _UMBRAL_INLINING:
+        opciones.inlining_threshold = _UMBRAL_INLINING[nivel]
+    constructor = llvm.create_pass_builder(maquina, opciones)
+    constructor.getModulePassManager().run(modulo, constructor)
+
+
+def optimizar_ir(llvm_ir: str, nivel: int, maquina=None) -> Tuple[str, TamanoIR, TamanoIR]:
+    """Optimiza el IR en texto; retorna (IR optimizado, tamaño antes, tamaño después)"""
+    # Importación diferida: linker importa este módulo
+    from linker import crear_maquina_destino
+
+    modulo = llvm.parse_assembly(llvm_ir)
+    modulo.verify()
+    antes = TamanoIR(modulo)
+    optimizar_modulo(modulo, maquina or crear_maquina_destino(nivel), nivel)
+    return str(modulo), antes, TamanoIR(modulo)
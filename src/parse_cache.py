@@ -0,0 +1,135 @@
+"""
+Caché en disco de AST para módulos Jade
+Guarda el AST recién parseado de cada archivo .jde en un directorio
+__jadecache__ junto al archivo (como __pycache__), indexado por el hash del
+contenido y por la versión del compilador, de modo que los arranques en frío
+no vuelven a lexear ni parsear los módulos que no cambiaron.
+"""
+
+import hashlib
+import os
+import pickle
+from typing import Optional
+
+from ast_nodes import Programa
+from lexer import crear_lexer
+from parser import parsear_codigo
+from version import VERSION_JADE
+
+
+DIRECTORIO_CACHE = '__jadecache__'
+EXTENSION_CACHE = '.ast'
+
+# Módulos del front-end que determinan la forma del AST: si cambian, las
+# entradas guardadas dejan de ser válidas aunque VERSION_JADE no cambie
+_MODULOS_FRONTEND = ('token_types.py', 'lexer.py', 'fast_lexer.py', 'token_stream.py',
+                     'parser.py', 'ast_nodes.py')
+
+_TAMANO_LECTURA = 64 * 1024
+
+
+def _calcular_version_compilador(modulos: tuple = _MODULOS_FRONTEND) -> str:
+    """VERSION_JADE más un hash del código de los módulos del compilador indicados"""
+    resumen = hashlib.sha256(VERSION_JADE.encode('utf-8'))
+    directorio = os.path.dirname(os.path.abspath(__file__))
+    for nombre in modulos:
+        with open(os.path.join(directorio, nombre), 'rb') as f:
+            resumen.update(f.read())
+    return f"{VERSION_JADE}-{resumen.hexdigest()[:16]}"
+
+
+def huella_archivo(ruta: str) -> str:
+    """Hash SHA-256 del contenido del archivo, leído por bloques"""
+    resumen = hashlib.sha256()
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(_TAMANO_LECTURA), b''):
+            resumen.update(bloque)
+    return resumen.hexdigest()
+
+
+class CacheAST:
+    """Caché de AST por archivo con estadísticas de aciertos y fallos"""
+
+    def __init__(self, habilitada: bool = True):
+        self.habilitada = habilitada
+        self.version = None  # Se calcula al primer uso
+        self.aciertos = 0
+        self.fallos = 0
+        self.escrituras = 0
+        self.errores = 0  # Entradas ilegibles o directorios sin permiso de escritura
+
+    def ruta_entrada(self, ruta_fuente: str) -> str:
+        """Ruta del archivo de caché correspondiente a un archivo fuente"""
+        directorio, nombre = os.path.split(os.path.abspath(ruta_fuente))
+        return os.path.join(directorio, DIRECTORIO_CACHE, nombre + EXTENSION_CACHE)
+
+    def _clave(self, huella: str) -> tuple:
+        if self.version is None:
+            self.version = _calcular_version_compilador()
+        return (self.version, huella)
+
+    def obtener(self, ruta_fuente: str, huella: str) -> Optional[Programa]:
+        """Retorna el AST guardado si corresponde a esta huella y versión"""
+        try:
+            with open(self.ruta_entrada(ruta_fuente), 'rb') as f:
+                clave, programa = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            self.errores += 1
+            return None
+        return programa if clave == self._clave(huella) else None
+
+    def guardar(self, ruta_fuente: str, huella: str, programa: Programa):
+        """Guarda el AST (escritura atómica; los errores de E/S se ignoran)"""
+        destino = self.ruta_entrada(ruta_fuente)
+        temporal = f"{destino}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(destino), exist_ok=True)
+            with open(temporal, 'wb') as f:
+                pickle.dump((self._clave(huella), programa), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporal, destino)
+            self.escrituras += 1
+        except (OSError, pickle.PicklingError, RecursionError):
+            self.errores += 1
+            try:
+                os.remove(temporal)
+            except OSError:
+                pass
+
+    def parsear_archivo(self, ruta: str) -> Programa:
+        """Retorna el AST del archivo, desde la caché o lexeando y parseando"""
+        if not self.habilitada:
+            return _parsear(ruta)
+
+        huella = huella_archivo(ruta)
+        programa = self.obtener(ruta, huella)
+        if programa is not None:
+            self.aciertos += 1
+            return programa
+
+        self.fallos += 1
+        programa = _parsear(ruta)
+        # Se guarda antes del análisis semántico, que anota el árbol
+        self.guardar(ruta, huella, programa)
+        return programa
+
+    def resumen(self) -> str:
+        estado = "" if self.habilitada else " (deshabilitada)"
+        return (f"Caché de AST{estado}: {self.aciertos} aciertos, {self.fallos} fallos, "
+                f"{self.escrituras} escrituras, {self.errores} errores")
+
+
+def _parsear(ruta: str) -> Programa:
+    with open(ruta, 'r', encoding='utf-8') as f:
+        return parsear_codigo(crear_lexer(f).iterar_tokens())
+
+
+# Caché compartida por el proceso (intérprete, analizador y compilador).
+# JADE_CACHE=0 la deshabilita.
+cache_ast = CacheAST(habilitada=os.environ.get('JADE_CACHE', '1') != '0')
+
+
+def parsear_archivo(ruta: str) -> Programa:
+    """Retorna el AST de un archivo .jde usando la caché compartida"""
+    return cache_ast.parsear_archivo(ruta)
@@ -3,25 +3,37 @@ Parser (Analizador Sint├íctico) para Jade
 Construye un AST a partir de tokens
 """
 
-from typing import List, Optional
+from typing import Iterator, List, Optional, Union
 from token_types import Token, TokenType
+from token_stream import FlujoTokens, ListaTokens, TokensPerezosos
 from ast_nodes import *
 
 
 class Parser:
-    """Parser recursivo descendente para Jade"""
-    
-    def __init__(self, tokens: List[Token]):
-        self.tokens = tokens
+    """
+    Parser recursivo descendente para Jade
+    Consume una lista de Token, un FlujoTokens o un iterador de Token (por
+    ejemplo Lexer.iterar_tokens(), para parsear mientras se lee la fuente);
+    internamente trabaja con índices de token, así que con un FlujoTokens
+    nunca crea objetos Token.
+    """
+    
+    def __init__(self, tokens: Union[List[Token], FlujoTokens, Iterator[Token]]):
+        if isinstance(tokens, FlujoTokens):
+            self.tokens = tokens
+        elif isinstance(tokens, list):
+            self.tokens = ListaTokens(tokens)
+        else:
+            self.tokens = TokensPerezosos(tokens)
         self.posicion = 0
-        self.token_actual = self.tokens[0] if len(self.tokens) > 0 else None
+        self.tipo_actual = self.tokens.tipo(0) if self.tokens.existe(0) else None
     
     def error(self, mensaje: str):
         """Lanza un error de sintaxis"""
-        if self.token_actual:
+        if self.tipo_actual is not None:
             raise SyntaxError(
-                f"Error de sintaxis en l├¡nea {self.token_actual.linea}, "
-                f"columna {self.token_actual.columna}: {mensaje}"
+                f"Error de sintaxis en l├¡nea {self.tokens.linea(self.posicion)}, "
+                f"columna {self.tokens.columna(self.posicion)}: {mensaje}"
             )
         else:
             raise SyntaxError(f"Error de sintaxis: {mensaje}")
@@ -29,24 +41,34 @@ class Parser:
     def avanzar(self):
         """Avanza al siguiente token"""
         self.posicion += 1
-        if self.posicion < len(self.tokens):
-            self.token_actual = self.tokens[self.posicion]
+        if self.tokens.existe(self.posicion):
+            self.tipo_actual = self.tokens.tipo(self.posicion)
         else:
-            self.token_actual = None
+            self.tipo_actual = None
     
-    def esperar(self, tipo: TokenType) -> Token:
-        """Verifica que el token actual sea del tipo esperado y avanza"""
-        if not self.token_actual or self.token_actual.tipo != tipo:
-            self.error(f"Se esperaba {tipo.name}, pero se encontr├│ {self.token_actual.tipo.name if self.token_actual else 'EOF'}")
-        token = self.token_actual
+    def esperar(self, tipo: TokenType) -> int:
+        """Verifica que el token actual sea del tipo esperado, avanza y retorna su índice"""
+        if self.tipo_actual != tipo:
+            self.error(f"Se esperaba {tipo.name}, pero se encontr├│ {self.tipo_actual.name if self.tipo_actual is not None else 'EOF'}")
+        indice = self.posicion
         self.avanzar()
-        return token
+        return indice
     
     def verificar(self, *tipos: TokenType) -> bool:
         """Verifica si el token actual es de uno de los tipos dados"""
-        if not self.token_actual:
-            return False
-        return self.token_actual.tipo in tipos
+        return self.tipo_actual in tipos
+    
+    def valor(self, indice: int) -> str:
+        """Valor del token en el índice dado"""
+        return self.tokens.valor(indice)
+    
+    def ubicacion(self, indice: int) -> int:
+        """Posición empaquetada (línea, columna) del token en el índice dado"""
+        return empaquetar_posicion(self.tokens.linea(indice), self.tokens.columna(indice))
+    
+    def operador(self, indice: int) -> Operador:
+        """Operador compartido correspondiente al token en el índice dado"""
+        return obtener_operador(self.tokens.tipo(indice), self.tokens.valor(indice))
     
     # ========================================================================
     # PROGRAMA Y DECLARACIONES
@@ -56,10 +78,13 @@ class Parser:
         """Parsea el programa completo"""
         declaraciones = []
         
-        while self.token_actual and self.token_actual.tipo != TokenType.EOF:
+        while self.tipo_actual is not None and self.tipo_actual != TokenType.EOF:
             decl = self.declaracion_alto_nivel()
             if decl:
                 declaraciones.append(decl)
+            # Entre declaraciones no se vuelve a consultar tokens anteriores
+            if isinstance(self.tokens, TokensPerezosos):
+                self.tokens.liberar_hasta(self.posicion)
         
         return Programa(declaraciones)
     
@@ -74,20 +99,20 @@ class Parser:
         elif self.verificar(TokenType.ENUM):
             return self.declaracion_enum()
         else:
-            self.error(f"Declaración inesperada: {self.token_actual.valor}")
+            self.error(f"Declaración inesperada: {self.valor(self.posicion)}")
     
     def declaracion_enum(self) -> DeclaracionEnum:
         """Parsea una declaración de Enum"""
         token = self.esperar(TokenType.ENUM)
         nombre_token = self.esperar(TokenType.IDENTIFICADOR)
-        nombre = nombre_token.valor
+        nombre = self.valor(nombre_token)
         
         self.esperar(TokenType.LLAVE_IZQ)
         
         valores = []
         if not self.verificar(TokenType.LLAVE_DER):
             val_token = self.esperar(TokenType.IDENTIFICADOR)
-            valores.append(val_token.valor)
+            valores.append(self.valor(val_token))
             
             while self.verificar(TokenType.COMA):
                 self.avanzar()
@@ -95,23 +120,23 @@ class Parser:
                 if self.verificar(TokenType.LLAVE_DER):
                     break
                 val_token = self.esperar(TokenType.IDENTIFICADOR)
-                valores.append(val_token.valor)
+                valores.append(self.valor(val_token))
         
         self.esperar(TokenType.LLAVE_DER)
         
-        return DeclaracionEnum(nombre, valores, token)
+        return DeclaracionEnum(nombre, valores, self.ubicacion(token))
     
     def declaracion_importar(self) -> Importar:
         """Parsea una declaración de importación"""
         token = self.esperar(TokenType.IMPORTAR)
         ruta_token = self.esperar(TokenType.LITERAL_TEXTO)
-        return Importar(ruta_token.valor, token)
+        return Importar(self.valor(ruta_token), self.ubicacion(token))
     
     def declaracion_funcion(self) -> DeclaracionFuncion:
         """Parsea una declaraci├│n de funci├│n"""
         token_funcion = self.esperar(TokenType.FUNCION)
         nombre_token = self.esperar(TokenType.IDENTIFICADOR)
-        nombre = nombre_token.valor
+        nombre = self.valor(nombre_token)
         
         self.esperar(TokenType.PARENTESIS_IZQ)
         
@@ -133,7 +158,7 @@ class Parser:
         
         self.esperar(TokenType.FIN)
         
-        return DeclaracionFuncion(nombre, parametros, tipo_retorno, cuerpo, token_funcion)
+        return DeclaracionFuncion(nombre, parametros, tipo_retorno, cuerpo, self.ubicacion(token_funcion))
     
     def parametro(self) -> tuple:
         """Parsea un par├ímetro de funci├│n"""
@@ -143,11 +168,11 @@ class Parser:
         # Verificar si hay tipo expl├¡cito
         if self.verificar(TokenType.ENTERO, TokenType.FLOTANTE, TokenType.BOOLEANO, 
                           TokenType.TEXTO, TokenType.LISTA, TokenType.MAPA):
-            tipo = self.token_actual.valor
+            tipo = self.valor(self.posicion)
             self.avanzar()
         
         nombre_token = self.esperar(TokenType.IDENTIFICADOR)
-        nombre = nombre_token.valor
+        nombre = self.valor(nombre_token)
         
         return (nombre, tipo)
     
@@ -155,7 +180,7 @@ class Parser:
         """Parsea un bloque de statements"""
         statements = []
         
-        while (self.token_actual and 
+        while (self.tipo_actual is not None and 
                not self.verificar(TokenType.FIN, TokenType.SINO, TokenType.EOF)):
             stmt = self.statement()
             if stmt:
@@ -194,7 +219,7 @@ class Parser:
     def declaracion_variable(self) -> DeclaracionVariable:
         """Parsea declaraci├│n de variable o constante"""
         es_constante = self.verificar(TokenType.CONSTANTE)
-        token = self.token_actual
+        token = self.posicion
         self.avanzar()  # variable o constante
         
         # Puede ser: variable nombre = valor
@@ -204,49 +229,50 @@ class Parser:
         # Verificar tipo expl├¡cito
         if self.verificar(TokenType.ENTERO, TokenType.FLOTANTE, TokenType.BOOLEANO, 
                           TokenType.TEXTO, TokenType.LISTA, TokenType.MAPA):
-            tipo_dato = self.token_actual.valor
+            tipo_dato = self.valor(self.posicion)
             self.avanzar()
         
         nombre_token = self.esperar(TokenType.IDENTIFICADOR)
-        nombre = nombre_token.valor
+        nombre = self.valor(nombre_token)
         
         # Valor inicial (requerido)
         self.esperar(TokenType.ASIGNAR)
         valor = self.expresion()
         
-        return DeclaracionVariable(nombre, tipo_dato, valor, es_constante, token)
+        return DeclaracionVariable(nombre, tipo_dato, valor, es_constante, self.ubicacion(token))
     
     def asignacion_o_expresion(self) -> Statement:
         """Parsea asignaci├│n o expresi├│n que empieza con identificador"""
         # Mirar adelante para ver si es asignaci├│n
-        if self.posicion + 1 < len(self.tokens):
-            siguiente = self.tokens[self.posicion + 1]
-            if siguiente.tipo in (TokenType.ASIGNAR, TokenType.MAS_IGUAL, 
+        if self.tokens.existe(self.posicion + 1):
+            siguiente = self.tokens.tipo(self.posicion + 1)
+            if siguiente in (TokenType.ASIGNAR, TokenType.MAS_IGUAL, 
                                  TokenType.MENOS_IGUAL, TokenType.MULTIPLICAR_IGUAL, 
                                  TokenType.DIVIDIR_IGUAL):
                 # Es asignaci├│n simple
-                nombre = self.token_actual.valor
+                nombre = self.valor(self.posicion)
                 self.avanzar()
-                operador = self.token_actual
+                operador = self.posicion
                 self.avanzar()
                 valor = self.expresion()
-                return Asignacion(nombre, valor, operador)
-            elif siguiente.tipo == TokenType.CORCHETE_IZQ:
+                return Asignacion(nombre, valor, self.operador(operador), self.ubicacion(operador))
+            elif siguiente == TokenType.CORCHETE_IZQ:
                 # Podr├¡a ser asignaci├│n a ├¡ndice: arr[i] = valor
-                objeto = Identificador(self.token_actual.valor, self.token_actual)
+                token_objeto = self.posicion
+                objeto = Identificador(self.valor(token_objeto), self.ubicacion(token_objeto))
                 self.avanzar()
                 self.esperar(TokenType.CORCHETE_IZQ)
                 indice = self.expresion()
                 self.esperar(TokenType.CORCHETE_DER)
                 
                 if self.verificar(TokenType.ASIGNAR):
-                    token_asig = self.token_actual
+                    token_asig = self.posicion
                     self.avanzar()
                     valor = self.expresion()
-                    return AsignacionIndice(objeto, indice, valor, token_asig)
+                    return AsignacionIndice(objeto, indice, valor, self.ubicacion(token_asig))
                 else:
                     # Es solo acceso a ├¡ndice como expresi├│n
-                    acc = AccesoIndice(objeto, indice, objeto.token)
+                    acc = AccesoIndice(objeto, indice, self.ubicacion(token_objeto))
                     return ExpresionStatement(acc)
         
         # Es solo una expresi├│n
@@ -276,7 +302,7 @@ class Parser:
                     bloque_sino.append(self.statement())
         
         self.esperar(TokenType.FIN)
-        return Si(condicion, bloque_entonces, bloque_sino, token_si)
+        return Si(condicion, bloque_entonces, bloque_sino, self.ubicacion(token_si))
     
     def statement_mientras(self) -> Mientras:
         """Parsea statement mientras"""
@@ -288,13 +314,13 @@ class Parser:
         
         self.esperar(TokenType.FIN)
         
-        return Mientras(condicion, cuerpo, token_mientras)
+        return Mientras(condicion, cuerpo, self.ubicacion(token_mientras))
     
     def statement_para(self) -> Para:
         """Parsea statement para"""
         token_para = self.esperar(TokenType.PARA)
         
-        nombre_var = self.esperar(TokenType.IDENTIFICADOR).valor
+        nombre_var = self.valor(self.esperar(TokenType.IDENTIFICADOR))
         
         self.esperar(TokenType.DESDE)
         inicio = self.expresion()
@@ -308,7 +334,7 @@ class Parser:
         
         self.esperar(TokenType.FIN)
         
-        return Para(nombre_var, inicio, fin, cuerpo, token_para)
+        return Para(nombre_var, inicio, fin, cuerpo, self.ubicacion(token_para))
     
     def statement_retornar(self) -> Retornar:
         """Parsea statement retornar"""
@@ -318,17 +344,17 @@ class Parser:
         if not self.verificar(TokenType.FIN, TokenType.EOF, TokenType.SINO):
             valor = self.expresion()
         
-        return Retornar(valor, token)
+        return Retornar(valor, self.ubicacion(token))
     
     def statement_romper(self) -> Romper:
         """Parsea statement romper"""
         token = self.esperar(TokenType.ROMPER)
-        return Romper(token)
+        return Romper(self.ubicacion(token))
     
     def statement_continuar(self) -> Continuar:
         """Parsea statement continuar"""
         token = self.esperar(TokenType.CONTINUAR)
-        return Continuar(token)
+        return Continuar(self.ubicacion(token))
     
     # ========================================================================
     # EXPRESIONES (con precedencia)
@@ -343,10 +369,10 @@ class Parser:
         izq = self.expresion_logica_y()
         
         while self.verificar(TokenType.O):
-            op = self.token_actual
+            op = self.posicion
             self.avanzar()
             der = self.expresion_logica_y()
-            izq = ExpresionBinaria(izq, op, der)
+            izq = ExpresionBinaria(izq, self.operador(op), der, self.ubicacion(op))
         
         return izq
     
@@ -355,10 +381,10 @@ class Parser:
         izq = self.expresion_igualdad()
         
         while self.verificar(TokenType.Y):
-            op = self.token_actual
+            op = self.posicion
             self.avanzar()
             der = self.expresion_igualdad()
-            izq = ExpresionBinaria(izq, op, der)
+            izq = ExpresionBinaria(izq, self.operador(op), der, self.ubicacion(op))
         
         return izq
     
@@ -367,10 +393,10 @@ class Parser:
         izq = self.expresion_comparacion()
         
         while self.verificar(TokenType.IGUAL, TokenType.DIFERENTE):
-            op = self.token_actual
+            op = self.posicion
             self.avanzar()
             der = self.expresion_comparacion()
-            izq = ExpresionBinaria(izq, op, der)
+            izq = ExpresionBinaria(izq, self.operador(op), der, self.ubicacion(op))
         
         return izq
     
@@ -380,10 +406,10 @@ class Parser:
         
         while self.verificar(TokenType.MENOR, TokenType.MAYOR, 
                             TokenType.MENOR_IGUAL, TokenType.MAYOR_IGUAL):
-            op = self.token_actual
+            op = self.posicion
             self.avanzar()
             der = self.expresion_aditiva()
-            izq = ExpresionBinaria(izq, op, der)
+            izq = ExpresionBinaria(izq, self.operador(op), der, self.ubicacion(op))
         
         return izq
     
@@ -392,10 +418,10 @@ class Parser:
         izq = self.expresion_multiplicativa()
         
         while self.verificar(TokenType.MAS, TokenType.MENOS):
-            op = self.token_actual
+            op = self.posicion
             self.avanzar()
             der = self.expresion_multiplicativa()
-            izq = ExpresionBinaria(izq, op, der)
+            izq = ExpresionBinaria(izq, self.operador(op), der, self.ubicacion(op))
         
         return izq
     
@@ -404,10 +430,10 @@ class Parser:
         izq = self.expresion_potencia()
         
         while self.verificar(TokenType.MULTIPLICAR, TokenType.DIVIDIR, TokenType.MODULO):
-            op = self.token_actual
+            op = self.posicion
             self.avanzar()
             der = self.expresion_potencia()
-            izq = ExpresionBinaria(izq, op, der)
+            izq = ExpresionBinaria(izq, self.operador(op), der, self.ubicacion(op))
         
         return izq
     
@@ -416,21 +442,21 @@ class Parser:
         izq = self.expresion_unaria()
         
         if self.verificar(TokenType.POTENCIA):
-            op = self.token_actual
+            op = self.posicion
             self.avanzar()
             # Potencia es asociativa a la derecha
             der = self.expresion_potencia()
-            return ExpresionBinaria(izq, op, der)
+            return ExpresionBinaria(izq, self.operador(op), der, self.ubicacion(op))
         
         return izq
     
     def expresion_unaria(self) -> Expresion:
         """Parsea expresiones unarias"""
         if self.verificar(TokenType.MENOS, TokenType.NO):
-            op = self.token_actual
+            op = self.posicion
             self.avanzar()
             expr = self.expresion_unaria()
-            return ExpresionUnaria(op, expr)
+            return ExpresionUnaria(self.operador(op), expr, self.ubicacion(op))
         
         return self.expresion_postfija()
     
@@ -441,7 +467,7 @@ class Parser:
         while True:
             if self.verificar(TokenType.PARENTESIS_IZQ):
                 # Llamada a funci├│n
-                token = self.token_actual
+                token = self.posicion
                 self.avanzar()
                 
                 argumentos = []
@@ -455,23 +481,23 @@ class Parser:
                 
                 # expr debe ser un identificador
                 if isinstance(expr, Identificador):
-                    expr = LlamadaFuncion(expr.nombre, argumentos, token)
+                    expr = LlamadaFuncion(expr.nombre, argumentos, self.ubicacion(token))
                 else:
                     self.error("Solo se puede llamar a funciones con nombre")
             
             elif self.verificar(TokenType.CORCHETE_IZQ):
                 # Acceso a índice
-                token = self.token_actual
+                token = self.posicion
                 self.avanzar()
                 indice = self.expresion()
                 self.esperar(TokenType.CORCHETE_DER)
-                expr = AccesoIndice(expr, indice, token)
+                expr = AccesoIndice(expr, indice, self.ubicacion(token))
             
             elif self.verificar(TokenType.PUNTO):
                 # Acceso a miembro (método o propiedad)
                 self.avanzar()
                 token_nombre = self.esperar(TokenType.IDENTIFICADOR)
-                nombre_miembro = token_nombre.valor
+                nombre_miembro = self.valor(token_nombre)
                 
                 # Verificar si es llamada a método
                 if self.verificar(TokenType.PARENTESIS_IZQ):
@@ -484,10 +510,10 @@ class Parser:
                             argumentos.append(self.expresion())
                     self.esperar(TokenType.PARENTESIS_DER)
                     
-                    expr = LlamadaMetodo(expr, nombre_miembro, argumentos, token_nombre)
+                    expr = LlamadaMetodo(expr, nombre_miembro, argumentos, self.ubicacion(token_nombre))
                 else:
                     # Es acceso a propiedad (campo o enum value)
-                    expr = AccesoPropiedad(expr, nombre_miembro, token_nombre)
+                    expr = AccesoPropiedad(expr, nombre_miembro, self.ubicacion(token_nombre))
             
             else:
                 break
@@ -498,46 +524,46 @@ class Parser:
         """Parsea expresiones primarias (literales, identificadores, etc.)"""
         # Literales num├®ricos
         if self.verificar(TokenType.LITERAL_ENTERO):
-            token = self.token_actual
-            valor = int(token.valor)
+            token = self.posicion
+            valor = int(self.valor(token))
             self.avanzar()
-            return LiteralEntero(valor, token)
+            return LiteralEntero(valor, self.ubicacion(token))
         
         if self.verificar(TokenType.LITERAL_FLOTANTE):
-            token = self.token_actual
-            valor = float(token.valor)
+            token = self.posicion
+            valor = float(self.valor(token))
             self.avanzar()
-            return LiteralFlotante(valor, token)
+            return LiteralFlotante(valor, self.ubicacion(token))
         
         # Literales de texto
         if self.verificar(TokenType.LITERAL_TEXTO):
-            token = self.token_actual
+            token = self.posicion
             self.avanzar()
-            return LiteralTexto(token.valor, token)
+            return LiteralTexto(self.valor(token), self.ubicacion(token))
         
         # Booleanos
         if self.verificar(TokenType.VERDADERO):
-            token = self.token_actual
+            token = self.posicion
             self.avanzar()
-            return LiteralBooleano(True, token)
+            return LiteralBooleano(True, self.ubicacion(token))
         
         if self.verificar(TokenType.FALSO):
-            token = self.token_actual
+            token = self.posicion
             self.avanzar()
-            return LiteralBooleano(False, token)
+            return LiteralBooleano(False, self.ubicacion(token))
         
         # Nulo
         if self.verificar(TokenType.NULO):
-            token = self.token_actual
+            token = self.posicion
             self.avanzar()
-            return LiteralNulo(token)
+            return LiteralNulo(self.ubicacion(token))
         
         # Identificadores
         if self.verificar(TokenType.IDENTIFICADOR):
-            token = self.token_actual
-            nombre = token.valor
+            token = self.posicion
+            nombre = self.valor(token)
             self.avanzar()
-            return Identificador(nombre, token)
+            return Identificador(nombre, self.ubicacion(token))
         
         # Listas
         if self.verificar(TokenType.CORCHETE_IZQ):
@@ -554,7 +580,7 @@ class Parser:
             self.esperar(TokenType.PARENTESIS_DER)
             return expr
         
-        self.error(f"Expresi├│n inesperada: {self.token_actual.valor if self.token_actual else 'EOF'}")
+        self.error(f"Expresi├│n inesperada: {self.valor(self.posicion) if self.tipo_actual is not None else 'EOF'}")
     
     def expresion_lista(self) -> LiteralLista:
         """Parsea literal de lista [1, 2, 3]"""
@@ -570,7 +596,7 @@ class Parser:
                 elementos.append(self.expresion())
         
         self.esperar(TokenType.CORCHETE_DER)
-        return LiteralLista(elementos, token)
+        return LiteralLista(elementos, self.ubicacion(token))
     
     def expresion_mapa(self) -> LiteralMapa:
         """Parsea literal de mapa {clave: valor}"""
@@ -594,10 +620,10 @@ class Parser:
                 pares.append((clave, valor))
         
         self.esperar(TokenType.LLAVE_DER)
-        return LiteralMapa(pares, token)
+        return LiteralMapa(pares, self.ubicacion(token))
 
 
-def parsear_codigo(tokens: List[Token]) -> Programa:
+def parsear_codigo(tokens: Union[List[Token], FlujoTokens, Iterator[Token]]) -> Programa:
     """Funci├│n de utilidad para parsear tokens"""
     parser = Parser(tokens)
     return parser.parsear()
@@ -0,0 +1,187 @@
+"""
+Resolutor de variables para Jade
+Pasada posterior al análisis semántico que asigna a cada Identificador,
+Asignacion, DeclaracionVariable y Para una coordenada (profundidad, slot).
+Los backends usan el slot para acceder a las variables por índice en lugar
+de buscarlas por nombre.
+"""
+
+from typing import Dict, List
+from ast_nodes import *
+
+
+# Jade no tiene funciones anidadas: una variable es local de la función que
+# se está ejecutando o pertenece a la tabla global (enums)
+PROFUNDIDAD_LOCAL = 0
+PROFUNDIDAD_GLOBAL = 1
+
+
+class Resolutor:
+    """Resuelve nombres de variables a coordenadas (profundidad, slot)"""
+
+    def __init__(self):
+        self.globales: Dict[str, int] = {}  # nombre -> slot global
+        self.slots: Dict[str, int] = {}     # nombre -> slot local (función actual)
+        self.locales: List[str] = []        # nombre de cada slot local
+
+    # ========================================================================
+    # PROGRAMA
+    # ========================================================================
+
+    def resolver_programa(self, programa: Programa):
+        """Declara los globales del programa y resuelve todas sus funciones"""
+        for decl in programa.declaraciones:
+            if isinstance(decl, DeclaracionEnum):
+                self.declarar_global(decl.nombre)
+
+        for decl in programa.declaraciones:
+            if isinstance(decl, DeclaracionFuncion):
+                self.resolver_funcion(decl)
+
+    def declarar_global(self, nombre: str) -> int:
+        """Retorna (o reserva) el slot de una variable global"""
+        if nombre not in self.globales:
+            self.globales[nombre] = len(self.globales)
+        return self.globales[nombre]
+
+    def resolver_funcion(self, func: DeclaracionFuncion):
+        """
+        Asigna un slot a cada variable de la función. Los parámetros ocupan
+        los primeros slots; cualquier nombre declarado o asignado en el cuerpo
+        es local en toda la función (los bloques no crean scopes en tiempo de
+        ejecución). Deja en func.locales el nombre de cada slot.
+        """
+        self.slots = {}
+        self.locales = []
+
+        for nombre, _ in func.parametros:
+            self._slot(nombre)
+        self._recolectar_locales(func.cuerpo)
+        self._bloque(func.cuerpo)
+
+        func.locales = self.locales
+
+    # ========================================================================
+    # SLOTS
+    # ========================================================================
+
+    def _slot(self, nombre: str) -> int:
+        """Retorna (o reserva) el slot de una variable local"""
+        if nombre not in self.slots:
+            self.slots[nombre] = len(self.locales)
+            self.locales.append(nombre)
+        return self.slots[nombre]
+
+    def _recolectar_locales(self, statements: list):
+        """Reserva slots para todas las variables escritas en la función"""
+        for stmt in statements:
+            if isinstance(stmt, (DeclaracionVariable, Asignacion)):
+                self._slot(stmt.nombre)
+            elif isinstance(stmt, Para):
+                self._slot(stmt.variable)
+                self._recolectar_locales(stmt.cuerpo)
+            elif isinstance(stmt, Mientras):
+                self._recolectar_locales(stmt.cuerpo)
+            elif isinstance(stmt, Si):
+                self._recolectar_locales(stmt.bloque_entonces)
+                if stmt.bloque_sino:
+                    self._recolectar_locales(stmt.bloque_sino)
+
+    def _anotar(self, nodo, nombre: str):
+        """Escribe la coordenada de 'nombre' en el nodo"""
+        if nombre in self.slots:
+            nodo.profundidad = PROFUNDIDAD_LOCAL
+            nodo.slot = self.slots[nombre]
+        elif nombre in self.globales:
+            nodo.profundidad = PROFUNDIDAD_GLOBAL
+            nodo.slot = self.globales[nombre]
+        else:
+            # Nombre no definido: los backends reportan el error al usarlo
+            nodo.profundidad = None
+            nodo.slot = None
+
+    # ========================================================================
+    # STATEMENTS
+    # ========================================================================
+
+    def _bloque(self, statements: list):
+        for stmt in statements:
+            self._statement(stmt)
+
+    def _statement(self, stmt: Statement):
+        if isinstance(stmt, DeclaracionVariable):
+            if stmt.valor_inicial is not None:
+                self._expresion(stmt.valor_inicial)
+            self._anotar(stmt, stmt.nombre)
+
+        elif isinstance(stmt, Asignacion):
+            self._expresion(stmt.valor)
+            self._anotar(stmt, stmt.nombre)
+
+        elif isinstance(stmt, AsignacionIndice):
+            self._expresion(stmt.objeto)
+            self._expresion(stmt.indice)
+            self._expresion(stmt.valor)
+
+        elif isinstance(stmt, Si):
+            self._expresion(stmt.condicion)
+            self._bloque(stmt.bloque_entonces)
+            if stmt.bloque_sino:
+                self._bloque(stmt.bloque_sino)
+
+        elif isinstance(stmt, Mientras):
+            self._expresion(stmt.condicion)
+            self._bloque(stmt.cuerpo)
+
+        elif isinstance(stmt, Para):
+            self._expresion(stmt.inicio)
+            self._expresion(stmt.fin)
+            self._anotar(stmt, stmt.variable)
+            self._bloque(stmt.cuerpo)
+
+        elif isinstance(stmt, Retornar):
+            if stmt.valor is not None:
+                self._expresion(stmt.valor)
+
+        elif isinstance(stmt, ExpresionStatement):
+            self._expresion(stmt.expresion)
+
+    # ========================================================================
+    # EXPRESIONES
+    # ========================================================================
+
+    def _expresion(self, expr: Expresion):
+        if isinstance(expr, Identificador):
+            self._anotar(expr, expr.nombre)
+
+        elif isinstance(expr, ExpresionBinaria):
+            self._expresion(expr.izquierda)
+            self._expresion(expr.derecha)
+
+        elif isinstance(expr, ExpresionUnaria):
+            self._expresion(expr.expresion)
+
+        elif isinstance(expr, LlamadaFuncion):
+            for arg in expr.argumentos:
+                self._expresion(arg)
+
+        elif isinstance(expr, LlamadaMetodo):
+            self._expresion(expr.objeto)
+            for arg in expr.argumentos:
+                self._expresion(arg)
+
+        elif isinstance(expr, AccesoIndice):
+            self._expresion(expr.objeto)
+            self._expresion(expr.indice)
+
+        elif isinstance(expr, AccesoPropiedad):
+            self._expresion(expr.objeto)
+
+        elif isinstance(expr, LiteralLista):
+            for elemento in expr.elementos:
+                self._expresion(elemento)
+
+        elif isinstance(expr, LiteralMapa):
+            for clave, valor in expr.pares:
+                self._expresion(clave)
+                self._expresion(valor)
@@ -11,7 +11,7 @@ from token_types import TokenType
 from builtin_functions import es_funcion_builtin, obtener_funcion_builtin
 
 # Importaciones diferidas para evitar ciclos circulares en tiempo de carga
-# Se importarán dentro de los métodos cuando sea necesario
+# Se importarán dentro de los métodos cuando sea necesario (module_loader)
 
 
 class TablaSimbolos:
@@ -67,15 +67,15 @@ class AnalizadorSemantico:
     
     def error(self, mensaje: str, nodo=None):
         """Registra un error semántico"""
-        if hasattr(nodo, 'token'):
+        if nodo is not None and nodo.linea:
             self.errores.append(
-                f"Error semántico en línea {nodo.token.linea}: {mensaje}"
+                f"Error semántico en línea {nodo.linea}: {mensaje}"
             )
         else:
             self.errores.append(f"Error semántico: {mensaje}")
     
-    def analizar(self, programa: Programa):
-        """Analiza el programa completo"""
+    def analizar(self, programa: Programa, requiere_main: bool = True):
+        """Analiza el programa completo (los módulos importados no requieren main)"""
         # Primera pasada: registrar funciones e imports
         for decl in programa.declaraciones:
             if isinstance(decl, DeclaracionFuncion):
@@ -93,7 +93,7 @@ class AnalizadorSemantico:
                 self.analizar_declaracion_variable(decl)
         
         # Verificar que existe función main
-        if 'main' not in self.funciones:
+        if requiere_main and 'main' not in self.funciones:
             self.error("El programa debe tener una función 'main'")
         
         if self.errores:
@@ -101,44 +101,31 @@ class AnalizadorSemantico:
     
     def analizar_importar(self, imp: Importar):
         """Analiza y carga un módulo importado"""
+        # Importación diferida: module_loader importa este módulo
+        from module_loader import registro_modulos
+        
         # Resolver ruta absoluta
-        dir_actual = os.path.dirname(self.archivo_actual)
-        ruta_abs = os.path.abspath(os.path.join(dir_actual, imp.ruta))
+        ruta_abs = registro_modulos.resolver_ruta(self.archivo_actual, imp.ruta)
         
         # Verificar existencia
         if not os.path.exists(ruta_abs):
             self.error(f"No se encuentra el módulo '{imp.ruta}'", imp)
             return
             
-        # Evitar ciclos y re-importaciones
+        # Evitar re-importaciones dentro de este archivo
         if ruta_abs in self.archivos_importados:
             return
         
         self.archivos_importados.add(ruta_abs)
         
         try:
-            # Cargar y parsear módulo
-            with open(ruta_abs, 'r', encoding='utf-8') as f:
-                codigo = f.read()
-            
-            # Importaciones locales para evitar ciclos
-            from lexer import tokenizar_codigo
-            from parser import parsear_codigo
-            
-            tokens = tokenizar_codigo(codigo)
-            modulo_ast = parsear_codigo(tokens)
-            
-            # Analizar módulo recursivamente
-            analizador_modulo = AnalizadorSemantico(ruta_abs)
-            # Compartir el set de archivos importados para detectar ciclos globales
-            analizador_modulo.archivos_importados = self.archivos_importados
-            
-            # Analizar (esto registrará las funciones del módulo)
-            analizador_modulo.analizar(modulo_ast)
+            # El registro parsea y analiza cada módulo una sola vez por proceso;
+            # un módulo en pleno análisis (ciclo) llega sin firmas
+            modulo = registro_modulos.analizar(registro_modulos.cargar(ruta_abs))
             
             # Fusionar funciones del módulo en el scope actual
             # Nota: No fusionamos variables globales por ahora para evitar conflictos
-            for nombre, firma in analizador_modulo.funciones.items():
+            for nombre, firma in (modulo.funciones or {}).items():
                 if nombre not in self.funciones:
                     self.funciones[nombre] = firma
                 elif nombre != 'main': # Ignorar main de módulos
@@ -147,9 +134,6 @@ class AnalizadorSemantico:
                     
         except Exception as e:
             self.error(f"Error al importar '{imp.ruta}': {str(e)}", imp)
-        
-        except Exception as e:
-            self.error(f"Error al importar '{imp.ruta}': {str(e)}", imp)
     
     def registrar_funcion(self, func: DeclaracionFuncion):
         """Registra una función en la tabla de símbolos global"""
@@ -157,6 +141,26 @@ class AnalizadorSemantico:
             self.error(f"Función '{func.nombre}' ya está definida", func)
             return
         
+        # Parámetros sin tipo explícito quedan como desconocidos
+        tipos_params = []
+        for nombre, tipo_nombre in func.parametros:
+            tipo = Tipo.desde_nombre(tipo_nombre) if tipo_nombre else TIPO_DESCONOCIDO
+            tipos_params.append((nombre, tipo))
+        
+        tipo_retorno = Tipo.desde_nombre(func.tipo_retorno) if func.tipo_retorno else TIPO_DESCONOCIDO
+        self.funciones[func.nombre] = (tipos_params, tipo_retorno)
+    
+    def registrar_enum(self, enum: DeclaracionEnum):
+        """Registra un Enum como símbolo global (Color.ROJO)"""
+        try:
+            self.scope_actual.definir(enum.nombre, Tipo(TipoDato.DESCONOCIDO))
+        except NameError as e:
+            self.error(str(e), enum)
+    
+    def analizar_funcion(self, func: DeclaracionFuncion):
+        """Analiza el cuerpo de una función"""
+        self.en_funcion = func.nombre
+        
         # Crear nuevo scope para la función
         self.scope_actual = self.scope_actual.crear_hijo()
         
@@ -179,6 +183,10 @@ class AnalizadorSemantico:
             self.analizar_declaracion_variable(stmt)
         elif isinstance(stmt, Asignacion):
             self.analizar_asignacion(stmt)
+        elif isinstance(stmt, AsignacionIndice):
+            self.analizar_expresion(stmt.objeto)
+            self.analizar_expresion(stmt.indice)
+            self.analizar_expresion(stmt.valor)
         elif isinstance(stmt, Si):
             self.analizar_si(stmt)
         elif isinstance(stmt, Mientras):
@@ -243,7 +251,7 @@ class AnalizadorSemantico:
         """Analiza statement condicional"""
         # Analizar condición
         tipo_cond = self.analizar_expresion(si.condicion)
-        if tipo_cond.tipo_base != TipoDato.BOOLEANO:
+        if tipo_cond.tipo_base != TipoDato.BOOLEANO and not es_desconocido(tipo_cond):
             self.error(f"Condición debe ser booleana, no {tipo_cond}", si)
         
         # Analizar bloque entonces
@@ -262,7 +270,7 @@ class AnalizadorSemantico:
     def analizar_mientras(self, mientras: Mientras):
         """Analiza bucle mientras"""
         tipo_cond = self.analizar_expresion(mientras.condicion)
-        if tipo_cond.tipo_base != TipoDato.BOOLEANO:
+        if tipo_cond.tipo_base != TipoDato.BOOLEANO and not es_desconocido(tipo_cond):
             self.error(f"Condición debe ser booleana, no {tipo_cond}", mientras)
         
         self.en_bucle = True
@@ -278,9 +286,9 @@ class AnalizadorSemantico:
         tipo_inicio = self.analizar_expresion(para.inicio)
         tipo_fin = self.analizar_expresion(para.fin)
         
-        if tipo_inicio.tipo_base != TipoDato.ENTERO:
+        if tipo_inicio.tipo_base != TipoDato.ENTERO and not es_desconocido(tipo_inicio):
             self.error("Valor inicial del bucle 'para' debe ser entero", para)
-        if tipo_fin.tipo_base != TipoDato.ENTERO:
+        if tipo_fin.tipo_base != TipoDato.ENTERO and not es_desconocido(tipo_fin):
             self.error("Valor final del bucle 'para' debe ser entero", para)
         
         # Crear scope con variable de bucle
@@ -371,7 +379,7 @@ class AnalizadorSemantico:
             tipo_indice = self.analizar_expresion(expr.indice)
             
             if isinstance(tipo_obj, TipoLista):
-                if tipo_indice.tipo_base != TipoDato.ENTERO:
+                if tipo_indice.tipo_base != TipoDato.ENTERO and not es_desconocido(tipo_indice):
                     self.error(f"Índice de lista debe ser entero, no {tipo_indice}", expr)
                 tipo_resultado = tipo_obj.tipo_elemento
             
@@ -401,34 +409,6 @@ class AnalizadorSemantico:
     def analizar_metodo(self, llamada: LlamadaMetodo) -> Tipo:
         """Analiza llamada a método"""
         tipo_obj = self.analizar_expresion(llamada.objeto)
-
-    def analizar_acceso_propiedad(self, acceso: AccesoPropiedad) -> Tipo:
-        """Analiza acceso a propiedad (ej: Enum.VALOR)"""
-        # Por ahora solo soportamos Enums
-        # El objeto debe ser un identificador que refiere a un TipoEnum
-        
-        # Caso especial: Acceso estático a Enum (Color.ROJO)
-        # En este caso 'Color' es un identificador que se resuelve a un TIPO, no a una variable
-        # Pero nuestro sistema de tipos actual trata los tipos como valores en la tabla de símbolos
-        
-        if isinstance(acceso.objeto, Identificador):
-            # Buscar si es un Enum
-            simbolo = self.scope_actual.buscar(acceso.objeto.nombre)
-            
-            # Si encontramos el símbolo y es un Tipo (que representa al Enum)
-            if simbolo and isinstance(simbolo, Tipo):
-                # Es un acceso a Enum
-                # Verificar que la propiedad es válida
-                # TODO: Necesitamos saber los valores válidos del Enum. 
-                # Por simplicidad, asumimos que si es un tipo válido, el acceso es válido
-                # y retorna una instancia de ese mismo tipo.
-                # En una implementación completa, verificaríamos contra la lista de valores.
-                return simbolo
-        
-        # Si llegamos aquí, intentamos analizarlo como expresión normal
-        tipo_obj = self.analizar_expresion(acceso.objeto)
-        self.error(f"No se puede acceder a propiedad '{acceso.propiedad}' en {tipo_obj}", acceso)
-        return TIPO_DESCONOCIDO
         
         # Analizar argumentos
         for arg in llamada.argumentos:
@@ -489,9 +469,69 @@ class AnalizadorSemantico:
                 self.error(f"Mapa no tiene método '{llamada.nombre_metodo}'", llamada)
                 return TIPO_DESCONOCIDO
         
+        elif tipo_obj.tipo_base == TipoDato.TEXTO:
+            if llamada.nombre_metodo in ('longitud',):
+                return TIPO_ENTERO
+            elif llamada.nombre_metodo in ('mayusculas', 'minusculas', 'recortar', 'reemplazar'):
+                return TIPO_TEXTO
+            elif llamada.nombre_metodo == 'contiene':
+                return TIPO_BOOLEANO
+            elif llamada.nombre_metodo == 'dividir':
+                return TipoLista(TIPO_TEXTO)
+            else:
+                self.error(f"Texto no tiene método '{llamada.nombre_metodo}'", llamada)
+                return TIPO_DESCONOCIDO
+        
+        elif tipo_obj.tipo_base == TipoDato.CONSTRUCTOR_TEXTO:
+            if llamada.nombre_metodo == 'agregar':
+                if len(llamada.argumentos) != 1:
+                    self.error("Método 'agregar' requiere 1 argumento", llamada)
+                elif llamada.argumentos[0].tipo.tipo_base not in (TipoDato.TEXTO, TipoDato.DESCONOCIDO):
+                    self.error(f"Método 'agregar' requiere un texto, no {llamada.argumentos[0].tipo}", llamada)
+                return TIPO_NULO
+            elif llamada.nombre_metodo in ('construir', 'longitud'):
+                if len(llamada.argumentos) != 0:
+                    self.error(f"Método '{llamada.nombre_metodo}' no acepta argumentos", llamada)
+                return TIPO_TEXTO if llamada.nombre_metodo == 'construir' else TIPO_ENTERO
+            else:
+                self.error(f"Constructor de texto no tiene método '{llamada.nombre_metodo}'", llamada)
+                return TIPO_DESCONOCIDO
+        
+        elif es_desconocido(tipo_obj):
+            # Sin información de tipo (ej: parámetro sin anotar)
+            return TIPO_DESCONOCIDO
+        
         self.error(f"Tipo {tipo_obj} no soporta métodos", llamada)
         return TIPO_DESCONOCIDO
     
+    def analizar_acceso_propiedad(self, acceso: AccesoPropiedad) -> Tipo:
+        """Analiza acceso a propiedad (ej: Enum.VALOR)"""
+        # Por ahora solo soportamos Enums
+        # El objeto debe ser un identificador que refiere a un TipoEnum
+        
+        # Caso especial: Acceso estático a Enum (Color.ROJO)
+        # En este caso 'Color' es un identificador que se resuelve a un TIPO, no a una variable
+        # Pero nuestro sistema de tipos actual trata los tipos como valores en la tabla de símbolos
+        
+        if isinstance(acceso.objeto, Identificador):
+            # Buscar si es un Enum
+            simbolo = self.scope_actual.buscar(acceso.objeto.nombre)
+            
+            # Si encontramos el símbolo y es un Tipo (que representa al Enum)
+            if simbolo and isinstance(simbolo, Tipo):
+                # Es un acceso a Enum
+                # Verificar que la propiedad es válida
+                # TODO: Necesitamos saber los valores válidos del Enum. 
+                # Por simplicidad, asumimos que si es un tipo válido, el acceso es válido
+                # y retorna una instancia de ese mismo tipo.
+                # En una implementación completa, verificaríamos contra la lista de valores.
+                return simbolo
+        
+        # Si llegamos aquí, intentamos analizarlo como expresión normal
+        tipo_obj = self.analizar_expresion(acceso.objeto)
+        self.error(f"No se puede acceder a propiedad '{acceso.propiedad}' en {tipo_obj}", acceso)
+        return TIPO_DESCONOCIDO
+    
     def analizar_expresion_binaria(self, expr: ExpresionBinaria) -> Tipo:
         """Analiza expresión binaria"""
         tipo_izq = self.analizar_expresion(expr.izquierda)
@@ -500,7 +540,8 @@ class AnalizadorSemantico:
         operador = expr.operador.valor
         tipo_resultado = inferir_tipo_binario(tipo_izq, operador, tipo_der)
         
-        if tipo_resultado.tipo_base == TipoDato.DESCONOCIDO:
+        if (tipo_resultado.tipo_base == TipoDato.DESCONOCIDO and
+                not es_desconocido(tipo_izq) and not es_desconocido(tipo_der)):
             self.error(
                 f"Operador '{operador}' no válido para tipos {tipo_izq} y {tipo_der}",
                 expr
@@ -513,11 +554,11 @@ class AnalizadorSemantico:
         tipo_expr = self.analizar_expresion(expr.expresion)
         
         if expr.operador.tipo == TokenType.MENOS:
-            if not tipo_expr.es_numerico():
+            if not tipo_expr.es_numerico() and not es_desconocido(tipo_expr):
                 self.error(f"Operador '-' no válido para tipo {tipo_expr}", expr)
             return tipo_expr
         elif expr.operador.tipo == TokenType.NO:
-            if tipo_expr.tipo_base != TipoDato.BOOLEANO:
+            if tipo_expr.tipo_base != TipoDato.BOOLEANO and not es_desconocido(tipo_expr):
                 self.error(f"Operador 'no' requiere tipo booleano, no {tipo_expr}", expr)
             return TIPO_BOOLEANO
         
@@ -0,0 +1,149 @@
+"""
+Flujo compacto de tokens para Jade
+Representa la salida del lexer como arreglos paralelos (tipo, inicio,
+longitud, línea, columna) que apuntan al código fuente en lugar de copiar
+cada lexema en un objeto Token. El texto de un token se obtiene bajo demanda.
+"""
+
+from array import array
+from typing import Iterable, List
+from token_types import Token, TokenType
+
+
+# Tipo de token <-> código numérico almacenado en el arreglo de tipos
+TIPOS = list(TokenType)
+CODIGO_TIPO = {tipo: codigo for codigo, tipo in enumerate(TIPOS)}
+
+# Tokens cuyo valor no es el lexema tal cual (comillas y escapes)
+_TIPOS_CON_ESCAPES = (TokenType.LITERAL_TEXTO, TokenType.LITERAL_CARACTER)
+
+
+class FlujoTokens:
+    """Secuencia de tokens almacenada en arreglos paralelos sobre el código fuente"""
+
+    def __init__(self, codigo: str):
+        self.codigo = codigo
+        self.tipos = array('B')       # CODIGO_TIPO del token
+        self.inicios = array('I')     # Offset del lexema en el código
+        self.longitudes = array('I')  # Longitud del lexema en el código
+        self.lineas = array('I')
+        self.columnas = array('I')
+
+    def agregar(self, tipo: TokenType, inicio: int, longitud: int, linea: int, columna: int):
+        """Agrega un token al final del flujo"""
+        self.tipos.append(CODIGO_TIPO[tipo])
+        self.inicios.append(inicio)
+        self.longitudes.append(longitud)
+        self.lineas.append(linea)
+        self.columnas.append(columna)
+
+    def __len__(self) -> int:
+        return len(self.tipos)
+
+    def existe(self, indice: int) -> bool:
+        return indice < len(self.tipos)
+
+    def tipo(self, indice: int) -> TokenType:
+        return TIPOS[self.tipos[indice]]
+
+    def linea(self, indice: int) -> int:
+        return self.lineas[indice]
+
+    def columna(self, indice: int) -> int:
+        return self.columnas[indice]
+
+    def texto(self, indice: int) -> str:
+        """Lexema del token tal como aparece en el código fuente"""
+        inicio = self.inicios[indice]
+        return self.codigo[inicio:inicio + self.longitudes[indice]]
+
+    def valor(self, indice: int) -> str:
+        """Valor del token, igual al Token.valor que produce el lexer"""
+        tipo = TIPOS[self.tipos[indice]]
+        if tipo in _TIPOS_CON_ESCAPES:
+            # Re-lexear el literal para resolver comillas y escapes
+            from lexer import Lexer
+            return Lexer(self.texto(indice)).siguiente_token().valor
+        if tipo == TokenType.EOF:
+            return ''
+        return self.texto(indice)
+
+    def token(self, indice: int) -> Token:
+        """Materializa un Token (depuración y compatibilidad)"""
+        return Token(self.tipo(indice), self.valor(indice),
+                     self.lineas[indice], self.columnas[indice])
+
+    def a_lista(self) -> List[Token]:
+        return [self.token(i) for i in range(len(self))]
+
+
+class ListaTokens:
+    """Adaptador con la interfaz de FlujoTokens sobre una lista de Token"""
+
+    def __init__(self, tokens: List[Token]):
+        self.tokens = tokens
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+    def existe(self, indice: int) -> bool:
+        return indice < len(self.tokens)
+
+    def tipo(self, indice: int) -> TokenType:
+        return self.tokens[indice].tipo
+
+    def linea(self, indice: int) -> int:
+        return self.tokens[indice].linea
+
+    def columna(self, indice: int) -> int:
+        return self.tokens[indice].columna
+
+    def valor(self, indice: int) -> str:
+        return self.tokens[indice].valor
+
+    def token(self, indice: int) -> Token:
+        return self.tokens[indice]
+
+
+class TokensPerezosos:
+    """
+    Interfaz de FlujoTokens sobre un generador de Token: los tokens se piden
+    al lexer a medida que el parser los necesita, y los ya procesados se
+    pueden liberar para acotar la memoria con fuentes muy grandes.
+    """
+
+    def __init__(self, tokens: Iterable[Token]):
+        self.fuente = iter(tokens)
+        self.ventana: List[Token] = []  # Tokens desde el índice self.base
+        self.base = 0
+
+    def existe(self, indice: int) -> bool:
+        while indice - self.base >= len(self.ventana):
+            token = next(self.fuente, None)
+            if token is None:
+                return False
+            self.ventana.append(token)
+        return True
+
+    def token(self, indice: int) -> Token:
+        if not self.existe(indice):
+            raise IndexError(f"Token {indice} fuera del flujo")
+        return self.ventana[indice - self.base]
+
+    def tipo(self, indice: int) -> TokenType:
+        return self.token(indice).tipo
+
+    def linea(self, indice: int) -> int:
+        return self.token(indice).linea
+
+    def columna(self, indice: int) -> int:
+        return self.token(indice).columna
+
+    def valor(self, indice: int) -> str:
+        return self.token(indice).valor
+
+    def liberar_hasta(self, indice: int):
+        """Descarta los tokens anteriores al índice dado (ya no se consultarán)"""
+        if indice > self.base:
+            del self.ventana[:indice - self.base]
+            self.base = indice
@@ -18,6 +18,7 @@ class TipoDato(Enum):
     NULO = auto()
     FUNCION = auto()
     DESCONOCIDO = auto()
+    CONSTRUCTOR_TEXTO = auto()
 
 
 class Tipo:
@@ -75,6 +76,7 @@ TIPO_TEXTO = Tipo(TipoDato.TEXTO)
 TIPO_CARACTER = Tipo(TipoDato.CARACTER)
 TIPO_NULO = Tipo(TipoDato.NULO)
 TIPO_DESCONOCIDO = Tipo(TipoDato.DESCONOCIDO)
+TIPO_CONSTRUCTOR_TEXTO = Tipo(TipoDato.CONSTRUCTOR_TEXTO)
 
 
 def inferir_tipo_binario(tipo_izq: Tipo, operador: str, tipo_der: Tipo) -> Tipo:
@@ -129,12 +131,21 @@ class TipoMapa(Tipo):
         return f"mapa[{str(self.tipo_clave)}, {str(self.tipo_valor)}]"
 
 
+def es_desconocido(tipo: Tipo) -> bool:
+    """Verifica si no hay información de tipo (parámetros sin anotar, etc.)"""
+    return tipo is None or tipo.tipo_base == TipoDato.DESCONOCIDO
+
+
 def puede_convertir(desde: Tipo, hacia: Tipo) -> bool:
     """Verifica si se puede convertir un tipo a otro"""
     # Mismo tipo
     if desde == hacia:
         return True
     
+    # Sin información de tipo: se verifica en tiempo de ejecución
+    if es_desconocido(desde) or es_desconocido(hacia):
+        return True
+    
     # Entero a flotante
     if desde.tipo_base == TipoDato.ENTERO and hacia.tipo_base == TipoDato.FLOTANTE:
         return True
@@ -0,0 +1,5 @@
+"""
+Versión de Jade
+"""
+
+VERSION_JADE = "0.1.0"
@@ -0,0 +1,227 @@
+"""
+Máquina virtual de pila para el bytecode de Jade
+Ejecuta las funciones compiladas por CompiladorBytecode con un bucle de
+despacho único; las variables locales viven en una lista indexada por slot.
+"""
+
+from ast_nodes import *
+from interpreter import InterpreteJade, FUNCIONES_NATIVAS, aplicar_metodo, _dividir, INDEFINIDA, salida
+from bytecode import *
+
+
+# Implementaciones de OPERACIONES (mismo orden que bytecode.OPERACIONES)
+_FUNCIONES_OPERACIONES = (
+    lambda izq, der: izq ** der,
+    lambda izq, der: izq and der,
+    lambda izq, der: izq or der,
+)
+
+
+class MaquinaVirtual:
+    """Bucle de despacho que ejecuta CodigoFuncion"""
+
+    def __init__(self, funciones: dict, globales: dict):
+        self.funciones = funciones  # nombre -> CodigoFuncion
+        self.globales = globales    # Scope global (enums)
+
+    def llamar(self, nombre: str, argumentos: list):
+        """Ejecuta una función por nombre"""
+        funcion = self.funciones.get(nombre)
+        if funcion is None:
+            raise NameError(f"Función '{nombre}' no definida")
+        return self.ejecutar(funcion, argumentos)
+
+    def ejecutar(self, funcion: CodigoFuncion, argumentos: list):
+        """Ejecuta el bytecode de una función y retorna su resultado"""
+        codigo = funcion.codigo
+        constantes = funcion.constantes
+        nombres = funcion.nombres
+        llamadas = funcion.llamadas
+        iteraciones = funcion.iteraciones
+        funciones = self.funciones
+        ejecutar = self.ejecutar
+
+        num_params = len(funcion.parametros)
+        locales = list(argumentos[:num_params])
+        locales.extend([INDEFINIDA] * (funcion.num_locales - len(locales)))
+
+        pila = []
+        push = pila.append
+        pop = pila.pop
+        pc = 0
+
+        while True:
+            op = codigo[pc]
+            arg = codigo[pc + 1]
+            pc += 2
+
+            # Instrucciones ordenadas por frecuencia aproximada
+            if op == LOAD_LOCAL:
+                valor = locales[arg]
+                if valor is INDEFINIDA:
+                    raise NameError(f"Variable '{funcion.locales[arg]}' no definida")
+                push(valor)
+            elif op == CONST:
+                push(constantes[arg])
+            elif op == STORE_LOCAL:
+                locales[arg] = pop()
+            elif op == FOR_ITER:
+                contador, limite, variable, fin = iteraciones[arg]
+                i = locales[contador]
+                if i < locales[limite]:
+                    locales[variable] = i
+                    locales[contador] = i + 1
+                else:
+                    pc = fin
+            elif op == JUMP:
+                pc = arg
+            elif op == JUMP_IF_FALSE:
+                if not pop():
+                    pc = arg
+            elif op == ADD:
+                der = pop()
+                pila[-1] = pila[-1] + der
+            elif op == SUB:
+                der = pop()
+                pila[-1] = pila[-1] - der
+            elif op == MUL:
+                der = pop()
+                pila[-1] = pila[-1] * der
+            elif op == LT:
+                der = pop()
+                pila[-1] = pila[-1] < der
+            elif op == LE:
+                der = pop()
+                pila[-1] = pila[-1] <= der
+            elif op == GT:
+                der = pop()
+                pila[-1] = pila[-1] > der
+            elif op == GE:
+                der = pop()
+                pila[-1] = pila[-1] >= der
+            elif op == EQ:
+                der = pop()
+                pila[-1] = pila[-1] == der
+            elif op == NE:
+                der = pop()
+                pila[-1] = pila[-1] != der
+            elif op == CALL:
+                nombre, argc = llamadas[arg]
+                if argc:
+                    args = pila[-argc:]
+                    del pila[-argc:]
+                else:
+                    args = []
+                llamada = funciones.get(nombre)
+                if llamada is None:
+                    raise NameError(f"Función '{nombre}' no definida")
+                push(ejecutar(llamada, args))
+            elif op == CALL_NATIVE:
+                nombre, argc = llamadas[arg]
+                if argc:
+                    args = pila[-argc:]
+                    del pila[-argc:]
+                else:
+                    args = []
+                push(FUNCIONES_NATIVAS[nombre](*args))
+            elif op == RETURN:
+                return pop()
+            elif op == RETURN_NONE:
+                return None
+            elif op == POP:
+                pop()
+            elif op == MOD:
+                der = pop()
+                pila[-1] = pila[-1] % der
+            elif op == DIV:
+                der = pop()
+                pila[-1] = _dividir(pila[-1], der)
+            elif op == BINARY:
+                der = pop()
+                pila[-1] = _FUNCIONES_OPERACIONES[arg](pila[-1], der)
+            elif op == NEG:
+                pila[-1] = -pila[-1]
+            elif op == NOT:
+                pila[-1] = not pila[-1]
+            elif op == INDEX:
+                indice = pop()
+                pila[-1] = pila[-1][indice]
+            elif op == STORE_INDEX:
+                valor = pop()
+                indice = pop()
+                pop()[indice] = valor
+            elif op == CALL_METHOD:
+                nombre_metodo, argc = llamadas[arg]
+                if argc:
+                    args = pila[-argc:]
+                    del pila[-argc:]
+                else:
+                    args = []
+                pila[-1] = aplicar_metodo(pila[-1], nombre_metodo, args)
+            elif op == LOAD_GLOBAL:
+                nombre = nombres[arg]
+                if nombre not in self.globales:
+                    raise NameError(f"Variable '{nombre}' no definida")
+                push(self.globales[nombre])
+            elif op == BUILD_LIST:
+                if arg:
+                    elementos = pila[-arg:]
+                    del pila[-arg:]
+                else:
+                    elementos = []
+                push(elementos)
+            elif op == BUILD_MAP:
+                mapa = {}
+                if arg:
+                    valores = pila[-2 * arg:]
+                    del pila[-2 * arg:]
+                    for i in range(0, len(valores), 2):
+                        mapa[valores[i]] = valores[i + 1]
+                push(mapa)
+            elif op == GET_PROP:
+                objeto = pila[-1]
+                propiedad = nombres[arg]
+                if isinstance(objeto, dict):
+                    if propiedad not in objeto:
+                        raise AttributeError(f"Propiedad '{propiedad}' no encontrada en objeto")
+                    pila[-1] = objeto[propiedad]
+                else:
+                    raise TypeError(f"No se puede acceder a propiedad en objeto de tipo {type(objeto)}")
+            else:
+                raise RuntimeError(f"Opcode desconocido {op} en '{funcion.nombre}' (pc={pc - 2})")
+
+
+class InterpreteBytecode(InterpreteJade):
+    """Intérprete que compila el programa a bytecode y lo ejecuta en la VM"""
+
+    def compilar_programa(self, programa: Programa) -> dict:
+        """Registra declaraciones y compila todas las funciones a bytecode"""
+        for decl in programa.declaraciones:
+            if isinstance(decl, DeclaracionFuncion):
+                self.funciones[decl.nombre] = decl
+            elif isinstance(decl, Importar):
+                self.ejecutar_importar(decl)
+            elif isinstance(decl, DeclaracionEnum):
+                self.globales[decl.nombre] = {val: val for val in decl.valores}
+        self.resolver_funciones()
+
+        compilador = CompiladorBytecode()
+        return {nombre: compilador.compilar_funcion(func)
+                for nombre, func in self.funciones.items()}
+
+    def ejecutar_programa(self, programa: Programa):
+        """Compila y ejecuta un programa Jade"""
+        compiladas = self.compilar_programa(programa)
+
+        if 'main' in compiladas:
+            try:
+                MaquinaVirtual(compiladas, self.globales).llamar('main', [])
+            finally:
+                salida.vaciar()
+        else:
+            print("Error: No se encontró función 'main'")
+
+    def desensamblar_programa(self, programa: Programa) -> str:
+        """Retorna el bytecode legible de todas las funciones del programa"""
+        compiladas = self.compilar_programa(programa)
+        return '\n\n'.join(desensamblar(f) for f in compiladas.values())
@@ -12,23 +12,418 @@
 #include <string.h>
 #include <time.h>
 
+#if defined(__unix__) || defined(__APPLE__)
+#include <sys/resource.h>
+#endif
+
 /* ============================================================================
  * GESTIÓN DE MEMORIA
  * ============================================================================
  */
 
+/* Arena: pila de bloques grandes; cada reserva lleva delante su tamaño
+ * (para realloc) y se alinea a 16 bytes como las de malloc. */
+#define JADE_ARENA_ALINEACION 16
+#define JADE_ARENA_BLOQUE ((size_t)1 << 20)
+/* Bloques vacíos que se guardan para reutilizar tras restaurar una región */
+#define JADE_ARENA_MAX_LIBRES 8
+/* Reservas pequeñas liberadas: una lista por tamaño (múltiplos de la
+ * alineación) para reutilizarlas sin esperar al fin de la región */
+#define JADE_ARENA_CLASES 16
+
+typedef struct JadeBloqueArena {
+  struct JadeBloqueArena *anterior; /* Bloque de debajo en la pila */
+  char *fin;                        /* Fin de los datos del bloque */
+  size_t tamano;                    /* Tamaño total pedido al sistema */
+  size_t relleno;
+  char datos[];
+} JadeBloqueArena;
+
+typedef struct {
+  size_t tamano; /* Bytes útiles de la reserva, redondeados */
+  size_t relleno;
+} JadeCabeceraArena;
+
+static int _jade_asignador = JADE_ASIGNADOR_SISTEMA;
+static int _jade_mostrar_estadisticas = 0;
+static JadeBloqueArena *_jade_arena_bloque = NULL; /* Cima de la pila */
+static char *_jade_arena_siguiente = NULL;         /* Primer byte libre */
+static JadeBloqueArena *_jade_arena_libres = NULL;
+static int _jade_arena_num_libres = 0;
+static void *_jade_arena_huecos[JADE_ARENA_CLASES];
+static JadeEstadisticasMemoria _jade_estadisticas;
+
+static void *_jade_sin_memoria(void) {
+  jade_vaciar_salida();
+  fprintf(stderr, "Error: No se pudo asignar memoria\n");
+  exit(1);
+}
+
+static inline size_t _jade_redondear(size_t size) {
+  return (size + JADE_ARENA_ALINEACION - 1) & ~(size_t)(JADE_ARENA_ALINEACION - 1);
+}
+
+static void _jade_arena_soltar_bloque(JadeBloqueArena *bloque) {
+  if (bloque->tamano == JADE_ARENA_BLOQUE &&
+      _jade_arena_num_libres < JADE_ARENA_MAX_LIBRES) {
+    bloque->anterior = _jade_arena_libres;
+    _jade_arena_libres = bloque;
+    _jade_arena_num_libres++;
+    return;
+  }
+  _jade_estadisticas.bytes_arena -= (int64_t)bloque->tamano;
+  free(bloque);
+}
+
+/* Apila un bloque con sitio para 'necesario' bytes (reservas grandes
+ * reciben un bloque a su medida) */
+static void _jade_arena_nuevo_bloque(size_t necesario) {
+  JadeBloqueArena *bloque;
+  size_t tamano = sizeof(JadeBloqueArena) + necesario;
+  if (tamano <= JADE_ARENA_BLOQUE && _jade_arena_libres) {
+    bloque = _jade_arena_libres;
+    _jade_arena_libres = bloque->anterior;
+    _jade_arena_num_libres--;
+  } else {
+    if (tamano < JADE_ARENA_BLOQUE) {
+      tamano = JADE_ARENA_BLOQUE;
+    }
+    bloque = (JadeBloqueArena *)malloc(tamano);
+    if (!bloque) {
+      _jade_sin_memoria();
+    }
+    bloque->tamano = tamano;
+    bloque->fin = (char *)bloque + tamano;
+    _jade_estadisticas.bloques_arena++;
+    _jade_estadisticas.bytes_arena += (int64_t)tamano;
+    if (_jade_estadisticas.bytes_arena > _jade_estadisticas.bytes_arena_max) {
+      _jade_estadisticas.bytes_arena_max = _jade_estadisticas.bytes_arena;
+    }
+  }
+  bloque->anterior = _jade_arena_bloque;
+  _jade_arena_bloque = bloque;
+  _jade_arena_siguiente = bloque->datos;
+}
+
+static inline size_t _jade_arena_clase(size_t tamano) {
+  return tamano / JADE_ARENA_ALINEACION - 1;
+}
+
+/* Reserva incrementando el puntero, sin mirar los huecos */
+static void *_jade_arena_incrementar(size_t tamano) {
+  size_t necesario = sizeof(JadeCabeceraArena) + tamano;
+  if (!_jade_arena_bloque ||
+      (size_t)(_jade_arena_bloque->fin - _jade_arena_siguiente) < necesario) {
+    _jade_arena_nuevo_bloque(necesario);
+  }
+  JadeCabeceraArena *cabecera = (JadeCabeceraArena *)_jade_arena_siguiente;
+  cabecera->tamano = necesario - sizeof(JadeCabeceraArena);
+  _jade_arena_siguiente += necesario;
+  return cabecera + 1;
+}
+
+static void *_jade_arena_reservar(size_t size) {
+  size_t tamano = _jade_redondear(size);
+  if (tamano > 0 && _jade_arena_clase(tamano) < JADE_ARENA_CLASES) {
+    /* Reutilizar un hueco del mismo tamaño */
+    void **hueco = (void **)_jade_arena_huecos[_jade_arena_clase(tamano)];
+    if (hueco) {
+      _jade_arena_huecos[_jade_arena_clase(tamano)] = *hueco;
+      return hueco;
+    }
+  }
+  return _jade_arena_incrementar(tamano);
+}
+
+/* True si ptr es la última reserva de la arena (se puede deshacer o crecer
+ * en su sitio) */
+static inline int _jade_arena_es_ultima(JadeCabeceraArena *cabecera) {
+  return (char *)(cabecera + 1) + cabecera->tamano == _jade_arena_siguiente;
+}
+
 void *jade_malloc(size_t size) {
+  _jade_estadisticas.asignaciones++;
+  _jade_estadisticas.bytes_pedidos += (int64_t)size;
+  if (_jade_asignador == JADE_ASIGNADOR_ARENA) {
+    return _jade_arena_reservar(size);
+  }
   void *ptr = malloc(size);
   if (!ptr) {
-    fprintf(stderr, "Error: No se pudo asignar memoria\n");
-    exit(1);
+    _jade_sin_memoria();
   }
   return ptr;
 }
 
+void *jade_realloc(void *ptr, size_t size) {
+  _jade_estadisticas.reasignaciones++;
+  if (_jade_asignador != JADE_ASIGNADOR_ARENA) {
+    void *nuevo = realloc(ptr, size);
+    if (!nuevo) {
+      _jade_sin_memoria();
+    }
+    return nuevo;
+  }
+  if (!ptr) {
+    return _jade_arena_reservar(size);
+  }
+  JadeCabeceraArena *cabecera = (JadeCabeceraArena *)ptr - 1;
+  size_t tamano = _jade_redondear(size);
+  if (tamano <= cabecera->tamano) {
+    return ptr;
+  }
+  /* La última reserva crece en su sitio si el bloque tiene espacio */
+  if (_jade_arena_es_ultima(cabecera) &&
+      (size_t)(_jade_arena_bloque->fin - (char *)ptr) >= tamano) {
+    _jade_arena_siguiente = (char *)ptr + tamano;
+    cabecera->tamano = tamano;
+    return ptr;
+  }
+  void *nuevo = _jade_arena_reservar(size);
+  memcpy(nuevo, ptr, cabecera->tamano);
+  return nuevo;
+}
+
 void jade_free(void *ptr) {
-  if (ptr) {
-    free(ptr);
+  if (!ptr) {
+    return;
+  }
+  _jade_estadisticas.liberaciones++;
+  if (_jade_asignador == JADE_ASIGNADOR_ARENA) {
+    /* La última reserva (p. ej. un texto temporal) se deshace; las
+     * pequeñas quedan como huecos y el resto se libera con su región */
+    JadeCabeceraArena *cabecera = (JadeCabeceraArena *)ptr - 1;
+    if (_jade_arena_es_ultima(cabecera)) {
+      _jade_arena_siguiente = (char *)cabecera;
+    } else if (cabecera->tamano > 0 &&
+               _jade_arena_clase(cabecera->tamano) < JADE_ARENA_CLASES) {
+      *(void **)ptr = _jade_arena_huecos[_jade_arena_clase(cabecera->tamano)];
+      _jade_arena_huecos[_jade_arena_clase(cabecera->tamano)] = ptr;
+    }
+    return;
+  }
+  free(ptr);
+}
+
+/* Una marca es la primera reserva de su región: guarda dónde empieza la
+ * región y los huecos de fuera, que la región no usa (así, al restaurar,
+ * solo hay que revisar los huecos que se liberaron dentro) */
+typedef struct {
+  char *posicion;
+  void *huecos[JADE_ARENA_CLASES];
+} JadeMarcaArena;
+
+void *jade_arena_marca(void) {
+  if (_jade_asignador != JADE_ASIGNADOR_ARENA) {
+    return NULL;
+  }
+  JadeMarcaArena *marca =
+      _jade_arena_incrementar(_jade_redondear(sizeof(JadeMarcaArena)));
+  marca->posicion = (char *)((JadeCabeceraArena *)marca - 1);
+  memcpy(marca->huecos, _jade_arena_huecos, sizeof(_jade_arena_huecos));
+  memset(_jade_arena_huecos, 0, sizeof(_jade_arena_huecos));
+  return marca;
+}
+
+/* True si ptr se reservó después de la posición de una marca: está en un
+ * bloque apilado después del de la marca o en el mismo bloque, detrás */
+static int _jade_arena_sobre_marca(const char *ptr, const char *posicion) {
+  for (JadeBloqueArena *bloque = _jade_arena_bloque; bloque;
+       bloque = bloque->anterior) {
+    int es_de_la_marca = posicion >= bloque->datos && posicion <= bloque->fin;
+    if (ptr >= bloque->datos && ptr < bloque->fin) {
+      return !es_de_la_marca || ptr >= posicion;
+    }
+    if (es_de_la_marca) {
+      return 0;
+    }
+  }
+  return 0;
+}
+
+void jade_arena_restaurar(void *marca) {
+  if (_jade_asignador != JADE_ASIGNADOR_ARENA) {
+    return;
+  }
+  JadeMarcaArena *datos = (JadeMarcaArena *)marca;
+  char *posicion = datos->posicion;
+  /* Los huecos de la región vuelven con los de fuera, salvo los que
+   * desaparecen con ella; los de debajo de la marca son objetos de fuera
+   * liberados dentro y se conservan */
+  for (int clase = 0; clase < JADE_ARENA_CLASES; clase++) {
+    void *conservados = datos->huecos[clase];
+    void *hueco = _jade_arena_huecos[clase];
+    while (hueco) {
+      void *siguiente = *(void **)hueco;
+      if (!_jade_arena_sobre_marca((char *)hueco, posicion)) {
+        *(void **)hueco = conservados;
+        conservados = hueco;
+      }
+      hueco = siguiente;
+    }
+    _jade_arena_huecos[clase] = conservados;
+  }
+  /* Desapilar los bloques pedidos después de la marca */
+  while (_jade_arena_bloque &&
+         !(posicion >= _jade_arena_bloque->datos &&
+           posicion <= _jade_arena_bloque->fin)) {
+    JadeBloqueArena *bloque = _jade_arena_bloque;
+    _jade_arena_bloque = bloque->anterior;
+    _jade_arena_soltar_bloque(bloque);
+  }
+  _jade_arena_siguiente = _jade_arena_bloque ? posicion : NULL;
+  _jade_estadisticas.regiones++;
+}
+
+/* Libera todos los bloques de la arena (región del programa) */
+static void _jade_arena_liberar_todo(void) {
+  while (_jade_arena_bloque) {
+    JadeBloqueArena *bloque = _jade_arena_bloque;
+    _jade_arena_bloque = bloque->anterior;
+    _jade_estadisticas.bytes_arena -= (int64_t)bloque->tamano;
+    free(bloque);
+  }
+  while (_jade_arena_libres) {
+    JadeBloqueArena *bloque = _jade_arena_libres;
+    _jade_arena_libres = bloque->anterior;
+    _jade_estadisticas.bytes_arena -= (int64_t)bloque->tamano;
+    free(bloque);
+  }
+  _jade_arena_num_libres = 0;
+  _jade_arena_siguiente = NULL;
+  memset(_jade_arena_huecos, 0, sizeof(_jade_arena_huecos));
+}
+
+const JadeEstadisticasMemoria *jade_estadisticas_memoria(void) {
+  return &_jade_estadisticas;
+}
+
+/* Memoria máxima del proceso en KB, o -1 si no se puede consultar */
+static int64_t _jade_memoria_maxima_kb(void) {
+#if defined(__unix__) || defined(__APPLE__)
+  struct rusage uso;
+  if (getrusage(RUSAGE_SELF, &uso) == 0) {
+#ifdef __APPLE__
+    return (int64_t)uso.ru_maxrss / 1024; /* macOS la da en bytes */
+#else
+    return (int64_t)uso.ru_maxrss;
+#endif
+  }
+#endif
+  return -1;
+}
+
+void jade_mostrar_estadisticas_memoria(void) {
+  const JadeEstadisticasMemoria *e = &_jade_estadisticas;
+  jade_vaciar_salida();
+  fprintf(stderr, "[memoria] asignador: %s\n",
+          _jade_asignador == JADE_ASIGNADOR_ARENA ? "arena" : "sistema");
+  fprintf(stderr,
+          "[memoria] asignaciones: %lld, reasignaciones: %lld, "
+          "liberaciones: %lld, bytes pedidos: %lld\n",
+          (long long)e->asignaciones, (long long)e->reasignaciones,
+          (long long)e->liberaciones, (long long)e->bytes_pedidos);
+  if (_jade_asignador == JADE_ASIGNADOR_ARENA) {
+    fprintf(stderr,
+            "[memoria] arena: %lld bloques, %lld KB como máximo, %lld "
+            "regiones liberadas\n",
+            (long long)e->bloques_arena, (long long)(e->bytes_arena_max / 1024),
+            (long long)e->regiones);
+  }
+  fprintf(stderr, "[memoria] memoria máxima (RSS): %lld KB\n",
+          (long long)_jade_memoria_maxima_kb());
+}
+
+/* ============================================================================
+ * TEXTOS
+ * ============================================================================
+ */
+
+static JadeString *_jade_texto_crear(int64_t capacidad) {
+  JadeString *texto =
+      (JadeString *)jade_malloc(sizeof(JadeString) + (size_t)capacidad + 1);
+  texto->longitud = 0;
+  texto->capacidad = capacidad;
+  texto->referencias = 1;
+  texto->hash = 0;
+  texto->datos[0] = '\0';
+  return texto;
+}
+
+char *jade_texto_nuevo(const char *datos, int64_t longitud) {
+  JadeString *texto = _jade_texto_crear(longitud);
+  memcpy(texto->datos, datos, (size_t)longitud);
+  texto->datos[longitud] = '\0';
+  texto->longitud = longitud;
+  return texto->datos;
+}
+
+char *jade_texto_desde_c(const char *cadena) {
+  return jade_texto_nuevo(cadena, (int64_t)strlen(cadena));
+}
+
+void jade_texto_retener(const char *texto) {
+  if (texto && JADE_TEXTO(texto)->referencias != JADE_TEXTO_INMORTAL) {
+    JADE_TEXTO(texto)->referencias++;
+  }
+}
+
+void jade_texto_liberar(const char *texto) {
+  if (!texto) {
+    return;
+  }
+  JadeString *cabecera = JADE_TEXTO(texto);
+  if (cabecera->referencias != JADE_TEXTO_INMORTAL &&
+      --cabecera->referencias == 0) {
+    jade_free(cabecera);
+  }
+}
+
+JadeConstructorTexto *jade_constructor_texto_nuevo(void) {
+  JadeConstructorTexto *constructor =
+      (JadeConstructorTexto *)jade_malloc(sizeof(JadeConstructorTexto));
+  constructor->longitud = 0;
+  constructor->capacidad = 64;
+  constructor->referencias = 1;
+  constructor->datos = (char *)jade_malloc((size_t)constructor->capacidad);
+  return constructor;
+}
+
+void jade_constructor_texto_agregar(JadeConstructorTexto *constructor,
+                                    const char *texto) {
+  int64_t longitud = JADE_TEXTO(texto)->longitud;
+  int64_t necesaria = constructor->longitud + longitud;
+  if (necesaria > constructor->capacidad) {
+    int64_t capacidad = constructor->capacidad * 2;
+    while (capacidad < necesaria) {
+      capacidad *= 2;
+    }
+    constructor->datos =
+        (char *)jade_realloc(constructor->datos, (size_t)capacidad);
+    constructor->capacidad = capacidad;
+  }
+  memcpy(constructor->datos + constructor->longitud, texto, (size_t)longitud);
+  constructor->longitud = necesaria;
+}
+
+char *jade_constructor_texto_construir(JadeConstructorTexto *constructor) {
+  /* Copia: el constructor puede seguir agregando */
+  return jade_texto_nuevo(constructor->datos, constructor->longitud);
+}
+
+int64_t jade_constructor_texto_longitud(JadeConstructorTexto *constructor) {
+  return constructor->longitud;
+}
+
+void jade_constructor_texto_retener(JadeConstructorTexto *constructor) {
+  if (constructor) {
+    constructor->referencias++;
+  }
+}
+
+void jade_constructor_texto_liberar(JadeConstructorTexto *constructor) {
+  if (constructor && --constructor->referencias == 0) {
+    jade_free(constructor->datos);
+    jade_free(constructor);
   }
 }
 
@@ -37,13 +432,55 @@ void jade_free(void *ptr) {
  * ============================================================================
  */
 
-void jade_mostrar(const char *texto) {
-  printf("%s\n", texto);
+/* Salida acumulada de mostrar() */
+#define JADE_SALIDA_TAMANO ((size_t)1 << 16)
+
+static char _jade_salida[JADE_SALIDA_TAMANO];
+static size_t _jade_salida_usada = 0;
+static int _jade_salida_con_buffer = 1;
+
+void jade_vaciar_salida(void) {
+  if (_jade_salida_usada > 0) {
+    fwrite(_jade_salida, 1, _jade_salida_usada, stdout);
+    _jade_salida_usada = 0;
+  }
   fflush(stdout);
 }
 
+void jade_configurar_salida(int64_t con_buffer) {
+  jade_vaciar_salida();
+  _jade_salida_con_buffer = con_buffer != 0;
+}
+
+static void _jade_salida_escribir(const char *datos, size_t n) {
+  if (_jade_salida_usada + n > JADE_SALIDA_TAMANO) {
+    jade_vaciar_salida();
+    if (n > JADE_SALIDA_TAMANO) {
+      /* No cabe ni con el buffer vacío: directo a stdout */
+      fwrite(datos, 1, n, stdout);
+      return;
+    }
+  }
+  memcpy(_jade_salida + _jade_salida_usada, datos, n);
+  _jade_salida_usada += n;
+}
+
+void jade_mostrar(const char *texto) {
+  size_t longitud = (size_t)JADE_TEXTO(texto)->longitud;
+  if (!_jade_salida_con_buffer) {
+    fwrite(texto, 1, longitud, stdout);
+    putchar('\n');
+    fflush(stdout);
+    return;
+  }
+  _jade_salida_escribir(texto, longitud);
+  _jade_salida_escribir("\n", 1);
+}
+
 char *jade_leer(void) {
   char buffer[1024];
+  /* Lo mostrado antes (p. ej. una pregunta) tiene que verse al leer */
+  jade_vaciar_salida();
   if (fgets(buffer, sizeof(buffer), stdin) != NULL) {
     // Eliminar newline
     size_t len = strlen(buffer);
@@ -51,13 +488,9 @@ char *jade_leer(void) {
       buffer[len - 1] = '\0';
       len--;
     }
-    char *result = (char *)jade_malloc(len + 1);
-    strcpy(result, buffer);
-    return result;
+    return jade_texto_nuevo(buffer, (int64_t)len);
   }
-  char *empty = (char *)jade_malloc(1);
-  empty[0] = '\0';
-  return empty;
+  return jade_texto_nuevo("", 0);
 }
 
 /* ============================================================================
@@ -67,25 +500,18 @@ char *jade_leer(void) {
 
 char *jade_convertir_a_texto_entero(int64_t n) {
   char buffer[32];
-  snprintf(buffer, sizeof(buffer), "%lld", (long long)n);
-  char *result = (char *)jade_malloc(strlen(buffer) + 1);
-  strcpy(result, buffer);
-  return result;
+  int len = snprintf(buffer, sizeof(buffer), "%lld", (long long)n);
+  return jade_texto_nuevo(buffer, len);
 }
 
 char *jade_convertir_a_texto_flotante(double n) {
   char buffer[32];
-  snprintf(buffer, sizeof(buffer), "%g", n);
-  char *result = (char *)jade_malloc(strlen(buffer) + 1);
-  strcpy(result, buffer);
-  return result;
+  int len = snprintf(buffer, sizeof(buffer), "%g", n);
+  return jade_texto_nuevo(buffer, len);
 }
 
 char *jade_convertir_a_texto_booleano(int b) {
-  const char *str = b ? "verdadero" : "falso";
-  char *result = (char *)jade_malloc(strlen(str) + 1);
-  strcpy(result, str);
-  return result;
+  return jade_texto_desde_c(b ? "verdadero" : "falso");
 }
 
 int64_t jade_convertir_a_entero(const char *str) { return (int64_t)atoll(str); }
@@ -101,20 +527,40 @@ char *jade_concatenar(const char *a, const char *b) {
   if (!a || !b)
     return NULL;
 
-  size_t len_a = strlen(a);
-  size_t len_b = strlen(b);
-  char *result = (char *)jade_malloc(len_a + len_b + 1);
+  int64_t len_a = JADE_TEXTO(a)->longitud;
+  int64_t len_b = JADE_TEXTO(b)->longitud;
+  JadeString *result = _jade_texto_crear(len_a + len_b);
 
-  strcpy(result, a);
-  strcat(result, b);
+  memcpy(result->datos, a, (size_t)len_a);
+  memcpy(result->datos + len_a, b, (size_t)len_b + 1);
+  result->longitud = len_a + len_b;
 
-  return result;
+  return result->datos;
+}
+
+char *jade_concatenar_n(int64_t n, const char **partes) {
+  int64_t total = 0;
+  for (int64_t i = 0; i < n; i++) {
+    total += JADE_TEXTO(partes[i])->longitud;
+  }
+
+  JadeString *result = _jade_texto_crear(total);
+  char *destino = result->datos;
+  for (int64_t i = 0; i < n; i++) {
+    int64_t longitud = JADE_TEXTO(partes[i])->longitud;
+    memcpy(destino, partes[i], (size_t)longitud);
+    destino += longitud;
+  }
+  *destino = '\0';
+  result->longitud = total;
+
+  return result->datos;
 }
 
 int64_t jade_longitud(const char *str) {
   if (!str)
     return 0;
-  return (int64_t)strlen(str);
+  return JADE_TEXTO(str)->longitud;
 }
 
 /* ============================================================================
@@ -141,61 +587,133 @@ double jade_aleatorio(void) { return (double)rand() / (double)RAND_MAX; }
  * ============================================================================
  */
 
-JadeList *jade_lista_nueva(void) {
+static inline int _jade_es_objeto(int64_t tipo) {
+  return tipo >= JADE_ELEMENTO_TEXTO;
+}
+
+void jade_objeto_retener(void *objeto, int64_t tipo) {
+  switch (tipo) {
+  case JADE_ELEMENTO_TEXTO:
+    jade_texto_retener((const char *)objeto);
+    break;
+  case JADE_ELEMENTO_LISTA:
+    jade_lista_retener((JadeList *)objeto);
+    break;
+  case JADE_ELEMENTO_MAPA:
+    jade_mapa_retener((JadeMap *)objeto);
+    break;
+  case JADE_ELEMENTO_CONSTRUCTOR:
+    jade_constructor_texto_retener((JadeConstructorTexto *)objeto);
+    break;
+  }
+}
+
+void jade_objeto_liberar(void *objeto, int64_t tipo) {
+  switch (tipo) {
+  case JADE_ELEMENTO_TEXTO:
+    jade_texto_liberar((const char *)objeto);
+    break;
+  case JADE_ELEMENTO_LISTA:
+    jade_lista_liberar((JadeList *)objeto);
+    break;
+  case JADE_ELEMENTO_MAPA:
+    jade_mapa_liberar((JadeMap *)objeto);
+    break;
+  case JADE_ELEMENTO_CONSTRUCTOR:
+    jade_constructor_texto_liberar((JadeConstructorTexto *)objeto);
+    break;
+  }
+}
+
+static int64_t _jade_tamano_elemento(int64_t tipo) {
+  return tipo == JADE_ELEMENTO_BOOLEANO ? (int64_t)sizeof(uint8_t)
+                                        : (int64_t)sizeof(void *);
+}
+
+static JadeList *_jade_lista_crear(int64_t tipo) {
   JadeList *lista = (JadeList *)jade_malloc(sizeof(JadeList));
   lista->size = 0;
   lista->capacity = 8; /* Capacidad inicial */
-  lista->data = (void **)jade_malloc(sizeof(void *) * lista->capacity);
+  lista->tipo = tipo;
+  lista->referencias = 1;
+  lista->data = (void **)jade_malloc(_jade_tamano_elemento(tipo) * lista->capacity);
   return lista;
 }
 
-void jade_lista_agregar(JadeList *lista, void *elemento) {
+/* Asegura espacio para un elemento más */
+static void _jade_lista_reservar(JadeList *lista) {
   if (lista->size >= lista->capacity) {
     lista->capacity *= 2;
-    void **new_data =
-        (void **)realloc(lista->data, sizeof(void *) * lista->capacity);
-    if (!new_data) {
-      fprintf(stderr, "Error: No se pudo redimensionar la lista\n");
-      exit(1);
-    }
-    lista->data = new_data;
+    lista->data = (void **)jade_realloc(
+        lista->data, _jade_tamano_elemento(lista->tipo) * lista->capacity);
   }
-  lista->data[lista->size++] = elemento;
 }
 
-void *jade_lista_obtener(JadeList *lista, int64_t indice) {
+void jade_lista_error_indice(JadeList *lista, int64_t indice) {
+  (void)lista;
+  jade_vaciar_salida();
+  fprintf(stderr, "Error: Índice de lista fuera de rango: %lld\n",
+          (long long)indice);
+  exit(1);
+}
+
+static void _jade_verificar_indice(JadeList *lista, int64_t indice) {
   if (indice < 0 || indice >= lista->size) {
-    fprintf(stderr, "Error: Índice de lista fuera de rango: %lld\n",
-            (long long)indice);
-    exit(1);
+    jade_lista_error_indice(lista, indice);
+  }
+}
+
+JadeList *jade_lista_nueva(void) {
+  return _jade_lista_crear(JADE_ELEMENTO_PUNTERO);
+}
+
+/*
+ * Las operaciones genéricas (void*) aceptan listas de cualquier tipo: los
+ * enteros y flotantes especializados ocupan 8 bytes con los mismos bits que
+ * su versión en caja, y los booleanos se convierten desde/hacia 0 y 1.
+ */
+
+void jade_lista_agregar(JadeList *lista, void *elemento) {
+  _jade_lista_reservar(lista);
+  if (lista->tipo == JADE_ELEMENTO_BOOLEANO) {
+    ((uint8_t *)lista->data)[lista->size++] = elemento != NULL;
+  } else {
+    jade_objeto_retener(elemento, lista->tipo);
+    lista->data[lista->size++] = elemento;
+  }
+}
+
+void *jade_lista_obtener(JadeList *lista, int64_t indice) {
+  _jade_verificar_indice(lista, indice);
+  if (lista->tipo == JADE_ELEMENTO_BOOLEANO) {
+    return (void *)(intptr_t)((uint8_t *)lista->data)[indice];
   }
   return lista->data[indice];
 }
 
 void jade_lista_asignar(JadeList *lista, int64_t indice, void *valor) {
-  if (indice < 0 || indice >= lista->size) {
-    fprintf(stderr, "Error: Índice de lista fuera de rango: %lld\n",
-            (long long)indice);
-    exit(1);
+  _jade_verificar_indice(lista, indice);
+  if (lista->tipo == JADE_ELEMENTO_BOOLEANO) {
+    ((uint8_t *)lista->data)[indice] = valor != NULL;
+  } else {
+    /* Retener antes de soltar: el valor puede ser el mismo */
+    jade_objeto_retener(valor, lista->tipo);
+    jade_objeto_liberar(lista->data[indice], lista->tipo);
+    lista->data[indice] = valor;
   }
-  lista->data[indice] = valor;
 }
 
 int64_t jade_lista_longitud(JadeList *lista) { return lista->size; }
 
+/* La referencia de la lista al elemento pasa a quien lo elimina */
 void *jade_lista_eliminar(JadeList *lista, int64_t indice) {
-  if (indice < 0 || indice >= lista->size) {
-    fprintf(stderr, "Error: Índice de lista fuera de rango: %lld\n",
-            (long long)indice);
-    exit(1);
-  }
-
-  void *elemento = lista->data[indice];
+  void *elemento = jade_lista_obtener(lista, indice);
+  int64_t tamano = _jade_tamano_elemento(lista->tipo);
 
   /* Desplazar elementos */
-  for (int64_t i = indice; i < lista->size - 1; i++) {
-    lista->data[i] = lista->data[i + 1];
-  }
+  char *data = (char *)lista->data;
+  memmove(data + indice * tamano, data + (indice + 1) * tamano,
+          (size_t)((lista->size - indice - 1) * tamano));
 
   lista->size--;
   return elemento;
@@ -204,7 +722,7 @@ void *jade_lista_eliminar(JadeList *lista, int64_t indice) {
 int jade_lista_contiene(JadeList *lista, void *elemento) {
   for (int64_t i = 0; i < lista->size; i++) {
     /* Comparación simple de punteros o valores enteros */
-    if (lista->data[i] == elemento) {
+    if (jade_lista_obtener(lista, i) == elemento) {
       return 1;
     }
     /* TODO: Comparación profunda para strings/objetos si fuera necesario */
@@ -212,143 +730,460 @@ int jade_lista_contiene(JadeList *lista, void *elemento) {
   return 0;
 }
 
-void jade_lista_liberar(JadeList *lista) {
+void jade_lista_retener(JadeList *lista) {
   if (lista) {
-    if (lista->data) {
-      jade_free(lista->data);
+    lista->referencias++;
+  }
+}
+
+void jade_lista_liberar(JadeList *lista) {
+  if (!lista || --lista->referencias > 0) {
+    return;
+  }
+  if (_jade_es_objeto(lista->tipo)) {
+    for (int64_t i = 0; i < lista->size; i++) {
+      jade_objeto_liberar(lista->data[i], lista->tipo);
+    }
+  }
+  jade_free(lista->data);
+  jade_free(lista);
+}
+
+void jade_lista_especializar(JadeList *lista, int64_t tipo) {
+  if (lista->tipo == tipo) {
+    return;
+  }
+  if (tipo == JADE_ELEMENTO_BOOLEANO || lista->tipo == JADE_ELEMENTO_BOOLEANO) {
+    /* Cambia el tamaño de los elementos: copiar a un arreglo nuevo */
+    JadeList *nueva = _jade_lista_crear(tipo);
+    for (int64_t i = 0; i < lista->size; i++) {
+      jade_lista_agregar(nueva, jade_lista_obtener(lista, i));
+    }
+    jade_free(lista->data);
+    nueva->referencias = lista->referencias;
+    *lista = *nueva;
+    jade_free(nueva);
+  } else if (_jade_es_objeto(tipo) && !_jade_es_objeto(lista->tipo)) {
+    /* Desde aquí la lista es dueña de sus elementos */
+    for (int64_t i = 0; i < lista->size; i++) {
+      jade_objeto_retener(lista->data[i], tipo);
     }
-    jade_free(lista);
   }
+  lista->tipo = tipo;
 }
 
+/*
+ * Listas especializadas: arreglos contiguos de valores nativos, sin caja.
+ * Cada tipo define nueva, agregar, obtener, asignar, eliminar y contiene;
+ * longitud y liberar son las genéricas.
+ */
+#define JADE_DEFINIR_LISTA(sufijo, T, TIPO)                                    \
+  JadeList *jade_lista_##sufijo##_nueva(void) {                                \
+    return _jade_lista_crear(TIPO);                                            \
+  }                                                                            \
+                                                                               \
+  void jade_lista_##sufijo##_agregar(JadeList *lista, T valor) {               \
+    jade_lista_especializar(lista, TIPO);                                      \
+    _jade_lista_reservar(lista);                                               \
+    ((T *)lista->data)[lista->size++] = valor;                                 \
+  }                                                                            \
+                                                                               \
+  T jade_lista_##sufijo##_obtener(JadeList *lista, int64_t indice) {           \
+    _jade_verificar_indice(lista, indice);                                     \
+    return ((T *)lista->data)[indice];                                         \
+  }                                                                            \
+                                                                               \
+  void jade_lista_##sufijo##_asignar(JadeList *lista, int64_t indice,          \
+                                     T valor) {                                \
+    _jade_verificar_indice(lista, indice);                                     \
+    ((T *)lista->data)[indice] = valor;                                        \
+  }                                                                            \
+                                                                               \
+  T jade_lista_##sufijo##_eliminar(JadeList *lista, int64_t indice) {          \
+    T elemento = jade_lista_##sufijo##_obtener(lista, indice);                 \
+    T *data = (T *)lista->data;                                                \
+    memmove(data + indice, data + indice + 1,                                  \
+            (size_t)(lista->size - indice - 1) * sizeof(T));                   \
+    lista->size--;                                                             \
+    return elemento;                                                           \
+  }                                                                            \
+                                                                               \
+  int jade_lista_##sufijo##_contiene(JadeList *lista, T valor) {               \
+    T *data = (T *)lista->data;                                                \
+    for (int64_t i = 0; i < lista->size; i++) {                                \
+      if (data[i] == valor) {                                                  \
+        return 1;                                                              \
+      }                                                                        \
+    }                                                                          \
+    return 0;                                                                  \
+  }
+
+JADE_DEFINIR_LISTA(entero, int64_t, JADE_ELEMENTO_ENTERO)
+JADE_DEFINIR_LISTA(flotante, double, JADE_ELEMENTO_FLOTANTE)
+JADE_DEFINIR_LISTA(booleano, uint8_t, JADE_ELEMENTO_BOOLEANO)
+
 /* ============================================================================
  * MAPAS (Hash Map)
  * ============================================================================
  */
 
-/* Hashing específico para strings si es necesario */
-uint64_t _jade_hash_str(const char *str) {
-  uint64_t hash = 5381;
-  int c;
-  while ((c = *str++))
-    hash = ((hash << 5) + hash) + c; /* hash * 33 + c */
-  return hash;
+/* Hashing: mezcla por multiplicación de 64x64 -> 128 bits al estilo de
+ * wyhash, leyendo la clave de a 8 bytes */
+static const uint64_t _JADE_SEMILLA_0 = 0xa0761d6478bd642fULL;
+static const uint64_t _JADE_SEMILLA_1 = 0xe7037ed1a0b428dbULL;
+
+static inline uint64_t _jade_mezclar(uint64_t a, uint64_t b) {
+  __uint128_t r = (__uint128_t)a * b;
+  return (uint64_t)r ^ (uint64_t)(r >> 64);
+}
+
+static inline uint64_t _jade_leer64(const uint8_t *p) {
+  uint64_t v;
+  memcpy(&v, p, 8);
+  return v;
 }
 
-/* Función de hash simple (djb2) */
-uint64_t _jade_hash(void *ptr) {
-  /* Asumimos que las claves son strings por defecto */
-  return _jade_hash_str((const char *)ptr);
+/* Lee los últimos 1..8 bytes de un bloque */
+static inline uint64_t _jade_leer_resto(const uint8_t *p, size_t n) {
+  uint64_t v = 0;
+  memcpy(&v, p, n);
+  return v;
 }
 
-JadeMap *jade_mapa_nuevo(void) {
+uint64_t jade_hash_bytes(const void *datos, size_t longitud) {
+  const uint8_t *p = (const uint8_t *)datos;
+  size_t n = longitud;
+  uint64_t semilla = _JADE_SEMILLA_0 ^ longitud;
+  while (n > 16) {
+    semilla = _jade_mezclar(_jade_leer64(p) ^ _JADE_SEMILLA_1,
+                            _jade_leer64(p + 8) ^ semilla);
+    p += 16;
+    n -= 16;
+  }
+  uint64_t a = 0, b = 0;
+  if (n > 8) {
+    a = _jade_leer64(p);
+    b = _jade_leer_resto(p + 8, n - 8);
+  } else if (n > 0) {
+    a = _jade_leer_resto(p, n);
+  }
+  return _jade_mezclar(_JADE_SEMILLA_1 ^ longitud,
+                       _jade_mezclar(a ^ _JADE_SEMILLA_1, b ^ semilla));
+}
+
+/*
+ * Las operaciones internas reciben el tipo de clave como parámetro: las
+ * genéricas pasan mapa->tipo_clave y las especializadas una constante, con
+ * lo que el compilador elimina la rama del otro tipo (las claves enteras no
+ * pasan por strlen ni strcmp).
+ */
+
+uint64_t jade_texto_hash(const char *texto) {
+  JadeString *cabecera = JADE_TEXTO(texto);
+  if (cabecera->hash == 0) {
+    uint64_t hash = jade_hash_bytes(texto, (size_t)cabecera->longitud);
+    /* 0 indica "sin calcular" */
+    cabecera->hash = hash ? hash : 1;
+  }
+  return cabecera->hash;
+}
+
+/* Hash de una clave, distinto de VACIO y BORRADO */
+static inline uint64_t _jade_mapa_hash(void *clave, int64_t tipo_clave) {
+  uint64_t hash;
+  if (tipo_clave == JADE_CLAVE_ENTERO) {
+    hash = _jade_mezclar((uint64_t)(uintptr_t)clave ^ _JADE_SEMILLA_0,
+                         _JADE_SEMILLA_1);
+  } else {
+    /* Calculado una vez por texto y guardado en su cabecera */
+    hash = jade_texto_hash((const char *)clave);
+  }
+  return hash < 2 ? hash + 2 : hash;
+}
+
+static inline int _jade_mapa_iguales(const JadeMapEntry *entrada, uint64_t hash,
+                                     void *clave, int64_t tipo_clave) {
+  /* El hash guardado descarta casi todas las comparaciones de texto */
+  return entrada->hash == hash &&
+         (entrada->clave == clave ||
+          (tipo_clave == JADE_CLAVE_TEXTO &&
+           JADE_TEXTO(entrada->clave)->longitud == JADE_TEXTO(clave)->longitud &&
+           memcmp(entrada->clave, clave,
+                  (size_t)JADE_TEXTO(clave)->longitud) == 0));
+}
+
+static inline int _jade_mapa_ocupada(const JadeMapEntry *entrada) {
+  return entrada->hash > JADE_MAPA_BORRADO;
+}
+
+static JadeMapEntry *_jade_mapa_entradas(int64_t capacidad) {
+  JadeMapEntry *entradas =
+      (JadeMapEntry *)jade_malloc(sizeof(JadeMapEntry) * capacidad);
+  memset(entradas, 0, sizeof(JadeMapEntry) * capacidad);
+  return entradas;
+}
+
+static JadeMap *_jade_mapa_crear(int64_t tipo_clave) {
   JadeMap *mapa = (JadeMap *)jade_malloc(sizeof(JadeMap));
   mapa->capacity = 16;
   mapa->size = 0;
-  mapa->entries =
-      (JadeMapEntry *)jade_malloc(sizeof(JadeMapEntry) * mapa->capacity);
-  memset(mapa->entries, 0, sizeof(JadeMapEntry) * mapa->capacity);
+  mapa->borrados = 0;
+  mapa->tipo_clave = tipo_clave;
+  mapa->tipo_valor = JADE_ELEMENTO_PUNTERO;
+  mapa->referencias = 1;
+  mapa->entries = _jade_mapa_entradas(mapa->capacity);
   return mapa;
 }
 
-void _jade_mapa_redimensionar(JadeMap *mapa) {
+JadeMap *jade_mapa_nuevo(void) { return _jade_mapa_crear(JADE_CLAVE_TEXTO); }
+
+#ifdef JADE_MAPA_ROBIN_HOOD
+
+/* Distancia de la entrada en i a su posición ideal */
+static inline uint64_t _jade_mapa_distancia(const JadeMap *mapa, int64_t i) {
+  uint64_t mascara = (uint64_t)mapa->capacity - 1;
+  return ((uint64_t)i - mapa->entries[i].hash) & mascara;
+}
+
+static inline int64_t _jade_mapa_buscar(JadeMap *mapa, void *clave,
+                                        uint64_t hash, int64_t tipo_clave) {
+  uint64_t mascara = (uint64_t)mapa->capacity - 1;
+  uint64_t i = hash & mascara;
+  for (uint64_t distancia = 0;; distancia++, i = (i + 1) & mascara) {
+    JadeMapEntry *entrada = &mapa->entries[i];
+    /* Una entrada más cercana a su posición ideal que la clave buscada
+     * indica que la clave no está */
+    if (entrada->hash == JADE_MAPA_VACIO ||
+        distancia > _jade_mapa_distancia(mapa, (int64_t)i)) {
+      return -1;
+    }
+    if (_jade_mapa_iguales(entrada, hash, clave, tipo_clave)) {
+      return (int64_t)i;
+    }
+  }
+}
+
+/* Inserta una clave que no está en el mapa */
+static void _jade_mapa_insertar_nueva(JadeMap *mapa, uint64_t hash, void *clave,
+                                      void *valor) {
+  uint64_t mascara = (uint64_t)mapa->capacity - 1;
+  uint64_t i = hash & mascara;
+  JadeMapEntry actual = {hash, clave, valor};
+  for (uint64_t distancia = 0;; distancia++, i = (i + 1) & mascara) {
+    JadeMapEntry *entrada = &mapa->entries[i];
+    if (entrada->hash == JADE_MAPA_VACIO) {
+      *entrada = actual;
+      mapa->size++;
+      return;
+    }
+    /* Robar la posición a la entrada más cercana a su posición ideal */
+    uint64_t distancia_entrada = _jade_mapa_distancia(mapa, (int64_t)i);
+    if (distancia_entrada < distancia) {
+      JadeMapEntry desplazada = *entrada;
+      *entrada = actual;
+      actual = desplazada;
+      distancia = distancia_entrada;
+    }
+  }
+}
+
+static void _jade_mapa_quitar(JadeMap *mapa, int64_t indice) {
+  /* Desplazar hacia atrás las entradas siguientes hasta un hueco o una
+   * entrada en su posición ideal: no quedan tombstones */
+  uint64_t mascara = (uint64_t)mapa->capacity - 1;
+  uint64_t i = (uint64_t)indice;
+  uint64_t siguiente = (i + 1) & mascara;
+  while (mapa->entries[siguiente].hash != JADE_MAPA_VACIO &&
+         _jade_mapa_distancia(mapa, (int64_t)siguiente) > 0) {
+    mapa->entries[i] = mapa->entries[siguiente];
+    i = siguiente;
+    siguiente = (siguiente + 1) & mascara;
+  }
+  memset(&mapa->entries[i], 0, sizeof(JadeMapEntry));
+  mapa->size--;
+}
+
+#else
+
+static inline int64_t _jade_mapa_buscar(JadeMap *mapa, void *clave,
+                                        uint64_t hash, int64_t tipo_clave) {
+  uint64_t mascara = (uint64_t)mapa->capacity - 1;
+  for (uint64_t i = hash & mascara;; i = (i + 1) & mascara) {
+    JadeMapEntry *entrada = &mapa->entries[i];
+    if (entrada->hash == JADE_MAPA_VACIO) {
+      return -1;
+    }
+    /* Los tombstones no coinciden con ningún hash y se saltan */
+    if (_jade_mapa_iguales(entrada, hash, clave, tipo_clave)) {
+      return (int64_t)i;
+    }
+  }
+}
+
+/* Inserta una clave que no está en el mapa, reutilizando el primer
+ * tombstone de su secuencia de sondeo */
+static void _jade_mapa_insertar_nueva(JadeMap *mapa, uint64_t hash, void *clave,
+                                      void *valor) {
+  uint64_t mascara = (uint64_t)mapa->capacity - 1;
+  uint64_t i = hash & mascara;
+  while (_jade_mapa_ocupada(&mapa->entries[i])) {
+    i = (i + 1) & mascara;
+  }
+  if (mapa->entries[i].hash == JADE_MAPA_BORRADO) {
+    mapa->borrados--;
+  }
+  mapa->entries[i].hash = hash;
+  mapa->entries[i].clave = clave;
+  mapa->entries[i].valor = valor;
+  mapa->size++;
+}
+
+static void _jade_mapa_quitar(JadeMap *mapa, int64_t indice) {
+  uint64_t mascara = (uint64_t)mapa->capacity - 1;
+  JadeMapEntry *entrada = &mapa->entries[indice];
+  /* Si la siguiente entrada está vacía ninguna secuencia de sondeo pasa por
+   * esta: puede quedar vacía en lugar de convertirse en tombstone */
+  if (mapa->entries[((uint64_t)indice + 1) & mascara].hash == JADE_MAPA_VACIO) {
+    entrada->hash = JADE_MAPA_VACIO;
+  } else {
+    entrada->hash = JADE_MAPA_BORRADO;
+    mapa->borrados++;
+  }
+  entrada->clave = NULL;
+  entrada->valor = NULL;
+  mapa->size--;
+}
+
+#endif
+
+/* Reconstruye la tabla (descartando tombstones) con la capacidad dada */
+static void _jade_mapa_redimensionar(JadeMap *mapa, int64_t capacidad) {
   int64_t old_capacity = mapa->capacity;
   JadeMapEntry *old_entries = mapa->entries;
 
-  mapa->capacity *= 2;
-  mapa->entries =
-      (JadeMapEntry *)jade_malloc(sizeof(JadeMapEntry) * mapa->capacity);
-  memset(mapa->entries, 0, sizeof(JadeMapEntry) * mapa->capacity);
+  mapa->capacity = capacidad;
+  mapa->entries = _jade_mapa_entradas(capacidad);
   mapa->size = 0;
+  mapa->borrados = 0;
 
   for (int64_t i = 0; i < old_capacity; i++) {
-    if (old_entries[i].ocupado) {
-      jade_mapa_asignar(mapa, old_entries[i].clave, old_entries[i].valor);
+    if (_jade_mapa_ocupada(&old_entries[i])) {
+      /* El hash guardado evita recalcularlo */
+      _jade_mapa_insertar_nueva(mapa, old_entries[i].hash, old_entries[i].clave,
+                                old_entries[i].valor);
     }
   }
 
   jade_free(old_entries);
 }
 
-void jade_mapa_asignar(JadeMap *mapa, void *clave, void *valor) {
-  if (mapa->size >= mapa->capacity * 0.75) {
-    _jade_mapa_redimensionar(mapa);
+static inline void _jade_mapa_asignar(JadeMap *mapa, void *clave, void *valor,
+                                      int64_t tipo_clave) {
+  uint64_t hash = _jade_mapa_hash(clave, tipo_clave);
+  int64_t indice = _jade_mapa_buscar(mapa, clave, hash, tipo_clave);
+  if (indice >= 0) {
+    /* Actualizar existente */
+    jade_objeto_retener(valor, mapa->tipo_valor);
+    jade_objeto_liberar(mapa->entries[indice].valor, mapa->tipo_valor);
+    mapa->entries[indice].valor = valor;
+    return;
   }
 
-  uint64_t hash = _jade_hash(clave);
-  int64_t index = hash % mapa->capacity;
-
-  while (mapa->entries[index].ocupado) {
-    /* Usar strcmp para comparar claves strings */
-    if (strcmp((const char *)mapa->entries[index].clave, (const char *)clave) ==
-        0) {
-      /* Actualizar existente */
-      mapa->entries[index].valor = valor;
-      return;
+  /* Factor de carga máximo 3/4, contando los tombstones */
+  if ((mapa->size + mapa->borrados + 1) * 4 > mapa->capacity * 3) {
+    int64_t capacidad = mapa->capacity;
+    /* Si la mayoría son tombstones basta con reconstruir la tabla */
+    if ((mapa->size + 1) * 2 > capacidad) {
+      capacidad *= 2;
     }
-    index = (index + 1) % mapa->capacity;
+    _jade_mapa_redimensionar(mapa, capacidad);
+  }
+  /* El mapa es dueño de una referencia a cada clave de texto */
+  if (tipo_clave == JADE_CLAVE_TEXTO) {
+    jade_texto_retener((const char *)clave);
+  }
+  jade_objeto_retener(valor, mapa->tipo_valor);
+  _jade_mapa_insertar_nueva(mapa, hash, clave, valor);
+}
+
+static inline int64_t _jade_mapa_indice(JadeMap *mapa, void *clave,
+                                        int64_t tipo_clave) {
+  return _jade_mapa_buscar(mapa, clave, _jade_mapa_hash(clave, tipo_clave),
+                           tipo_clave);
+}
+
+static inline void *_jade_mapa_obtener(JadeMap *mapa, void *clave,
+                                       int64_t tipo_clave) {
+  int64_t indice = _jade_mapa_indice(mapa, clave, tipo_clave);
+  return indice >= 0 ? mapa->entries[indice].valor : NULL;
+}
+
+/* La referencia del mapa al valor pasa a quien lo elimina */
+static inline void *_jade_mapa_eliminar(JadeMap *mapa, void *clave,
+                                        int64_t tipo_clave) {
+  int64_t indice = _jade_mapa_indice(mapa, clave, tipo_clave);
+  if (indice < 0) {
+    return NULL;
   }
+  void *valor = mapa->entries[indice].valor;
+  void *clave_guardada = mapa->entries[indice].clave;
+  _jade_mapa_quitar(mapa, indice);
+  if (tipo_clave == JADE_CLAVE_TEXTO) {
+    jade_texto_liberar((const char *)clave_guardada);
+  }
+  return valor;
+}
 
-  /* Insertar nuevo */
-  mapa->entries[index].clave = clave;
-  mapa->entries[index].valor = valor;
-  mapa->entries[index].ocupado = 1;
-  mapa->size++;
+void jade_mapa_asignar(JadeMap *mapa, void *clave, void *valor) {
+  _jade_mapa_asignar(mapa, clave, valor, mapa->tipo_clave);
 }
 
 void *jade_mapa_obtener(JadeMap *mapa, void *clave) {
-  uint64_t hash = _jade_hash(clave);
-  int64_t index = hash % mapa->capacity;
-  int64_t start_index = index;
-
-  do {
-    if (mapa->entries[index].ocupado &&
-        strcmp((const char *)mapa->entries[index].clave, (const char *)clave) ==
-            0) {
-      return mapa->entries[index].valor;
-    }
-    if (!mapa->entries[index].ocupado && mapa->entries[index].clave == NULL) {
-      /* Encontró hueco vacío (no borrado), no existe */
-      return NULL;
-    }
-    index = (index + 1) % mapa->capacity;
-  } while (index != start_index);
-
-  return NULL;
+  return _jade_mapa_obtener(mapa, clave, mapa->tipo_clave);
 }
 
 int jade_mapa_contiene(JadeMap *mapa, void *clave) {
-  return jade_mapa_obtener(mapa, clave) != NULL;
+  /* No basta con obtener() != NULL: el valor puede ser 0 */
+  return _jade_mapa_indice(mapa, clave, mapa->tipo_clave) >= 0;
 }
 
 void *jade_mapa_eliminar(JadeMap *mapa, void *clave) {
-  uint64_t hash = _jade_hash(clave);
-  int64_t index = hash % mapa->capacity;
-  int64_t start_index = index;
-
-  do {
-    if (mapa->entries[index].ocupado &&
-        strcmp((const char *)mapa->entries[index].clave, (const char *)clave) ==
-            0) {
-      void *valor = mapa->entries[index].valor;
-      mapa->entries[index].ocupado = 0;
-      /* No limpiamos clave/valor para marcar como "borrado" (tombstone)
-         pero simplificamos aquí poniendo ocupado=0 */
-      mapa->size--;
-      return valor;
-    }
-    index = (index + 1) % mapa->capacity;
-  } while (index != start_index);
-
-  return NULL;
+  return _jade_mapa_eliminar(mapa, clave, mapa->tipo_clave);
 }
 
+/* Mapas especializados por tipo de clave */
+#define JADE_DEFINIR_MAPA(sufijo, TClave, TIPO)                                \
+  JadeMap *jade_mapa_##sufijo##_nuevo(void) { return _jade_mapa_crear(TIPO); } \
+                                                                               \
+  void jade_mapa_##sufijo##_asignar(JadeMap *mapa, TClave clave,               \
+                                    void *valor) {                             \
+    _jade_mapa_asignar(mapa, (void *)(uintptr_t)clave, valor, TIPO);           \
+  }                                                                            \
+                                                                               \
+  void *jade_mapa_##sufijo##_obtener(JadeMap *mapa, TClave clave) {            \
+    return _jade_mapa_obtener(mapa, (void *)(uintptr_t)clave, TIPO);           \
+  }                                                                            \
+                                                                               \
+  void *jade_mapa_##sufijo##_eliminar(JadeMap *mapa, TClave clave) {           \
+    return _jade_mapa_eliminar(mapa, (void *)(uintptr_t)clave, TIPO);          \
+  }                                                                            \
+                                                                               \
+  int jade_mapa_##sufijo##_contiene(JadeMap *mapa, TClave clave) {             \
+    return _jade_mapa_indice(mapa, (void *)(uintptr_t)clave, TIPO) >= 0;       \
+  }
+
+JADE_DEFINIR_MAPA(entero, int64_t, JADE_CLAVE_ENTERO)
+JADE_DEFINIR_MAPA(texto, const char *, JADE_CLAVE_TEXTO)
+
 int64_t jade_mapa_longitud(JadeMap *mapa) { return mapa->size; }
 
 JadeList *jade_mapa_claves(JadeMap *mapa) {
-  JadeList *lista = jade_lista_nueva();
+  /* La lista comparte las claves de texto: siguen vivas aunque se eliminen */
+  JadeList *lista = _jade_lista_crear(mapa->tipo_clave == JADE_CLAVE_TEXTO
+                                          ? JADE_ELEMENTO_TEXTO
+                                          : JADE_ELEMENTO_PUNTERO);
   for (int64_t i = 0; i < mapa->capacity; i++) {
-    if (mapa->entries[i].ocupado) {
+    if (_jade_mapa_ocupada(&mapa->entries[i])) {
       jade_lista_agregar(lista, mapa->entries[i].clave);
     }
   }
@@ -356,22 +1191,41 @@ JadeList *jade_mapa_claves(JadeMap *mapa) {
 }
 
 JadeList *jade_mapa_valores(JadeMap *mapa) {
-  JadeList *lista = jade_lista_nueva();
+  JadeList *lista = _jade_lista_crear(_jade_es_objeto(mapa->tipo_valor)
+                                          ? mapa->tipo_valor
+                                          : JADE_ELEMENTO_PUNTERO);
   for (int64_t i = 0; i < mapa->capacity; i++) {
-    if (mapa->entries[i].ocupado) {
+    if (_jade_mapa_ocupada(&mapa->entries[i])) {
       jade_lista_agregar(lista, mapa->entries[i].valor);
     }
   }
   return lista;
 }
 
-void jade_mapa_liberar(JadeMap *mapa) {
+void jade_mapa_especializar_valores(JadeMap *mapa, int64_t tipo) {
+  mapa->tipo_valor = tipo;
+}
+
+void jade_mapa_retener(JadeMap *mapa) {
   if (mapa) {
-    if (mapa->entries) {
-      jade_free(mapa->entries);
+    mapa->referencias++;
+  }
+}
+
+void jade_mapa_liberar(JadeMap *mapa) {
+  if (!mapa || --mapa->referencias > 0) {
+    return;
+  }
+  for (int64_t i = 0; i < mapa->capacity; i++) {
+    if (_jade_mapa_ocupada(&mapa->entries[i])) {
+      if (mapa->tipo_clave == JADE_CLAVE_TEXTO) {
+        jade_texto_liberar((const char *)mapa->entries[i].clave);
+      }
+      jade_objeto_liberar(mapa->entries[i].valor, mapa->tipo_valor);
     }
-    jade_free(mapa);
   }
+  jade_free(mapa->entries);
+  jade_free(mapa);
 }
 
 /* ============================================================================
@@ -382,4 +1236,34 @@ void jade_mapa_liberar(JadeMap *mapa) {
 void jade_init_runtime(void) {
   // Inicializar generador de números aleatorios
   srand((unsigned int)time(NULL));
+
+  // Elegir el asignador de memoria (JADE_ALLOC=arena|sistema)
+  const char *asignador = getenv("JADE_ALLOC");
+  _jade_asignador = asignador && strcmp(asignador, "arena") == 0
+                        ? JADE_ASIGNADOR_ARENA
+                        : JADE_ASIGNADOR_SISTEMA;
+  const char *estadisticas = getenv("JADE_ALLOC_STATS");
+  _jade_mostrar_estadisticas =
+      estadisticas && estadisticas[0] && strcmp(estadisticas, "0") != 0;
+  memset(&_jade_estadisticas, 0, sizeof(_jade_estadisticas));
+
+  // Salida con buffer salvo JADE_SALIDA_SIN_BUFFER=1; lo acumulado se
+  // escribe también si el programa termina con exit() por un error
+  const char *sin_buffer = getenv("JADE_SALIDA_SIN_BUFFER");
+  _jade_salida_con_buffer =
+      !(sin_buffer && sin_buffer[0] && strcmp(sin_buffer, "0") != 0);
+  static int salida_registrada = 0;
+  if (!salida_registrada) {
+    atexit(jade_vaciar_salida);
+    salida_registrada = 1;
+  }
+}
+
+void jade_finalizar_runtime(void) {
+  jade_vaciar_salida();
+  if (_jade_mostrar_estadisticas) {
+    jade_mostrar_estadisticas_memoria();
+  }
+  // La arena es la región del programa: se libera entera al terminar
+  _jade_arena_liberar_todo();
 }
@@ -8,13 +8,88 @@
 #include <stddef.h>
 #include <stdint.h>
 
-/* Gestión de memoria */
+/* Gestión de memoria. El asignador se elige al iniciar el runtime con la
+ * variable de entorno JADE_ALLOC: "sistema" (malloc/free, por defecto) o
+ * "arena" (reserva por incremento de puntero en bloques grandes; liberar
+ * solo deshace la última reserva o guarda las pequeñas para reutilizarlas, y
+ * las regiones se liberan de una vez). Con JADE_ALLOC_STATS=1 el programa informa al terminar del número de
+ * reservas y de la memoria máxima (RSS). */
+#define JADE_ASIGNADOR_SISTEMA 0
+#define JADE_ASIGNADOR_ARENA 1
+
 void *jade_malloc(size_t size);
+void *jade_realloc(void *ptr, size_t size);
 void jade_free(void *ptr);
 
-/* Entrada/Salida */
+/* Regiones de la arena: marca() recuerda la posición actual y restaurar()
+ * libera todo lo reservado después; lo que se liberó dentro de la región pero
+ * se había reservado antes sigue disponible. Con el asignador del sistema no
+ * hacen nada. */
+void *jade_arena_marca(void);
+void jade_arena_restaurar(void *marca);
+
+typedef struct {
+  int64_t asignaciones;
+  int64_t reasignaciones;
+  int64_t liberaciones;
+  int64_t bytes_pedidos;
+  int64_t regiones;          /* Regiones de la arena liberadas */
+  int64_t bloques_arena;     /* Bloques de la arena pedidos al sistema */
+  int64_t bytes_arena;       /* Bytes de los bloques que retiene la arena */
+  int64_t bytes_arena_max;
+} JadeEstadisticasMemoria;
+
+const JadeEstadisticasMemoria *jade_estadisticas_memoria(void);
+void jade_mostrar_estadisticas_memoria(void);
+
+/* Textos: los valores de tipo texto son punteros a los datos (terminados en
+ * NUL, válidos como char*) de un JadeString, cuya cabecera está justo
+ * antes. Longitud y hash se leen de la cabecera sin recorrer el texto. */
+typedef struct {
+  int64_t longitud;    /* Bytes, sin el NUL final */
+  int64_t capacidad;   /* Bytes reservados para datos, sin el NUL */
+  int64_t referencias; /* Contador de referencias o JADE_TEXTO_INMORTAL */
+  uint64_t hash;       /* Hash de los datos; 0 si aún no se calculó */
+  char datos[];
+} JadeString;
+
+/* Literales del programa: nunca se liberan */
+#define JADE_TEXTO_INMORTAL (-1)
+
+#define JADE_TEXTO(texto)                                                      \
+  ((JadeString *)((char *)(texto) - offsetof(JadeString, datos)))
+
+char *jade_texto_nuevo(const char *datos, int64_t longitud);
+char *jade_texto_desde_c(const char *cadena);
+uint64_t jade_texto_hash(const char *texto);
+void jade_texto_retener(const char *texto);
+void jade_texto_liberar(const char *texto);
+
+/* Constructor de textos: agregar() copia solo el texto agregado y el búfer
+ * crece al doble cuando se llena */
+typedef struct {
+  char *datos;
+  int64_t longitud;
+  int64_t capacidad;
+  int64_t referencias;
+} JadeConstructorTexto;
+
+JadeConstructorTexto *jade_constructor_texto_nuevo(void);
+void jade_constructor_texto_agregar(JadeConstructorTexto *constructor,
+                                    const char *texto);
+char *jade_constructor_texto_construir(JadeConstructorTexto *constructor);
+int64_t jade_constructor_texto_longitud(JadeConstructorTexto *constructor);
+void jade_constructor_texto_retener(JadeConstructorTexto *constructor);
+void jade_constructor_texto_liberar(JadeConstructorTexto *constructor);
+
+/* Entrada/Salida. mostrar() acumula la salida en un buffer que se escribe
+ * al llenarse, antes de leer(), con jade_vaciar_salida() y al terminar el
+ * programa. Sin buffer (jade_configurar_salida(0) o la variable de entorno
+ * JADE_SALIDA_SIN_BUFFER=1) cada línea se escribe en el momento. */
 void jade_mostrar(const char *texto);
 char *jade_leer(void);
+void jade_vaciar_salida(void);
+void jade_configurar_salida(int64_t con_buffer);
 
 /* Conversiones */
 char *jade_convertir_a_texto_entero(int64_t n);
@@ -38,12 +113,34 @@ double jade_aleatorio(void);
  */
 
 /* Listas dinámicas */
+
+/* Tipo de los elementos: los especializados se guardan sin caja. Los
+ * objetos (textos, listas, mapas y constructores) se guardan como punteros
+ * y la lista es dueña de una referencia a cada uno: la toma al agregarlo o
+ * asignarlo y la suelta al reemplazarlo o al liberarse. Los punteros
+ * genéricos no se cuentan. */
+#define JADE_ELEMENTO_PUNTERO 0  /* void* (genérico) */
+#define JADE_ELEMENTO_ENTERO 1   /* int64_t */
+#define JADE_ELEMENTO_FLOTANTE 2 /* double */
+#define JADE_ELEMENTO_BOOLEANO 3 /* uint8_t */
+#define JADE_ELEMENTO_TEXTO 4
+#define JADE_ELEMENTO_LISTA 5
+#define JADE_ELEMENTO_MAPA 6
+#define JADE_ELEMENTO_CONSTRUCTOR 7
+
 typedef struct {
-  void **data;      /* Array de punteros a elementos */
+  void **data;      /* Arreglo contiguo de elementos (ver tipo) */
   int64_t size;     /* Número actual de elementos */
   int64_t capacity; /* Capacidad reservada */
+  int64_t tipo;     /* JADE_ELEMENTO_* */
+  int64_t referencias;
 } JadeList;
 
+/* Contadores de referencias de un objeto de tipo JADE_ELEMENTO_* (no hacen
+ * nada con los demás tipos ni con NULL) */
+void jade_objeto_retener(void *objeto, int64_t tipo);
+void jade_objeto_liberar(void *objeto, int64_t tipo);
+
 JadeList *jade_lista_nueva(void);
 void jade_lista_agregar(JadeList *lista, void *elemento);
 void *jade_lista_obtener(JadeList *lista, int64_t indice);
@@ -51,21 +148,70 @@ void jade_lista_asignar(JadeList *lista, int64_t indice, void *valor);
 int64_t jade_lista_longitud(JadeList *lista);
 void *jade_lista_eliminar(JadeList *lista, int64_t indice);
 int jade_lista_contiene(JadeList *lista, void *elemento);
+/* Las listas nacen con una referencia; liberar suelta una y, al llegar a
+ * cero, libera la lista y suelta sus elementos */
+void jade_lista_retener(JadeList *lista);
 void jade_lista_liberar(JadeList *lista);
+/* Reporta un índice fuera de rango y termina (el código generado comprueba
+ * los límites en línea y solo llama aquí en caso de error) */
+void jade_lista_error_indice(JadeList *lista, int64_t indice)
+    __attribute__((noreturn));
+/* Convierte la lista al tipo de elemento dado (p. ej. la de mapa.claves()) */
+void jade_lista_especializar(JadeList *lista, int64_t tipo);
+
+/* Listas especializadas por tipo de elemento */
+JadeList *jade_lista_entero_nueva(void);
+void jade_lista_entero_agregar(JadeList *lista, int64_t valor);
+int64_t jade_lista_entero_obtener(JadeList *lista, int64_t indice);
+void jade_lista_entero_asignar(JadeList *lista, int64_t indice, int64_t valor);
+int64_t jade_lista_entero_eliminar(JadeList *lista, int64_t indice);
+int jade_lista_entero_contiene(JadeList *lista, int64_t valor);
+
+JadeList *jade_lista_flotante_nueva(void);
+void jade_lista_flotante_agregar(JadeList *lista, double valor);
+double jade_lista_flotante_obtener(JadeList *lista, int64_t indice);
+void jade_lista_flotante_asignar(JadeList *lista, int64_t indice, double valor);
+double jade_lista_flotante_eliminar(JadeList *lista, int64_t indice);
+int jade_lista_flotante_contiene(JadeList *lista, double valor);
+
+JadeList *jade_lista_booleano_nueva(void);
+void jade_lista_booleano_agregar(JadeList *lista, uint8_t valor);
+uint8_t jade_lista_booleano_obtener(JadeList *lista, int64_t indice);
+void jade_lista_booleano_asignar(JadeList *lista, int64_t indice, uint8_t valor);
+uint8_t jade_lista_booleano_eliminar(JadeList *lista, int64_t indice);
+int jade_lista_booleano_contiene(JadeList *lista, uint8_t valor);
+
+/* Mapas: direccionamiento abierto con sondeo lineal y capacidad potencia de
+ * dos. Cada entrada guarda el hash de su clave; los valores 0 y 1 del campo
+ * marcan una entrada vacía o borrada (tombstone). Compilado con
+ * -DJADE_MAPA_ROBIN_HOOD usa sondeo Robin Hood con borrado por
+ * desplazamiento hacia atrás, sin tombstones. */
+#define JADE_MAPA_VACIO 0
+#define JADE_MAPA_BORRADO 1
+
+/* Tipo de las claves: texto (char*) o entero (int64_t guardado en void*) */
+#define JADE_CLAVE_TEXTO 0
+#define JADE_CLAVE_ENTERO 1
 
-/* Mapas (Hash Map simple) */
 typedef struct {
+  uint64_t hash; /* Hash de la clave (>= 2), o JADE_MAPA_VACIO/BORRADO */
   void *clave;
   void *valor;
-  int ocupado; /* 1 si tiene valor, 0 si está vacío/borrado */
 } JadeMapEntry;
 
 typedef struct {
   JadeMapEntry *entries;
-  int64_t capacity;
-  int64_t size;
+  int64_t capacity; /* Potencia de dos */
+  int64_t size;     /* Entradas con clave */
+  int64_t borrados; /* Tombstones (cuentan para el factor de carga) */
+  int64_t tipo_clave; /* JADE_CLAVE_* */
+  int64_t tipo_valor; /* JADE_ELEMENTO_*: los objetos se cuentan */
+  int64_t referencias;
 } JadeMap;
 
+/* Hash de 64 bits para bloques de bytes (estilo wyhash) */
+uint64_t jade_hash_bytes(const void *datos, size_t longitud);
+
 JadeMap *jade_mapa_nuevo(void);
 void jade_mapa_asignar(JadeMap *mapa, void *clave, void *valor);
 void *jade_mapa_obtener(JadeMap *mapa, void *clave);
@@ -74,13 +220,33 @@ int jade_mapa_contiene(JadeMap *mapa, void *clave);
 int64_t jade_mapa_longitud(JadeMap *mapa);
 JadeList *jade_mapa_claves(JadeMap *mapa);
 JadeList *jade_mapa_valores(JadeMap *mapa);
+/* Tipo de los valores (JADE_ELEMENTO_*), fijado al crear el mapa */
+void jade_mapa_especializar_valores(JadeMap *mapa, int64_t tipo);
+void jade_mapa_retener(JadeMap *mapa);
 void jade_mapa_liberar(JadeMap *mapa);
 
+/* Mapas especializados por tipo de clave (las operaciones genéricas
+ * consultan tipo_clave; longitud, claves, valores y liberar son comunes) */
+JadeMap *jade_mapa_entero_nuevo(void);
+void jade_mapa_entero_asignar(JadeMap *mapa, int64_t clave, void *valor);
+void *jade_mapa_entero_obtener(JadeMap *mapa, int64_t clave);
+void *jade_mapa_entero_eliminar(JadeMap *mapa, int64_t clave);
+int jade_mapa_entero_contiene(JadeMap *mapa, int64_t clave);
+
+JadeMap *jade_mapa_texto_nuevo(void);
+void jade_mapa_texto_asignar(JadeMap *mapa, const char *clave, void *valor);
+void *jade_mapa_texto_obtener(JadeMap *mapa, const char *clave);
+void *jade_mapa_texto_eliminar(JadeMap *mapa, const char *clave);
+int jade_mapa_texto_contiene(JadeMap *mapa, const char *clave);
+
 /* Operaciones de cadenas (faltantes) */
 char *jade_concatenar(const char *a, const char *b);
+/* Concatena n textos con una sola reserva (cadenas a + b + c + ...) */
+char *jade_concatenar_n(int64_t n, const char **partes);
 int64_t jade_longitud(const char *str);
 
-/* Inicialización */
+/* Inicialización y cierre */
 void jade_init_runtime(void);
+void jade_finalizar_runtime(void);
 
 #endif /* JADE_RUNTIME_H */
@@ -0,0 +1,89 @@
+"""
+Tests del asignador de arena del runtime (JADE_ALLOC=arena) y de las
+regiones que abre el código generado
+"""
+
+import sys
+sys.path.insert(0, '../src')
+
+import os
+import subprocess
+
+import pytest
+
+llvmlite = pytest.importorskip("llvmlite")
+
+from utilidades import requiere_cc, generar_ir, cuerpo_funcion, ejecutar_jit, compilar
+
+# contar() reserva textos, listas y mapas y retorna un entero: tiene región.
+# doble() no reserva nada: no la necesita.
+PROGRAMA = """
+funcion contar(texto prefijo, entero n)
+    variable xs = [0]
+    variable m = {"x": 0}
+    variable ct = constructor_texto()
+    variable i = 0
+    mientras i < n hacer
+        variable t = prefijo + convertir_a_texto(i)
+        xs.agregar(t.longitud())
+        m[t] = i
+        ct.agregar(t)
+        i = i + 1
+    fin
+    retornar xs.longitud() + m.longitud() + ct.longitud() + m[prefijo + "7"]
+fin
+
+funcion doble(entero n)
+    retornar n * 2
+fin
+
+funcion main()
+    variable total = 0
+    variable k = 0
+    mientras k < 50 hacer
+        total = total + contar("clave", 300 + k)
+        k = k + 1
+    fin
+    mostrar(convertir_a_texto(doble(total)))
+fin
+"""
+
+SALIDA = "314400\n"
+
+
+def test_regiones_por_funcion():
+    llvm_ir = generar_ir(PROGRAMA)
+    contar = cuerpo_funcion(llvm_ir, 'contar')
+    assert 'call i8* @"jade_arena_marca"()' in contar
+    assert contar.count('call void @"jade_arena_restaurar"') == 1
+    assert 'jade_arena_marca' not in cuerpo_funcion(llvm_ir, 'doble')
+    # El punto de entrada libera la arena del programa
+    assert 'call void @"jade_finalizar_runtime"()' in cuerpo_funcion(llvm_ir, '_jade_main')
+
+
+@requiere_cc
+@pytest.mark.parametrize("asignador", ['sistema', 'arena'])
+def test_asignadores_misma_salida(tmp_path, asignador):
+    resultado = ejecutar_jit(tmp_path, PROGRAMA, {'JADE_ALLOC': asignador, 'JADE_ALLOC_STATS': '1'})
+    assert resultado.returncode == 0, resultado.stderr
+    assert resultado.stdout == SALIDA
+    assert f"[memoria] asignador: {asignador}" in resultado.stderr
+    assert "[memoria] memoria máxima (RSS):" in resultado.stderr
+    if asignador == 'arena':
+        # Una región por llamada a contar() y la de main
+        assert "51 regiones liberadas" in resultado.stderr
+
+
+@requiere_cc
+def test_ejecutable_inicia_el_runtime(tmp_path):
+    """El main de C del ejecutable pasa por jade_init_runtime y jade_finalizar_runtime"""
+    ejecutable = compilar(tmp_path, PROGRAMA)
+    resultado = subprocess.run([ejecutable], capture_output=True, text=True,
+                               env={**os.environ, 'JADE_ALLOC': 'arena', 'JADE_ALLOC_STATS': '1'})
+    assert resultado.returncode == 0
+    assert resultado.stdout == SALIDA
+    assert "[memoria] asignador: arena" in resultado.stderr
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,100 @@
+"""
+Tests de la recompilación incremental de Jade
+"""
+
+import sys
+sys.path.insert(0, '../src')
+
+import os
+import subprocess
+
+import pytest
+
+llvmlite = pytest.importorskip("llvmlite")
+
+from module_loader import registro_modulos
+from incremental import ConstruccionIncremental
+from linker import compilar_runtime, enlazar
+from utilidades import requiere_cc
+
+
+BASE = """
+funcion sumar(entero a, entero b)
+    retornar a + b
+fin
+"""
+
+MEDIO = """
+importar "base.jde"
+
+funcion doble(entero x)
+    retornar sumar(x, x)
+fin
+"""
+
+PRINCIPAL = """
+importar "medio.jde"
+
+funcion main()
+    mostrar(convertir_a_texto(doble(sumar(1, 2))))
+fin
+"""
+
+
+def construir(directorio):
+    """Una construcción como la de un proceso nuevo del compilador"""
+    for ruta in [r for r in registro_modulos.modulos if r.startswith(str(directorio))]:
+        del registro_modulos.modulos[ruta]
+    construccion = ConstruccionIncremental(str(directorio / "principal.jde"))
+    objetos = construccion.construir()
+    nombres = lambda rutas: [ruta.rsplit('/', 1)[-1] for ruta in rutas]
+    return nombres(construccion.regenerados), objetos
+
+
+def test_recompila_solo_lo_afectado(tmp_path):
+    for nombre, codigo in (("base", BASE), ("medio", MEDIO), ("principal", PRINCIPAL)):
+        (tmp_path / f"{nombre}.jde").write_text(codigo, encoding='utf-8')
+
+    regenerados, objetos = construir(tmp_path)
+    assert regenerados == ["base.jde", "medio.jde", "principal.jde"]
+    assert all(os.path.exists(objeto) for objeto in objetos)
+    # Cada módulo define sus funciones y declara las importadas
+    with open(os.path.splitext(objetos[1])[0] + ".ll") as f:
+        medio = f.read()
+    assert 'define i64 @"doble"' in medio and 'declare i64 @"sumar"' in medio
+    assert construir(tmp_path)[0] == []
+
+    # Cambio en el cuerpo: las firmas no cambian, los importadores se reutilizan
+    (tmp_path / "base.jde").write_text(BASE.replace("a + b", "b + a"), encoding='utf-8')
+    assert construir(tmp_path)[0] == ["base.jde"]
+
+    # Cambio de firma: se recompilan los módulos que lo ven
+    (tmp_path / "base.jde").write_text(BASE.replace("entero b", "b"), encoding='utf-8')
+    assert construir(tmp_path)[0] == ["base.jde", "medio.jde", "principal.jde"]
+
+
+def test_error_en_modulo(tmp_path):
+    (tmp_path / "base.jde").write_text(BASE.replace("a + b", "c"), encoding='utf-8')
+    (tmp_path / "principal.jde").write_text(PRINCIPAL.replace("medio", "base").replace("doble(", "("),
+                                            encoding='utf-8')
+    with pytest.raises(Exception):
+        construir(tmp_path)
+    (tmp_path / "base.jde").write_text(BASE, encoding='utf-8')
+    assert construir(tmp_path)[0] == ["base.jde", "principal.jde"]
+
+
+@requiere_cc
+def test_enlace_por_modulos(tmp_path):
+    """Los objetos de cada módulo se enlazan con el runtime en un ejecutable"""
+    for nombre, codigo in (("base", BASE), ("medio", MEDIO), ("principal", PRINCIPAL)):
+        (tmp_path / f"{nombre}.jde").write_text(codigo.replace("retornar a + b", 'mostrar("base")\n    retornar a + b'),
+                                                encoding='utf-8')
+    _, objetos = construir(tmp_path)
+    ejecutable = str(tmp_path / "principal")
+    enlazar(objetos + [compilar_runtime(str(tmp_path / "__jadebuild__"))], ejecutable)
+    salida = subprocess.run([ejecutable], capture_output=True, text=True).stdout
+    assert salida == "base\nbase\n6\n"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
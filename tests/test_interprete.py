@@ -0,0 +1,160 @@
+"""
+Tests de los motores del intérprete de Jade
+"""
+
+import sys
+sys.path.insert(0, '../src')
+
+import contextlib
+import io
+import os
+
+import pytest
+from lexer import tokenizar_codigo
+from parser import parsear_codigo
+from interpreter import InterpreteJade
+from closure_compiler import InterpreteCierres
+from vm import InterpreteBytecode
+from bytecode import NOMBRES_OPCODES
+
+
+EJEMPLOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'examples')
+
+MOTORES = [InterpreteJade, InterpreteCierres, InterpreteBytecode]
+
+
+def ejecutar(clase_motor, codigo: str, archivo: str = "") -> str:
+    """Ejecuta código Jade con el motor dado y retorna la salida"""
+    programa = parsear_codigo(tokenizar_codigo(codigo))
+    salida = io.StringIO()
+    with contextlib.redirect_stdout(salida):
+        clase_motor(archivo).ejecutar_programa(programa)
+    return salida.getvalue()
+
+
+@pytest.mark.parametrize("nombre", [
+    'factorial.jde', 'fibonacci.jde', 'listas.jde', 'mapas.jde',
+    'modulo_main.jde', 'test_enums.jde', 'test_strings.jde',
+])
+def test_motores_misma_salida(nombre):
+    """Todos los motores producen la misma salida que el intérprete de árbol"""
+    ruta = os.path.join(EJEMPLOS, nombre)
+    with open(ruta, 'r', encoding='utf-8') as f:
+        codigo = f.read()
+    
+    esperado = ejecutar(InterpreteJade, codigo, ruta)
+    assert esperado
+    for motor in MOTORES[1:]:
+        assert ejecutar(motor, codigo, ruta) == esperado
+
+
+@pytest.mark.parametrize("motor", MOTORES)
+def test_recursion(motor):
+    """Prueba llamadas recursivas"""
+    codigo = """
+    funcion fib(n)
+        si n <= 1 entonces
+            retornar n
+        fin
+        retornar fib(n - 1) + fib(n - 2)
+    fin
+    
+    funcion main()
+        mostrar(fib(15))
+    fin
+    """
+    assert ejecutar(motor, codigo) == "610\n"
+
+
+@pytest.mark.parametrize("motor", [InterpreteCierres, InterpreteBytecode])
+def test_romper_continuar(motor):
+    """Prueba romper/continuar en los motores compilados"""
+    codigo = """
+    funcion main()
+        variable suma = 0
+        para i desde 0 hasta 100 hacer
+            si i % 2 == 0 entonces
+                continuar
+            fin
+            si i > 10 entonces
+                romper
+            fin
+            suma = suma + i
+        fin
+        mostrar(suma)
+    fin
+    """
+    assert ejecutar(motor, codigo) == "25\n"
+
+
+@pytest.mark.parametrize("motor", MOTORES)
+def test_constructor_texto(motor):
+    """Prueba constructor_texto() y la interpolación con f()"""
+    codigo = """
+    funcion main()
+        variable ct = constructor_texto()
+        para i desde 0 hasta 3 hacer
+            ct.agregar(f("[{}]", i))
+        fin
+        mostrar(ct.construir())
+        mostrar(ct.longitud())
+        mostrar(f("{} y {} {}", "uno", 2))
+    fin
+    """
+    assert ejecutar(motor, codigo) == "[0][1][2]\n9\nuno y 2 {}\n"
+
+
+def test_desensamblador():
+    """Prueba que el bytecode use slots locales y se pueda desensamblar"""
+    codigo = """
+    funcion doble(x)
+        variable r = x * 2
+        retornar r
+    fin
+    
+    funcion main()
+        mostrar(doble(21))
+        mostrar([1, 2].longitud())
+    fin
+    """
+    programa = parsear_codigo(tokenizar_codigo(codigo))
+    texto = InterpreteBytecode().desensamblar_programa(programa)
+    
+    assert "funcion doble(x)" in texto
+    assert "LOAD_LOCAL         0  (x)" in texto
+    assert "STORE_LOCAL        1  (r)" in texto
+    assert "CALL               0  (doble/1)" in texto
+    assert "CALL_METHOD" in texto
+    # Solo opcodes, sin las constantes enteras que llegan de ast_nodes
+    assert sorted(NOMBRES_OPCODES) == list(range(len(NOMBRES_OPCODES)))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
+
+
+def test_marcos_de_llamada():
+    """Cada llamada tiene sus propias locales y la pila queda vacía al terminar"""
+    codigo = """
+funcion cuenta(n)
+    variable x = n
+    si n > 0 entonces
+        cuenta(n - 1)
+    fin
+    retornar x
+fin
+
+funcion main()
+    variable x = 100
+    mostrar(cuenta(50))
+    mostrar(x)
+fin
+"""
+    programa = parsear_codigo(tokenizar_codigo(codigo))
+    interprete = InterpreteJade()
+    salida = io.StringIO()
+    with contextlib.redirect_stdout(salida):
+        interprete.ejecutar_programa(programa)
+    assert salida.getvalue() == "50\n100\n"
+    assert interprete.marcos == []
+    assert interprete.variables is interprete.valores_globales
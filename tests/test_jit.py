@@ -0,0 +1,40 @@
+"""
+Tests de la ejecución JIT de Jade
+"""
+
+import sys
+sys.path.insert(0, '../src')
+
+import pytest
+
+llvmlite = pytest.importorskip("llvmlite")
+
+from utilidades import requiere_cc, ejecutar_jit
+
+PROGRAMA = """
+funcion factorial(entero n)
+    si n <= 1 entonces
+        retornar 1
+    fin
+    retornar n * factorial(n - 1)
+fin
+
+funcion main()
+    mostrar("factorial:")
+    mostrar(convertir_a_texto(factorial(10)))
+fin
+"""
+
+
+@requiere_cc
+def test_jit_ejecuta_main(tmp_path):
+    """--jit ejecuta el programa en memoria: solo su salida va a stdout"""
+    resultado = ejecutar_jit(tmp_path, PROGRAMA)
+    assert resultado.returncode == 0, resultado.stderr
+    assert resultado.stdout == "factorial:\n3628800\n"
+    assert not (tmp_path / "programa.ll").exists()
+    assert list((tmp_path / "__jadebuild__").glob("runtime-*.so"))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -6,7 +6,7 @@ import sys
 sys.path.insert(0, '../src')
 
 import pytest
-from lexer import Lexer, tokenizar_codigo
+from lexer import Lexer, crear_lexer, tokenizar_codigo, tokenizar_flujo
 from token_types import TokenType
 
 
@@ -165,5 +165,84 @@ def test_funcion_simple():
     assert tokens[6].tipo == TokenType.PARENTESIS_DER
 
 
+
+def test_flujo_tokens():
+    """El FlujoTokens produce los mismos tokens que la lista, sin copiar lexemas"""
+    codigo = """
+    funcion saludo(nombre) // comentario
+        variable mensaje = "Hola\\t\\"" + nombre
+        retornar mensaje + 'x' + convertir_a_texto(3.14 <= 10)
+    fin
+    """
+    tokens = tokenizar_codigo(codigo)
+    flujo = tokenizar_flujo(codigo)
+
+    assert len(flujo) == len(tokens)
+    for i, token in enumerate(tokens):
+        assert flujo.tipo(i) == token.tipo
+        assert flujo.valor(i) == token.valor
+        assert (flujo.linea(i), flujo.columna(i)) == (token.linea, token.columna)
+
+    # El texto es el lexema del código fuente; el valor resuelve escapes
+    i = next(i for i, t in enumerate(tokens) if t.tipo == TokenType.LITERAL_TEXTO)
+    assert flujo.texto(i) == '"Hola\\t\\""'
+    assert flujo.valor(i) == 'Hola\t"'
+
+
+def test_lexer_rapido_equivalente():
+    """El lexer rápido produce los mismos tokens y errores que el clásico"""
+    codigo = '''
+    /* comentario
+       de bloque */
+    funcion año_2(x) // fin de línea
+        variable t = "a\\n\\"b" + 'c' + '\\t' + """uno
+dos"""
+        retornar [x >= 1.5, x != 2, x /= 3, x % 4 ^ 5]
+    fin
+    '''
+    for salida in ('tokenizar', 'tokenizar_flujo'):
+        clasico = getattr(crear_lexer(codigo, 'clasico'), salida)()
+        rapido = getattr(crear_lexer(codigo, 'rapido'), salida)()
+        if salida == 'tokenizar_flujo':
+            clasico, rapido = clasico.a_lista(), rapido.a_lista()
+        assert [(t.tipo, t.valor, t.linea, t.columna) for t in rapido] == \
+               [(t.tipo, t.valor, t.linea, t.columna) for t in clasico]
+
+    for erroneo in ['variable x = 1.2.3', 'x = "sin cerrar', "''", '/* abierto', 'x # y']:
+        with pytest.raises(SyntaxError) as clasico:
+            tokenizar_codigo(erroneo, 'clasico')
+        with pytest.raises(SyntaxError) as rapido:
+            tokenizar_codigo(erroneo, 'rapido')
+        assert str(rapido.value) == str(clasico.value)
+
+
+
+def test_lexer_en_flujo():
+    """Un archivo o iterable de fragmentos produce los mismos tokens que la cadena"""
+    import io
+    from parser import parsear_codigo
+
+    codigo = """
+    funcion main() /* bloque
+    partido */
+        variable t = \"\"\"uno
+dos\"\"\" + "esc\\"ape"
+        mostrar(t + convertir_a_texto(12.5 >= 3))
+    fin
+    """
+    esperado = [(t.tipo, t.valor, t.linea, t.columna) for t in tokenizar_codigo(codigo)]
+    # Fragmentos de un carácter: ningún token ni comentario cae entero en uno
+    for fuente in (io.StringIO(codigo), iter(codigo), ['', codigo[:7], '', codigo[7:]]):
+        tokens = Lexer(fuente).iterar_tokens()
+        assert [(t.tipo, t.valor, t.linea, t.columna) for t in tokens] == esperado
+
+    flujo = tokenizar_flujo(iter(codigo))
+    assert [(t.tipo, t.valor, t.linea, t.columna) for t in flujo.a_lista()] == esperado
+
+    # El parser consume el generador mientras el lexer lee la fuente
+    programa = parsear_codigo(Lexer(iter(codigo)).iterar_tokens())
+    assert programa.declaraciones[0].nombre == 'main'
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,38 @@
+"""
+Tests de la emisión de objetos y el enlace de Jade
+"""
+
+import sys
+sys.path.insert(0, '../src')
+
+import os
+import subprocess
+
+import pytest
+
+llvmlite = pytest.importorskip("llvmlite")
+
+from linker import compilar_runtime, compilar_runtime_en_segundo_plano
+from utilidades import requiere_cc, compilar
+
+pytestmark = requiere_cc
+
+
+def test_runtime_en_cache(tmp_path):
+    """El runtime se compila una vez por hash de sus fuentes y opciones"""
+    ruta = compilar_runtime(str(tmp_path))
+    modificado = os.path.getmtime(ruta)
+    assert compilar_runtime_en_segundo_plano(str(tmp_path)).result() == ruta
+    assert os.path.getmtime(ruta) == modificado
+    assert [p.name for p in tmp_path.iterdir()] == [os.path.basename(ruta)]
+
+
+def test_compilar_a_ejecutable(tmp_path):
+    """El compilador produce el ejecutable en un solo comando"""
+    ejecutable = compilar(tmp_path, 'funcion main()\n    mostrar("hola")\nfin\n', ('-O2',), nombre="hola")
+    assert (tmp_path / "hola.o").exists()
+    assert subprocess.run([ejecutable], capture_output=True, text=True).stdout == "hola\n"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,79 @@
+"""
+Tests de las listas especializadas del generador LLVM
+"""
+
+import sys
+sys.path.insert(0, '../src')
+
+import pytest
+
+llvmlite = pytest.importorskip("llvmlite")
+
+from utilidades import requiere_cc, generar_ir, ejecutar_jit
+
+PROGRAMA = """
+funcion main()
+    variable xs = [1, 2, 3]
+    xs.agregar(40)
+    xs[0] = 10
+    mostrar(convertir_a_texto(xs[0] + xs[3]))
+    mostrar(convertir_a_texto(xs.eliminar(1)))
+    mostrar(convertir_a_texto(xs.longitud()))
+    variable fs = [1.5, 2.25]
+    fs.agregar(3.5)
+    fs[0] = fs[2]
+    mostrar(convertir_a_texto(fs[0]))
+    variable bs = [verdadero, falso]
+    bs.agregar(verdadero)
+    si bs[2] y no bs[1] entonces
+        mostrar("booleanos")
+    fin
+    variable m = {"a": 1, "b": 2}
+    variable vs = m.valores()
+    mostrar(convertir_a_texto(vs[0] + vs[1]))
+fin
+"""
+
+
+def test_listas_tipadas_usan_el_runtime_especializado():
+    llvm_ir = generar_ir(PROGRAMA, acceso_en_linea=False)
+    for sufijo in ('entero', 'flotante', 'booleano'):
+        assert f'call i8* @"jade_lista_{sufijo}_nueva"()' in llvm_ir
+    assert 'call i64 @"jade_lista_entero_obtener"' in llvm_ir
+    assert 'call double @"jade_lista_flotante_obtener"' in llvm_ir
+    # Las listas de m.valores() se convierten a su representación nativa
+    assert '@"jade_lista_especializar"' in llvm_ir
+
+
+def test_indexado_en_linea():
+    """Los accesos por índice no llaman al runtime salvo para informar errores"""
+    llvm_ir = generar_ir(PROGRAMA)
+    assert 'call i64 @"jade_lista_entero_obtener"' not in llvm_ir
+    assert 'call void @"jade_lista_entero_asignar"' not in llvm_ir
+    assert 'call void @"jade_lista_error_indice"' in llvm_ir
+    assert 'load double, double*' in llvm_ir
+
+
+@requiere_cc
+def test_listas_tipadas_ejecucion(tmp_path):
+    resultado = ejecutar_jit(tmp_path, PROGRAMA)
+    assert resultado.returncode == 0, resultado.stderr
+    assert resultado.stdout == "50\n2\n3\n3.5\nbooleanos\n3\n"
+
+
+@requiere_cc
+@pytest.mark.parametrize("indice", ["3", "0 - 1"])
+def test_indice_fuera_de_rango(tmp_path, indice):
+    codigo = f"""
+funcion main()
+    variable xs = [1, 2, 3]
+    mostrar(convertir_a_texto(xs[{indice}]))
+fin
+"""
+    resultado = ejecutar_jit(tmp_path, codigo)
+    assert resultado.returncode == 1
+    assert "fuera de rango" in resultado.stderr
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
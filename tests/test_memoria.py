@@ -0,0 +1,141 @@
+"""
+Tests del conteo de referencias en el código compilado: las variables,
+listas y mapas retienen los textos, listas y mapas que guardan y los
+sueltan al reemplazarlos o al salir de la función
+"""
+
+import sys
+sys.path.insert(0, '../src')
+
+import os
+import subprocess
+
+import pytest
+
+llvmlite = pytest.importorskip("llvmlite")
+
+from utilidades import requiere_cc, generar_ir, cuerpo_funcion, ejecutar_jit, compilar
+
+PROGRAMA = """
+funcion medir(texto t)
+    variable copia = t
+    variable partes = [t, t + "!"]
+    retornar copia.longitud() + partes.longitud()
+fin
+
+funcion main()
+    variable nombres = {"a": "uno"}
+    nombres["b"] = "do" + "s"
+    nombres["a"] = nombres["b"]
+    variable xs = ["x"]
+    xs[0] = "y" + convertir_a_texto(1)
+    mostrar(xs[0] + nombres["a"])
+    mostrar(convertir_a_texto(medir(xs[0])))
+fin
+"""
+
+# Diez millones de textos temporales: sin liberarlos ocupan más de 1 GB
+ITERACIONES = 10_000_000
+
+PROGRAMA_TEMPORALES = """
+funcion main()
+    variable total = 0
+    variable i = 0
+    mientras i < {iteraciones} hacer
+        variable t = "x" + convertir_a_texto(i)
+        t = t + "!"
+        total = total + t.longitud()
+        i = i + 1
+    fin
+    mostrar(convertir_a_texto(total))
+fin
+"""
+
+# medir() reserva una lista y retorna un entero, así que abre una región de
+# arena en cada llamada; los textos que libera el bucle (por debajo de la
+# marca) tienen que seguir disponibles después de restaurarla
+ITERACIONES_REGIONES = 2_000_000
+
+PROGRAMA_REGIONES = """
+funcion medir(texto t)
+    variable partes = [t, t + "!"]
+    retornar t.longitud() + partes.longitud()
+fin
+
+funcion main()
+    variable total = 0
+    variable i = 0
+    mientras i < {iteraciones} hacer
+        variable a = "x" + convertir_a_texto(i)
+        variable b = "y" + convertir_a_texto(i)
+        total = total + medir(a) + b.longitud()
+        i = i + 1
+    fin
+    mostrar(convertir_a_texto(total))
+fin
+"""
+
+
+def test_retener_y_liberar_en_funciones():
+    medir = cuerpo_funcion(generar_ir(PROGRAMA), 'medir')
+    # El parámetro y la copia toman su referencia; la lista nueva cede la suya a
+    # la variable y retiene sus elementos en jade_lista_agregar
+    assert medir.count('call void @"jade_texto_retener"') == 2
+    assert 'call void @"jade_lista_especializar"' in medir
+    # Al retornar se sueltan el parámetro y las variables locales
+    antes_de_retornar = medir[:medir.index('ret i64')]
+    assert antes_de_retornar.count('call void @"jade_texto_liberar"') >= 2
+    assert 'call void @"jade_lista_liberar"' in antes_de_retornar
+
+
+def test_mapas_de_objetos_cuentan_sus_valores():
+    main = cuerpo_funcion(generar_ir(PROGRAMA), 'jade.main')
+    assert 'call void @"jade_mapa_especializar_valores"' in main
+    assert 'call void @"jade_mapa_liberar"' in main
+
+
+def medir_temporales(tmp_path, iteraciones: int, asignador: str,
+                     plantilla: str = PROGRAMA_TEMPORALES):
+    """Salida y memoria máxima (KB) del programa de temporales compilado"""
+    ejecutable = compilar(tmp_path, plantilla.format(iteraciones=iteraciones), ('-O2',),
+                          nombre=f"temporales_{iteraciones}")
+    proceso = subprocess.Popen([ejecutable], stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                               env={**os.environ, 'JADE_ALLOC': asignador})
+    salida = proceso.stdout.read()
+    _, estado, uso = os.wait4(proceso.pid, 0)
+    assert estado == 0
+    return salida.decode('utf-8'), uso.ru_maxrss
+
+
+@requiere_cc
+def test_programa_con_objetos_compartidos(tmp_path):
+    resultado = ejecutar_jit(tmp_path, PROGRAMA)
+    assert resultado.returncode == 0, resultado.stderr
+    assert resultado.stdout == "y1dos\n4\n"
+
+
+@requiere_cc
+@pytest.mark.parametrize("asignador", ['sistema', 'arena'])
+def test_temporales_en_memoria_constante(tmp_path, asignador):
+    salida, memoria_kb = medir_temporales(tmp_path, ITERACIONES, asignador)
+    esperado = sum(len(f"x{i}!") for i in range(ITERACIONES))
+    assert salida == f"{esperado}\n"
+    # La memoria máxima del hijo parte de la del proceso que lo lanza: se
+    # compara con la del mismo programa con mil vueltas
+    _, memoria_base_kb = medir_temporales(tmp_path, 1000, asignador)
+    assert memoria_kb - memoria_base_kb < 16 * 1024
+
+
+@requiere_cc
+@pytest.mark.parametrize("asignador", ['sistema', 'arena'])
+def test_regiones_en_un_bucle_en_memoria_constante(tmp_path, asignador):
+    salida, memoria_kb = medir_temporales(tmp_path, ITERACIONES_REGIONES, asignador,
+                                          PROGRAMA_REGIONES)
+    esperado = sum(len(f"x{i}") + 2 + len(f"y{i}") for i in range(ITERACIONES_REGIONES))
+    assert salida == f"{esperado}\n"
+    _, memoria_base_kb = medir_temporales(tmp_path, 1000, asignador, PROGRAMA_REGIONES)
+    assert memoria_kb - memoria_base_kb < 16 * 1024
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,111 @@
+"""
+Tests del registro de módulos de Jade
+"""
+
+import sys
+sys.path.insert(0, '../src')
+
+import contextlib
+import io
+
+import pytest
+from module_loader import registro_modulos
+from interpreter import InterpreteJade
+from ast_nodes import *
+
+
+BIBLIOTECA = """
+funcion sumar(entero a, entero b)
+    retornar a + b
+fin
+"""
+
+PRINCIPAL = """
+importar "biblioteca.jde"
+importar "utilidades.jde"
+
+funcion main()
+    mostrar(doble(sumar(1, 2)))
+fin
+"""
+
+UTILIDADES = """
+importar "biblioteca.jde"
+
+funcion doble(x)
+    retornar sumar(x, x)
+fin
+"""
+
+
+def escribir(directorio, **archivos):
+    for nombre, codigo in archivos.items():
+        (directorio / f"{nombre}.jde").write_text(codigo, encoding='utf-8')
+    return str(directorio / "principal.jde")
+
+
+def test_cada_modulo_una_vez(tmp_path):
+    """Analizador e intérprete comparten el mismo Programa de cada módulo"""
+    ruta = escribir(tmp_path, principal=PRINCIPAL, biblioteca=BIBLIOTECA, utilidades=UTILIDADES)
+    cargas, analisis = registro_modulos.cargas, registro_modulos.analisis
+
+    modulo = registro_modulos.analizar(registro_modulos.cargar(ruta), requiere_main=True)
+    # biblioteca.jde se importa dos veces pero se parsea y analiza una
+    assert registro_modulos.cargas - cargas == 3
+    assert registro_modulos.analisis - analisis == 3
+    assert {'sumar', 'doble', 'main'} <= set(modulo.funciones)
+
+    salida = io.StringIO()
+    with contextlib.redirect_stdout(salida):
+        InterpreteJade(ruta).ejecutar_programa(modulo.programa)
+    assert salida.getvalue() == "6\n"
+    assert registro_modulos.cargas - cargas == 3
+
+    biblioteca = registro_modulos.cargar(str(tmp_path / "biblioteca.jde"))
+    importados = registro_modulos.importados(modulo)
+    assert [m.ruta for m in importados][0] == biblioteca.ruta
+    assert importados[0].programa is biblioteca.programa
+
+
+def test_importacion_ciclica(tmp_path):
+    """Un ciclo de importaciones termina y los errores del módulo se conservan"""
+    (tmp_path / "a.jde").write_text('importar "b.jde"\nfuncion fa()\n    retornar fb()\nfin\n', encoding='utf-8')
+    (tmp_path / "b.jde").write_text('importar "a.jde"\nfuncion fb()\n    retornar 1\nfin\n', encoding='utf-8')
+    analisis = registro_modulos.analisis
+    modulo = registro_modulos.analizar(registro_modulos.cargar(str(tmp_path / "a.jde")))
+    assert {'fa', 'fb'} <= set(modulo.funciones)
+
+    (tmp_path / "malo.jde").write_text('funcion f()\n    retornar x\nfin\n', encoding='utf-8')
+    malo = registro_modulos.cargar(str(tmp_path / "malo.jde"))
+    for _ in range(2):
+        with pytest.raises(Exception, match="x"):
+            registro_modulos.analizar(malo)
+    assert registro_modulos.analisis - analisis == 3
+
+
+def test_precarga_en_paralelo(tmp_path):
+    """La precarga con procesos obtiene las mismas firmas que el camino secuencial"""
+    secuencial, paralelo = tmp_path / "secuencial", tmp_path / "paralelo"
+    firmas = {}
+    for directorio in (secuencial, paralelo):
+        directorio.mkdir()
+        ruta = escribir(directorio, principal=PRINCIPAL, biblioteca=BIBLIOTECA, utilidades=UTILIDADES)
+        analisis = registro_modulos.analisis
+        if directorio is paralelo:
+            registro_modulos.precargar(ruta, procesos=2)
+            # Las dependencias ya vienen analizadas de los procesos
+            assert registro_modulos.analisis - analisis == 2
+            assert registro_modulos.modulos[str(directorio / "utilidades.jde")].analizado
+        modulo = registro_modulos.analizar(registro_modulos.cargar(ruta), requiere_main=True)
+        assert registro_modulos.analisis - analisis == 3
+        firmas[directorio] = modulo.funciones
+
+        salida = io.StringIO()
+        with contextlib.redirect_stdout(salida):
+            InterpreteJade(ruta).ejecutar_programa(modulo.programa)
+        assert salida.getvalue() == "6\n"
+    assert firmas[secuencial] == firmas[paralelo]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,51 @@
+"""
+Tests del pipeline de optimización LLVM de Jade
+"""
+
+import sys
+sys.path.insert(0, '../src')
+
+import pytest
+
+llvmlite = pytest.importorskip("llvmlite")
+
+from codegen_llvm import inicializar_llvm
+from optimizer import optimizar_ir, NIVELES_OPTIMIZACION
+from utilidades import generar_ir
+
+
+PROGRAMA = """
+funcion suma_hasta(entero n)
+    variable total = 0
+    variable i = 0
+    mientras i < n hacer
+        total = total + i
+        i = i + 1
+    fin
+    retornar total
+fin
+
+funcion main()
+    mostrar(convertir_a_texto(suma_hasta(10)))
+fin
+"""
+
+
+@pytest.mark.parametrize("nivel", NIVELES_OPTIMIZACION)
+def test_niveles_de_optimizacion(nivel):
+    inicializar_llvm()
+    llvm_ir = generar_ir(PROGRAMA)
+    optimizado, antes, despues = optimizar_ir(llvm_ir, nivel)
+    assert antes.allocas > 0
+    if nivel == 0:
+        assert despues.instrucciones == antes.instrucciones
+    else:
+        # mem2reg elimina las allocas de las variables locales
+        assert despues.allocas == 0
+        assert despues.instrucciones < antes.instrucciones
+    # El punto de entrada se conserva aunque main se integre en él
+    assert '@_jade_main()' in optimizado.replace('"', '')
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
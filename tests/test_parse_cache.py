@@ -0,0 +1,69 @@
+"""
+Tests de la caché de AST en disco de Jade
+"""
+
+import sys
+sys.path.insert(0, '../src')
+
+import pytest
+from parse_cache import CacheAST, DIRECTORIO_CACHE
+from ast_nodes import *
+
+
+MODULO = """
+funcion doble(x)
+    retornar x * 2 + 1
+fin
+"""
+
+
+def test_aciertos_y_fallos(tmp_path):
+    """El segundo parseo de un archivo sin cambios sale de la caché"""
+    ruta = tmp_path / "modulo.jde"
+    ruta.write_text(MODULO, encoding='utf-8')
+
+    cache = CacheAST()
+    original = cache.parsear_archivo(str(ruta))
+    assert (cache.aciertos, cache.fallos, cache.escrituras) == (0, 1, 1)
+    assert (tmp_path / DIRECTORIO_CACHE / "modulo.jde.ast").exists()
+
+    # Otra instancia (otro proceso) encuentra la entrada en disco
+    otra = CacheAST()
+    recuperado = otra.parsear_archivo(str(ruta))
+    assert (otra.aciertos, otra.fallos) == (1, 0)
+
+    funcion = recuperado.declaraciones[0]
+    assert isinstance(funcion, DeclaracionFuncion)
+    assert funcion.nombre == 'doble'
+    expresion = funcion.cuerpo[0].valor
+    assert (expresion.linea, expresion.columna) == (original.declaraciones[0].cuerpo[0].valor.linea,
+                                                    original.declaraciones[0].cuerpo[0].valor.columna)
+    # Los operadores deserializados son las instancias compartidas
+    assert expresion.operador is original.declaraciones[0].cuerpo[0].valor.operador
+
+
+def test_invalidacion(tmp_path):
+    """Un cambio de contenido o de versión del compilador invalida la entrada"""
+    ruta = tmp_path / "modulo.jde"
+    ruta.write_text(MODULO, encoding='utf-8')
+    CacheAST().parsear_archivo(str(ruta))
+
+    ruta.write_text(MODULO.replace('doble', 'triple'), encoding='utf-8')
+    cache = CacheAST()
+    assert cache.parsear_archivo(str(ruta)).declaraciones[0].nombre == 'triple'
+    assert (cache.aciertos, cache.fallos) == (0, 1)
+
+    otra_version = CacheAST()
+    otra_version.version = 'otra'
+    otra_version.parsear_archivo(str(ruta))
+    assert (otra_version.aciertos, otra_version.fallos) == (0, 1)
+
+    # Una entrada corrupta cuenta como fallo, no como error fatal
+    (tmp_path / DIRECTORIO_CACHE / "modulo.jde.ast").write_bytes(b'basura')
+    corrupta = CacheAST()
+    assert corrupta.parsear_archivo(str(ruta)).declaraciones[0].nombre == 'triple'
+    assert (corrupta.fallos, corrupta.errores) == (1, 1)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
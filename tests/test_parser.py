@@ -162,5 +162,23 @@ def test_lista_literal():
     assert len(lista.elementos) == 5
 
 
+
+def test_nodos_compactos():
+    """Los nodos usan __slots__, posiciones empaquetadas y operadores compartidos"""
+    codigo = """
+    funcion main()
+        variable a = 1 + 2
+        variable b = a + 3
+    fin
+    """
+    programa = parsear_codigo(tokenizar_codigo(codigo))
+    decl_a, decl_b = programa.declaraciones[0].cuerpo
+
+    assert not hasattr(decl_a, '__dict__')
+    assert (decl_a.linea, decl_a.columna) == (3, 9)
+    assert decl_b.valor_inicial.izquierda.linea == 4
+    assert decl_a.valor_inicial.operador is decl_b.valor_inicial.operador
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,79 @@
+"""
+Tests del Resolutor de variables de Jade
+"""
+
+import sys
+sys.path.insert(0, '../src')
+
+import pytest
+from lexer import tokenizar_codigo
+from parser import parsear_codigo
+from semantic_analyzer import AnalizadorSemantico
+from resolver import Resolutor, PROFUNDIDAD_LOCAL, PROFUNDIDAD_GLOBAL
+from ast_nodes import *
+
+
+def resolver(codigo: str) -> Programa:
+    programa = parsear_codigo(tokenizar_codigo(codigo))
+    AnalizadorSemantico().analizar(programa)
+    Resolutor().resolver_programa(programa)
+    return programa
+
+
+def test_parametros_primero():
+    """Los parámetros ocupan los primeros slots y las locales los siguientes"""
+    programa = resolver("""
+    funcion suma(a, b)
+        variable c = a + b
+        retornar c
+    fin
+
+    funcion main()
+        mostrar(suma(1, 2))
+    fin
+    """)
+    func = programa.declaraciones[0]
+    assert func.locales == ['a', 'b', 'c']
+
+    decl, ret = func.cuerpo
+    assert (decl.profundidad, decl.slot) == (PROFUNDIDAD_LOCAL, 2)
+    assert (decl.valor_inicial.izquierda.profundidad, decl.valor_inicial.izquierda.slot) == (PROFUNDIDAD_LOCAL, 0)
+    assert (decl.valor_inicial.derecha.profundidad, decl.valor_inicial.derecha.slot) == (PROFUNDIDAD_LOCAL, 1)
+    assert ret.valor.slot == 2
+
+
+def test_para_y_asignacion():
+    """La variable de 'para' y las asignaciones comparten slot con su declaración"""
+    programa = resolver("""
+    funcion main()
+        variable total = 0
+        para i desde 0 hasta 10 hacer
+            total = total + i
+        fin
+    fin
+    """)
+    func = programa.declaraciones[0]
+    assert func.locales == ['total', 'i']
+
+    para = func.cuerpo[1]
+    asignacion = para.cuerpo[0]
+    assert para.slot == 1
+    assert asignacion.slot == 0
+    assert asignacion.valor.derecha.slot == 1
+
+
+def test_globales():
+    """Los enums se resuelven a la tabla global"""
+    programa = resolver("""
+    enum Color {
+        ROJO,
+        VERDE
+    }
+
+    funcion main()
+        variable c = Color.ROJO
+    fin
+    """)
+    main = programa.declaraciones[1]
+    acceso = main.cuerpo[0].valor_inicial
+    assert (acceso.objeto.profundidad, acceso.objeto.slot) == (PROFUNDIDAD_GLOBAL, 0)
@@ -0,0 +1,90 @@
+"""
+Tests del mapa del runtime de C (a través del modo JIT)
+"""
+
+import sys
+sys.path.insert(0, '../src')
+
+import pytest
+
+llvmlite = pytest.importorskip("llvmlite")
+
+from utilidades import requiere_cc, ejecutar_jit
+
+# Borra las claves impares: las búsquedas deben atravesar los tombstones
+PROGRAMA = """
+funcion main()
+    variable m = {"cero": 0}
+    variable i = 1
+    mientras i < 2000 hacer
+        m["k" + convertir_a_texto(i)] = i
+        i = i + 1
+    fin
+    i = 1
+    mientras i < 2000 hacer
+        m.eliminar("k" + convertir_a_texto(i))
+        i = i + 2
+    fin
+    mostrar(convertir_a_texto(m.longitud()))
+    mostrar(convertir_a_texto(m.contiene("cero")))
+    mostrar(convertir_a_texto(m.contiene("k1999")))
+    mostrar(convertir_a_texto(m["k1998"]))
+    m["k1999"] = 1
+    variable total = 0
+    variable vs = m.valores()
+    i = 0
+    mientras i < vs.longitud() hacer
+        total = total + vs[i]
+        i = i + 1
+    fin
+    mostrar(convertir_a_texto(total))
+fin
+"""
+
+
+# Claves enteras: jade_mapa_entero_* no las trata como texto
+PROGRAMA_CLAVES_ENTERAS = """
+funcion main()
+    variable cuadrados = {0: 0}
+    variable i = 1
+    mientras i < 1000 hacer
+        cuadrados[i] = i * i
+        i = i + 1
+    fin
+    i = 0
+    mientras i < 1000 hacer
+        cuadrados.eliminar(i)
+        i = i + 3
+    fin
+    mostrar(convertir_a_texto(cuadrados.longitud()))
+    mostrar(convertir_a_texto(cuadrados[998]))
+    mostrar(convertir_a_texto(cuadrados.contiene(999)))
+    variable ks = cuadrados.claves()
+    variable total = 0
+    i = 0
+    mientras i < ks.longitud() hacer
+        total = total + ks[i]
+        i = i + 1
+    fin
+    mostrar(convertir_a_texto(total))
+fin
+"""
+
+
+@requiere_cc
+def test_mapa_con_borrados(tmp_path):
+    resultado = ejecutar_jit(tmp_path, PROGRAMA)
+    assert resultado.returncode == 0, resultado.stderr
+    # contiene("cero") es 1 aunque su valor sea 0
+    assert resultado.stdout == "1000\n1\n0\n1998\n999001\n"
+
+
+@requiere_cc
+def test_mapa_con_claves_enteras(tmp_path):
+    resultado = ejecutar_jit(tmp_path, PROGRAMA_CLAVES_ENTERAS)
+    assert resultado.returncode == 0, resultado.stderr
+    assert resultado.stdout == "666\n996004\n0\n332667\n"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,102 @@
+"""
+Tests de la salida con buffer de mostrar() en el intérprete y en el código
+compilado
+"""
+
+import sys
+sys.path.insert(0, '../src')
+
+import contextlib
+import io
+import subprocess
+
+import pytest
+from lexer import tokenizar_codigo
+from parser import parsear_codigo
+from interpreter import InterpreteJade, salida
+from closure_compiler import InterpreteCierres
+from vm import InterpreteBytecode
+from utilidades import INTERPRETE, requiere_cc, generar_ir, compilar
+
+# Lo mostrado antes de leer() y antes de un error también tiene que salir
+PROGRAMA = """
+funcion main()
+    mostrar("¿Nombre?")
+    variable n = leer()
+    mostrar("Hola " + n)
+    vaciar_salida()
+    variable xs = [1, 2]
+    mostrar("antes del error")
+    mostrar(convertir_a_texto(xs[5]))
+fin
+"""
+
+SALIDA = "¿Nombre?\nHola Ana\nantes del error\n"
+
+
+class EscrituraContada(io.StringIO):
+    """StringIO que cuenta las llamadas a write"""
+
+    def __init__(self):
+        super().__init__()
+        self.escrituras = 0
+
+    def write(self, texto):
+        self.escrituras += 1
+        return super().write(texto)
+
+
+@pytest.mark.parametrize("clase_motor", [InterpreteJade, InterpreteCierres, InterpreteBytecode])
+def test_interprete_escribe_en_bloques(clase_motor):
+    codigo = """
+funcion main()
+    para i desde 0 hasta 100 hacer
+        mostrar(i)
+    fin
+    vaciar_salida()
+    mostrar("fin")
+fin
+"""
+    programa = parsear_codigo(tokenizar_codigo(codigo))
+    destino = EscrituraContada()
+    with contextlib.redirect_stdout(destino):
+        clase_motor("").ejecutar_programa(programa)
+    assert destino.getvalue() == "".join(f"{i}\n" for i in range(100)) + "fin\n"
+    # Una escritura por vaciar_salida() y otra al terminar el programa
+    assert destino.escrituras == 2
+    assert salida.lineas == []
+
+
+@pytest.mark.parametrize("sin_buffer", [False, True])
+def test_interprete_vacia_antes_de_leer_y_de_un_error(tmp_path, sin_buffer):
+    ruta = tmp_path / "salida.jde"
+    ruta.write_text(PROGRAMA, encoding='utf-8')
+    comando = [sys.executable, INTERPRETE, '--motor', 'bytecode', str(ruta)]
+    if sin_buffer:
+        comando.append('--salida-sin-buffer')
+    resultado = subprocess.run(comando, input="Ana\n", capture_output=True, text=True)
+    assert resultado.returncode == 1
+    assert resultado.stdout == SALIDA
+
+
+def test_sin_buffer_en_el_punto_de_entrada():
+    assert 'call void @"jade_configurar_salida"(i64 0)' in generar_ir(PROGRAMA, salida_sin_buffer=True)
+    llvm_ir = generar_ir(PROGRAMA)
+    assert 'call void @"jade_configurar_salida"' not in llvm_ir
+    assert 'call i8* @"jade_leer"()' in llvm_ir
+    assert 'call void @"jade_vaciar_salida"()' in llvm_ir
+
+
+@requiere_cc
+@pytest.mark.parametrize("opciones", [[], ['--salida-sin-buffer']])
+def test_ejecutable_vacia_antes_de_leer_y_de_un_error(tmp_path, opciones):
+    pytest.importorskip("llvmlite")
+    ejecutable = compilar(tmp_path, PROGRAMA, opciones)
+    resultado = subprocess.run([ejecutable], input="Ana\n", capture_output=True, text=True)
+    assert resultado.returncode == 1
+    assert resultado.stdout == SALIDA
+    assert "Índice de lista fuera de rango" in resultado.stderr
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
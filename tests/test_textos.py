@@ -0,0 +1,92 @@
+"""
+Tests de la representación de textos (JadeString) en el código generado
+"""
+
+import sys
+sys.path.insert(0, '../src')
+
+import pytest
+
+llvmlite = pytest.importorskip("llvmlite")
+
+from utilidades import requiere_cc, generar_ir, ejecutar_jit
+
+PROGRAMA = """
+funcion main()
+    variable s = "abc"
+    mostrar(s + "def" + convertir_a_texto(42))
+    mostrar(convertir_a_texto(s.longitud()))
+    mostrar(convertir_a_texto((s + "xy").longitud()))
+    variable m = {"a1": 1}
+    variable i = 0
+    mientras i < 5 hacer
+        m["a" + convertir_a_texto(i)] = i * 10
+        i = i + 1
+    fin
+    mostrar(convertir_a_texto(m["a" + convertir_a_texto(3)]))
+    m.eliminar("a" + convertir_a_texto(2))
+    mostrar(convertir_a_texto(m.contiene("a2")))
+    variable ks = m.claves()
+    m.eliminar("a1")
+    mostrar(convertir_a_texto(ks.longitud()))
+    mostrar(convertir_a_texto(s))
+fin
+"""
+
+
+def test_literales_con_cabecera():
+    llvm_ir = generar_ir(PROGRAMA)
+    # {longitud, capacidad, referencias (inmortal), hash, datos}
+    assert '{i64, i64, i64, i64, [4 x i8]} {i64 3, i64 3, i64 -1, i64 0, [4 x i8] c"abc\\00"}' in llvm_ir
+
+
+def test_temporales_liberados():
+    """Los textos intermedios de concatenaciones y claves se liberan tras usarse"""
+    llvm_ir = generar_ir(PROGRAMA)
+    # s + "def" (dentro de la cadena), convertir_a_texto(42), la cadena en
+    # mostrar, s + "xy", y las claves temporales del mapa
+    assert llvm_ir.count('call void @"jade_texto_liberar"') >= 8
+    # longitud() de un texto se lee de la cabecera, sin llamar al runtime
+    assert 'jade_lista_longitud"(i8* %"s' not in llvm_ir
+
+
+@requiere_cc
+def test_textos_ejecucion(tmp_path):
+    resultado = ejecutar_jit(tmp_path, PROGRAMA)
+    assert resultado.returncode == 0, resultado.stderr
+    # Las claves de ks siguen vivas aunque se eliminen del mapa
+    assert resultado.stdout == "abcdef42\n3\n5\n30\n0\n4\nabc\n"
+
+
+PROGRAMA_CONSTRUCTOR = """
+funcion main()
+    variable ct = constructor_texto()
+    variable i = 0
+    mientras i < 3 hacer
+        ct.agregar("<" + convertir_a_texto(i) + ">")
+        i = i + 1
+    fin
+    variable s = ct.construir()
+    mostrar(s + " | " + convertir_a_texto(ct.longitud()) + " | " + s)
+    mostrar(f("{} + {} = {}", 1.5, "dos", 7))
+fin
+"""
+
+
+def test_cadena_de_concatenaciones():
+    """a + b + c + ... se arma con una sola llamada a jade_concatenar_n"""
+    llvm_ir = generar_ir(PROGRAMA_CONSTRUCTOR)
+    assert llvm_ir.count('call i8* @"jade_concatenar_n"(i64 5') == 2
+    assert 'call i8* @"jade_concatenar_n"(i64 3' in llvm_ir
+    assert 'call i8* @"jade_concatenar"(' not in llvm_ir
+
+
+@requiere_cc
+def test_constructor_texto_ejecucion(tmp_path):
+    resultado = ejecutar_jit(tmp_path, PROGRAMA_CONSTRUCTOR)
+    assert resultado.returncode == 0, resultado.stderr
+    assert resultado.stdout == "<0><1><2> | 9 | <0><1><2>\n1.5 + dos = 7\n"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,64 @@
+"""
+Utilidades compartidas por los tests del compilador y del runtime de C
+"""
+
+import sys
+sys.path.insert(0, '../src')
+
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from lexer import tokenizar_codigo
+from parser import parsear_codigo
+from semantic_analyzer import AnalizadorSemantico
+from resolver import Resolutor
+try:
+    from codegen_llvm import GeneradorLLVM
+    LLVM_DISPONIBLE = True
+except ImportError:
+    LLVM_DISPONIBLE = False
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COMPILADOR = os.path.join(RAIZ, 'src', 'compiler.py')
+INTERPRETE = os.path.join(RAIZ, 'src', 'interpreter.py')
+
+requiere_cc = pytest.mark.skipif(shutil.which(os.environ.get('CC', 'gcc')) is None,
+                                 reason="requiere un compilador de C para el runtime")
+
+
+def generar_ir(codigo: str, **opciones) -> str:
+    """IR LLVM del programa; las opciones se pasan a GeneradorLLVM"""
+    if not LLVM_DISPONIBLE:
+        pytest.skip("requiere llvmlite")
+    programa = parsear_codigo(tokenizar_codigo(codigo))
+    AnalizadorSemantico("prueba.jde").analizar(programa, requiere_main=True)
+    Resolutor().resolver_programa(programa)
+    return GeneradorLLVM(**opciones).generar(programa)
+
+
+def cuerpo_funcion(llvm_ir: str, nombre: str) -> str:
+    """Definición de una función del IR, desde su nombre hasta la llave final"""
+    inicio = llvm_ir.index(f'@"{nombre}"(')
+    return llvm_ir[inicio:llvm_ir.index('\n}', inicio)]
+
+
+def ejecutar_jit(tmp_path, codigo: str, entorno: dict = None, nombre: str = "programa"):
+    """Ejecuta el programa con --jit y retorna el proceso terminado"""
+    ruta = tmp_path / f"{nombre}.jde"
+    ruta.write_text(codigo, encoding='utf-8')
+    return subprocess.run([sys.executable, COMPILADOR, '--jit', str(ruta)],
+                          capture_output=True, text=True, env={**os.environ, **(entorno or {})})
+
+
+def compilar(tmp_path, codigo: str, opciones: tuple = (), nombre: str = "programa") -> str:
+    """Compila el programa a un ejecutable y retorna su ruta"""
+    ruta = tmp_path / f"{nombre}.jde"
+    ruta.write_text(codigo, encoding='utf-8')
+    ejecutable = str(tmp_path / nombre)
+    resultado = subprocess.run([sys.executable, COMPILADOR, *opciones, str(ruta), '-o', ejecutable],
+                               capture_output=True, text=True)
+    assert resultado.returncode == 0, resultado.stderr
+    return ejecutable